@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Benchmark: per-request overhead of handle() around a trivial handler.
+
+Runs the same request through two configurations:
+
+    env-per-request   settings re-read from os.environ on every request
+                      (the behaviour before the runtime config snapshot)
+    frozen, prod      snapshot taken at startup, production fast lane
+
+Usage:
+    .venv/bin/python benchmarks/bench_dispatch.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Ensure tina4_python is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tina4_python.core.config import freeze_runtime_config, thaw_runtime_config
+from tina4_python.core.request import Request
+from tina4_python.core.router import Router
+from tina4_python.core.server import handle
+
+SCOPE = {
+    "type": "http", "method": "GET", "path": "/api/ping", "query_string": b"",
+    "headers": [(b"host", b"localhost"), (b"accept", b"application/json")],
+    "client": ("127.0.0.1", 50000),
+}
+
+
+async def _handler(request, response):
+    return response({"ok": True})
+
+
+async def bench(iterations: int) -> float:
+    """Return the average cost of one handle() call in microseconds."""
+    for _ in range(200):  # warm-up (route tables, invoke plans)
+        await handle(Request.from_scope(SCOPE))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await handle(Request.from_scope(SCOPE))
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    iterations = 20000
+    Router.clear()
+    Router.get("/api/ping", _handler)
+
+    results = []
+    os.environ["TINA4_DEBUG"] = "false"
+    thaw_runtime_config()
+    results.append(("env-per-request", asyncio.run(bench(iterations))))
+
+    freeze_runtime_config()
+    results.append(("frozen, prod", asyncio.run(bench(iterations))))
+
+    print("=" * 60)
+    print(f"handle() overhead — {iterations} requests each")
+    print("=" * 60)
+    baseline = results[0][1]
+    for name, cost in results:
+        print(f"  {name:<18} {cost:8.2f} µs/request   ({baseline / cost:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
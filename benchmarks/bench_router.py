@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark: Router.match cost as the route table grows.
+
+Compares the compiled routing table (static hash map + segment trie) with a
+linear regex scan over the same registry, for 10 to 10,000 routes. The
+compiled lookup should stay flat; the linear scan grows with route count.
+
+Usage:
+    .venv/bin/python benchmarks/bench_router.py
+"""
+
+import os
+import sys
+import time
+
+# Ensure tina4_python is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tina4_python.core.router import Router, _routes
+
+
+async def _handler(request, response):
+    return response({"ok": True})
+
+
+def register(count: int):
+    """Register *count* routes — a mix of static and parameterised paths."""
+    Router.clear()
+    for i in range(count):
+        if i % 2 == 0:
+            Router.get(f"/api/resource{i}/list", _handler)
+        else:
+            Router.get(f"/api/resource{i}/{{id:int}}", _handler)
+
+
+def linear_match(method: str, path: str):
+    """The pre-compiled-table algorithm: one regex per route, in order."""
+    for route in _routes:
+        if route["method"] not in (method.upper(), "ANY"):
+            continue
+        m = route["pattern"].match(path)
+        if m:
+            return route, {name: m.group(i + 1) for i, name in enumerate(route["param_names"])}
+    return None, {}
+
+
+def bench(match, method: str, path: str, iterations: int) -> float:
+    """Return the average cost of one match call in microseconds."""
+    match(method, path)  # warm-up (builds the compiled table)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        match(method, path)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    iterations = 2000
+    print("=" * 78)
+    print("Router.match — compiled table vs linear scan")
+    print("=" * 78)
+    print(f"Iterations per test: {iterations}\n")
+    print(f"{'Routes':>8}  {'Lookup':<8}{'Compiled (us)':>16}{'Linear (us)':>16}{'Speedup':>12}")
+    print("-" * 78)
+
+    for count in (10, 100, 1_000, 10_000):
+        register(count)
+        last = count - 1
+        lookups = {
+            "static": f"/api/resource{last - (last % 2)}/list",
+            "param": f"/api/resource{last if last % 2 else last - 1}/42",
+            "404": "/api/does-not-exist",
+        }
+        for label, path in lookups.items():
+            compiled = bench(Router.match, "GET", path, iterations)
+            linear = bench(linear_match, "GET", path, max(10, iterations // max(1, count // 100)))
+            speedup = linear / compiled if compiled > 0 else float("inf")
+            print(f"{count:>8}  {label:<8}{compiled:>16.3f}{linear:>16.3f}{speedup:>11.1f}x")
+        print()
+
+    Router.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -729,3 +729,166 @@ class TestFileBackendEnv:
         backend.set("env_key", {"test": True}, ttl=60)
         result = backend.get("env_key")
         assert result == {"test": True}
+
+
+# ── Backend-shared response entries ───────────────────────────────
+
+
+class TestResponseEnvelope:
+    """The binary envelope response entries are stored in."""
+
+    def test_round_trip(self):
+        entry = cache_module._CacheEntry(
+            body=b"\x00binary\xff", content_type="application/octet-stream", status_code=203,
+            expires_at=time.time() + 60, headers=[("x-one", "1"), ("x-two", "ünï")],
+            tags={"products": 42},
+        )
+        back = cache_module._unpack_entry(cache_module._pack_entry(entry))
+        assert back.body == entry.body
+        assert back.status_code == 203
+        assert back.content_type == "application/octet-stream"
+        assert back.headers == entry.headers
+        assert back.tags == {"products": 42}
+        assert back.expires_at == entry.expires_at
+
+    def test_rejects_foreign_or_truncated_data(self):
+        packed = cache_module._pack_entry(cache_module._CacheEntry(b"x", "text/plain", 200, time.time() + 60,
+                                                                   headers=[("x-a", "b")]))
+        assert cache_module._unpack_entry(b"not an envelope") is None
+        assert cache_module._unpack_entry(packed[:12]) is None
+
+    def test_text_backends_store_base64(self, tmp_path):
+        backend = _FileBackend(cache_dir=str(tmp_path))
+        backend.set_raw("blob", b"\x00\x01\xff", 60)
+        assert isinstance(backend.get("blob"), str)
+        assert backend.get_raw("blob") == b"\x00\x01\xff"
+
+
+class TestSharedBackend:
+    """Instances over one file backend behave like workers sharing Redis."""
+
+    def _pair(self, tmp_path, monkeypatch, **kwargs):
+        monkeypatch.setenv("TINA4_CACHE_DIR", str(tmp_path))
+        return (ResponseCache(ttl=60, backend="file", **kwargs),
+                ResponseCache(ttl=60, backend="file", **kwargs))
+
+    def _store(self, cache, url, body):
+        req = MockRequest(url=url)
+        cache.before_cache(req, MockResponse())
+        cache.after_cache(req, MockResponse(body=body))
+
+    def _replace(self, cache, url, body):
+        """Store as after a miss, whatever the cache currently holds."""
+        req = MockRequest(url=url)
+        req._cache_key = f"GET:{url}"
+        cache.after_cache(req, MockResponse(body=body))
+
+    def test_entry_written_by_one_is_served_by_other(self, tmp_path, monkeypatch):
+        first, second = self._pair(tmp_path, monkeypatch)
+        self._store(first, "/api/shared", "from-first")
+        _, hit = second.before_cache(MockRequest(url="/api/shared"), MockResponse())
+        assert hit.body == "from-first"
+        assert second.cache_stats()["hits"] == 1
+
+    def test_clear_tag_purges_every_worker(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TINA4_CACHE_L1_TTL", "0")
+        first, second = self._pair(tmp_path, monkeypatch, tags=["products"])
+        self._store(first, "/api/products", "v1")
+        _, hit = second.before_cache(MockRequest(url="/api/products"), MockResponse())
+        assert hit.body == "v1"
+
+        first.clear_tag("products")
+        resp = MockResponse()
+        _, miss = second.before_cache(MockRequest(url="/api/products"), resp)
+        assert miss is resp
+
+    def test_l1_serves_briefly_stale_entries(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TINA4_CACHE_L1_TTL", "30")
+        first, second = self._pair(tmp_path, monkeypatch)
+        self._store(first, "/api/stale", "old")
+        second.before_cache(MockRequest(url="/api/stale"), MockResponse())
+        self._replace(first, "/api/stale", "new")
+        _, hit = second.before_cache(MockRequest(url="/api/stale"), MockResponse())
+        assert hit.body == "old"
+
+    def test_l1_ttl_bounds_staleness(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TINA4_CACHE_L1_TTL", "0.05")
+        first, second = self._pair(tmp_path, monkeypatch)
+        self._store(first, "/api/stale", "old")
+        second.before_cache(MockRequest(url="/api/stale"), MockResponse())
+        self._replace(first, "/api/stale", "new")
+        time.sleep(0.1)
+        _, hit = second.before_cache(MockRequest(url="/api/stale"), MockResponse())
+        assert hit.body == "new"
+
+
+class TestClearTag:
+
+    def test_module_clear_tag_reaches_all_instances(self):
+        from tina4_python.cache import clear_tag
+        tagged = ResponseCache(ttl=60, tags=["news"])
+        other = ResponseCache(ttl=60, tags=["weather"])
+        for cache, url in ((tagged, "/news"), (other, "/weather")):
+            req = MockRequest(url=url)
+            cache.before_cache(req, MockResponse())
+            cache.after_cache(req, MockResponse(body=url))
+
+        clear_tag("news")
+        resp = MockResponse()
+        _, miss = tagged.before_cache(MockRequest(url="/news"), resp)
+        assert miss is resp
+        _, hit = other.before_cache(MockRequest(url="/weather"), MockResponse())
+        assert hit.body == "/weather"
+
+
+class TestResponseCacheDispatch:
+    """ResponseCache as route middleware on real requests."""
+
+    @pytest.fixture(autouse=True)
+    def clear_routes(self):
+        from tina4_python.core.router import Router
+        Router.clear()
+        yield
+        Router.clear()
+
+    @staticmethod
+    def _request(path, query=b""):
+        from tina4_python.core.request import Request
+        return Request.from_scope({
+            "type": "http", "method": "GET", "path": path, "query_string": query,
+            "headers": [], "client": ("127.0.0.1", 0),
+        }, b"")
+
+    async def test_hit_skips_handler(self):
+        from tina4_python.core.router import get, middleware
+        from tina4_python.core.server import handle
+        calls = []
+
+        @middleware(ResponseCache(ttl=60))
+        @get("/api/cached-items")
+        async def items(request, response):
+            calls.append(request.query_string)
+            return response.json({"n": len(calls)}).header("x-source", "handler")
+
+        first = await handle(self._request("/api/cached-items", b"b=2&a=1"))
+        second = await handle(self._request("/api/cached-items", b"a=1&b=2"))
+        assert calls == ["b=2&a=1"]
+        assert second.content == first.content == b'{"n":1}'
+        assert second.content_type == first.content_type
+        headers = {name.lower(): value for name, value in second._headers}
+        assert headers["x-source"] == "handler" and "age" in headers
+
+    async def test_cookie_responses_are_not_stored(self):
+        from tina4_python.core.router import get, middleware
+        from tina4_python.core.server import handle
+        calls = []
+
+        @middleware(ResponseCache(ttl=60))
+        @get("/api/personal")
+        async def personal(request, response):
+            calls.append(1)
+            return response("hi").cookie("seen", "1")
+
+        await handle(self._request("/api/personal"))
+        await handle(self._request("/api/personal"))
+        assert calls == [1, 1]
@@ -0,0 +1,58 @@
+# Tests for tina4_python.core.codec — JSON codec registry and array streaming.
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from tina4_python.core import codec
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    yield
+    codec._codecs.pop("upper", None)
+    codec.use()
+
+
+class TestCodecRegistry:
+
+    def test_auto_selects_available_codec(self):
+        assert codec.current().name in codec.available()
+
+    def test_stdlib_output_is_compact_with_str_fallback(self):
+        codec.use("stdlib")
+        out = codec.dumps({"when": datetime(2024, 1, 2, 3, 4, 5), "price": Decimal("9.50")})
+        assert out == '{"when":"2024-01-02 03:04:05","price":"9.50"}'
+        assert codec.loads(out.encode())["price"] == "9.50"
+
+    def test_register_and_use(self):
+        codec.register("upper", lambda obj: json.dumps(obj).upper().encode(), json.loads)
+        codec.use("upper")
+        assert codec.dumps_bytes({"a": "b"}) == b'{"A": "B"}'
+
+    def test_unknown_codec_raises(self):
+        with pytest.raises(ValueError):
+            codec.use("nope")
+
+    def test_decode_error_is_json_decode_error(self):
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads(b"{broken")
+
+
+class TestIterArray:
+
+    def test_matches_full_encoding(self):
+        rows = ({"id": i, "name": f"row {i}"} for i in range(5000))
+        chunks = list(codec.iter_array(rows, chunk_size=4096))
+        assert len(chunks) > 1
+        assert json.loads(b"".join(chunks)) == [{"id": i, "name": f"row {i}"} for i in range(5000)]
+
+    def test_empty(self):
+        assert b"".join(codec.iter_array([])) == b"[]"
+
+    async def test_async_source(self):
+        async def rows():
+            for i in range(3):
+                yield {"n": i}
+        chunks = [chunk async for chunk in codec.aiter_array(rows())]
+        assert json.loads(b"".join(chunks)) == [{"n": 0}, {"n": 1}, {"n": 2}]
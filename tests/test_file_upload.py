@@ -112,3 +112,110 @@ class TestMaxUploadSize:
         body = _build_multipart(boundary, files={"file": {"filename": "logo.svg", "type": "image/svg+xml", "content": logo}})
         req = _make_request(body, f"multipart/form-data; boundary={boundary}")
         assert "file" in req.files
+
+
+class TestStreamingMultipart:
+    def _body(self, boundary, payload):
+        return _build_multipart(
+            boundary,
+            fields={"title": "clip"},
+            files={"video": {"filename": "clip.bin", "type": "application/octet-stream", "content": payload}},
+        )
+
+    def test_byte_by_byte_matches_whole_body(self):
+        from tina4_python.core.request import MultipartParser
+        boundary = "----STREAM"
+        payload = b"\x00--" + boundary.encode() + b"\r\n\r" + bytes(range(256))
+        body = self._body(boundary, payload)
+        parser = MultipartParser(f"multipart/form-data; boundary={boundary}")
+        for i in range(len(body)):
+            parser.feed(body[i:i + 1])
+        result = parser.close()
+        assert result["title"] == "clip"
+        assert result["video"]["content"] == payload
+        assert result["video"]["size"] == len(payload)
+
+    def test_large_part_spooled_to_disk(self):
+        from tina4_python.core.request import MultipartParser
+        boundary = "----BIG"
+        payload = b"v" * 5000
+        body = self._body(boundary, payload)
+        parser = MultipartParser(f"multipart/form-data; boundary={boundary}", spool_threshold=1024)
+        for start in range(0, len(body), 700):
+            parser.feed(body[start:start + 700])
+        video = parser.close()["video"]
+        assert video.file._rolled  # on disk, not in memory
+        assert video.read(4) == b"vvvv"
+        assert video.getvalue() == payload
+
+    def test_save_copies_upload(self, tmp_path):
+        boundary = "----SAVE"
+        body = self._body(boundary, b"saved-bytes")
+        req = _make_request(body, f"multipart/form-data; boundary={boundary}")
+        target = tmp_path / "out.bin"
+        req.files["video"].save(str(target))
+        assert target.read_bytes() == b"saved-bytes"
+        assert req.body == {"title": "clip"}
+
+    def test_dict_shape_preserved(self):
+        boundary = "----SHAPE"
+        req = _make_request(self._body(boundary, b"abc"), f"multipart/form-data; boundary={boundary}")
+        upload = req.files["video"]
+        assert "content" in upload
+        assert upload.get("content") == b"abc"
+        assert {k: upload[k] for k in ("filename", "type", "content", "size")} == {
+            "filename": "clip.bin", "type": "application/octet-stream", "content": b"abc", "size": 3,
+        }
+
+    def test_content_is_a_real_key(self):
+        import json
+        boundary = "----KEYS"
+        req = _make_request(self._body(boundary, b"abc"), f"multipart/form-data; boundary={boundary}")
+        upload = req.files["video"]
+        expected = {"filename": "clip.bin", "type": "application/octet-stream", "size": 3, "content": b"abc"}
+        assert dict(upload) == expected and {**upload} == expected and upload.copy() == expected
+        assert dict(upload.items()) == expected and set(upload.keys()) == set(expected)
+        assert list(upload)[-1] == "content" and len(upload) == 4
+        assert json.loads(json.dumps(upload, default=bytes.decode))["content"] == "abc"
+
+    async def test_app_parses_while_receiving(self, monkeypatch):
+        import tina4_python.core.request as req_mod
+        from tina4_python.core.router import Router, post, noauth
+        from tina4_python.core.server import app
+        monkeypatch.setattr(req_mod, "TINA4_SPOOL_THRESHOLD", 64)
+        boundary = "----ASGI"
+        payload = b"z" * 1000
+        body = self._body(boundary, payload)
+        chunks = [body[i:i + 100] for i in range(0, len(body), 100)]
+        seen = {}
+
+        Router.clear()
+
+        @noauth()
+        @post("/api/upload")
+        async def upload(request, response):
+            seen["raw"] = request.raw_body
+            seen["rolled"] = request.files["video"].file._rolled
+            seen["content"] = request.files["video"]["content"]
+            return response({"title": request.body["title"]})
+
+        async def receive():
+            chunk = chunks.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        scope = {
+            "type": "http", "method": "POST", "path": "/api/upload", "query_string": b"",
+            "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())],
+            "client": ("127.0.0.1", 0),
+        }
+        try:
+            await app(scope, receive, send)
+        finally:
+            Router.clear()
+        assert sent[0]["status"] == 200, sent
+        assert seen == {"raw": b"", "rolled": True, "content": payload}
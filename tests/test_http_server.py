@@ -0,0 +1,449 @@
+# Tests for tina4_python.core.http_server (built-in HTTP/1.1 server)
+import asyncio
+import pytest
+from tina4_python.core.http_server import serve_connection, BadRequest, _parse_head_pure
+
+
+async def echo_app(scope, receive, send):
+    """ASGI app that echoes method, path and body."""
+    body = f"{scope['method']} {scope['path']} ".encode()
+    while True:
+        msg = await receive()
+        body += msg.get("body", b"")
+        if not msg.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/plain"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _start(app=echo_app):
+    async def handler(reader, writer):
+        await serve_connection(reader, writer, app, ("127.0.0.1", 0))
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, port
+
+
+async def _read_response(reader) -> tuple[bytes, dict, bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return lines[0].encode(), headers, body
+
+
+class TestHeadParser:
+
+    def test_parses_request_line_and_headers(self):
+        method, target, version, headers = _parse_head_pure(
+            b"GET /a?b=1 HTTP/1.1\r\nHost: x\r\nX-Thing:  v \r\n\r\n"
+        )
+        assert method == "GET"
+        assert target == b"/a?b=1"
+        assert version == "1.1"
+        assert headers == [(b"host", b"x"), (b"x-thing", b"v")]
+
+    def test_repeated_headers_kept(self):
+        _, _, _, headers = _parse_head_pure(b"GET / HTTP/1.1\r\nA: 1\r\nA: 2\r\n\r\n")
+        assert headers == [(b"a", b"1"), (b"a", b"2")]
+
+    def test_malformed_request_line(self):
+        with pytest.raises(BadRequest):
+            _parse_head_pure(b"GARBAGE\r\n\r\n")
+
+    def test_malformed_header(self):
+        with pytest.raises(BadRequest):
+            _parse_head_pure(b"GET / HTTP/1.1\r\nNoColon\r\n\r\n")
+
+
+class TestKeepAlive:
+
+    async def test_two_requests_one_connection(self):
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for path in ("/one", "/two"):
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+                await writer.drain()
+                status, headers, body = await _read_response(reader)
+                assert status.startswith(b"HTTP/1.1 200")
+                assert headers["connection"] == "keep-alive"
+                assert body == f"GET {path} ".encode()
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_pipelined_requests_answered_in_order(self):
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b"GET /a HTTP/1.1\r\nHost: x\r\n\r\n"
+                b"POST /b HTTP/1.1\r\nHost: x\r\nContent-Length: 3\r\n\r\nxyz"
+                b"GET /c HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"
+            )
+            await writer.drain()
+            bodies = [(await _read_response(reader))[2] for _ in range(3)]
+            assert bodies == [b"GET /a ", b"POST /b xyz", b"GET /c "]
+            assert await reader.read() == b""  # closed after Connection: close
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_http10_closes_by_default(self):
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.0\r\n\r\n")
+            await writer.drain()
+            _, headers, _ = await _read_response(reader)
+            assert headers["connection"] == "close"
+            assert await reader.read() == b""
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_max_requests_per_connection(self, monkeypatch):
+        monkeypatch.setenv("TINA4_KEEPALIVE_MAX_REQUESTS", "2")
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /1 HTTP/1.1\r\n\r\nGET /2 HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            assert (await _read_response(reader))[1]["connection"] == "keep-alive"
+            assert (await _read_response(reader))[1]["connection"] == "close"
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_idle_timeout_closes(self, monkeypatch):
+        monkeypatch.setenv("TINA4_KEEPALIVE_TIMEOUT", "0.1")
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            await _read_response(reader)
+            assert await asyncio.wait_for(reader.read(), timeout=2) == b""
+            writer.close()
+        finally:
+            server.close()
+
+
+class TestRequestBodies:
+
+    async def test_chunked_body(self):
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b"POST /up HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"5\r\nhello\r\n6;ext=1\r\n world\r\n0\r\nX-Trailer: t\r\n\r\n"
+            )
+            await writer.drain()
+            _, _, body = await _read_response(reader)
+            assert body == b"POST /up hello world"
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_oversized_content_length_rejected(self, monkeypatch):
+        from tina4_python.core import request as request_module
+        monkeypatch.setattr(request_module, "TINA4_MAX_UPLOAD_SIZE", 10)
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST / HTTP/1.1\r\nContent-Length: 100\r\n\r\n")
+            await writer.drain()
+            status, _, _ = await _read_response(reader)
+            assert status.startswith(b"HTTP/1.1 413")
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_head_response_has_no_body(self):
+        server, port = await _start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"HEAD /x HTTP/1.1\r\n\r\nGET /y HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert b"content-length: 8" in head  # "HEAD /x "
+            _, _, body = await _read_response(reader)
+            assert body == b"GET /y "
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_unsupported_transfer_encoding_rejected(self):
+        server, port = await _start()
+        try:
+            for coding in (b"gzip", b"gzip, chunked", b"chunked, identity"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST / HTTP/1.1\r\nTransfer-Encoding: " + coding + b"\r\n\r\nhello")
+                await writer.drain()
+                status, headers, _ = await _read_response(reader)
+                assert status.startswith(b"HTTP/1.1 400") and headers["connection"] == "close"
+                writer.close()
+        finally:
+            server.close()
+
+    async def test_body_streamed_to_app_in_chunks(self):
+        received = []
+
+        async def collecting_app(scope, receive, send):
+            while True:
+                msg = await receive()
+                received.append((msg["body"], msg["more_body"]))
+                if not msg["more_body"]:
+                    break
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        server, port = await _start(collecting_app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b"POST /up HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"3\r\nabc\r\n2\r\nde\r\n0\r\n\r\n"
+            )
+            await writer.drain()
+            status, _, _ = await _read_response(reader)
+            assert status.startswith(b"HTTP/1.1 204")
+            assert received == [(b"abc", True), (b"de", True), (b"", False)]
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_oversized_chunked_body_rejected(self, monkeypatch):
+        from tina4_python.core import request as request_module
+        from tina4_python.core.server import app
+        monkeypatch.setattr(request_module, "TINA4_MAX_UPLOAD_SIZE", 4)
+        server, port = await _start(app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n")
+            await writer.drain()
+            status, _, _ = await _read_response(reader)
+            assert status.startswith(b"HTTP/1.1 413")
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_continue_deferred_until_body_read(self):
+        async def reject_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 401, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        server, port = await _start(reject_app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST / HTTP/1.1\r\nContent-Length: 5\r\nExpect: 100-continue\r\n\r\n")
+            await writer.drain()
+            status, headers, _ = await _read_response(reader)
+            assert status.startswith(b"HTTP/1.1 401")  # no interim 100
+            assert headers["connection"] == "close"  # unread body left on the socket
+            writer.close()
+        finally:
+            server.close()
+
+
+class TestStreamedResponses:
+
+    @staticmethod
+    async def _streaming_app(scope, receive, send, headers=()):
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        for part in (b"abc", b"", b"defg"):
+            await send({"type": "http.response.body", "body": part, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def test_chunked_transfer_encoding(self):
+        server, port = await _start(self._streaming_app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /s HTTP/1.1\r\n\r\nGET /t HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert b"transfer-encoding: chunked" in head
+            assert b"content-length" not in head
+            assert b"connection: keep-alive" in head
+            assert await reader.readuntil(b"0\r\n\r\n") == b"3\r\nabc\r\n4\r\ndefg\r\n0\r\n\r\n"
+            # The connection is still usable after the terminating chunk
+            assert (await reader.readuntil(b"\r\n\r\n")).startswith(b"HTTP/1.1 200")
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_head_on_stream_has_no_invented_length(self):
+        from tina4_python.core.router import Router, any_method
+        from tina4_python.core.server import app
+        Router.clear()
+
+        @any_method("/csv")
+        async def csv(request, response):
+            async def rows():
+                yield "a,b\n"
+            return response.stream(rows(), "text/csv")
+
+        server, port = await _start(app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"HEAD /csv HTTP/1.1\r\n\r\nGET /missing HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert head.startswith(b"HTTP/1.1 200")
+            assert b"content-length" not in head and b"transfer-encoding" not in head
+            assert (await reader.readuntil(b"\r\n\r\n")).startswith(b"HTTP/1.1 404")
+            writer.close()
+        finally:
+            server.close()
+            Router.clear()
+
+    async def test_head_keeps_length_set_by_handler(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-length", b"42")]})
+            await send({"type": "http.response.body", "body": b""})
+
+        server, port = await _start(app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"HEAD /x HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            head = await reader.read()
+            assert b"content-length: 42\r\n" in head and head.endswith(b"\r\n\r\n")
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_http10_stream_is_close_delimited(self):
+        server, port = await _start(self._streaming_app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /s HTTP/1.0\r\nConnection: keep-alive\r\n\r\n")
+            await writer.drain()
+            data = await reader.read()
+            head, _, body = data.partition(b"\r\n\r\n")
+            assert b"transfer-encoding" not in head
+            assert b"connection: close" in head
+            assert body == b"abcdefg"
+            writer.close()
+        finally:
+            server.close()
+
+    async def test_stream_through_framework_app(self):
+        from tina4_python.core.router import Router, get
+        from tina4_python.core.server import app
+        Router.clear()
+
+        @get("/csv")
+        async def csv(request, response):
+            async def rows():
+                yield "a,b\n"
+                yield "1,2\n"
+            return response.stream(rows(), "text/csv")
+
+        server, port = await _start(app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /csv HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            data = await reader.read()
+            head, _, body = data.partition(b"\r\n\r\n")
+            assert b"transfer-encoding: chunked" in head
+            assert b"etag" not in head
+            assert body == b"4\r\na,b\n\r\n4\r\n1,2\n\r\n0\r\n\r\n"
+            writer.close()
+        finally:
+            server.close()
+            Router.clear()
+
+    async def test_pathsend_uses_file(self, tmp_path):
+        target = tmp_path / "asset.bin"
+        target.write_bytes(b"x" * 5000)
+
+        async def pathsend_app(scope, receive, send):
+            assert "http.response.pathsend" in scope["extensions"]
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/octet-stream")]})
+            await send({"type": "http.response.pathsend", "path": str(target)})
+
+        server, port = await _start(pathsend_app)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /a HTTP/1.1\r\n\r\nGET /b HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            for _ in range(2):
+                _, headers, body = await _read_response(reader)
+                assert headers["content-length"] == "5000"
+                assert body == b"x" * 5000
+            writer.close()
+        finally:
+            server.close()
+
+
+class TestGracefulDrain:
+
+    async def test_drain_closes_idle_and_finishes_in_flight(self):
+        from tina4_python.core.http_server import ConnectionTracker
+        tracker = ConnectionTracker()
+        release = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            if scope["path"] == "/slow":
+                await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        async def handler(reader, writer):
+            await serve_connection(reader, writer, slow_app, ("127.0.0.1", 0), tracker=tracker)
+
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            idle_reader, idle_writer = await asyncio.open_connection("127.0.0.1", port)
+            idle_writer.write(b"GET /fast HTTP/1.1\r\n\r\n")
+            await _read_response(idle_reader)
+            busy_reader, busy_writer = await asyncio.open_connection("127.0.0.1", port)
+            busy_writer.write(b"GET /slow HTTP/1.1\r\n\r\n")
+            await asyncio.sleep(0.05)
+            assert len(tracker) == 2
+
+            drain = asyncio.create_task(tracker.drain(timeout=5))
+            assert await asyncio.wait_for(idle_reader.read(), timeout=1) == b""  # idle closed at once
+            release.set()
+            _, headers, body = await _read_response(busy_reader)
+            assert body == b"ok" and headers["connection"] == "close"
+            await asyncio.wait_for(drain, timeout=1)
+            assert len(tracker) == 0
+            idle_writer.close()
+            busy_writer.close()
+        finally:
+            server.close()
+
+    async def test_drain_timeout_aborts(self):
+        from tina4_python.core.http_server import ConnectionTracker
+        tracker = ConnectionTracker()
+
+        async def hanging_app(scope, receive, send):
+            await asyncio.sleep(10)
+
+        async def handler(reader, writer):
+            await serve_connection(reader, writer, hanging_app, ("127.0.0.1", 0), tracker=tracker)
+
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET / HTTP/1.1\r\n\r\n")
+            await asyncio.sleep(0.05)
+            await tracker.drain(timeout=0.1)
+            assert await asyncio.wait_for(reader.read(), timeout=1) == b""
+            writer.close()
+        finally:
+            server.close()
@@ -218,3 +218,81 @@ class TestRateLimiterNegative:
         time.sleep(1.1)
         allowed, _ = limiter.check("10.0.0.7")
         assert allowed is True
+
+
+# ── Middleware Pipeline Tests ───────────────────────────────────
+
+
+class TestMiddlewarePipeline:
+
+    def test_compiles_before_and_after_hooks_in_order(self):
+        from tina4_python.core.middleware import MiddlewarePipeline
+
+        class First:
+            def before_b(self, req, res): return req, res
+            def before_a(self, req, res): return req, res
+            def after_x(self, req, res): return req, res
+
+        class Second:
+            def before_z(self, req, res): return req, res
+
+        pipeline = MiddlewarePipeline.compile([First, Second])
+        assert [s.name for s in pipeline.before] == ["First.before_a", "First.before_b", "Second.before_z"]
+        assert [s.name for s in pipeline.after] == ["First.after_x"]
+
+    def test_class_instantiated_once(self):
+        from tina4_python.core.middleware import MiddlewarePipeline
+        created = []
+
+        class Counting:
+            def __init__(self):
+                created.append(self)
+
+            def before_count(self, req, res):
+                return req, res
+
+        pipeline = MiddlewarePipeline.compile([Counting])
+        for _ in range(3):
+            pipeline.before[0](MockRequest(), MockResponse())
+        assert len(created) == 1
+
+    def test_per_request_opt_in(self):
+        from tina4_python.core.middleware import MiddlewarePipeline
+        created = []
+
+        class Fresh:
+            per_request = True
+
+            def __init__(self):
+                created.append(self)
+
+            def before_count(self, req, res):
+                return req, res
+
+        pipeline = MiddlewarePipeline.compile([Fresh])
+        assert created == []
+        for _ in range(3):
+            pipeline.before[0](MockRequest(), MockResponse())
+        assert len(created) == 3
+
+    def test_counters(self):
+        from tina4_python.core.middleware import MiddlewarePipeline
+
+        class Timed:
+            @staticmethod
+            def before_timed(req, res):
+                return req, res
+
+        pipeline = MiddlewarePipeline.compile([Timed])
+        pipeline.before[0](MockRequest(), MockResponse())
+        pipeline.before[0](MockRequest(), MockResponse())
+        stats = pipeline.stats()
+        assert stats[0]["name"] == "Timed.before_timed"
+        assert stats[0]["phase"] == "before"
+        assert stats[0]["calls"] == 2
+        assert stats[0]["total_ms"] >= 0
+
+    def test_empty_middleware_list(self):
+        from tina4_python.core.middleware import MiddlewarePipeline
+        pipeline = MiddlewarePipeline.compile([])
+        assert pipeline.before == () and pipeline.after == ()
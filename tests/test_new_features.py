@@ -179,6 +179,34 @@ class TestResultCaching:
         result2 = User.cached(f"SELECT * FROM users", ttl=60)
         assert result1[0].name == result2[0].name
 
+    def test_cached_query_single_flight(self, db, monkeypatch):
+        import threading
+        db.insert("users", {"name": "Zed", "email": "z@b.com", "role": "user"})
+        db.commit()
+        selects = []
+        gate = threading.Event()
+        real_select = User.select.__func__
+
+        def slow_select(cls, *args, **kwargs):
+            selects.append(1)
+            gate.wait(2)
+            return real_select(cls, *args, **kwargs)
+
+        monkeypatch.setattr(User, "select", classmethod(slow_select))
+        _query_cache.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(User.cached("SELECT * FROM users", ttl=60)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join(5)
+        assert selects == [1]
+        assert [r[0].name for r in results] == ["Zed"] * 5
+        assert User.cache_stats()["coalesced"] == 4
+
     def test_clear_cache(self, db):
         db.insert("users", {"name": "Bob", "email": "b@b.com", "role": "user"})
         db.commit()
@@ -1,7 +1,8 @@
 # Tests for tina4_python.core.middleware.RateLimiter (v3)
+import os
 import time
 import pytest
-from tina4_python.core.middleware import RateLimiter
+from tina4_python.core.middleware import RateLimiter, MemoryRateStore, SharedMemoryRateStore, RedisRateStore
 from tina4_python.core.response import Response
 
 
@@ -125,19 +126,139 @@ class TestRateLimiterCleanup:
     def test_cleanup_removes_expired_ips(self, monkeypatch):
         monkeypatch.setenv("TINA4_RATE_LIMIT", "100")
         monkeypatch.setenv("TINA4_RATE_WINDOW", "1")
-        rl = RateLimiter()
+        rl = RateLimiter(store=MemoryRateStore())
         rl.check("10.0.0.1")
-        # Simulate time passage by manipulating timestamps
-        now = time.monotonic()
-        rl._requests["10.0.0.1"] = [now - 10]  # expired
-        rl._cleanup(now)
-        assert "10.0.0.1" not in rl._requests
+        # Past the window the client's allowance has fully recovered
+        rl._cleanup(time.time() + 10)
+        assert "10.0.0.1" not in rl.store
 
     def test_cleanup_keeps_active_ips(self, monkeypatch):
         monkeypatch.setenv("TINA4_RATE_LIMIT", "100")
         monkeypatch.setenv("TINA4_RATE_WINDOW", "60")
-        rl = RateLimiter()
+        rl = RateLimiter(store=MemoryRateStore())
         rl.check("10.0.0.1")
-        now = time.monotonic()
-        rl._cleanup(now)
-        assert "10.0.0.1" in rl._requests
+        rl._cleanup(time.time())
+        assert "10.0.0.1" in rl.store
+
+
+class TestGCRA:
+
+    @pytest.mark.parametrize("store_cls", [MemoryRateStore, SharedMemoryRateStore])
+    def test_burst_then_steady_rate(self, store_cls):
+        store = store_cls()
+        # 10 per 60s: burst of 10, then one every 6 seconds
+        results = [store.consume("k", 1000.0, 6.0, 60.0)[0] for _ in range(11)]
+        assert results == [True] * 10 + [False]
+        assert store.consume("k", 1005.0, 6.0, 60.0)[0] is False
+        assert store.consume("k", 1006.0, 6.0, 60.0)[0] is True
+        assert store.consume("k", 1006.0, 6.0, 60.0)[0] is False
+
+    @pytest.mark.parametrize("store_cls", [MemoryRateStore, SharedMemoryRateStore])
+    def test_keys_are_independent(self, store_cls):
+        store = store_cls()
+        assert store.consume("a", 0.0, 60.0, 60.0)[0] is True
+        assert store.consume("a", 0.0, 60.0, 60.0)[0] is False
+        assert store.consume("b", 0.0, 60.0, 60.0)[0] is True
+
+    def test_state_is_one_number_per_client(self):
+        store = MemoryRateStore()
+        rl = RateLimiter(limit=1000, window=60, store=store)
+        for _ in range(500):
+            rl.check("10.0.0.1")
+        tats, _ = store._shard("10.0.0.1")
+        assert isinstance(tats["10.0.0.1"], float) and len(store) == 1
+
+    def test_blocked_reset_is_time_until_next_request(self):
+        rl = RateLimiter(limit=2, window=60, store=MemoryRateStore())
+        rl.check("ip")
+        rl.check("ip")
+        allowed, info = rl.check("ip")
+        assert allowed is False and 29 <= info["reset"] <= 30
+
+    def test_full_shared_table_takes_over_stalest_slot(self):
+        store = SharedMemoryRateStore(slots=8, shards=1)
+        for i in range(8):
+            store.consume(f"k{i}", 0.0, 1.0 + i, 60.0)
+        assert store.consume("new", 0.0, 60.0, 60.0)[0] is True
+        assert store.consume("new", 0.0, 60.0, 60.0)[0] is False
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_shared_store_is_shared_across_fork(self):
+        store = SharedMemoryRateStore()
+        pid = os.fork()
+        if pid == 0:
+            store.consume("client", 0.0, 60.0, 60.0)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        assert store.consume("client", 0.0, 60.0, 60.0)[0] is False
+
+    def test_redis_store_fails_open(self):
+        import socket
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        store = RedisRateStore(f"redis://127.0.0.1:{port}")
+        store._client = None
+        assert store.consume("k", 0.0, 1.0, 1.0)[0] is True
+
+
+class TestRouteRateLimit:
+
+    @staticmethod
+    def _scope(path, headers=None, ip="127.0.0.1"):
+        return {"type": "http", "method": "GET", "path": path, "query_string": b"",
+                "headers": headers or [], "client": (ip, 0)}
+
+    async def test_route_limit_per_client(self):
+        from tina4_python.core.request import Request
+        from tina4_python.core.router import Router, get, rate_limit
+        from tina4_python.core.server import handle
+        Router.clear()
+
+        @get("/api/limited")
+        @rate_limit(2, 60)
+        async def limited(request, response):
+            return response.json({"ok": True})
+
+        try:
+            codes = [(await handle(Request.from_scope(self._scope("/api/limited")))).status_code for _ in range(3)]
+            assert codes == [200, 200, 429]
+            other = await handle(Request.from_scope(self._scope("/api/limited", ip="10.9.9.9")))
+            assert other.status_code == 200
+        finally:
+            Router.clear()
+
+    async def test_route_limit_keyed_by_api_key(self):
+        from tina4_python.core.request import Request
+        from tina4_python.core.router import Router
+        from tina4_python.core.server import handle
+        Router.clear()
+
+        async def search(request, response):
+            return response.json({"ok": True})
+
+        Router.get("/api/search", search).rate_limit(1, 60, key="api_key")
+        try:
+            first = await handle(Request.from_scope(self._scope("/api/search", [(b"x-api-key", b"alpha")])))
+            second = await handle(Request.from_scope(self._scope("/api/search", [(b"x-api-key", b"alpha")])))
+            third = await handle(Request.from_scope(self._scope("/api/search", [(b"x-api-key", b"beta")])))
+            assert (first.status_code, second.status_code, third.status_code) == (200, 429, 200)
+            headers = {name.lower(): value for name, value in second._headers}
+            assert headers["x-ratelimit-remaining"] == "0" and "retry-after" in headers
+        finally:
+            Router.clear()
+
+    def test_user_key_uses_verified_token(self, monkeypatch):
+        from tina4_python.auth import Auth
+        monkeypatch.setenv("SECRET", "rate-secret")
+        token = Auth().get_token({"user_id": 42})
+
+        class FakeRequest:
+            ip = "1.2.3.4"
+            headers = {"authorization": f"Bearer {token}"}
+
+        rl = RateLimiter(limit=5, window=60, store=MemoryRateStore(), key="user")
+        assert rl.client_key(FakeRequest) == "user:42"
+        FakeRequest.headers = {"authorization": "Bearer forged.token.value"}
+        assert rl.client_key(FakeRequest) == "1.2.3.4"
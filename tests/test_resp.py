@@ -0,0 +1,547 @@
+# Tests for tina4_python.core.resp — RESP parser, pooled client and its users,
+# against an in-process stand-in server.
+import time
+import socket
+import fnmatch
+import threading
+import socketserver
+import pytest
+from tina4_python.core.resp import (
+    RespClient, AsyncRespClient, RespParser, RespError, NOT_READY, encode_command, parse_url,
+)
+
+
+class _FakeRedis(socketserver.ThreadingTCPServer):
+    """Just enough of a Redis server: strings, SCAN, MULTI/EXEC, pub/sub, EVALSHA."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), _FakeRedisHandler)
+        self.password = password
+        self.data: dict[int, dict[bytes, bytes]] = {}
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.commands: list[list[bytes]] = []
+        self.subscribers: dict[bytes, set] = {}
+        self.clients: set = set()
+        self.scripts = set()
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.server_address[1]}"
+
+    def drop_clients(self):
+        """Close every client connection, as a restarted server would."""
+        for handler in list(self.clients):
+            try:
+                handler.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _FakeRedisHandler(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        self.db = 0
+        self.queue = None
+        self.authed = self.server.password is None
+        self.send_lock = threading.Lock()
+        with self.server.lock:
+            self.server.connections += 1
+            self.server.clients.add(self)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.clients.discard(self)
+            for subscribers in self.server.subscribers.values():
+                subscribers.discard(self)
+
+    def handle(self):
+        parser = RespParser()
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            parser.feed(data)
+            out = []
+            while (command := parser.gets()) is not NOT_READY:
+                with self.server.lock:
+                    self.server.commands.append(command)
+                out.append(self.dispatch(command))
+            self.send(b"".join(out))
+
+    def send(self, data: bytes):
+        with self.send_lock:
+            self.request.sendall(data)
+
+    def dispatch(self, args: list) -> bytes:
+        name = args[0].upper()
+        if not self.authed and name not in (b"AUTH", b"HELLO"):
+            return b"-NOAUTH Authentication required.\r\n"
+        if self.queue is not None and name not in (b"EXEC", b"MULTI"):
+            self.queue.append(args)
+            return b"+QUEUED\r\n"
+        return getattr(self, "cmd_" + name.decode().lower(), self.unknown)(args[1:])
+
+    @property
+    def store(self) -> dict:
+        return self.server.data.setdefault(self.db, {})
+
+    def unknown(self, args):
+        return b"-ERR unknown command\r\n"
+
+    def cmd_ping(self, args):
+        return b"+PONG\r\n"
+
+    def cmd_auth(self, args):
+        if args[-1].decode() != self.server.password:
+            return b"-WRONGPASS invalid password\r\n"
+        self.authed = True
+        return b"+OK\r\n"
+
+    def cmd_hello(self, args):
+        if b"AUTH" in args:
+            reply = self.cmd_auth(args[-2:])
+            if reply.startswith(b"-"):
+                return reply
+        return b"%2\r\n+server\r\n+fake\r\n+proto\r\n:3\r\n"
+
+    def cmd_select(self, args):
+        self.db = int(args[0])
+        return b"+OK\r\n"
+
+    def cmd_get(self, args):
+        value = self.store.get(args[0])
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def cmd_set(self, args):
+        if b"NX" in args[2:] and args[0] in self.store:
+            return b"$-1\r\n"
+        self.store[args[0]] = args[1]
+        return b"+OK\r\n"
+
+    def cmd_del(self, args):
+        return b":%d\r\n" % sum(self.store.pop(key, None) is not None for key in args)
+
+    cmd_unlink = cmd_del
+
+    def cmd_slowincr(self, args):
+        """INCR that answers late, as a busy server would."""
+        reply = self.cmd_incr(args)
+        time.sleep(0.3)
+        return reply
+
+    def cmd_incr(self, args):
+        value = int(self.store.get(args[0], b"0")) + 1
+        self.store[args[0]] = str(value).encode()
+        return b":%d\r\n" % value
+
+    def cmd_mget(self, args):
+        return b"*%d\r\n" % len(args) + b"".join(self.cmd_get([key]) for key in args)
+
+    def cmd_mset(self, args):
+        for i in range(0, len(args), 2):
+            self.store[args[i]] = args[i + 1]
+        return b"+OK\r\n"
+
+    def cmd_scan(self, args):
+        cursor = int(args[0])
+        options = {args[i].upper(): args[i + 1] for i in range(1, len(args) - 1, 2)}
+        count = int(options.get(b"COUNT", 10))
+        keys = sorted(self.store)
+        batch = keys[cursor:cursor + count]
+        match = options.get(b"MATCH")
+        if match is not None:
+            batch = [k for k in batch if fnmatch.fnmatchcase(k.decode(), match.decode())]
+        following = cursor + count if cursor + count < len(keys) else 0
+        items = b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in batch)
+        nxt = str(following).encode()
+        return b"*2\r\n$%d\r\n%s\r\n*%d\r\n%s" % (len(nxt), nxt, len(batch), items)
+
+    def cmd_multi(self, args):
+        self.queue = []
+        return b"+OK\r\n"
+
+    def cmd_exec(self, args):
+        queued, self.queue = self.queue, None
+        replies = [self.dispatch(command) for command in queued]
+        return b"*%d\r\n" % len(replies) + b"".join(replies)
+
+    def cmd_publish(self, args):
+        channel, message = args
+        with self.server.lock:
+            subscribers = list(self.server.subscribers.get(channel, ()))
+        payload = b"*3\r\n$7\r\nmessage\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n" % (len(channel), channel, len(message), message)
+        for subscriber in subscribers:
+            subscriber.send(payload)
+        return b":%d\r\n" % len(subscribers)
+
+    def cmd_subscribe(self, args):
+        out = []
+        for i, channel in enumerate(args, 1):
+            with self.server.lock:
+                self.server.subscribers.setdefault(channel, set()).add(self)
+            out.append(b"*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:%d\r\n" % (len(channel), channel, i))
+        return b"".join(out)
+
+    def cmd_unsubscribe(self, args):
+        for channel in args:
+            with self.server.lock:
+                self.server.subscribers.get(channel, set()).discard(self)
+        return b"*3\r\n$11\r\nunsubscribe\r\n$-1\r\n:0\r\n"
+
+    def cmd_evalsha(self, args):
+        if args[0] not in self.server.scripts:
+            return b"-NOSCRIPT No matching script.\r\n"
+        return b"*2\r\n:1\r\n$3\r\n0.5\r\n"
+
+    def cmd_eval(self, args):
+        import hashlib
+        self.server.scripts.add(hashlib.sha1(args[0]).hexdigest().encode())
+        return b"*2\r\n:1\r\n$3\r\n0.5\r\n"
+
+
+@pytest.fixture
+def server():
+    srv = _FakeRedis()
+    thread = threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.drop_clients()
+    srv.server_close()
+
+
+def _names(srv) -> list[bytes]:
+    return [command[0].upper() for command in srv.commands]
+
+
+# ── Parser ────────────────────────────────────────────────────────
+
+
+class TestRespParser:
+
+    def test_resp2_types(self):
+        parser = RespParser()
+        parser.feed(b"+OK\r\n-ERR bad\r\n:42\r\n$5\r\nhello\r\n$-1\r\n*2\r\n$1\r\na\r\n:1\r\n*-1\r\n")
+        assert parser.gets() == "OK"
+        error = parser.gets()
+        assert isinstance(error, RespError) and str(error) == "ERR bad"
+        assert parser.gets() == 42
+        assert parser.gets() == b"hello"
+        assert parser.gets() is None
+        assert parser.gets() == [b"a", 1]
+        assert parser.gets() is None
+        assert parser.gets() is NOT_READY
+
+    def test_resp3_types(self):
+        parser = RespParser(decode=True)
+        parser.feed(
+            b"_\r\n#t\r\n,3.5\r\n(12345678901234567890\r\n%1\r\n+k\r\n$1\r\nv\r\n"
+            b"~2\r\n:1\r\n:2\r\n=8\r\ntxt:text\r\n!5\r\noops!\r\n|1\r\n+ttl\r\n:3\r\n:7\r\n>2\r\n+pushed\r\n:1\r\n"
+        )
+        assert parser.gets() is None
+        assert parser.gets() is True
+        assert parser.gets() == 3.5
+        assert parser.gets() == 12345678901234567890
+        assert parser.gets() == {"k": "v"}
+        assert parser.gets() == [1, 2]
+        assert parser.gets() == "text"
+        assert str(parser.gets()) == "oops!"
+        assert parser.gets() == 7  # attribute skipped
+        assert parser.gets() == ["pushed", 1]
+
+    def test_byte_at_a_time(self):
+        stream = b"*3\r\n$3\r\nfoo\r\n*1\r\n:-1\r\n$0\r\n\r\n+done\r\n"
+        parser = RespParser()
+        replies = []
+        for i in range(len(stream)):
+            parser.feed(stream[i:i + 1])
+            while (reply := parser.gets()) is not NOT_READY:
+                replies.append(reply)
+        assert replies == [[b"foo", [-1], b""], "done"]
+
+    def test_large_bulk_in_chunks(self):
+        value = bytes(range(256)) * 8192  # 2 MiB, CRLFs included
+        frame = b"$%d\r\n%s\r\n" % (len(value), value)
+        parser = RespParser()
+        for i in range(0, len(frame), 65536):
+            assert parser.gets() is NOT_READY
+            parser.feed(frame[i:i + 65536])
+        assert parser.gets() == value
+
+    def test_encode_command(self):
+        assert encode_command(("SET", "k", b"\x00v", 10)) == b"*4\r\n$3\r\nSET\r\n$1\r\nk\r\n$2\r\n\x00v\r\n$2\r\n10\r\n"
+
+    def test_parse_url(self):
+        assert parse_url("redis://:s3cret@cache.local:6380/2") == {
+            "host": "cache.local", "port": 6380, "db": 2, "tls": False, "password": "s3cret",
+        }
+        options = parse_url("valkeys://app:pw@host")
+        assert options["tls"] and options["username"] == "app" and options["port"] == 6379
+
+
+# ── Blocking client ───────────────────────────────────────────────
+
+
+class TestRespClient:
+
+    def test_commands(self, server):
+        client = RespClient(server.url)
+        assert client.ping()
+        assert client.set("k", "v", ex=60)
+        assert client.get("k") == b"v"
+        assert client.set("k", "other", nx=True) is False
+        assert client.mset({"a": "1", "b": b"\x00\xff"})
+        assert client.mget(["a", "b", "missing"]) == [b"1", b"\x00\xff", None]
+        assert client.delete("a", "b", "missing") == 2
+        with pytest.raises(RespError):
+            client.execute("NOPE")
+
+    def test_decode(self, server):
+        client = RespClient(server.url, decode=True)
+        client.set("k", "välue")
+        assert client.get("k") == "välue"
+
+    def test_large_value_round_trip(self, server):
+        client = RespClient(server.url)
+        value = b"x" * (3 * 1024 * 1024)
+        client.set("big", value)
+        assert client.get("big") == value
+
+    def test_connections_are_pooled_and_select_sent_once(self, server):
+        client = RespClient(server.url + "/3")
+        for i in range(20):
+            client.set(f"k{i}", i)
+        assert server.connections == 1
+        assert _names(server).count(b"SELECT") == 1
+        assert server.data[3][b"k19"] == b"19"
+
+    def test_pool_is_bounded_under_threads(self, server):
+        client = RespClient(server.url, pool_size=3)
+        errors = []
+
+        def work(n):
+            try:
+                for i in range(50):
+                    client.execute("INCR", "counter")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        assert errors == []
+        assert client.get("counter") == b"400"
+        assert server.connections <= 3
+
+    def test_auth(self):
+        srv = _FakeRedis(password="pw")
+        threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True).start()
+        try:
+            port = srv.server_address[1]
+            assert RespClient(f"redis://:pw@127.0.0.1:{port}").ping()
+            assert RespClient(f"redis://:pw@127.0.0.1:{port}", protocol=3).ping()
+            with pytest.raises(RespError):
+                RespClient(f"redis://:wrong@127.0.0.1:{port}").ping()
+        finally:
+            srv.shutdown()
+            srv.drop_clients()
+            srv.server_close()
+
+    def test_retries_once_on_stale_pooled_connection(self, server):
+        client = RespClient(server.url)
+        client.set("k", "v")
+        server.drop_clients()
+        time.sleep(0.05)
+        assert client.get("k") == b"v"
+        assert server.connections == 2
+
+    def test_timeout_is_never_retried(self, server):
+        client = RespClient(server.url, timeout=0.1)
+        client.ping()  # The next command runs on a reused connection
+        with pytest.raises(TimeoutError):
+            client.execute("SLOWINCR", "n")
+        time.sleep(0.3)
+        assert server.data[0][b"n"] == b"1"
+        assert _names(server).count(b"SLOWINCR") == 1
+        assert client.execute("INCR", "n") == 2  # The timed-out connection was not reused
+
+    def test_pipeline_is_one_round_trip(self, server):
+        client = RespClient(server.url)
+        with client.pipeline() as pipe:
+            pipe.set("a", "1").get("a").command("INCR", "n").command("INCR", "n")
+        assert pipe.results == ["OK", b"1", 1, 2]
+
+    def test_pipeline_errors(self, server):
+        client = RespClient(server.url)
+        results = client.pipeline(raise_on_error=False).command("PING").command("NOPE").execute()
+        assert results[0] == "PONG" and isinstance(results[1], RespError)
+        with pytest.raises(RespError):
+            client.pipeline().command("NOPE").execute()
+
+    def test_transaction(self, server):
+        client = RespClient(server.url)
+        results = client.pipeline(transaction=True).command("INCR", "t").command("INCR", "t").execute()
+        assert results == [1, 2]
+        assert _names(server)[-4:] == [b"MULTI", b"INCR", b"INCR", b"EXEC"]
+
+    def test_scan_iter(self, server):
+        client = RespClient(server.url)
+        client.mset({f"tina4:cache:{i}": i for i in range(25)} | {"other": 1})
+        keys = set(client.scan_iter("tina4:cache:*", count=10))
+        assert len(keys) == 25 and b"other" not in keys
+        assert b"KEYS" not in _names(server)
+        assert client.unlink_matching("tina4:cache:*", batch=7) == 25
+        assert list(client.scan_iter()) == [b"other"]
+
+    def test_pubsub(self, server):
+        client = RespClient(server.url, decode=True)
+        received = []
+        got = threading.Event()
+        pubsub = client.pubsub()
+        pubsub.subscribe("news", lambda channel, data: (received.append((channel, data)), got.set()))
+        for _ in range(50):
+            if client.publish("news", "hello"):
+                break
+            time.sleep(0.02)
+        assert got.wait(2)
+        assert received == [("news", "hello")]
+        pubsub.close()
+
+
+# ── asyncio client ────────────────────────────────────────────────
+
+
+class TestAsyncRespClient:
+
+    async def test_commands_and_pipeline(self, server):
+        client = AsyncRespClient(server.url + "/1")
+        assert await client.ping()
+        assert await client.set("k", "v")
+        assert await client.get("k") == b"v"
+        assert await client.mset({"a": 1, "b": 2})
+        assert await client.mget(["a", "b"]) == [b"1", b"2"]
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.command("INCR", "n").command("INCR", "n")
+        assert pipe.results == [1, 2]
+        assert [key async for key in client.scan_iter("?")] == [b"a", b"b", b"k", b"n"]
+        assert await client.delete("a", "b") == 2
+        await client.close()
+
+    async def test_timeout_is_never_retried(self, server):
+        import asyncio
+        client = AsyncRespClient(server.url, timeout=0.1)
+        await client.ping()
+        with pytest.raises(TimeoutError):
+            await client.execute("SLOWINCR", "n")
+        await asyncio.sleep(0.3)
+        assert _names(server).count(b"SLOWINCR") == 1
+        assert await client.execute("INCR", "n") == 2
+        await client.close()
+
+    async def test_retries_once_on_stale_pooled_connection(self, server):
+        import asyncio
+        client = AsyncRespClient(server.url)
+        await client.set("k", "v")
+        server.drop_clients()
+        await asyncio.sleep(0.05)
+        assert await client.get("k") == b"v"
+        assert server.connections == 2
+        await client.close()
+
+    async def test_concurrent_tasks_share_bounded_pool(self, server):
+        import asyncio
+        client = AsyncRespClient(server.url, pool_size=2)
+        await asyncio.gather(*(client.execute("INCR", "c") for _ in range(40)))
+        assert await client.get("c") == b"40"
+        assert server.connections <= 2
+        await client.close()
+
+
+# ── Users of the client ───────────────────────────────────────────
+
+
+class TestRespUsers:
+
+    def test_cache_backend(self, server):
+        from tina4_python.cache import _RedisBackend
+        backend = _RedisBackend(url=server.url)
+        backend.set("obj", {"a": 1}, 60)
+        assert backend.get("obj") == {"a": 1}
+        backend.set_raw("blob", b"\x00T4RC\xff", 60)
+        assert backend.get_raw("blob") == b"\x00T4RC\xff"
+        assert backend.stats()["size"] == 2
+        assert backend.delete("obj") is True
+        backend.clear()
+        assert backend.stats()["size"] == 0
+        assert b"KEYS" not in _names(server)
+
+    def test_response_cache_over_redis(self, server):
+        from tina4_python.cache import ResponseCache
+
+        class Req:
+            method = "GET"
+            path = "/api/shared"
+            query_string = ""
+
+        class Resp:
+            def __init__(self, body=""):
+                self.body, self.status_code, self.content_type = body, 200, "text/plain"
+
+            def __call__(self, body=None, status_code=None):
+                return Resp(body)
+
+        writer = ResponseCache(ttl=60, backend="redis", cache_url=server.url)
+        reader = ResponseCache(ttl=60, backend="redis", cache_url=server.url)
+        req = Req()
+        writer.before_cache(req, Resp())
+        req._cache_key, req._cache_ttl = "GET:/api/shared", 60
+        writer.after_cache(req, Resp("shared"))
+        _, hit = reader.before_cache(Req(), Resp())
+        assert hit.body == "shared"
+
+    @pytest.mark.parametrize("module, cls", [
+        ("tina4_python.session_handlers.redis_handler", "RedisSessionHandler"),
+        ("tina4_python.session_handlers.valkey_handler", "ValkeySessionHandler"),
+    ])
+    def test_session_handlers(self, server, module, cls):
+        import importlib
+        handler_class = getattr(importlib.import_module(module), cls)
+        handler = handler_class(host="127.0.0.1", port=server.server_address[1], db=2, ttl=60)
+        handler.write("sid", {"user": "ünï"})
+        assert handler.read("sid") == {"user": "ünï"}
+        handler.destroy("sid")
+        assert handler.read("sid") == {}
+        assert _names(server).count(b"SELECT") == 1
+        handler.close()
+
+    def test_rate_store_evalsha(self, server):
+        from tina4_python.core.middleware import RedisRateStore
+        store = RedisRateStore(server.url)
+        store._client = None
+        assert store.consume("k", 0.0, 1.0, 1.0) == (True, 0.5)
+        assert store.consume("k", 0.0, 1.0, 1.0) == (True, 0.5)
+        assert _names(server) == [b"EVALSHA", b"EVAL", b"EVALSHA"]
+
+    def test_backplane(self, server):
+        from tina4_python.websocket.backplane import RedisBackplane
+        backplane = RedisBackplane(url=server.url)
+        if backplane._resp is None:
+            pytest.skip("redis package installed; backplane uses it")
+        got = threading.Event()
+        messages = []
+        backplane.subscribe("chat", lambda message: (messages.append(message), got.set()))
+        for _ in range(50):
+            backplane.publish("chat", '{"text": "hi"}')
+            if got.wait(0.05):
+                break
+        assert messages[0] == '{"text": "hi"}'
+        backplane.close()
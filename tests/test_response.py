@@ -157,3 +157,91 @@ class TestHTTPConstants:
         assert APPLICATION_JSON == "application/json"
         assert "text/html" in TEXT_HTML
         assert "text/plain" in TEXT_PLAIN
+
+
+class TestStreamingResponse:
+
+    async def _collect(self, response):
+        return b"".join([chunk async for chunk in response.iter_stream()])
+
+    async def test_async_generator_body(self):
+        async def rows():
+            yield "id,name\n"
+            yield b"1,alice\n"
+
+        r = Response().stream(rows(), "text/csv")
+        assert r.is_streaming
+        assert r.content_type == "text/csv"
+        assert await self._collect(r) == b"id,name\n1,alice\n"
+
+    async def test_sync_iterable_body(self):
+        r = Response().stream(iter(["a", "b"]))
+        assert await self._collect(r) == b"ab"
+
+    def test_headers_have_no_length_or_etag(self):
+        r = Response().stream(iter(["x" * 5000]), "text/plain")
+        names = [name for name, _ in r.build_headers()]
+        assert b"content-length" not in names
+        assert b"etag" not in names
+
+    async def test_streaming_gzip(self):
+        import zlib
+        r = Response().stream(iter(["hello " * 100, "world " * 100]), "text/plain")
+        headers = dict(r.build_headers("gzip, br"))
+        assert headers[b"content-encoding"] == b"gzip"
+        chunks = [chunk async for chunk in r.iter_stream()]
+        assert len(chunks) == 3  # one sync-flushed block per chunk, then the trailer
+        assert zlib.decompress(b"".join(chunks), 31) == ("hello " * 100 + "world " * 100).encode()
+
+    def test_binary_stream_not_compressed(self):
+        r = Response().stream(iter([b"\x00" * 4096]), "application/octet-stream")
+        assert b"content-encoding" not in dict(r.build_headers("gzip"))
+
+
+class TestAdaptiveCompression:
+
+    def setup_method(self):
+        from tina4_python.core.response import reset_compression_stats
+        reset_compression_stats()
+
+    def test_level_drops_with_size(self):
+        from tina4_python.core.response import compression_level
+        assert compression_level("gzip", 10_000) == 6
+        assert compression_level("gzip", 500_000) == 4
+        assert compression_level("gzip", 5_000_000) == 1
+
+    def test_tiny_and_precompressed_bodies_skipped(self):
+        import gzip
+        tiny = Response().text("x" * 1024)
+        assert b"content-encoding" not in dict(tiny.build_headers("gzip"))
+        packed = Response()
+        packed.content = gzip.compress(b"y" * 5000)
+        packed.content_type = "application/json"
+        assert b"content-encoding" not in dict(packed.build_headers("gzip"))
+
+    def test_refused_gzip_not_used(self):
+        r = Response().text("x" * 5000)
+        assert b"content-encoding" not in dict(r.build_headers("gzip;q=0"))
+
+    async def test_large_body_offloaded(self, monkeypatch):
+        import gzip
+        from tina4_python.core import response as response_module
+        monkeypatch.setattr(response_module, "COMPRESS_OFFLOAD_SIZE", 4096)
+        body = json.dumps([{"n": i} for i in range(2000)])
+        r = Response().json(json.loads(body))
+        headers = dict(await r.build_headers_async("gzip"))
+        assert headers[b"content-encoding"] == b"gzip"
+        assert headers[b"etag"].startswith(b'W/"')
+        assert json.loads(gzip.decompress(r.content)) == json.loads(body)
+        stats = response_module.compression_stats()
+        assert stats["responses"] == 1 and stats["offloaded"] == 1
+        assert 0 < stats["ratio"] < 1
+
+
+class TestJsonStream:
+
+    async def test_streams_generator_as_array(self):
+        r = Response().json_stream({"id": i} for i in range(1000))
+        assert r.is_streaming and r.content_type == "application/json"
+        body = b"".join([chunk async for chunk in r.iter_stream()])
+        assert json.loads(body) == [{"id": i} for i in range(1000)]
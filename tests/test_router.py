@@ -253,3 +253,136 @@ class TestMiddlewareAndCaching:
         async def handler(req, res): pass
         assert handler._cached is True
         assert handler._cache_max_age == 120
+
+
+class TestCompiledRoutingTable:
+
+    def test_first_registered_route_wins_over_later_static(self):
+        @get("/api/{name}")
+        async def dynamic(req, res): pass
+
+        @get("/api/users")
+        async def static(req, res): pass
+
+        route, params = Router.match("GET", "/api/users")
+        assert route["handler"] is dynamic
+        assert params == {"name": "users"}
+
+    def test_static_route_trailing_slash(self):
+        @get("/api/users")
+        async def handler(req, res): pass
+        route, params = Router.match("GET", "/api/users/")
+        assert route is not None and params == {}
+
+    def test_path_param_followed_by_segment(self):
+        @get("/files/{path:path}/edit")
+        async def handler(req, res): pass
+        route, params = Router.match("GET", "/files/a/b/edit")
+        assert route is not None
+        assert params["path"] == "a/b"
+
+    def test_any_route_respects_registration_order(self):
+        from tina4_python.core.router import any_method
+
+        @any_method("/api/items/{id}")
+        async def any_handler(req, res): pass
+
+        @get("/api/items/{id:int}")
+        async def get_handler(req, res): pass
+
+        route, _ = Router.match("GET", "/api/items/7")
+        assert route["handler"] is any_handler
+        route, _ = Router.match("HEAD", "/api/items/7")
+        assert route["handler"] is any_handler
+
+    def test_table_rebuilt_after_add(self):
+        @get("/api/a")
+        async def a(req, res): pass
+        assert Router.match("GET", "/api/b")[0] is None
+
+        @get("/api/b")
+        async def b(req, res): pass
+        assert Router.match("GET", "/api/b")[0]["handler"] is b
+
+    def test_table_rebuilt_after_clear(self):
+        @get("/api/a")
+        async def a(req, res): pass
+        assert Router.match("GET", "/api/a")[0] is not None
+        Router.clear()
+        assert Router.match("GET", "/api/a")[0] is None
+
+    def test_matches_regex_scan(self):
+        paths = [
+            "/", "/api/users", "/api/users/{id:int}", "/api/users/{id}/posts",
+            "/api/{resource}/{id:float}", "/docs/*", "/files/{path:path}",
+        ]
+        for p in paths:
+            Router.get(p, lambda req, res: None)
+        probes = [
+            "/", "//", "/api/users", "/api/users/", "/api/users/12", "/api/users/ab/posts",
+            "/api/things/1.5", "/docs/a/b/", "/files/x", "/files/x/y/", "/nope",
+        ]
+        for probe in probes:
+            expected = None, {}
+            for route in Router.get_routes():
+                m = route["pattern"].match(probe)
+                if m:
+                    expected = route, dict(zip(route["param_names"], m.groups()))
+                    break
+            route, params = Router.match("GET", probe)
+            assert route is expected[0], probe
+            assert params == expected[1], probe
+
+    def test_match_ws_uses_compiled_table(self):
+        Router.websocket("/ws/chat/{room}", lambda conn, event, data: None)
+        route, params = Router.match_ws("/ws/chat/lobby")
+        assert route is not None and params == {"room": "lobby"}
+        assert Router.match_ws("/ws/other")[0] is None
+
+
+class TestInvokePlan:
+
+    def test_request_response_plan(self):
+        from tina4_python.core.router import _PLAN_REQUEST_RESPONSE
+
+        @get("/plan/a")
+        async def handler(request, response): pass
+        route, _ = Router.match("GET", "/plan/a")
+        assert route["invoke_plan"] is _PLAN_REQUEST_RESPONSE
+
+    def test_path_params_bound_by_name(self):
+        from tina4_python.core.router import _ARG_REQUEST, _ARG_RESPONSE
+
+        @get("/plan/{id}/{slug}")
+        async def handler(slug, id, request, response): pass
+        route, _ = Router.match("GET", "/plan/1/x")
+        assert route["invoke_plan"] == ("slug", "id", _ARG_REQUEST, _ARG_RESPONSE)
+
+    def test_single_param_annotated_request(self):
+        from tina4_python.core.request import Request
+        from tina4_python.core.router import _ARG_REQUEST, _ARG_RESPONSE
+
+        @get("/plan/req")
+        async def wants_request(req: Request): pass
+
+        @get("/plan/res")
+        async def wants_response(res): pass
+
+        assert Router.match("GET", "/plan/req")[0]["invoke_plan"] == (_ARG_REQUEST,)
+        assert Router.match("GET", "/plan/res")[0]["invoke_plan"] == (_ARG_RESPONSE,)
+
+    def test_no_params(self):
+        @get("/plan/none")
+        async def handler(): pass
+        assert Router.match("GET", "/plan/none")[0]["invoke_plan"] == ()
+
+    def test_late_decorator_invalidates_plan(self):
+        from tina4_python.core.router import noauth, get_invoke_plan, _PLAN_REQUEST_RESPONSE
+
+        @noauth()
+        @post("/plan/write")
+        async def handler(request, response): pass
+        route, _ = Router.match("POST", "/plan/write")
+        assert "invoke_plan" not in route
+        assert get_invoke_plan(route) is _PLAN_REQUEST_RESPONSE
+        assert route["invoke_plan"] is _PLAN_REQUEST_RESPONSE
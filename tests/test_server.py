@@ -0,0 +1,667 @@
+# Tests for request dispatch in tina4_python.core.server (v3)
+import pytest
+from tina4_python.core.request import Request
+from tina4_python.core.router import Router, get
+from tina4_python.core.server import handle
+
+
+@pytest.fixture(autouse=True)
+def clear_routes():
+    Router.clear()
+    yield
+    Router.clear()
+
+
+def _request(method: str = "GET", path: str = "/", headers: list | None = None, body: bytes = b"") -> Request:
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": headers or [],
+        "client": ("127.0.0.1", 0),
+    }
+    return Request.from_scope(scope, body)
+
+
+class TestHandlerInvocation:
+
+    async def test_request_response_handler(self):
+        @get("/api/hello")
+        async def hello(request, response):
+            return response({"path": request.path})
+
+        resp = await handle(_request(path="/api/hello"))
+        assert resp.status_code == 200
+        assert resp.content == b'{"path":"/api/hello"}'
+
+    async def test_path_params_passed_by_name(self):
+        @get("/api/items/{item_id}/{slug}")
+        async def item(slug, item_id, request, response):
+            return response({"id": item_id, "slug": slug})
+
+        resp = await handle(_request(path="/api/items/7/widget"))
+        assert resp.content == b'{"id":"7","slug":"widget"}'
+
+    async def test_response_only_handler(self):
+        @get("/api/only-response")
+        async def only(response):
+            return response("ok")
+
+        resp = await handle(_request(path="/api/only-response"))
+        assert resp.content == b"ok"
+
+    async def test_request_only_handler(self):
+        captured = {}
+
+        @get("/api/only-request")
+        async def only(request: Request):
+            captured["path"] = request.path
+
+        resp = await handle(_request(path="/api/only-request"))
+        assert captured["path"] == "/api/only-request"
+        assert resp.status_code == 200
+
+    async def test_no_arg_handler(self):
+        calls = []
+
+        @get("/api/no-args")
+        async def no_args():
+            calls.append(1)
+
+        await handle(_request(path="/api/no-args"))
+        assert calls == [1]
+
+
+class TestMiddlewareDispatch:
+
+    async def test_before_middleware_short_circuits(self):
+        from tina4_python.core.router import middleware
+
+        class Deny:
+            def before_deny(self, request, response):
+                return request, response({"error": "nope"}, 403)
+
+        calls = []
+
+        @middleware(Deny)
+        @get("/api/denied")
+        async def denied(request, response):
+            calls.append(1)
+            return response("ok")
+
+        resp = await handle(_request(path="/api/denied"))
+        assert resp.status_code == 403
+        assert calls == []
+
+    async def test_before_hook_returning_new_response_still_runs_handler(self):
+        from tina4_python.core.response import Response
+        from tina4_python.core.router import middleware
+
+        class Fresh:
+            def before_fresh(self, request, response):
+                replacement = Response()
+                replacement.header("x-fresh", "1")
+                return request, replacement
+
+        calls = []
+
+        @middleware(Fresh)
+        @get("/api/fresh")
+        async def fresh(request, response):
+            calls.append(1)
+            return response("handled")
+
+        resp = await handle(_request(path="/api/fresh"))
+        assert calls == [1]
+        assert resp.content == b"handled" and ("x-fresh", "1") in resp._headers
+
+    async def test_pipeline_reused_across_requests(self):
+        from tina4_python.core.router import middleware
+
+        created = []
+
+        class Tag:
+            def __init__(self):
+                created.append(self)
+
+            def after_tag(self, request, response):
+                response.header("x-tag", "1")
+                return request, response
+
+        @middleware(Tag)
+        @get("/api/tagged")
+        async def tagged(request, response):
+            return response("ok")
+
+        for _ in range(3):
+            resp = await handle(_request(path="/api/tagged"))
+            assert ("x-tag", "1") in resp._headers
+        assert len(created) == 1
+        route, _ = Router.match("GET", "/api/tagged")
+        assert route["middleware_pipeline"].stats()[0]["calls"] == 3
+
+
+class _Channel:
+    """ASGI receive/send pair fed from a list of body chunks."""
+
+    def __init__(self, chunks: list[bytes]):
+        self.chunks = list(chunks)
+        self.reads = 0
+        self.sent = []
+
+    async def receive(self):
+        self.reads += 1
+        chunk = self.chunks.pop(0) if self.chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(self.chunks)}
+
+    async def send(self, msg):
+        self.sent.append(msg)
+
+
+def _scope(method: str = "POST", path: str = "/", headers: list | None = None) -> dict:
+    return {"type": "http", "method": method, "path": path, "query_string": b"",
+            "headers": headers or [], "client": ("127.0.0.1", 0)}
+
+
+class TestLazyRequest:
+    def test_repeated_headers_are_kept(self):
+        req = Request.from_scope(_scope("GET", headers=[
+            (b"Accept", b"text/html"), (b"accept", b"application/json"),
+            (b"cookie", b"a=1"), (b"Cookie", b"b=2"),
+        ]))
+        assert req.headers["Accept"] == "text/html, application/json"
+        assert req.headers.get_all("ACCEPT") == ["text/html", "application/json"]
+        assert req.cookies == {"a": "1", "b": "2"}
+        assert "Cookie" in req.headers
+
+    def test_nothing_decoded_until_accessed(self):
+        req = Request.from_scope(_scope(headers=[(b"content-type", b"application/json")]),
+                                 body=b'{"a": 1}')
+        assert req._headers is None and req._query is None and not req._body_parsed
+        assert req.body == {"a": 1}
+        assert req.content_type == "application/json"
+
+    def test_query_and_route_params(self):
+        scope = _scope("GET")
+        scope["query_string"] = b"page=2&tag=a&tag=b"
+        req = Request.from_scope(scope)
+        req._route_params = {"id": "7"}
+        req.merge_route_params()
+        assert req.params == {"page": "2", "tag": ["a", "b"], "id": "7"}
+        assert req.query == {"page": "2", "tag": ["a", "b"]}
+
+    def test_attributes_remain_assignable(self):
+        req = Request()
+        assert req.headers == {} and req.body is None and req.files == {}
+        req.headers = {"origin": "http://x"}
+        req.body = {"k": "v"}
+        assert req.headers["origin"] == "http://x" and req.body == {"k": "v"}
+
+
+class TestRequestBodyStreaming:
+
+    async def test_declared_length_rejected_before_reading(self, monkeypatch):
+        from tina4_python.core import request as request_module
+        from tina4_python.core.server import app
+        monkeypatch.setattr(request_module, "TINA4_MAX_UPLOAD_SIZE", 10)
+        channel = _Channel([b"x" * 100])
+        await app(_scope(headers=[(b"content-length", b"100")]), channel.receive, channel.send)
+        assert channel.reads == 0
+        assert channel.sent[0]["status"] == 413
+        assert b"Payload Too Large" in channel.sent[1]["body"]
+
+    async def test_undeclared_body_rejected_mid_stream(self, monkeypatch):
+        from tina4_python.core import request as request_module
+        from tina4_python.core.server import app
+        monkeypatch.setattr(request_module, "TINA4_MAX_UPLOAD_SIZE", 10)
+        channel = _Channel([b"x" * 8, b"x" * 8, b"x" * 8])
+        await app(_scope(), channel.receive, channel.send)
+        assert channel.reads == 2
+        assert channel.sent[0]["status"] == 413
+
+    async def test_large_body_is_spooled_and_streamed(self, monkeypatch):
+        from tina4_python.core import request as request_module
+        from tina4_python.core.request import read_body
+        monkeypatch.setattr(request_module, "TINA4_SPOOL_THRESHOLD", 16)
+        channel = _Channel([b"a" * 10, b"b" * 10, b"c" * 10])
+        body, body_file = await read_body(channel.receive)
+        assert body == b"" and body_file is not None
+        request = Request.from_scope(_scope(headers=[(b"content-type", b"application/octet-stream")]),
+                                     body, body_file=body_file)
+        assert request.body is None  # opaque spooled bodies are not decoded
+        chunks = [chunk async for chunk in request.stream(chunk_size=12)]
+        assert b"".join(chunks) == b"a" * 10 + b"b" * 10 + b"c" * 10
+        assert len(chunks) == 3
+        assert request.raw_body == b"a" * 10 + b"b" * 10 + b"c" * 10
+        request.close()
+
+    async def test_small_body_stays_in_memory(self):
+        from tina4_python.core.request import read_body
+        channel = _Channel([b'{"a":', b'1}'])
+        body, body_file = await read_body(channel.receive)
+        assert body == b'{"a":1}' and body_file is None
+        request = Request.from_scope(_scope(headers=[(b"content-type", b"application/json")]), body)
+        assert request.body == {"a": 1}
+        assert [chunk async for chunk in request.stream()] == [b'{"a":1}']
+
+    async def test_spooled_json_still_parsed(self, monkeypatch):
+        from tina4_python.core import request as request_module
+        from tina4_python.core.request import read_body
+        monkeypatch.setattr(request_module, "TINA4_SPOOL_THRESHOLD", 4)
+        channel = _Channel([b'{"name":', b'"tina4"}'])
+        body, body_file = await read_body(channel.receive)
+        request = Request.from_scope(_scope(headers=[(b"content-type", b"application/json")]),
+                                     body, body_file=body_file)
+        assert request.body == {"name": "tina4"}
+        request.close()
+
+
+    @pytest.mark.parametrize("content_type", ["application/xml", "application/soap+xml; charset=utf-8"])
+    async def test_spooled_text_decoded_like_in_memory(self, monkeypatch, content_type):
+        from tina4_python.core import request as request_module
+        from tina4_python.core.request import read_body
+        payload = b"<envelope>" + b"<item/>" * 10 + b"</envelope>"
+        in_memory = Request.from_scope(_scope(headers=[(b"content-type", content_type.encode())]), payload)
+        monkeypatch.setattr(request_module, "TINA4_SPOOL_THRESHOLD", 16)
+        body, body_file = await read_body(_Channel([payload[:40], payload[40:]]).receive)
+        assert body_file is not None
+        spooled = Request.from_scope(_scope(headers=[(b"content-type", content_type.encode())]),
+                                     body, body_file=body_file)
+        assert spooled.body == in_memory.body == payload.decode()
+        spooled.close()
+
+
+class TestStreamingDispatch:
+
+    async def test_app_sends_chunks_with_more_body(self):
+        from tina4_python.core.server import app
+
+        @get("/export")
+        async def export(request, response):
+            async def lines():
+                for i in range(3):
+                    yield f"line {i}\n"
+            return response.stream(lines(), "text/plain")
+
+        channel = _Channel([])
+        await app(_scope("GET", "/export"), channel.receive, channel.send)
+        start, *bodies = channel.sent
+        assert start["status"] == 200
+        assert b"content-length" not in dict(start["headers"])
+        assert [m["body"] for m in bodies] == [b"line 0\n", b"line 1\n", b"line 2\n", b""]
+        assert [m["more_body"] for m in bodies] == [True, True, True, False]
+
+
+class TestConditionalRequests:
+
+    async def test_route_etag_skips_handler_on_match(self):
+        from tina4_python.core.router import etag
+        from tina4_python.core.server import app
+        calls = []
+
+        @get("/article")
+        @etag(lambda request: "v3")
+        async def article(request, response):
+            calls.append(1)
+            return response.json({"title": "x" * 2000})
+
+        channel = _Channel([])
+        await app(_scope("GET", "/article", [(b"accept-encoding", b"gzip")]), channel.receive, channel.send)
+        tag = dict(channel.sent[0]["headers"])[b"etag"].decode()
+        assert calls == [1] and tag.startswith('W/"')
+
+        channel = _Channel([])
+        await app(_scope("GET", "/article", [(b"if-none-match", tag.encode())]), channel.receive, channel.send)
+        start = channel.sent[0]
+        assert start["status"] == 304 and calls == [1]
+        assert dict(start["headers"])[b"etag"] == tag.removeprefix("W/").encode()
+        assert b"content-length" not in dict(start["headers"])
+
+    async def test_route_ref_last_modified(self):
+        from datetime import datetime, timezone
+        updated = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+        async def feed(request, response):
+            return response.text("feed")
+
+        Router.get("/feed", feed).etag(lambda request: updated)
+
+        response = await handle(_request("GET", "/feed"))
+        assert response.status_code == 200
+        assert ("last-modified", "Tue, 02 Jan 2024 00:00:00 GMT") in response._headers
+
+        response = await handle(_request("GET", "/feed", [(b"if-modified-since", b"Wed, 03 Jan 2024 00:00:00 GMT")]))
+        assert response.status_code == 304
+
+    async def test_body_etag_uses_uncompressed_content(self):
+        from tina4_python.core.conditional import body_etag
+        from tina4_python.core.server import app
+        payload = "y" * 4000
+
+        @get("/big")
+        async def big(request, response):
+            return response.text(payload)
+
+        channel = _Channel([])
+        await app(_scope("GET", "/big", [(b"if-none-match", body_etag(payload.encode()).encode()),
+                                         (b"accept-encoding", b"gzip")]), channel.receive, channel.send)
+        assert channel.sent[0]["status"] == 304
+        assert channel.sent[1]["body"] == b""
+
+
+class TestRouteCache:
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        from tina4_python.core.route_cache import route_cache
+        route_cache.clear()
+        yield route_cache
+        route_cache.clear()
+
+    @staticmethod
+    def _get(path: str, query: bytes = b"", headers: list | None = None) -> Request:
+        request = _request("GET", path, headers)
+        request.query_string = query.decode()
+        return request
+
+    async def test_cached_decorator_serves_hits(self, fresh_cache):
+        from tina4_python.core.router import cached
+        calls = []
+
+        @get("/products")
+        @cached(max_age=120)
+        async def products(request, response):
+            calls.append(1)
+            return response.json({"items": [1, 2, 3]})
+
+        first = await handle(self._get("/products"))
+        second = await handle(self._get("/products"))
+        assert calls == [1]
+        assert second.content == first.content and second.status_code == 200
+        headers = {name.lower(): value for name, value in second._headers}
+        assert headers["cache-control"].startswith("public, max-age=")
+        assert "age" in headers and "etag" in headers
+        assert fresh_cache.stats()["hits"] == 1
+
+    async def test_query_is_normalized_and_vary_keys(self):
+        calls = []
+
+        async def search(request, response):
+            calls.append(request.headers.get("accept-language"))
+            return response.json({"q": request.query_string})
+
+        Router.get("/search", search).cache(60, vary=("Accept-Language",))
+
+        await handle(self._get("/search", b"a=1&b=2", [(b"accept-language", b"en")]))
+        await handle(self._get("/search", b"b=2&a=1", [(b"accept-language", b"en")]))
+        await handle(self._get("/search", b"a=1&b=2", [(b"accept-language", b"fr")]))
+        assert calls == ["en", "fr"]
+
+    async def test_stores_compressed_variant_once(self, fresh_cache, monkeypatch):
+        from tina4_python.core import route_cache as module
+        compressed = []
+        real = module.compress
+        monkeypatch.setattr(module, "compress", lambda data, encoding, offloaded=False: compressed.append(encoding) or real(data, encoding))
+
+        async def page(request, response):
+            return response.html("<p>" + "cached " * 1000 + "</p>")
+
+        Router.get("/page", page).cache(60)
+        await handle(self._get("/page"))
+        for _ in range(3):
+            hit = await handle(self._get("/page", headers=[(b"accept-encoding", b"gzip")]))
+        assert compressed == ["gzip"]
+        headers = {name.lower(): value for name, value in hit._headers}
+        assert headers["content-encoding"] == "gzip" and headers["etag"].startswith("W/")
+
+    async def test_uncacheable_responses_are_not_stored(self, fresh_cache):
+        calls = []
+
+        async def private(request, response):
+            calls.append(1)
+            response.header("Cache-Control", "private")
+            return response.json({"me": True})
+
+        async def missing(request, response):
+            calls.append(2)
+            return response.json({"error": "nope"}, 404)
+
+        Router.get("/me", private).cache(60)
+        Router.get("/missing", missing).cache(60)
+        for _ in range(2):
+            await handle(self._get("/me"))
+            await handle(self._get("/missing"))
+        assert calls == [1, 2, 1, 2] and fresh_cache.stats()["size"] == 0
+
+    async def test_concurrent_misses_run_handler_once(self, fresh_cache):
+        import asyncio
+        calls = []
+        release = asyncio.Event()
+
+        async def slow(request, response):
+            calls.append(1)
+            await release.wait()
+            return response.json({"value": 42})
+
+        Router.get("/slow", slow).cache(60)
+        tasks = [asyncio.create_task(handle(self._get("/slow"))) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+        responses = await asyncio.gather(*tasks)
+        assert calls == [1]
+        assert all(r.status_code == 200 and r.content == responses[0].content for r in responses)
+        assert fresh_cache.stats()["coalesced"] == 4
+
+    async def test_secured_route_is_not_shared_between_users(self, fresh_cache, monkeypatch):
+        from tina4_python.auth import Auth
+        from tina4_python.core.router import cached, secured
+        monkeypatch.setenv("SECRET", "route-cache-secret")
+        auth = Auth(secret="route-cache-secret")
+
+        @get("/whoami")
+        @secured()
+        @cached(max_age=60)
+        async def whoami(request, response):
+            token = request.headers["authorization"][7:]
+            return response.json({"who": auth.get_payload(token)["user"]})
+
+        bodies = []
+        for user in ("alice", "bob"):
+            token = auth.get_token({"user": user})
+            response = await handle(self._get("/whoami", headers=[(b"authorization", f"Bearer {token}".encode())]))
+            bodies.append(response.content)
+            assert not any(value.startswith("public") for name, value in response._headers
+                           if name.lower() == "cache-control")
+        assert bodies == [b'{"who":"alice"}', b'{"who":"bob"}']
+        assert fresh_cache.stats()["size"] == 0
+
+    async def test_credentials_or_session_bypass_cache(self, fresh_cache):
+        calls = []
+
+        async def greet(request, response):
+            calls.append(1)
+            return response.json({"hello": request.session.get("name", "guest")})
+
+        async def feed(request, response):
+            calls.append(2)
+            return response.json({"items": []})
+
+        Router.get("/greet", greet).cache(60)
+        Router.get("/feed", feed).cache(60)
+        for _ in range(2):
+            await handle(self._get("/greet"))
+            await handle(self._get("/feed", headers=[(b"authorization", b"Basic dXNlcjpwdw==")]))
+        assert calls == [1, 2, 1, 2] and fresh_cache.stats()["size"] == 0
+
+    async def test_not_modified_from_cached_entry(self):
+        calls = []
+
+        async def doc(request, response):
+            calls.append(1)
+            return response.text("doc body " * 300)
+
+        Router.get("/doc", doc).cache(60)
+        first = await handle(self._get("/doc"))
+        tag = dict((n.lower(), v) for n, v in first._headers)["etag"]
+        second = await handle(self._get("/doc", headers=[(b"if-none-match", tag.encode()),
+                                                         (b"accept-encoding", b"gzip")]))
+        # Left uncompressed for the 304 the sender will make of it
+        assert calls == [1] and second.entity_tag() == tag
+        assert not any(name == "content-encoding" for name, _ in second._headers)
+
+
+class TestRuntimeConfig:
+
+    @pytest.fixture(autouse=True)
+    def thaw(self):
+        from tina4_python.core.config import thaw_runtime_config
+        yield
+        thaw_runtime_config()
+
+    def test_unfrozen_reads_environment(self, monkeypatch):
+        from tina4_python.core.config import runtime_config
+        monkeypatch.setenv("TINA4_SESSION_TTL", "60")
+        assert runtime_config().session_ttl == 60
+        monkeypatch.setenv("TINA4_SESSION_TTL", "120")
+        assert runtime_config().session_ttl == 120
+
+    def test_frozen_snapshot_ignores_later_changes(self, monkeypatch):
+        from tina4_python.core.config import runtime_config, freeze_runtime_config
+        monkeypatch.setenv("TINA4_API_KEY", "first")
+        freeze_runtime_config()
+        monkeypatch.setenv("TINA4_API_KEY", "second")
+        assert runtime_config().api_key == "first"
+        assert freeze_runtime_config().api_key == "second"
+
+    def test_session_and_static_read_the_snapshot(self, tmp_path, monkeypatch):
+        from tina4_python.core import static
+        from tina4_python.core.config import freeze_runtime_config
+        from tina4_python.session import Session, FileSessionHandler
+        monkeypatch.setenv("TINA4_PUBLIC_DIR", str(tmp_path))
+        monkeypatch.setenv("TINA4_SESSION_TTL", "60")
+        monkeypatch.setenv("TINA4_SESSION_TOUCH_INTERVAL", "5")
+        monkeypatch.setenv("TINA4_SESSION_SAMESITE", "Strict")
+        monkeypatch.setenv("TINA4_DEBUG", "false")
+        freeze_runtime_config()
+        monkeypatch.setenv("TINA4_SESSION_TTL", "999")
+        monkeypatch.setenv("TINA4_SESSION_SAMESITE", "None")
+        monkeypatch.setenv("TINA4_DEBUG", "true")
+
+        session = Session(handler=FileSessionHandler(str(tmp_path / "s")))
+        assert session._ttl == 60 and session._touch_interval == 5
+        assert "SameSite=Strict" in session.cookie_header()
+
+        static.clear_cache()
+        (tmp_path / "a.css").write_text("one")
+        entry = static.resolve("/a.css")
+        (tmp_path / "a.css").write_text("three")
+        assert static.resolve("/a.css") is entry  # production caching, not dev re-stat
+        static.clear_cache()
+
+    async def test_production_lane_skips_dev_stages(self, monkeypatch):
+        from tina4_python.core.config import freeze_runtime_config
+        monkeypatch.setenv("TINA4_DEBUG", "false")
+        freeze_runtime_config()
+        response = await handle(_request("GET", "/swagger"))
+        assert response.status_code == 404
+        response = await handle(_request("GET", "/__dev"))
+        assert response.status_code == 404
+
+    async def test_dev_lane_serves_swagger(self, monkeypatch):
+        from tina4_python.core.config import freeze_runtime_config
+        monkeypatch.setenv("TINA4_DEBUG", "true")
+        freeze_runtime_config()
+        response = await handle(_request("GET", "/swagger"))
+        assert response.status_code == 200 and b"swagger-ui" in response.content
+
+
+class TestWorkers:
+
+    def test_resolve_workers(self, monkeypatch):
+        import os
+        from tina4_python.core.server import resolve_workers
+        monkeypatch.delenv("TINA4_WORKERS", raising=False)
+        assert resolve_workers() == 1
+        monkeypatch.setenv("TINA4_WORKERS", "4")
+        assert resolve_workers() == 4
+        assert resolve_workers(2) == 2  # CLI flag wins
+        assert resolve_workers("auto") == (os.cpu_count() or 1)
+        monkeypatch.setenv("TINA4_WORKERS", "lots")
+        assert resolve_workers() == 1
+
+    def test_gc_turn_is_taken_once_per_interval(self, tmp_path, monkeypatch):
+        import time
+        from tina4_python.core.server import _claim_gc_turn
+        turn = tmp_path / "data" / ".session-gc"
+        # Two workers of an external server: no TINA4_WORKER_ID, one shared turn file
+        assert _claim_gc_turn(60, turn) is True
+        assert _claim_gc_turn(60, turn) is False
+        monkeypatch.setattr(time, "time", lambda real=time.time: real() + 61)
+        assert _claim_gc_turn(60, turn) is True
+
+    @pytest.mark.skipif(not hasattr(__import__("os"), "fork"), reason="pre-fork needs os.fork")
+    def test_prefork_exits_when_port_cannot_be_bound(self, tmp_path):
+        import os
+        import socket
+        import subprocess
+        import sys
+
+        env = dict(os.environ, TINA4_DEBUG="false",
+                   PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        with socket.create_server(("127.0.0.1", 0)) as held:
+            port = held.getsockname()[1]
+            proc = subprocess.Popen(
+                [sys.executable, "-c",
+                 f"from tina4_python.core.server import _run_prefork; _run_prefork('127.0.0.1', {port}, 2)"],
+                cwd=tmp_path, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                assert proc.wait(timeout=20) == 1
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+
+    @pytest.mark.skipif(not hasattr(__import__("os"), "fork"), reason="pre-fork needs os.fork")
+    def test_prefork_workers_share_port_and_drain(self, tmp_path):
+        import os
+        import signal
+        import socket
+        import subprocess
+        import sys
+        import time
+        import http.client
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        (tmp_path / "src" / "routes").mkdir(parents=True)
+        (tmp_path / "src" / "routes" / "pid.py").write_text(
+            "import os\nfrom tina4_python.core.router import get\n\n"
+            "@get('/pid')\nasync def pid(request, response):\n    return response(str(os.getpid()))\n"
+        )
+        env = dict(os.environ, TINA4_DEBUG="false", TINA4_NO_BROWSER="true",
+                   PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        proc = subprocess.Popen(
+            [sys.executable, "-c",
+             f"from tina4_python.core.server import run; run(host='127.0.0.1', port={port}, workers=2)"],
+            cwd=tmp_path, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            pids = set()
+            deadline = time.time() + 15
+            while len(pids) < 2 and time.time() < deadline:
+                try:
+                    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+                    conn.request("GET", "/pid")
+                    pids.add(conn.getresponse().read())
+                    conn.close()
+                except OSError:
+                    time.sleep(0.1)
+            assert len(pids) == 2
+            assert str(proc.pid).encode() not in pids  # the parent only supervises
+            proc.send_signal(signal.SIGTERM)
+            assert proc.wait(timeout=10) == 0
+        finally:
+            if proc.poll() is None:
+                proc.kill()
@@ -459,3 +459,203 @@ class TestSessionDirtyFlag:
         session.save()
         session.clear()
         assert session._dirty is True
+
+
+class _CountingHandler(FileSessionHandler):
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = self.writes = self.touches = 0
+
+    def read(self, session_id):
+        self.reads += 1
+        return super().read(session_id)
+
+    def write(self, session_id, data, ttl):
+        self.writes += 1
+        super().write(session_id, data, ttl)
+
+    def touch(self, session_id, data, ttl):
+        self.touches += 1
+        super().touch(session_id, data, ttl)
+
+
+class TestLazySession:
+    def test_new_session_skips_storage_read(self, tmp_path):
+        handler = _CountingHandler(str(tmp_path / "s"))
+        session = Session(handler=handler)
+        session.start()
+        assert handler.reads == 0 and session.needs_cookie
+
+    def test_resumed_session_only_writes_when_changed(self, tmp_path):
+        handler = _CountingHandler(str(tmp_path / "s"))
+        first = Session(handler=handler)
+        sid = first.start()
+        first.set("user", 1)
+        first.save()
+        resumed = Session(handler=handler)
+        resumed.start(sid)
+        resumed.get("user")
+        resumed.unset("missing")
+        resumed.save()
+        assert handler.writes == 1 and handler.touches == 0
+        assert not resumed.needs_cookie
+        assert resumed.all() == {"user": 1}
+
+    def test_touch_at_most_once_per_interval(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TINA4_SESSION_TOUCH_INTERVAL", "0")
+        handler = _CountingHandler(str(tmp_path / "s"))
+        writer = Session(handler=handler)
+        sid = writer.start()
+        writer.set("user", 1)
+        writer.save()
+        resumed = Session(handler=handler)
+        resumed.start(sid)
+        resumed.save()
+        assert handler.touches == 1 and resumed.needs_cookie
+
+        monkeypatch.setenv("TINA4_SESSION_TOUCH_INTERVAL", "300")
+        again = Session(handler=handler)
+        again.start(sid)
+        again.save()
+        assert handler.touches == 1 and not again.needs_cookie
+
+    def test_lazy_proxy_loads_on_first_use(self, tmp_path, monkeypatch):
+        from tina4_python.session import LazySession
+        monkeypatch.setenv("TINA4_SESSION_PATH", str(tmp_path / "s"))
+        lazy = LazySession(None)
+        assert not lazy.loaded
+        lazy.set("k", "v")
+        assert lazy.loaded and lazy.get("k") == "v" and lazy.needs_cookie
+
+
+class TestSessionDispatch:
+    async def test_unused_session_sends_no_cookie(self, tmp_path, monkeypatch):
+        from tina4_python.core.request import Request
+        from tina4_python.core.router import Router, get
+        from tina4_python.core.server import handle
+        monkeypatch.setenv("TINA4_SESSION_PATH", str(tmp_path / "s"))
+        Router.clear()
+
+        @get("/api/ping")
+        async def ping(request, response):
+            return response.json({"ok": True})
+
+        @get("/login")
+        async def login(request, response):
+            request.session.set("user", 7)
+            return response.json({"ok": True})
+
+        def scope(path, cookie=None):
+            headers = [(b"cookie", cookie.encode())] if cookie else []
+            return {"type": "http", "method": "GET", "path": path, "query_string": b"",
+                    "headers": headers, "client": ("127.0.0.1", 0)}
+
+        try:
+            response = await handle(Request.from_scope(scope("/api/ping")))
+            assert not any(name == "set-cookie" for name, _ in response._headers)
+            assert not (tmp_path / "s").exists()  # No handler was even created
+
+            response = await handle(Request.from_scope(scope("/login")))
+            cookie = next(value for name, value in response._headers if name == "set-cookie")
+            sid = cookie.split(";")[0].split("=", 1)[1]
+
+            response = await handle(Request.from_scope(scope("/login", f"tina4_session={sid}")))
+            assert not any(name == "set-cookie" for name, _ in response._headers)
+        finally:
+            Router.clear()
+
+
+class TestExpiryIndex:
+    def test_gc_reads_only_expired_buckets(self, tmp_path, monkeypatch):
+        handler = FileSessionHandler(str(tmp_path / "s"))
+        handler.write("live", {"a": 1}, 3600)
+        handler.write("dead", {"b": 2}, 1)
+        opened = []
+        original = handler._expire
+        monkeypatch.setattr(handler, "_expire", lambda f, now: opened.append(f.name) or original(f, now))
+        monkeypatch.setattr(time, "time", lambda real=time.time: real() + 120)
+        handler.gc(0)
+        assert opened == [handler._file("dead").name]
+        assert not handler._file("dead").exists()
+        assert handler._file("live").exists()
+
+    def test_unindexed_sessions_swept_once(self, tmp_path):
+        path = tmp_path / "s"
+        path.mkdir()
+        (path / "old.json").write_text('{"_data": {}, "_expires": 1}')
+        handler = FileSessionHandler(str(path))
+        handler.gc(0)
+        assert not (path / "old.json").exists()
+
+    def test_legacy_sessions_swept_by_a_later_handler(self, tmp_path):
+        path = tmp_path / "s"
+        path.mkdir()
+        (path / "old.json").write_text('{"_data": {}, "_expires": 1}')
+        FileSessionHandler(str(path)).write("new", {"a": 1}, 3600)  # First request builds the index
+        FileSessionHandler(str(path)).gc(0)
+        assert not (path / "old.json").exists()
+        assert (path / "_expiry" / ".swept").exists()
+
+    def test_index_added_to_existing_session_table(self, tmp_path):
+        db = Database(f"sqlite:///{tmp_path / 'session.db'}")
+        db.execute("CREATE TABLE tina4_session (session_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)")
+        db.commit()
+        DatabaseSessionHandler(db)
+        DatabaseSessionHandler(db)
+        rows = db.fetch("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tina4_session'").records
+        assert "idx_tina4_session_expires" in [row["name"] for row in rows]
+        db.close()
+
+    def test_table_checked_once_per_database(self, tmp_path):
+        from unittest.mock import patch
+        db = Database(f"sqlite:///{tmp_path / 'once.db'}")
+        DatabaseSessionHandler(db)
+        with patch.object(db, "table_exists") as table_exists, patch.object(db, "commit") as commit:
+            DatabaseSessionHandler(db)
+            DatabaseSessionHandler(Database(db.url))
+        table_exists.assert_not_called()
+        commit.assert_not_called()
+        db.close()
+
+    def test_failed_index_is_logged(self, tmp_path):
+        from unittest.mock import patch
+        db = Database(f"sqlite:///{tmp_path / 'noindex.db'}")
+        real_execute = db.execute
+
+        def execute(sql, params=None):
+            if sql.lstrip().startswith("CREATE INDEX"):
+                db.last_error = "syntax error"
+                return False
+            return real_execute(sql, params)
+
+        with patch.object(db, "execute", side_effect=execute), \
+                patch("tina4_python.debug.Log.warning") as warning:
+            DatabaseSessionHandler(db)
+        assert "syntax error" in warning.call_args[0][0]
+        assert db.table_exists("tina4_session")
+        db.close()
+
+    async def test_lifespan_runs_background_gc(self, tmp_path, monkeypatch):
+        import asyncio
+        from tina4_python.core.server import app
+        from tina4_python.core.config import thaw_runtime_config
+        from tina4_python import session as session_module
+        calls = []
+        from tina4_python.core import server as server_module
+        monkeypatch.setenv("TINA4_SESSION_GC_INTERVAL", "0.01")
+        monkeypatch.setattr(session_module, "run_gc", lambda: calls.append(1))
+        monkeypatch.setattr(server_module, "_GC_TURN_FILE", tmp_path / ".session-gc")
+        inbox = asyncio.Queue()
+        sent = []
+
+        async def send(msg):
+            sent.append(msg["type"])
+
+        await inbox.put({"type": "lifespan.startup"})
+        task = asyncio.create_task(app({"type": "lifespan"}, inbox.get, send))
+        await asyncio.sleep(0.1)
+        await inbox.put({"type": "lifespan.shutdown"})
+        await task
+        thaw_runtime_config()
+        assert calls
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
@@ -1,4 +1,4 @@
-# Tests for Tina4 Session Handlers — Redis, MongoDB, Valkey.
+# Tests for Tina4 Session Handlers — Redis, MongoDB, Valkey, Cookie, Tiered.
 """
 Tests cover:
 - Handler interface/contract verification
@@ -120,6 +120,16 @@ class TestRedisHandlerConfig:
         handler = RedisSessionHandler()
         handler.gc(1800)  # Should not raise
 
+    def test_handlers_share_one_client_per_server(self):
+        from tina4_python.session_handlers.redis_handler import RedisSessionHandler
+        from tina4_python.session_handlers.valkey_handler import ValkeySessionHandler
+
+        first = RedisSessionHandler(host="shared-host", db=1)
+        assert RedisSessionHandler(host="shared-host", db=1)._resp is first._resp
+        assert ValkeySessionHandler(host="shared-host", db=1)._resp is first._resp
+        assert RedisSessionHandler(host="shared-host", db=2)._resp is not first._resp
+        assert RedisSessionHandler(host="shared-host", db=1, password="x")._resp is not first._resp
+
 
 class TestRedisHandlerMocked:
     """Test Redis handler with mocked redis client."""
@@ -507,6 +517,402 @@ class TestSessionWithHandlers:
         assert session.get("lang") == "en"
 
 
+# ── Cookie Handler Tests ─────────────────────────────────────────
+
+
+class _RecordingHandler:
+    """Fallback stand-in that keeps sessions in a dict and counts calls."""
+
+    def __init__(self):
+        self.store = {}
+        self.calls = 0
+
+    def read(self, session_id):
+        self.calls += 1
+        return dict(self.store.get(session_id, {}))
+
+    def write(self, session_id, data, ttl):
+        self.calls += 1
+        self.store[session_id] = dict(data)
+
+    def touch(self, session_id, data, ttl):
+        self.write(session_id, data, ttl)
+
+    def destroy(self, session_id):
+        self.calls += 1
+        self.store.pop(session_id, None)
+
+    def gc(self, max_lifetime):
+        pass
+
+
+def _without_sid(data):
+    return {k: v for k, v in data.items() if k != "_tina4_sid"}
+
+
+class TestCookieSessionHandler:
+    def _handler(self, **kwargs):
+        from tina4_python.session_handlers import CookieSessionHandler
+        fallback = _RecordingHandler()
+        return CookieSessionHandler(secret="test-secret", fallback=fallback, **kwargs), fallback
+
+    def test_round_trip_without_storage(self):
+        from tina4_python.session import Session
+        handler, fallback = self._handler()
+        session = Session(handler=handler)
+        session.start()
+        session.set("user_id", 42)
+        session.set("csrf", "abc123")
+        session.save()
+        token = session.cookie_value
+        assert token.startswith("c.") and session.needs_cookie
+
+        resumed = Session(handler=handler)
+        resumed.start(token)
+        assert resumed.get("user_id") == 42 and resumed.get("csrf") == "abc123"
+        assert resumed.all() == {"user_id": 42, "csrf": "abc123"}
+        assert fallback.calls == 0
+
+    def test_session_id_survives_rewrites(self):
+        import secrets
+        from tina4_python.session import Session
+        handler, _ = self._handler(max_size=300)
+        session = Session(handler=handler)
+        sid = session.start()
+        session.set("n", 1)
+        session.save()
+        first = session.cookie_value
+        assert session.session_id == sid and first != sid
+
+        resumed = Session(handler=handler)
+        assert resumed.start(first) == sid
+        resumed.set("blob", secrets.token_hex(200))  # Moves to the fallback and back
+        resumed.save()
+        assert resumed.cookie_value.startswith("s.") and resumed.session_id == sid
+        again = Session(handler=handler)
+        assert again.start(resumed.cookie_value) == sid
+        again.delete("blob")
+        again.save()
+        assert again.cookie_value.startswith("c.") and again.cookie_value != first
+        assert Session(handler=handler).start(again.cookie_value) == sid
+
+        again.regenerate()
+        assert again.session_id != sid and again.session_id == Session(handler=handler).start(again.cookie_value)
+
+    def test_tampered_or_foreign_cookie_is_empty(self):
+        handler, _ = self._handler()
+        token = handler.write("x", {"role": "user"}, 60)
+        prefix, payload, signature = token.split(".")
+        forged = handler.encode({"role": "admin"}, 60).split(".")[1]
+        assert handler.read(f"{prefix}.{forged}.{signature}") == {}
+        assert handler.read(token[:-2] + "AA") == {}
+        assert handler.read("c.garbage") == {}
+
+        from tina4_python.session_handlers import CookieSessionHandler
+        other = CookieSessionHandler(secret="other-secret", fallback=_RecordingHandler())
+        assert other.read(token) == {}
+
+    def test_expired_cookie_is_empty(self):
+        handler, _ = self._handler()
+        token = handler.encode({"user_id": 1}, -1)
+        assert handler.read(token) == {}
+
+    def test_secret_defaults_to_auth_secret(self, monkeypatch):
+        from tina4_python.session_handlers import CookieSessionHandler
+        monkeypatch.setenv("SECRET", "shared")
+        token = CookieSessionHandler(fallback=_RecordingHandler()).write("x", {"a": 1}, 60)
+        assert _without_sid(CookieSessionHandler(secret="shared").read(token)) == {"a": 1}
+
+    def test_encryption_hides_payload(self):
+        import base64
+        plain, _ = self._handler(compress=False)
+        secret, _ = self._handler(compress=False, encrypt=True)
+        data = {"email": "someone@example.com"}
+
+        def raw(token):
+            payload = token.split(".")[1]
+            return base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+
+        assert b"someone@example.com" in raw(plain.write("x", data, 60))
+        token = secret.write("x", data, 60)
+        assert b"someone@example.com" not in raw(token)
+        assert _without_sid(secret.read(token)) == data
+        assert secret.write("x", data, 60) != token  # Fresh nonce each time
+
+    def test_large_payload_is_compressed(self):
+        handler, fallback = self._handler()
+        data = {"items": ["same value"] * 500}
+        token = handler.write("x", data, 60)
+        assert len(token) < len(json.dumps(data))
+        assert _without_sid(handler.read(token)) == data and fallback.calls == 0
+
+    def test_oversized_session_falls_back_and_returns(self):
+        import secrets
+        handler, fallback = self._handler(max_size=200)
+        big = {"blob": secrets.token_hex(200)}
+        sid = handler.write("c.old", big, 60)
+        assert sid.startswith("s.") and _without_sid(fallback.store[sid]) == big
+        assert _without_sid(handler.read(sid)) == big
+
+        token = handler.write(sid, {"user_id": 1}, 60)
+        assert token.startswith("c.") and sid not in fallback.store
+
+    def test_unknown_id_needs_no_lookup(self):
+        handler, fallback = self._handler()
+        assert handler.read("some-random-id") == {}
+        handler.destroy("c.anything")
+        assert fallback.calls == 0
+
+    def test_resolved_from_backend_env(self, monkeypatch):
+        from tina4_python.session import Session
+        from tina4_python.session_handlers import CookieSessionHandler
+        monkeypatch.setenv("TINA4_SESSION_BACKEND", "cookie")
+        assert isinstance(Session()._handler, CookieSessionHandler)
+
+    async def test_login_and_logout_cookies(self, monkeypatch):
+        from tina4_python.core.request import Request
+        from tina4_python.core.router import Router, get
+        from tina4_python.core.server import handle
+        monkeypatch.setenv("TINA4_SESSION_BACKEND", "cookie")
+        monkeypatch.setenv("SECRET", "dispatch-secret")
+        Router.clear()
+
+        @get("/login")
+        async def login(request, response):
+            request.session.set("user", 7)
+            return response.json({"ok": True})
+
+        @get("/me")
+        async def me(request, response):
+            return response.json({"user": request.session.get("user")})
+
+        @get("/logout")
+        async def logout(request, response):
+            request.session.destroy()
+            return response.json({"ok": True})
+
+        def scope(path, cookie=None):
+            headers = [(b"cookie", cookie.encode())] if cookie else []
+            return {"type": "http", "method": "GET", "path": path, "query_string": b"",
+                    "headers": headers, "client": ("127.0.0.1", 0)}
+
+        def set_cookie(response):
+            return next((value for name, value in response._headers if name.lower() == "set-cookie"), None)
+
+        try:
+            response = await handle(Request.from_scope(scope("/login")))
+            token = set_cookie(response).split(";")[0].split("=", 1)[1]
+            assert token.startswith("c.")
+
+            response = await handle(Request.from_scope(scope("/me", f"tina4_session={token}")))
+            assert json.loads(response.content) == {"user": 7}
+            assert set_cookie(response) is None
+
+            response = await handle(Request.from_scope(scope("/logout", f"tina4_session={token}")))
+            assert "Max-Age=0" in set_cookie(response)
+        finally:
+            Router.clear()
+
+
+# ── Tiered Handler Tests ─────────────────────────────────────────
+
+
+class TestTieredSessionHandler:
+    def _tier(self, store=None, **kwargs):
+        from tina4_python.session_handlers import TieredSessionHandler
+        store = store or _RecordingHandler()
+        return TieredSessionHandler(store, **kwargs), store
+
+    def test_hot_session_needs_no_storage(self):
+        from tina4_python.session import Session
+        tier, store = self._tier()
+        session = Session(handler=tier)
+        session.start()
+        session.set("user_id", 42)
+        session.save()
+        sid = session.session_id
+        assert session.needs_cookie
+
+        resumed = Session(handler=tier)
+        resumed.start(sid)
+        assert resumed.get("user_id") == 42
+        assert store.calls == 0 and tier.stats()["hits"] == 1
+
+    def test_session_id_is_stable_across_writes(self):
+        from tina4_python.session import Session
+        tier, store = self._tier()
+        session = Session(handler=tier)
+        session.start()
+        session.set("n", 1)
+        session.save()
+        sid = session.session_id
+
+        resumed = Session(handler=tier)
+        resumed.start(sid)
+        resumed.set("n", 2)
+        resumed.save()
+        tier.flush()
+        assert resumed.session_id == sid and not resumed.needs_cookie
+        assert store.store[sid]["n"] == 2 and "_tina4_version" in store.store[sid]
+
+    def test_writes_coalesce_until_flush(self):
+        tier, store = self._tier()
+        for i in range(5):
+            assert tier.write("abc", {"n": i}, 60) is None
+        assert store.calls == 0 and tier.stats()["pending"] == 1
+        assert tier.flush() == 1
+        assert store.store["abc"]["n"] == 4 and store.calls == 2  # One read to reconcile, one write
+        assert tier.flush() == 0
+
+    def test_hot_copy_is_revalidated_without_waiting(self):
+        import time
+        from tina4_python.session_handlers import TieredSessionHandler
+        store = _RecordingHandler()
+        worker_a = TieredSessionHandler(store)
+        worker_b = TieredSessionHandler(store, revalidate=0.05)
+        worker_a.write("abc", {"step": 1}, 60)
+        worker_a.flush()
+        assert worker_b.read("abc") == {"step": 1}
+
+        worker_a.write("abc", {"step": 2}, 60)
+        worker_a.flush()
+        assert worker_b.read("abc") == {"step": 1}  # Still within the revalidate window
+        time.sleep(0.06)
+        start = time.monotonic()
+        assert worker_b.read("abc") == {"step": 2}
+        assert time.monotonic() - start < 0.05 and worker_b.stats()["misses"] == 2
+
+    def test_unflushed_peer_is_not_waited_for(self):
+        import time
+        from tina4_python.session_handlers import TieredSessionHandler
+        store = _RecordingHandler()
+        worker_a = TieredSessionHandler(store)
+        worker_b = TieredSessionHandler(store, revalidate=0)
+        worker_a.write("abc", {"step": 1}, 60)
+        worker_a.flush()
+        worker_a.write("abc", {"step": 2}, 60)  # Not flushed yet
+
+        start = time.monotonic()
+        assert worker_b.read("abc") == {"step": 1}
+        assert time.monotonic() - start < 0.05
+        worker_a.flush()
+        assert worker_b.read("abc") == {"step": 2}
+
+    def test_different_keys_from_two_workers_are_merged(self):
+        from tina4_python.session_handlers import TieredSessionHandler
+        store = _RecordingHandler()
+        worker_a = TieredSessionHandler(store)
+        worker_b = TieredSessionHandler(store)
+        worker_a.write("abc", {"user": 1}, 60)
+        worker_a.flush()
+        seen_a, seen_b = worker_a.read("abc"), worker_b.read("abc")
+
+        worker_a.write("abc", {**seen_a, "cart": [7]}, 60)
+        worker_b.write("abc", {**seen_b, "theme": "dark"}, 60)
+        worker_a.flush()
+        worker_b.flush()
+        stored = {k: v for k, v in store.store["abc"].items() if k != "_tina4_version"}
+        assert stored == {"user": 1, "cart": [7], "theme": "dark"}
+        assert worker_b.stats()["conflicts"] == 0
+        assert worker_b.read("abc") == stored
+
+    def test_same_key_conflict_is_counted(self):
+        from tina4_python.session_handlers import TieredSessionHandler
+        store = _RecordingHandler()
+        worker_a = TieredSessionHandler(store)
+        worker_b = TieredSessionHandler(store)
+        worker_a.write("abc", {"step": 1, "user": 1}, 60)
+        worker_a.flush()
+        worker_b.read("abc")
+
+        worker_a.write("abc", {"step": 2, "user": 1}, 60)
+        worker_b.write("abc", {"step": 3}, 60)
+        worker_a.flush()
+        worker_b.flush()
+        assert store.store["abc"]["step"] == 3 and "user" not in store.store["abc"]
+        assert worker_b.stats()["conflicts"] == 1 and worker_a.stats()["conflicts"] == 0
+
+    def test_session_destroyed_elsewhere_is_not_resurrected(self):
+        from tina4_python.session_handlers import TieredSessionHandler
+        store = _RecordingHandler()
+        worker_a = TieredSessionHandler(store)
+        worker_b = TieredSessionHandler(store)
+        worker_a.write("abc", {"user": 1}, 60)
+        worker_a.flush()
+        worker_b.read("abc")
+
+        worker_a.destroy("abc")
+        worker_b.write("abc", {"user": 1, "cart": [7]}, 60)
+        assert worker_b.flush() == 0
+        assert "abc" not in store.store and worker_b.stats()["hot"] == 0
+
+    def test_write_during_flush_builds_on_it(self):
+        class Slow(_RecordingHandler):
+            def write(self, session_id, data, ttl):
+                super().write(session_id, data, ttl)
+                if data.get("n") == 1:
+                    tier.write("abc", {"n": 2}, 60)  # Lands while the flush is in progress
+
+        store = Slow()
+        tier, _ = self._tier(store)
+        tier.write("abc", {"n": 1}, 60)
+        tier.flush()
+        tier.flush()
+        assert store.store["abc"]["n"] == 2 and tier.stats()["conflicts"] == 0
+
+    def test_lru_is_bounded_but_keeps_queued_writes(self):
+        tier, store = self._tier(max_sessions=2)
+        for name in ("a", "b", "c"):
+            tier.write(name, {"name": name}, 60)
+        assert tier.stats()["hot"] == 2
+        assert tier.read("a") == {"name": "a"} and store.calls == 0
+        tier.flush()
+        assert set(store.store) == {"a", "b", "c"}
+
+    def test_destroy_is_immediate(self):
+        tier, store = self._tier()
+        tier.write("abc", {"user": 1}, 60)
+        tier.flush()
+        tier.destroy("abc")
+        assert "abc" not in store.store and tier.read("abc") == {}
+        assert tier.flush() == 0
+
+    def test_failed_flush_is_requeued(self):
+        class Flaky(_RecordingHandler):
+            fail = True
+
+            def write(self, session_id, data, ttl):
+                if self.fail:
+                    raise OSError("disk full")
+                super().write(session_id, data, ttl)
+
+        tier, store = self._tier(Flaky())
+        tier.write("abc", {"user": 1}, 60)
+        with pytest.raises(OSError):
+            tier.flush()
+        store.fail = False
+        assert tier.flush() == 1 and store.store["abc"]["user"] == 1
+
+    def test_shared_tier_from_env(self, tmp_path, monkeypatch):
+        import tina4_python.session as session_module
+        from tina4_python.session import Session, FileSessionHandler, flush_sessions
+        from tina4_python.session_handlers import TieredSessionHandler
+        monkeypatch.setattr(session_module, "_tier", None)
+        monkeypatch.setenv("TINA4_SESSION_TIER_SIZE", "100")
+        monkeypatch.setenv("TINA4_SESSION_PATH", str(tmp_path / "s"))
+
+        first = Session()
+        assert isinstance(first._handler, TieredSessionHandler)
+        assert isinstance(first._handler.handler, FileSessionHandler)
+        assert Session()._handler is first._handler
+
+        first.start()
+        first.set("user", 9)
+        first.save()
+        assert flush_sessions() == 1
+        assert FileSessionHandler(str(tmp_path / "s")).read(first.session_id)["user"] == 9
+
+
 # ── Integration Tests (require actual services) ─────────────────
 
 
@@ -292,6 +292,63 @@ class TestCache:
         assert removed == 1
         assert c.get("long") == "val"
 
+    def test_get_refreshes_lru_position(self):
+        c = Cache(max_size=3)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.set("c", 3)
+        c.get("a")
+        c.set("d", 4)  # "b" is now least recently used
+        assert c.get("b") is None
+        assert c.get("a") == 1
+
+    def test_sharded_cache(self):
+        c = Cache(max_size=64, shards=4)
+        for i in range(200):
+            c.set(f"k{i}", i, tags=["even" if i % 2 == 0 else "odd"])
+        assert c.size() <= 64
+        assert c.get("k199") == 199
+        kept_even = sum(1 for i in range(0, 200, 2) if c.get(f"k{i}") is not None)
+        assert c.clear_tag("even") == kept_even
+        assert all(c.get(f"k{i}") is None for i in range(0, 200, 2))
+
+    def test_max_bytes_evicts_least_recently_used(self):
+        c = Cache(max_bytes=20_000)
+        for i in range(20):
+            c.set(f"k{i}", "x" * 2000)
+        assert c.memory()["bytes"] <= 20_000
+        assert c.get("k19") is not None
+        assert c.get("k0") is None
+
+    def test_value_over_budget_is_not_stored(self):
+        c = Cache(max_bytes=10_000)
+        c.set("small", "x")
+        c.set("huge", "x" * 50_000)
+        assert c.get("huge") is None
+        assert c.get("small") == "x"
+
+    def test_memory_per_tag(self):
+        c = Cache(max_bytes=1_000_000)
+        c.set("u1", {"name": "a" * 1000}, tags=["users"])
+        c.set("u2", {"name": "b" * 1000}, tags=["users"])
+        c.set("p1", "c" * 100, tags=["posts"])
+        memory = c.memory()
+        assert memory["tags"]["users"] > 2000 > memory["tags"]["posts"]
+        assert memory["bytes"] == memory["tags"]["users"] + memory["tags"]["posts"]
+        c.delete("u1")
+        c.set("p1", "c", tags=None)  # re-set keeps its tags
+        memory = c.memory()
+        assert 1000 < memory["tags"]["users"] < 2000
+        assert c.clear_tag("posts") == 1
+        assert "posts" not in c.memory()["tags"]
+
+    def test_memory_without_budget_is_measured_on_demand(self):
+        c = Cache()
+        c.set("u1", "a" * 1000, tags=["users"])
+        memory = c.memory()
+        assert memory["max_bytes"] is None
+        assert memory["tags"]["users"] == memory["bytes"] > 1000
+
     def test_remember(self):
         c = Cache()
         calls = [0]
@@ -304,6 +361,127 @@ class TestCache:
         assert c.remember("key", 60, factory) == "computed"
         assert calls[0] == 1  # Factory only called once
 
+    def test_remember_single_flight_threads(self):
+        import threading
+        c = Cache()
+        calls = []
+        gate = threading.Event()
+
+        def factory():
+            calls.append(1)
+            gate.wait(2)
+            return "computed"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(c.remember("hot", 60, factory)))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join(5)
+        assert calls == [1]
+        assert results == ["computed"] * 8
+        stats = c.stats()
+        assert stats["misses"] == 1 and stats["coalesced"] == 7
+
+    def test_remember_waiters_see_factory_error(self):
+        import threading
+        c = Cache()
+        gate = threading.Event()
+        errors = []
+
+        def factory():
+            gate.wait(2)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                c.remember("bad", 60, factory)
+            except ValueError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join(5)
+        assert errors == ["boom"] * 3
+        # Nothing cached, nothing left in flight
+        assert c.remember("bad", 60, lambda: "ok") == "ok"
+
+    async def test_remember_async_single_flight(self):
+        import asyncio
+        c = Cache()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"n": 1}
+
+        results = await asyncio.gather(*(c.remember_async("hot", 60, factory) for _ in range(10)))
+        assert calls == [1]
+        assert all(r == {"n": 1} for r in results)
+        assert c.stats()["coalesced"] == 9
+
+    async def test_async_waits_on_thread_computation(self):
+        import asyncio
+        import threading
+        c = Cache()
+        gate = threading.Event()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            gate.wait(2)
+            return "from-thread"
+
+        thread = threading.Thread(target=c.remember, args=("k", 60, factory))
+        thread.start()
+        time.sleep(0.05)
+        waiter = asyncio.ensure_future(c.remember_async("k", 60, lambda: "from-task"))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        gate.set()
+        assert await waiter == "from-thread"
+        thread.join(5)
+        assert calls == [1]
+
+    def test_remember_stale_while_revalidate(self):
+        import threading
+        c = Cache()
+        refreshed = threading.Event()
+        values = iter(["v1", "v2"])
+
+        def factory():
+            value = next(values)
+            if value == "v2":
+                refreshed.set()
+            return value
+
+        assert c.remember("k", 1, factory, stale_ttl=30) == "v1"
+        time.sleep(1.1)
+        assert c.get("k") is None  # expired for plain reads
+        assert c.remember("k", 1, factory, stale_ttl=30) == "v1"  # stale, refresh started
+        assert refreshed.wait(2)
+        time.sleep(0.05)
+        assert c.remember("k", 1, factory, stale_ttl=30) == "v2"
+        assert c.stats()["refreshes"] == 1
+
+    def test_remember_early_expiration(self, monkeypatch):
+        import random
+        c = Cache()
+        c.remember("k", 60, lambda: "old")
+        c._shard("k").deltas["k"] = 1000.0  # a very slow factory: refresh well before expiry
+        monkeypatch.setattr(random, "random", lambda: 0.5)
+        assert c.remember("k", 60, lambda: "new", beta=1.0) == "new"
+        assert c.stats()["refreshes"] == 1
+        assert c.remember("k", 60, lambda: "newer") == "new"
+
     def test_query_key(self):
         k1 = Cache.query_key("SELECT * FROM users", [1])
         k2 = Cache.query_key("SELECT * FROM users", [1])
@@ -1,4 +1,5 @@
 # Tests for static file serving in tina4_python.core.server (v3)
+import time
 import pytest
 import mimetypes
 from pathlib import Path
@@ -164,3 +165,289 @@ class TestDirectoryTraversalPrevention:
     def test_try_static_returns_response_or_none(self):
         result = _try_static("/js/tina4.min.js")
         assert result is None or isinstance(result, Response)
+
+
+class _Req:
+    def __init__(self, **headers):
+        self.method = "GET"
+        self.headers = {k.replace("_", "-"): v for k, v in headers.items()}
+
+
+@pytest.fixture
+def public(tmp_path, monkeypatch):
+    from tina4_python.core import static
+    monkeypatch.setenv("TINA4_PUBLIC_DIR", str(tmp_path))
+    monkeypatch.setenv("TINA4_DEBUG", "false")
+    static.clear_cache()
+    yield tmp_path
+    static.clear_cache()
+
+
+class TestStaticResolveCache:
+
+    def test_hit_is_cached_in_production(self, public):
+        from tina4_python.core import static
+        (public / "app.css").write_text("body{}")
+        entry = static.resolve("/app.css")
+        (public / "app.css").unlink()
+        assert static.resolve("/app.css") is entry
+
+    def test_miss_is_cached_in_production(self, public):
+        from tina4_python.core import static
+        assert static.resolve("/late.css") is None
+        (public / "late.css").write_text("x")
+        assert static.resolve("/late.css") is None
+        static.clear_cache()
+        assert static.resolve("/late.css") is not None
+
+    def test_miss_expires(self, public, monkeypatch):
+        from tina4_python.core import static
+        monkeypatch.setattr(static, "MISS_TTL_SECONDS", 0.05)
+        assert static.resolve("/late.css") is None
+        (public / "late.css").write_text("x")
+        time.sleep(0.06)
+        assert static.resolve("/late.css") is not None
+
+    def test_hit_revalidated_after_ttl(self, public, monkeypatch):
+        from tina4_python.core import static
+        monkeypatch.setattr(static, "REVALIDATE_SECONDS", 0.05)
+        f = public / "app.css"
+        f.write_text("body{}")
+        first = static.resolve("/app.css")
+        time.sleep(0.06)
+        assert static.resolve("/app.css") is first  # Unchanged: one stat, same entry
+        f.write_text("body{color:red}")
+        time.sleep(0.06)
+        second = static.resolve("/app.css")
+        assert second is not first and second.size == 15
+
+    def test_edit_before_revalidation_sends_current_length(self, public):
+        from tina4_python.core import static
+        f = public / "app.txt"
+        f.write_text("a much longer first version")
+        entry = static.resolve("/app.txt")
+        f.write_text("short")
+        resp = static.serve(static.resolve("/app.txt"), _Req(), Response())
+        assert static.resolve("/app.txt") is entry and resp.content == b"short"
+
+    def test_dev_mode_revalidates(self, public, monkeypatch):
+        from tina4_python.core import static
+        monkeypatch.setenv("TINA4_DEBUG", "true")
+        f = public / "app.js"
+        f.write_text("one")
+        first = static.resolve("/app.js")
+        f.write_text("three")
+        second = static.resolve("/app.js")
+        assert second is not first and second.size == 5
+        f.unlink()
+        assert static.resolve("/app.js") is None
+        f.write_text("back")
+        assert static.resolve("/app.js") is not None
+
+    def test_parent_segments_rejected(self, public):
+        from tina4_python.core import static
+        (public / "secret.txt").write_text("x")
+        assert static.resolve("/sub/../secret.txt") is None
+
+    def test_validators_from_stat(self, public):
+        import os
+        from tina4_python.core import static
+        f = public / "a.txt"
+        f.write_text("hello")
+        st = os.stat(f)
+        entry = static.resolve("/a.txt")
+        assert entry.etag == f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        assert entry.last_modified.endswith("GMT")
+
+
+class TestStaticServe:
+
+    def _serve(self, public, name, **headers):
+        from tina4_python.core import static
+        return static.serve(static.resolve(f"/{name}"), _Req(**headers), Response())
+
+    def test_full_response_headers(self, public):
+        (public / "a.txt").write_text("hello world")
+        resp = self._serve(public, "a.txt")
+        headers = dict(resp._headers)
+        assert resp.status_code == 200
+        assert resp.content == b"hello world"
+        assert headers["accept-ranges"] == "bytes"
+        assert "last-modified" in headers
+        built = dict(resp.build_headers())
+        assert built[b"etag"] == headers["etag"].encode()  # not replaced by an md5
+
+    def test_if_none_match_304(self, public):
+        (public / "a.txt").write_text("hello")
+        etag = dict(self._serve(public, "a.txt")._headers)["etag"]
+        resp = self._serve(public, "a.txt", if_none_match=etag)
+        assert resp.status_code == 304 and resp.content == b""
+
+    def test_if_modified_since_304(self, public):
+        (public / "a.txt").write_text("hello")
+        last_modified = dict(self._serve(public, "a.txt")._headers)["last-modified"]
+        assert self._serve(public, "a.txt", if_modified_since=last_modified).status_code == 304
+
+    def test_range(self, public):
+        (public / "a.txt").write_bytes(b"0123456789")
+        resp = self._serve(public, "a.txt", range="bytes=2-5")
+        assert resp.status_code == 206
+        assert resp.content == b"2345"
+        assert dict(resp._headers)["content-range"] == "bytes 2-5/10"
+
+    def test_suffix_and_open_ranges(self, public):
+        (public / "a.txt").write_bytes(b"0123456789")
+        assert self._serve(public, "a.txt", range="bytes=-3").content == b"789"
+        assert self._serve(public, "a.txt", range="bytes=7-").content == b"789"
+        assert self._serve(public, "a.txt", range="bytes=8-99").content == b"89"
+
+    def test_unsatisfiable_range(self, public):
+        (public / "a.txt").write_bytes(b"0123")
+        resp = self._serve(public, "a.txt", range="bytes=10-20")
+        assert resp.status_code == 416
+        assert dict(resp._headers)["content-range"] == "bytes */4"
+
+    def test_if_range_mismatch_sends_full_file(self, public):
+        (public / "a.txt").write_bytes(b"0123456789")
+        resp = self._serve(public, "a.txt", range="bytes=0-1", if_range='"stale"')
+        assert resp.status_code == 200 and resp.content == b"0123456789"
+
+    def test_multi_range_ignored(self, public):
+        (public / "a.txt").write_bytes(b"0123456789")
+        assert self._serve(public, "a.txt", range="bytes=0-1,4-5").status_code == 200
+
+    async def test_large_file_streamed(self, public, monkeypatch):
+        from tina4_python.core import response as response_module
+        monkeypatch.setattr(response_module, "FILE_STREAM_THRESHOLD", 100)
+        monkeypatch.setattr(response_module, "FILE_CHUNK_SIZE", 64)
+        data = bytes(range(256)) * 4
+        (public / "big.bin").write_bytes(data)
+        resp = self._serve(public, "big.bin")
+        assert resp.is_streaming and resp.content == b""
+        built = dict(resp.build_headers("gzip"))
+        assert built[b"content-length"] == b"1024"
+        chunks = [c async for c in resp.iter_stream()]
+        assert len(chunks) == 16 and b"".join(chunks) == data
+
+        ranged = self._serve(public, "big.bin", range="bytes=100-899")
+        ranged.build_headers()
+        assert ranged._file_path is None  # partial bodies never use pathsend
+        assert b"".join([c async for c in ranged.iter_stream()]) == data[100:900]
+
+
+class TestStaticPathsend:
+
+    async def test_app_offers_large_file_via_pathsend(self, public, monkeypatch):
+        from tina4_python.core import response as response_module
+        from tina4_python.core.server import app
+        monkeypatch.setattr(response_module, "FILE_STREAM_THRESHOLD", 10)
+        (public / "movie.bin").write_bytes(b"m" * 100)
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(msg):
+            sent.append(msg)
+
+        scope = {"type": "http", "method": "GET", "path": "/movie.bin", "query_string": b"",
+                 "headers": [], "client": ("127.0.0.1", 0),
+                 "extensions": {"http.response.pathsend": {}}}
+        await app(scope, receive, send)
+        assert sent[0]["status"] == 200
+        assert dict(sent[0]["headers"])[b"content-length"] == b"100"
+        assert sent[1] == {"type": "http.response.pathsend", "path": str(public / "movie.bin")}
+
+
+class TestPrecompressedVariants:
+
+    def _serve(self, name, accept_encoding="gzip, deflate, br"):
+        from tina4_python.core import static
+        return static.serve(static.resolve(f"/{name}"), _Req(accept_encoding=accept_encoding), Response())
+
+    def test_in_memory_variant_compressed_once(self, public, monkeypatch):
+        import gzip
+        from tina4_python.core import static
+        source = b"body { color: red; }\n" * 200
+        (public / "app.css").write_bytes(source)
+        calls = []
+        real = static._compress
+        monkeypatch.setattr(static, "_compress", lambda data, enc: calls.append(enc) or real(data, enc))
+        first = self._serve("app.css")
+        second = self._serve("app.css")
+        assert calls == [static.ENCODINGS[0][0]]
+        assert first.content is second.content
+        headers = dict(first._headers)
+        if headers["content-encoding"] == "gzip":
+            assert gzip.decompress(first.content) == source
+        assert headers["vary"] == "Accept-Encoding"
+        built = dict(first.build_headers("gzip"))
+        assert built[b"content-length"] == str(len(first.content)).encode()  # not compressed twice
+
+    def test_identity_when_not_accepted(self, public):
+        source = b"x" * 5000
+        (public / "app.js").write_bytes(source)
+        resp = self._serve("app.js", accept_encoding="identity, gzip;q=0")
+        assert resp.content == source
+        assert "content-encoding" not in dict(resp._headers)
+
+    def test_precompress_writes_siblings_and_they_are_served(self, public, monkeypatch):
+        import gzip
+        from tina4_python.core import static
+        (public / "css").mkdir()
+        source = b"h1 { margin: 0 }\n" * 300
+        (public / "css" / "site.css").write_bytes(source)
+        (public / "tiny.css").write_bytes(b"a{}")
+        (public / "logo.png").write_bytes(b"\x89PNG" * 500)
+        assert static.precompress([str(public)]) == len(static.ENCODINGS)
+        assert (public / "css" / "site.css.gz").is_file()
+        assert not (public / "tiny.css.gz").exists()
+        assert not (public / "logo.png.gz").exists()
+        assert static.precompress([str(public)]) == 0  # up to date
+
+        monkeypatch.setattr(static, "_compress", lambda *a: pytest.fail("compressed per request"))
+        resp = self._serve("css/site.css", accept_encoding="gzip")
+        assert dict(resp._headers)["content-encoding"] == "gzip"
+        assert gzip.decompress(resp.content) == source
+
+    def test_each_coding_has_its_own_strong_etag(self, public):
+        (public / "app.css").write_bytes(b"p { margin: 0 }\n" * 200)
+        plain = dict(self._serve("app.css", accept_encoding="")._headers)["etag"]
+        gzipped = dict(self._serve("app.css", accept_encoding="gzip")._headers)["etag"]
+        assert gzipped != plain and not gzipped.startswith("W/") and gzipped.endswith('-gz"')
+
+        from tina4_python.core import static
+        revalidated = static.serve(static.resolve("/app.css"), _Req(accept_encoding="gzip", if_none_match=gzipped), Response())
+        assert revalidated.status_code == 304
+        # A range validated against the gzip tag must not splice identity bytes onto it
+        ranged = static.serve(static.resolve("/app.css"), _Req(range="bytes=0-9", if_range=gzipped), Response())
+        assert ranged.status_code == 200
+        ranged = static.serve(static.resolve("/app.css"), _Req(range="bytes=0-9", if_range=plain), Response())
+        assert ranged.status_code == 206 and dict(ranged._headers)["etag"] == plain
+
+    async def test_serve_async_compresses_on_the_pool(self, public, monkeypatch):
+        import threading
+        from tina4_python.core import static
+        (public / "app.js").write_bytes(b"let x = 1;\n" * 500)
+        threads = []
+        real = static._compress
+        monkeypatch.setattr(static, "_compress", lambda data, enc: threads.append(threading.current_thread().name) or real(data, enc))
+        resp = await static.serve_async(static.resolve("/app.js"), _Req(accept_encoding="gzip"), Response())
+        again = await static.serve_async(static.resolve("/app.js"), _Req(accept_encoding="gzip"), Response())
+        assert len(threads) == 1 and threads[0].startswith("tina4-compress")
+        assert resp.content is again.content and dict(resp._headers)["content-encoding"] == "gzip"
+
+    def test_stale_sibling_ignored(self, public):
+        import os
+        from tina4_python.core import static
+        f = public / "app.css"
+        f.write_bytes(b"a" * 2000)
+        (public / "app.css.gz").write_bytes(b"stale")
+        os.utime(public / "app.css.gz", ns=(1, 1))
+        entry = static.resolve("/app.css")
+        assert "gzip" not in entry.siblings
+
+    def test_compressed_file_served_as_archive(self, public):
+        from tina4_python.core import static
+        (public / "bundle.js.gz").write_bytes(b"\x1f\x8b" + b"0" * 10)
+        assert static.resolve("/bundle.js.gz").content_type == "application/gzip"
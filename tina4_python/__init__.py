@@ -13,7 +13,7 @@ __version__ = "3.10.69"
 # ── Route decorators ──
 from tina4_python.core.router import (  # noqa: E402, F401
     get, post, put, patch, delete, any_method,
-    noauth, secured, cached, middleware, template,
+    noauth, secured, cached, etag, rate_limit, middleware, template,
     Router, RouteGroup,
 )
 
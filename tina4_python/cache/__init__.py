@@ -7,10 +7,10 @@ Response cache for GET requests with pluggable backends.
 Backends are selected via the ``TINA4_CACHE_BACKEND`` env var:
 
     memory  — in-process LRU cache (default, zero deps)
-    redis   — Redis / Valkey (uses ``redis`` package or raw RESP over TCP)
+    redis   — Redis / Valkey (uses ``redis`` package or Tina4's pooled RESP client)
     file    — JSON files in ``data/cache/``
 
-    from tina4_python.cache import ResponseCache, cache_stats, clear_cache
+    from tina4_python.cache import ResponseCache, cache_stats, clear_cache, clear_tag
     from tina4_python.cache import cache_get, cache_set, cache_delete, cache_clear, cache_stats
 
     # As middleware on a route
@@ -26,20 +26,40 @@ Backends are selected via the ``TINA4_CACHE_BACKEND`` env var:
     cache_clear()
     stats = cache_stats()  # {"hits": 42, "misses": 7, "size": 15, "backend": "memory"}
 
+    # Tagged responses, purged when the data behind them changes
+    @middleware(ResponseCache(ttl=300, tags=["products"]))
+    @get("/api/products")
+    async def products(request, response): ...
+
+    clear_tag("products")
+
+Response entries are stored in the backend, so the redis and file backends
+share one response cache between workers.
+
 Environment:
     TINA4_CACHE_BACKEND      — memory | redis | file  (default: memory)
     TINA4_CACHE_URL           — redis://localhost:6379  (redis backend only)
     TINA4_CACHE_TTL           — default TTL in seconds  (default: 60)
     TINA4_CACHE_MAX_ENTRIES   — max cached entries       (default: 1000)
+    TINA4_CACHE_L1_TTL        — seconds a worker reuses a redis/file response entry
+                                before re-reading it (default: 2, 0 = off)
+    TINA4_CACHE_L1_ENTRIES    — response entries held in that L1 (default: 256)
 """
 import os
 import time
 import json
+import base64
+import struct
 import hashlib
 import threading
-import socket
+import weakref
 from collections import OrderedDict
 from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+
+from tina4_python.core import codec
+from tina4_python.core.resp import RespClient, RespError
+from tina4_python.core.response import Response
 
 
 # ── Backend interface ──────────────────────────────────────────────
@@ -66,6 +86,19 @@ class _CacheBackend:
     def name(self) -> str:
         raise NotImplementedError
 
+    def get_raw(self, key: str) -> bytes | None:
+        """Bytes stored with ``set_raw()``. Text backends keep them base64-encoded."""
+        value = self.get(key)
+        if not isinstance(value, str):
+            return None
+        try:
+            return base64.b64decode(value, validate=True)
+        except ValueError:
+            return None
+
+    def set_raw(self, key: str, data: bytes, ttl: int):
+        self.set(key, base64.b64encode(data).decode("ascii"), ttl)
+
 
 # ── Memory backend ─────────────────────────────────────────────────
 
@@ -133,13 +166,20 @@ class _MemoryBackend(_CacheBackend):
     def name(self) -> str:
         return "memory"
 
+    def get_raw(self, key: str) -> bytes | None:
+        value = self.get(key)
+        return value if isinstance(value, bytes) else None
+
+    def set_raw(self, key: str, data: bytes, ttl: int):
+        self.set(key, data, ttl)
+
 
 # ── Redis backend ──────────────────────────────────────────────────
 
 
 class _RedisBackend(_CacheBackend):
     """Redis / Valkey backend. Uses the ``redis`` package if available,
-    otherwise falls back to raw RESP protocol over TCP."""
+    otherwise Tina4's pooled RESP client (``tina4_python.core.resp``)."""
 
     def __init__(self, url: str = "redis://localhost:6379", max_entries: int = 1000):
         self._url = url
@@ -150,13 +190,10 @@ class _RedisBackend(_CacheBackend):
         self._client = None
         self._use_raw = False
 
-        # Parse URL
-        cleaned = url.replace("redis://", "")
-        parts = cleaned.split(":")
-        self._host = parts[0] or "localhost"
-        self._port = int(parts[1].split("/")[0]) if len(parts) > 1 else 6379
-        db_part = cleaned.split("/")
-        self._db = int(db_part[1]) if len(db_part) > 1 and db_part[1] else 0
+        self._resp = RespClient(url, timeout=5)
+        self._host = self._resp.host
+        self._port = self._resp.port
+        self._db = self._resp.db
 
         # Try the redis package first
         try:
@@ -170,38 +207,11 @@ class _RedisBackend(_CacheBackend):
             self._client = None
             self._use_raw = True
 
-    def _resp_command(self, *args) -> str | None:
-        """Send a command using raw RESP protocol over TCP."""
+    def _resp_command(self, *args):
+        """Run a command on the RESP client. Returns None if the server is unreachable."""
         try:
-            cmd = f"*{len(args)}\r\n"
-            for arg in args:
-                s = str(arg)
-                cmd += f"${len(s)}\r\n{s}\r\n"
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((self._host, self._port))
-            if self._db != 0:
-                select_cmd = f"*2\r\n$6\r\nSELECT\r\n${len(str(self._db))}\r\n{self._db}\r\n"
-                sock.sendall(select_cmd.encode())
-                sock.recv(1024)
-            sock.sendall(cmd.encode())
-            response = sock.recv(65536).decode()
-            sock.close()
-
-            if response.startswith("+"):
-                return response[1:].strip()
-            elif response.startswith("$-1"):
-                return None
-            elif response.startswith("$"):
-                lines = response.split("\r\n")
-                return lines[1] if len(lines) > 1 else None
-            elif response.startswith(":"):
-                return response[1:].strip()
-            elif response.startswith("-"):
-                return None
-            return response.strip()
-        except Exception:
+            return self._resp.execute(*args)
+        except (OSError, ConnectionError, RespError):
             return None
 
     def get(self, key: str):
@@ -220,13 +230,13 @@ class _RedisBackend(_CacheBackend):
             return None
         self._hits += 1
         try:
-            return json.loads(raw)
+            return codec.loads(raw)
         except (json.JSONDecodeError, TypeError):
-            return raw
+            return raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw
 
     def set(self, key: str, value, ttl: int):
         full_key = self._prefix + key
-        serialized = json.dumps(value, default=str)
+        serialized = codec.dumps(value)
         if self._client:
             try:
                 if ttl > 0:
@@ -237,10 +247,29 @@ class _RedisBackend(_CacheBackend):
                 pass
         elif self._use_raw:
             if ttl > 0:
-                self._resp_command("SETEX", full_key, str(ttl), serialized)
+                self._resp_command("SET", full_key, serialized, "EX", ttl)
             else:
                 self._resp_command("SET", full_key, serialized)
 
+    def get_raw(self, key: str) -> bytes | None:
+        if not self._use_raw:
+            return super().get_raw(key)
+        # The RESP client is binary-safe, so bytes are stored as they are
+        raw = self._resp_command("GET", self._prefix + key)
+        if raw is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return raw
+
+    def set_raw(self, key: str, data: bytes, ttl: int):
+        if not self._use_raw:
+            return super().set_raw(key, data, ttl)
+        if ttl > 0:
+            self._resp_command("SET", self._prefix + key, data, "EX", ttl)
+        else:
+            self._resp_command("SET", self._prefix + key, data)
+
     def delete(self, key: str) -> bool:
         full_key = self._prefix + key
         if self._client:
@@ -249,8 +278,7 @@ class _RedisBackend(_CacheBackend):
             except Exception:
                 return False
         elif self._use_raw:
-            result = self._resp_command("DEL", full_key)
-            return result == "1"
+            return bool(self._resp_command("DEL", full_key))
         return False
 
     def clear(self):
@@ -258,24 +286,32 @@ class _RedisBackend(_CacheBackend):
         self._misses = 0
         if self._client:
             try:
-                keys = self._client.keys(self._prefix + "*")
-                if keys:
-                    self._client.delete(*keys)
+                batch = []
+                for key in self._client.scan_iter(match=self._prefix + "*", count=1000):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        self._client.unlink(*batch)
+                        batch = []
+                if batch:
+                    self._client.unlink(*batch)
             except Exception:
                 pass
         elif self._use_raw:
-            # Raw RESP doesn't support pattern delete easily,
-            # so we just clear stats and let TTL handle cleanup
-            pass
+            try:
+                self._resp.unlink_matching(self._prefix + "*")
+            except (OSError, ConnectionError, RespError):
+                pass
 
     def stats(self) -> dict:
         size = 0
-        if self._client:
-            try:
-                keys = self._client.keys(self._prefix + "*")
-                size = len(keys)
-            except Exception:
-                pass
+        try:
+            # SCAN walks the keyspace in batches instead of blocking it like KEYS
+            if self._client:
+                size = sum(1 for _ in self._client.scan_iter(match=self._prefix + "*", count=1000))
+            elif self._use_raw:
+                size = sum(1 for _ in self._resp.scan_iter(self._prefix + "*"))
+        except Exception:
+            pass
         return {
             "hits": self._hits,
             "misses": self._misses,
@@ -312,7 +348,7 @@ class _FileBackend(_CacheBackend):
                 self._misses += 1
                 return None
             try:
-                data = json.loads(path.read_text())
+                data = codec.loads(path.read_text())
                 expires_at = data.get("expires_at")
                 if expires_at and time.time() > expires_at:
                     path.unlink(missing_ok=True)
@@ -338,7 +374,7 @@ class _FileBackend(_CacheBackend):
             except OSError:
                 pass
             try:
-                path.write_text(json.dumps(entry, default=str))
+                path.write_text(codec.dumps(entry))
             except OSError:
                 pass
 
@@ -367,7 +403,7 @@ class _FileBackend(_CacheBackend):
             count = 0
             for f in self._dir.glob("*.json"):
                 try:
-                    data = json.loads(f.read_text())
+                    data = codec.loads(f.read_text())
                     exp = data.get("expires_at")
                     if exp and now > exp:
                         f.unlink(missing_ok=True)
@@ -412,28 +448,124 @@ def _create_backend(
 
 # ── Cache entry (for response cache) ──────────────────────────────
 
+# Backend key namespaces — response entries and tag generations
+_RESPONSE_PREFIX = "response:"
+_TAG_PREFIX = "response-tag:"
+
+# Binary envelope: magic + version, then status, stored/expiry times,
+# header and tag counts, content type, headers, tags, and the raw body
+_ENVELOPE_MAGIC = b"T4RC\x01"
+_ENVELOPE_HEAD = struct.Struct("!HddHH")
+_LEN = struct.Struct("!I")
+_TAG_VERSION = struct.Struct("!Q")
+
+# Response headers that belong to one exchange, not to the cached copy
+_TRANSIENT_HEADERS = frozenset(("x-request-id", "set-cookie", "age", "date"))
+
 
 class _CacheEntry:
     """Single cached response."""
-    __slots__ = ("body", "content_type", "status_code", "expires_at")
+    __slots__ = ("body", "content_type", "status_code", "headers", "tags", "stored_at", "expires_at")
 
-    def __init__(self, body: str, content_type: str, status_code: int, expires_at: float):
+    def __init__(self, body: bytes, content_type: str, status_code: int, expires_at: float,
+                 headers: list | None = None, tags: dict | None = None, stored_at: float | None = None):
         self.body = body
         self.content_type = content_type
         self.status_code = status_code
-        self.expires_at = expires_at
+        self.headers = headers or []
+        self.tags = tags or {}
+        self.stored_at = stored_at if stored_at is not None else time.time()
+        self.expires_at = expires_at  # wall clock, so workers agree on it
+
+
+def _pack_text(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return _LEN.pack(len(data)) + data
+
+
+def _unpack_text(data: bytes, pos: int) -> tuple[str, int]:
+    (size,) = _LEN.unpack_from(data, pos)
+    pos += _LEN.size
+    end = pos + size
+    if end > len(data):
+        raise ValueError("truncated envelope")
+    return data[pos:end].decode("utf-8"), end
+
+
+def _pack_entry(entry: _CacheEntry) -> bytes:
+    """Serialise an entry into the binary envelope stored in the backend."""
+    parts = [
+        _ENVELOPE_MAGIC,
+        _ENVELOPE_HEAD.pack(entry.status_code, entry.stored_at, entry.expires_at,
+                            len(entry.headers), len(entry.tags)),
+        _pack_text(entry.content_type),
+    ]
+    for name, value in entry.headers:
+        parts.append(_pack_text(name))
+        parts.append(_pack_text(value))
+    for tag, version in entry.tags.items():
+        parts.append(_pack_text(tag))
+        parts.append(_TAG_VERSION.pack(version))
+    parts.append(entry.body)
+    return b"".join(parts)
+
+
+def _unpack_entry(data: bytes) -> _CacheEntry | None:
+    """Inverse of ``_pack_entry``. Returns None for anything that is not a valid envelope."""
+    if not data.startswith(_ENVELOPE_MAGIC):
+        return None
+    try:
+        pos = len(_ENVELOPE_MAGIC)
+        status_code, stored_at, expires_at, n_headers, n_tags = _ENVELOPE_HEAD.unpack_from(data, pos)
+        pos += _ENVELOPE_HEAD.size
+        content_type, pos = _unpack_text(data, pos)
+        headers = []
+        for _ in range(n_headers):
+            name, pos = _unpack_text(data, pos)
+            value, pos = _unpack_text(data, pos)
+            headers.append((name, value))
+        tags = {}
+        for _ in range(n_tags):
+            tag, pos = _unpack_text(data, pos)
+            (tags[tag],) = _TAG_VERSION.unpack_from(data, pos)
+            pos += _TAG_VERSION.size
+    except (struct.error, ValueError):
+        return None
+    return _CacheEntry(bytes(data[pos:]), content_type, status_code, expires_at,
+                       headers=headers, tags=tags, stored_at=stored_at)
 
 
 # ── ResponseCache middleware ───────────────────────────────────────
 
+# Every live ResponseCache, so the module-level clear_tag() reaches them all
+_instances: "weakref.WeakSet[ResponseCache]" = weakref.WeakSet()
+
 
 class ResponseCache:
     """
     Middleware that caches GET responses using a pluggable backend.
 
-    Cache key: method + URL (including query string).
+    Entries live in the configured backend as a compact binary envelope
+    (status, content type, headers, body), so with the redis or file
+    backend every worker shares one cache. Remote backends are fronted by
+    a small in-process L1 that may serve an entry for up to
+    ``TINA4_CACHE_L1_TTL`` seconds after another worker replaced or
+    purged it.
+
+    Cache key: method + path + query string (parameters sorted).
     Configurable via constructor kwargs or environment variables.
 
+    Tags group entries for invalidation on writes::
+
+        @middleware(ResponseCache(ttl=300, tags=["products"]))
+        @get("/api/products")
+        async def products(request, response): ...
+
+        clear_tag("products")   # after a product is created or changed
+
+    A purge bumps the tag's generation in the backend; entries stored
+    under an older generation are treated as misses.
+
     Parameters
     ----------
     ttl : int
@@ -445,12 +577,14 @@ class ResponseCache:
     status_codes : list[int]
         Only cache responses with these status codes. Default: ``[200]``.
     cleanup_interval : float
-        Seconds between automatic sweeps of expired entries. Default: 30.
+        Seconds between sweeps of expired L1 entries. Default: 30.
     backend : str
         Cache backend: ``memory`` | ``redis`` | ``file``.
         Falls back to ``TINA4_CACHE_BACKEND`` env var, then ``memory``.
     cache_url : str
         Redis URL. Falls back to ``TINA4_CACHE_URL``.
+    tags : list[str]
+        Tags stamped on every entry this instance stores.
     """
 
     def __init__(
@@ -461,6 +595,7 @@ class ResponseCache:
         cleanup_interval: float = 30.0,
         backend: str | None = None,
         cache_url: str | None = None,
+        tags: list[str] | None = None,
     ):
         env_ttl = os.environ.get("TINA4_CACHE_TTL")
         env_max = os.environ.get("TINA4_CACHE_MAX_ENTRIES")
@@ -468,6 +603,7 @@ class ResponseCache:
         self.ttl: int = ttl if ttl is not None else (int(env_ttl) if env_ttl else 60)
         self.max_entries: int = max_entries if max_entries is not None else (int(env_max) if env_max else 1000)
         self.status_codes: set[int] = set(status_codes or [200])
+        self.tags: tuple[str, ...] = tuple(tags or ())
         self._cleanup_interval: float = cleanup_interval
 
         # Create the backend
@@ -477,16 +613,19 @@ class ResponseCache:
             max_entries=self.max_entries,
         )
 
-        # For memory backend, also keep the old LRU store for response caching
-        # (direct entry access with expiry tracking)
-        self._store: OrderedDict[str, _CacheEntry] = OrderedDict()
+        # In-process L1 in front of remote backends; the memory backend is already local
+        self._l1_ttl: float = 0.0
+        if self._backend.name() != "memory":
+            self._l1_ttl = float(os.environ.get("TINA4_CACHE_L1_TTL", "2"))
+        self._l1_max: int = int(os.environ.get("TINA4_CACHE_L1_ENTRIES", "256"))
+        self._l1: OrderedDict[str, tuple[_CacheEntry, float]] = OrderedDict()  # key -> (entry, until)
+        self._l1_tags: dict[str, tuple[int, float]] = {}                      # tag -> (version, until)
+        self._next_sweep: float = time.monotonic() + cleanup_interval
+
         self._lock = threading.Lock()
         self._hits: int = 0
         self._misses: int = 0
-
-        # Start periodic cleanup if TTL is positive
-        if self.ttl > 0:
-            self._start_cleanup_timer()
+        _instances.add(self)
 
     # ── Middleware interface ──────────────────────────────────────
 
@@ -494,8 +633,8 @@ class ResponseCache:
         """
         Middleware hook (before_* convention).
 
-        If a valid cached entry exists for this GET request, return the
-        cached response immediately. Otherwise let the request continue.
+        If a valid cached entry exists for this GET request, answer with
+        it — the handler does not run. Otherwise let the request continue.
         """
         if self.ttl <= 0:
             return request, response
@@ -504,25 +643,18 @@ class ResponseCache:
         if method.upper() != "GET":
             return request, response
 
-        url = getattr(request, "url", "/")
-        params = getattr(request, "params", None)
-        if params:
-            qs = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-            cache_key = f"GET:{url}?{qs}"
-        else:
-            cache_key = f"GET:{url}"
+        cache_key = self._cache_key(request)
 
         # Check for per-route TTL override
         route_ttl = self._get_route_ttl(request)
 
-        with self._lock:
-            entry = self._store.get(cache_key)
-            if entry is not None and time.monotonic() < entry.expires_at:
+        entry = self._lookup(cache_key)
+        if entry is not None:
+            with self._lock:
                 self._hits += 1
-                # Move to end (most recently used)
-                self._store.move_to_end(cache_key)
-                return request, response(entry.body, entry.status_code)
+            return request, self._respond(response, entry)
 
+        with self._lock:
             self._misses += 1
 
         # Tag the request so after_cache can store the response
@@ -534,8 +666,8 @@ class ResponseCache:
         """
         Middleware hook (after_* convention).
 
-        Capture the response body and cache it if the status code is
-        in the allowed set.
+        Capture the response and store it if the status code is in the
+        allowed set and it carries nothing specific to one client.
         """
         if self.ttl <= 0:
             return request, response
@@ -544,33 +676,29 @@ class ResponseCache:
         if cache_key is None:
             return request, response
 
-        cache_ttl = getattr(request, "_cache_ttl", self.ttl)
+        cache_ttl = getattr(request, "_cache_ttl", None)
+        if cache_ttl is None:
+            cache_ttl = self.ttl
         if cache_ttl <= 0:
             return request, response
 
         # Extract response data
         status_code = self._extract_status(response)
-        if status_code not in self.status_codes:
+        if status_code not in self.status_codes or not self._storable(response):
             return request, response
 
-        body = self._extract_body(response)
-        content_type = self._extract_content_type(response)
-
+        now = time.time()
         entry = _CacheEntry(
-            body=body,
-            content_type=content_type,
+            body=self._extract_body(response),
+            content_type=self._extract_content_type(response),
             status_code=status_code,
-            expires_at=time.monotonic() + cache_ttl,
+            expires_at=now + cache_ttl,
+            headers=self._extract_headers(response),
+            tags=self._tag_versions(self.tags),
+            stored_at=now,
         )
-
-        with self._lock:
-            # Evict LRU if at capacity
-            while len(self._store) >= self.max_entries:
-                self._store.popitem(last=False)
-
-            self._store[cache_key] = entry
-            self._store.move_to_end(cache_key)
-
+        self._backend.set_raw(_RESPONSE_PREFIX + cache_key, _pack_entry(entry), int(cache_ttl))
+        self._remember(cache_key, entry)
         return request, response
 
     # ── Public API ───────────────────────────────────────────────
@@ -583,24 +711,134 @@ class ResponseCache:
         dict
             ``{"hits": int, "misses": int, "size": int, "backend": str}``
         """
+        size = self._backend.stats().get("size", 0)
         with self._lock:
             return {
                 "hits": self._hits,
                 "misses": self._misses,
-                "size": len(self._store),
+                "size": size,
                 "backend": self._backend.name(),
             }
 
     def clear_cache(self) -> None:
         """Flush all cached entries and reset stats."""
         with self._lock:
-            self._store.clear()
+            self._l1.clear()
+            self._l1_tags.clear()
             self._hits = 0
             self._misses = 0
         self._backend.clear()
 
+    def clear_tag(self, tag: str) -> None:
+        """Invalidate every entry stored under ``tag``, in every worker sharing the backend."""
+        self._backend.set(_TAG_PREFIX + tag, time.time_ns(), 0)
+        self._forget_tag(tag)
+
     # ── Internal helpers ─────────────────────────────────────────
 
+    @staticmethod
+    def _cache_key(request) -> str:
+        """``GET:<path>?<sorted query>`` for a Request, or from url/params on anything else."""
+        path = getattr(request, "path", None) or getattr(request, "url", "/")
+        query = getattr(request, "query_string", None)
+        if query is None:
+            params = getattr(request, "params", None)
+            query = "&".join(f"{k}={v}" for k, v in sorted(params.items())) if params else ""
+        elif query:
+            query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+        return f"GET:{path}?{query}" if query else f"GET:{path}"
+
+    def _lookup(self, cache_key: str) -> _CacheEntry | None:
+        """The live entry for ``cache_key`` — L1 first, then the backend."""
+        now = time.time()
+        entry = None
+        if self._l1_ttl > 0:
+            with self._lock:
+                self._sweep_l1()
+                held = self._l1.get(cache_key)
+                if held is not None and held[1] > now:
+                    self._l1.move_to_end(cache_key)
+                    entry = held[0]
+        if entry is None:
+            data = self._backend.get_raw(_RESPONSE_PREFIX + cache_key)
+            entry = _unpack_entry(data) if data else None
+            if entry is None:
+                return None
+            self._remember(cache_key, entry)
+        if entry.expires_at <= now:
+            return None
+        if entry.tags and self._tag_versions(entry.tags) != entry.tags:
+            return None
+        return entry
+
+    def _tag_versions(self, tags) -> dict[str, int]:
+        """Current generation of each tag, from L1 when fresh."""
+        versions = {}
+        now = time.monotonic()
+        for tag in tags:
+            if self._l1_ttl > 0:
+                with self._lock:
+                    held = self._l1_tags.get(tag)
+                if held is not None and held[1] > now:
+                    versions[tag] = held[0]
+                    continue
+            version = self._backend.get(_TAG_PREFIX + tag)
+            if not isinstance(version, int):
+                # First use, or the generation was evicted: start a fresh one so
+                # entries from before an eviction cannot come back to life
+                version = time.time_ns()
+                self._backend.set(_TAG_PREFIX + tag, version, 0)
+            if self._l1_ttl > 0:
+                with self._lock:
+                    self._l1_tags[tag] = (version, now + self._l1_ttl)
+            versions[tag] = version
+        return versions
+
+    def _remember(self, cache_key: str, entry: _CacheEntry) -> None:
+        """Hold ``entry`` in L1, never past its own expiry."""
+        if self._l1_ttl <= 0:
+            return
+        until = min(time.time() + self._l1_ttl, entry.expires_at)
+        with self._lock:
+            self._l1[cache_key] = (entry, until)
+            self._l1.move_to_end(cache_key)
+            while len(self._l1) > self._l1_max:
+                self._l1.popitem(last=False)
+
+    def _forget_tag(self, tag: str) -> None:
+        """Drop a purged tag and the L1 entries that carry it."""
+        with self._lock:
+            self._l1_tags.pop(tag, None)
+            for key in [k for k, (entry, _) in self._l1.items() if tag in entry.tags]:
+                del self._l1[key]
+
+    def _sweep_l1(self) -> None:
+        """Drop expired L1 entries every ``cleanup_interval`` seconds (caller holds the lock)."""
+        if time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + self._cleanup_interval
+        now = time.time()
+        for key in [k for k, (_, until) in self._l1.items() if until <= now]:
+            del self._l1[key]
+
+    @staticmethod
+    def _respond(response, entry: _CacheEntry):
+        """A response answering from ``entry``.
+
+        For a Tina4 Response this is a new object marked ``_answered``,
+        which tells the dispatcher to skip the handler.
+        """
+        if isinstance(response, Response):
+            hit = Response()
+            hit.status_code = entry.status_code
+            hit.content_type = entry.content_type
+            hit.content = entry.body
+            hit._headers = [*response._headers, *entry.headers,
+                            ("age", str(max(0, int(time.time() - entry.stored_at))))]
+            hit._answered = True
+            return hit
+        return response(entry.body.decode("utf-8", "replace"), entry.status_code)
+
     @staticmethod
     def _get_route_ttl(request) -> int | None:
         """Check for a per-route cache TTL set via the @cached decorator."""
@@ -609,6 +847,20 @@ class ResponseCache:
             return int(meta["cache_max_age"])
         return None
 
+    @staticmethod
+    def _storable(response) -> bool:
+        """False for streamed bodies and anything setting cookies or marked private."""
+        if isinstance(response, Response):
+            if response.is_streaming or response._cookies:
+                return False
+            for name, value in response._headers:
+                name = name.lower()
+                if name == "set-cookie":
+                    return False
+                if name == "cache-control" and ("no-store" in value or "private" in value):
+                    return False
+        return True
+
     @staticmethod
     def _extract_status(response) -> int:
         """Best-effort extraction of the HTTP status code from the response."""
@@ -619,14 +871,16 @@ class ResponseCache:
         return 200
 
     @staticmethod
-    def _extract_body(response) -> str:
-        """Best-effort extraction of the response body."""
-        if hasattr(response, "body"):
-            body = response.body
-            return body if isinstance(body, str) else str(body)
-        if hasattr(response, "content"):
-            return str(response.content)
-        return str(response)
+    def _extract_body(response) -> bytes:
+        """Best-effort extraction of the response body as bytes."""
+        if isinstance(response, Response):
+            return response.content
+        body = getattr(response, "body", None)
+        if body is None:
+            body = getattr(response, "content", response)
+        if isinstance(body, bytes):
+            return body
+        return (body if isinstance(body, str) else str(body)).encode("utf-8")
 
     @staticmethod
     def _extract_content_type(response) -> str:
@@ -639,23 +893,25 @@ class ResponseCache:
                     return str(val)
         return "application/json"
 
-    def _cleanup_expired(self) -> None:
-        """Remove entries whose TTL has expired."""
-        now = time.monotonic()
-        with self._lock:
-            expired_keys = [k for k, v in self._store.items() if now >= v.expires_at]
-            for key in expired_keys:
-                del self._store[key]
-
-    def _start_cleanup_timer(self) -> None:
-        """Start a daemon thread that periodically cleans expired entries."""
-        def _run():
-            while True:
-                time.sleep(self._cleanup_interval)
-                self._cleanup_expired()
-
-        t = threading.Thread(target=_run, daemon=True, name="tina4-cache-cleanup")
-        t.start()
+    @staticmethod
+    def _extract_headers(response) -> list[tuple[str, str]]:
+        """Headers worth replaying on a hit (a Tina4 Response's own, minus per-exchange ones)."""
+        if not isinstance(response, Response):
+            return []
+        return [(n, v) for n, v in response._headers if n.lower() not in _TRANSIENT_HEADERS]
+
+
+def clear_tag(tag: str) -> None:
+    """Invalidate ``tag`` in every ResponseCache — across workers for shared backends."""
+    purged = set()
+    for cache in list(_instances):
+        backend = cache._backend
+        # Caches sharing one backend object only need the generation bumped once
+        if id(backend) not in purged:
+            cache.clear_tag(tag)
+            purged.add(id(backend))
+        else:
+            cache._forget_tag(tag)
 
 
 # ── Module-level direct cache API (backend-aware) ─────────────────
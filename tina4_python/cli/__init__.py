@@ -11,6 +11,7 @@ CLI commands for development workflow.
     tina4python seed              # Run seeders
     tina4python routes            # List registered routes
     tina4python test              # Run tests
+    tina4python compress          # Precompress public assets (.gz / .zst)
     tina4python generate          # Generate scaffolding
     tina4python ai                # Detect AI tools and install context
 """
@@ -135,6 +136,7 @@ def main():
         "routes": _routes,
         "test": _test,
         "build": _build,
+        "compress": _compress,
         "ai": _ai,
         "generate": _generate,
         "console": _console,
@@ -158,6 +160,7 @@ Usage: tina4python <command> [options]
 Commands:
   init [dir]                    Scaffold a new project
   serve [--port P] [--no-browser] [--no-reload]  Start dev server (default: 0.0.0.0:7146)
+        [--workers N]             Pre-fork N workers (TINA4_DEBUG=false; 0 = one per CPU)
   migrate                      Run pending database migrations
   migrate:create <desc>         Create a new migration file
   migrate:rollback              Rollback last migration batch
@@ -165,7 +168,8 @@ Commands:
   seed                          Run database seeders
   routes                        List all registered routes
   test                          Run test suite
-  build                         Build distributable package
+  build                         Build distributable package (precompresses assets first)
+  compress                      Write .gz/.zst siblings for files in public/ and src/public/
   ai [--all]                    Install AI coding assistant context
   console                       Start interactive REPL with framework loaded
 
@@ -382,12 +386,15 @@ def _serve(args):
     # --no-reload flag
     no_reload = "no-reload" in flags
 
+    # --workers N (pre-fork; production mode only)
+    cli_workers = flags.get("workers")
+
     # Kill existing process on port
     port = cli_port or int(os.environ.get("PORT", os.environ.get("TINA4_PORT", "7146")))
     _kill_process_on_port(port)
 
     from tina4_python.core import run
-    run(host=cli_host, port=cli_port, no_browser=no_browser, no_reload=no_reload)
+    run(host=cli_host, port=cli_port, no_browser=no_browser, no_reload=no_reload, workers=cli_workers)
 
 
 # ── Migrate ───────────────────────────────────────────────────────────
@@ -530,8 +537,17 @@ def _test(args):
     subprocess.run([sys.executable, "-m", "pytest", "tests/"] + args)
 
 
+def _compress(args):
+    """Precompress static assets so they are never compressed per request."""
+    from tina4_python.core.static import precompress, ENCODINGS
+    written = precompress(args or None)
+    suffixes = "/".join(suffix for _, suffix in ENCODINGS)
+    print(f"Precompressed {written} asset variant(s) ({suffixes})")
+
+
 def _build(args):
     """Build a distributable package."""
+    _compress([])
     try:
         subprocess.run(
             [sys.executable, "-m", "PyInstaller", "--onefile", "app.py",
@@ -9,16 +9,148 @@ In-memory cache with time-to-live expiry. No external dependencies.
     cache.get("key")  # → value or None
     cache.delete("key")
 
+Bounded by entry count (LRU) and optionally by approximate memory:
+
+    cache = Cache(max_size=100_000, max_bytes=256 * 1024 * 1024)
+    cache.memory()  # {"bytes": ..., "max_bytes": ..., "tags": {"users": ...}}
+
 For query caching:
-    result = cache.get("users:all")
-    if result is None:
-        result = db.fetch("SELECT * FROM users")
-        cache.set("users:all", result, ttl=60)
+    result = cache.remember("users:all", 60, lambda: db.fetch("SELECT * FROM users"))
+
+``remember()`` is single-flight: when a key is missing, one caller runs the
+factory and concurrent callers for the same key — threads or asyncio tasks
+(``remember_async()``) — wait for its result instead of running it too.
+Two options soften expiry of hot keys further:
+
+    # Serve the old value for up to 30s past expiry while one refresh runs
+    cache.remember("stats", 60, compute_stats, stale_ttl=30)
+
+    # Recompute a little early, more likely the closer expiry is and the
+    # slower the factory was last time (probabilistic early expiration)
+    cache.remember("stats", 60, compute_stats, beta=1.0)
+
+``stats()`` counts hits, misses, coalesced waits and refreshes.
 """
+import math
 import time
+import random
+import asyncio
+import inspect
+import sys
 import threading
 import hashlib
-import json
+from collections import OrderedDict
+
+from tina4_python.core import codec
+
+# What a remember() caller does with a key (see Cache._claim)
+_HIT, _LEAD, _WAIT, _REFRESH, _STALE = range(5)
+
+
+class _Flight:
+    """One in-progress factory call that other callers wait on."""
+
+    __slots__ = ("done", "value", "error", "loop", "_lock", "_waiters")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None):
+        self.done = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+        self.loop = loop                 # set when an asyncio task is computing
+        self._lock = threading.Lock()
+        self._waiters: list[tuple] = []  # (loop, future) of waiting tasks
+
+    def finish(self, value=None, error: BaseException = None):
+        with self._lock:
+            self.value, self.error = value, error
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def wait(self):
+        self.done.wait()
+        return self.result()
+
+    async def wait_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.done.is_set():
+                return self.result()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        await future
+        return self.result()
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def approx_size(value, max_objects: int = 10000) -> int:
+    """Rough deep size of ``value`` in bytes.
+
+    Sums ``sys.getsizeof`` over the objects reachable through containers
+    and instance ``__dict__``s, each counted once, stopping after
+    ``max_objects``. Good enough to budget memory, not an exact RSS figure.
+    """
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack and len(seen) < max_objects:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 64)
+        if isinstance(obj, _ATOMIC):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif not isinstance(obj, type):
+            attrs = getattr(obj, "__dict__", None)
+            if isinstance(attrs, dict):
+                stack.append(attrs)
+    return total
+
+
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+class _Shard:
+    """One stripe of a Cache: its own lock, LRU order, byte count and flights."""
+
+    __slots__ = ("lock", "entries", "flights", "deltas", "bytes", "max_size", "max_bytes",
+                 "hits", "misses", "coalesced", "refreshes")
+
+    def __init__(self, max_size: int, max_bytes: int | None):
+        self.lock = threading.RLock()
+        self.entries: OrderedDict[str, tuple] = OrderedDict()  # key → (value, expires_at, keep_until, size), LRU first
+        self.flights: dict[str, _Flight] = {}  # key → factory call in progress
+        self.deltas: dict[str, float] = {}  # key → seconds its factory last took
+        self.bytes = 0
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
 
 
 class Cache:
@@ -26,84 +158,132 @@ class Cache:
 
     Features:
     - Per-key TTL or global default
-    - Thread-safe via RLock
+    - Thread-safe, lock-striped across shards for large caches
     - Lazy expiry (cleaned on access) + periodic sweep
-    - Max size with LRU eviction
+    - Max size with O(1) LRU eviction, and an optional byte budget
     - Tags for group invalidation (e.g., clear all "users" cache)
     - SQL query helper for database result caching
+    - Single-flight remember() with stale-while-revalidate and early refresh
+
+    ``shards`` splits the keys over independently locked LRUs so threads
+    rarely contend. Limits then apply per shard (``max_size / shards``
+    each), making eviction approximately LRU; the default is one shard
+    (exact LRU) below 4096 entries and 16 above.
+
+    ``max_bytes`` bounds the approximate memory held by values (see
+    ``approx_size()``), evicting least recently used entries to stay
+    under it; a value larger than a shard's budget is not stored.
+    ``memory()`` reports the bytes held in total and per tag.
     """
 
-    def __init__(self, default_ttl: int = 300, max_size: int = 1000):
-        self._store: dict[str, tuple] = {}  # key → (value, expires_at)
+    def __init__(self, default_ttl: int = 300, max_size: int = 1000,
+                 max_bytes: int = None, shards: int = None):
+        if shards is None:
+            shards = 16 if max_size >= 4096 else 1
+        shards = max(1, shards)
+        per_size = -(-max_size // shards)
+        per_bytes = -(-max_bytes // shards) if max_bytes else None
+        self._shards = tuple(_Shard(per_size, per_bytes) for _ in range(shards))
         self._tags: dict[str, set[str]] = {}  # tag → set of keys
         self._key_tags: dict[str, set[str]] = {}  # key → set of tags
-        self._access_order: list[str] = []  # LRU tracking
-        self._lock = threading.RLock()
+        self._tag_bytes: dict[str, int] = {}  # tag → bytes held by its keys (with max_bytes)
+        self._tag_lock = threading.Lock()  # taken after a shard lock, never before
+        self._tasks: set[asyncio.Task] = set()  # remember_async() computations in flight
         self._default_ttl = default_ttl
         self._max_size = max_size
+        self._max_bytes = max_bytes
+
+    def _shard(self, key: str) -> _Shard:
+        shards = self._shards
+        return shards[hash(key) % len(shards)] if len(shards) > 1 else shards[0]
 
     def get(self, key: str, default=None):
         """Get a value by key. Returns default if missing or expired."""
-        with self._lock:
-            entry = self._store.get(key)
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
             if entry is None:
                 return default
-            value, expires_at = entry
+            value, expires_at, keep_until, _ = entry
             if expires_at and time.time() > expires_at:
-                self._remove_key(key)
+                # Past its TTL; kept only while remember() may still serve it stale
+                if time.time() > keep_until:
+                    self._remove_key(shard, key)
                 return default
-            # Update LRU
-            if key in self._access_order:
-                self._access_order.remove(key)
-            self._access_order.append(key)
+            shard.entries.move_to_end(key)
             return value
 
     def set(self, key: str, value, ttl: int = None, tags: list[str] = None):
         """Store a value with optional TTL (seconds) and tags."""
-        with self._lock:
-            if ttl is None:
-                ttl = self._default_ttl
-            expires_at = time.time() + ttl if ttl > 0 else None
-            self._store[key] = (value, expires_at)
-
-            # LRU tracking
-            if key in self._access_order:
-                self._access_order.remove(key)
-            self._access_order.append(key)
-
-            # Tag tracking
-            if tags:
-                self._key_tags[key] = set(tags)
-                for tag in tags:
-                    if tag not in self._tags:
-                        self._tags[tag] = set()
-                    self._tags[tag].add(key)
-
-            # Evict if over max size
-            while len(self._store) > self._max_size:
-                oldest = self._access_order.pop(0)
-                self._remove_key(oldest)
+        size = self._measure(key, value)
+        shard = self._shard(key)
+        with shard.lock:
+            self._put(shard, key, value, size, ttl, tags)
+
+    def _measure(self, key: str, value) -> int:
+        """Bytes charged to an entry — only counted when there is a byte budget."""
+        if not self._max_bytes:
+            return 0
+        return sys.getsizeof(key) + approx_size(value)
+
+    def _put(self, shard: _Shard, key: str, value, size: int, ttl: int = None,
+             tags: list[str] = None, stale_ttl: int = 0):
+        """set() body; ``stale_ttl`` keeps the entry that long past expiry for remember(). Caller holds the shard lock."""
+        if ttl is None:
+            ttl = self._default_ttl
+        expires_at = time.time() + ttl if ttl > 0 else None
+        keep_until = expires_at + stale_ttl if expires_at else None
+
+        old = shard.entries.pop(key, None)
+        old_tags = None
+        if old is not None:
+            shard.bytes -= old[3]
+            old_tags = self._unlink_tags(key, old[3])
+        if shard.max_bytes and size > shard.max_bytes:
+            shard.deltas.pop(key, None)
+            return
+
+        shard.entries[key] = (value, expires_at, keep_until, size)
+        shard.bytes += size
+        # Tag tracking — a re-set without tags keeps the key's tags
+        tags = tags or old_tags
+        if tags:
+            self._link_tags(key, tags, size)
+
+        # Evict least recently used while over either limit
+        entries = shard.entries
+        while len(entries) > shard.max_size or (shard.max_bytes and shard.bytes > shard.max_bytes):
+            self._remove_key(shard, next(iter(entries)))
 
     def delete(self, key: str) -> bool:
         """Remove a key. Returns True if it existed."""
-        with self._lock:
-            return self._remove_key(key)
+        shard = self._shard(key)
+        with shard.lock:
+            return self._remove_key(shard, key)
 
     def clear(self):
         """Remove all entries."""
-        with self._lock:
-            self._store.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.deltas.clear()
+                shard.bytes = 0
+                shard.hits = shard.misses = shard.coalesced = shard.refreshes = 0
+        with self._tag_lock:
             self._tags.clear()
             self._key_tags.clear()
-            self._access_order.clear()
+            self._tag_bytes.clear()
 
     def clear_tag(self, tag: str) -> int:
         """Remove all entries with the given tag. Returns count removed."""
-        with self._lock:
-            keys = self._tags.pop(tag, set())
-            for key in keys:
-                self._remove_key(key)
-            return len(keys)
+        with self._tag_lock:
+            keys = list(self._tags.get(tag, ()))
+        removed = 0
+        for key in keys:
+            shard = self._shard(key)
+            with shard.lock:
+                removed += self._remove_key(shard, key)
+        return removed
 
     def has(self, key: str) -> bool:
         """Check if a key exists and hasn't expired."""
@@ -111,51 +291,241 @@ class Cache:
 
     def size(self) -> int:
         """Number of entries (including potentially expired ones)."""
-        return len(self._store)
+        return sum(len(shard.entries) for shard in self._shards)
 
     def sweep(self) -> int:
         """Remove all expired entries. Returns count removed."""
-        with self._lock:
-            now = time.time()
-            expired = [
-                k for k, (_, exp) in self._store.items()
-                if exp and now > exp
-            ]
-            for key in expired:
-                self._remove_key(key)
-            return len(expired)
-
-    def _remove_key(self, key: str) -> bool:
-        if key not in self._store:
+        now = time.time()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                expired = [
+                    k for k, (_, exp, keep, _) in shard.entries.items()
+                    if exp and now > keep
+                ]
+                for key in expired:
+                    self._remove_key(shard, key)
+                removed += len(expired)
+        return removed
+
+    def stats(self) -> dict:
+        """remember() counters: hits (stale serves included), misses, callers that
+        waited on another's factory call, and refreshes (stale or early)."""
+        totals = {"hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "size": 0}
+        for shard in self._shards:
+            with shard.lock:
+                totals["hits"] += shard.hits
+                totals["misses"] += shard.misses
+                totals["coalesced"] += shard.coalesced
+                totals["refreshes"] += shard.refreshes
+                totals["size"] += len(shard.entries)
+        return totals
+
+    def memory(self) -> dict:
+        """Approximate bytes held: ``{"bytes", "max_bytes", "tags": {tag: bytes}}``.
+
+        Tracked as entries change when ``max_bytes`` is set; otherwise
+        measured now by walking every entry.
+        """
+        if self._max_bytes:
+            total = sum(shard.bytes for shard in self._shards)
+            with self._tag_lock:
+                tags = dict(self._tag_bytes)
+            return {"bytes": total, "max_bytes": self._max_bytes, "tags": tags}
+
+        sizes = {}
+        for shard in self._shards:
+            with shard.lock:
+                items = list(shard.entries.items())
+            for key, entry in items:
+                sizes[key] = sys.getsizeof(key) + approx_size(entry[0])
+        tags = {}
+        with self._tag_lock:
+            for key, key_tags in self._key_tags.items():
+                for tag in key_tags:
+                    tags[tag] = tags.get(tag, 0) + sizes.get(key, 0)
+        return {"bytes": sum(sizes.values()), "max_bytes": None, "tags": tags}
+
+    def _remove_key(self, shard: _Shard, key: str) -> bool:
+        """Drop ``key`` from its shard (caller holds the shard lock)."""
+        entry = shard.entries.pop(key, None)
+        if entry is None:
             return False
-        del self._store[key]
-        if key in self._access_order:
-            self._access_order.remove(key)
-        # Clean up tags
-        for tag in self._key_tags.pop(key, set()):
-            if tag in self._tags:
-                self._tags[tag].discard(key)
-                if not self._tags[tag]:
-                    del self._tags[tag]
+        shard.bytes -= entry[3]
+        shard.deltas.pop(key, None)
+        self._unlink_tags(key, entry[3])
         return True
 
+    def _link_tags(self, key: str, tags, size: int):
+        with self._tag_lock:
+            self._key_tags[key] = set(tags)
+            for tag in tags:
+                if tag not in self._tags:
+                    self._tags[tag] = set()
+                self._tags[tag].add(key)
+                self._tag_bytes[tag] = self._tag_bytes.get(tag, 0) + size
+
+    def _unlink_tags(self, key: str, size: int) -> "set[str] | None":
+        """Detach ``key`` from its tags. Returns the tags it had."""
+        with self._tag_lock:
+            tags = self._key_tags.pop(key, None)
+            for tag in tags or ():
+                keys = self._tags.get(tag)
+                if keys is None:
+                    continue
+                keys.discard(key)
+                if keys:
+                    self._tag_bytes[tag] -= size
+                else:
+                    del self._tags[tag]
+                    self._tag_bytes.pop(tag, None)
+            return tags
+
     # ── Query Cache Helper ─────────────────────────────────────────
 
     @staticmethod
     def query_key(sql: str, params: list = None) -> str:
         """Generate a cache key from a SQL query and parameters."""
-        raw = sql + "|" + json.dumps(params or [], default=str)
+        raw = sql + "|" + codec.dumps(params or [])
         return "query:" + hashlib.md5(raw.encode()).hexdigest()
 
-    def remember(self, key: str, ttl: int, factory: callable):
+    def remember(self, key: str, ttl: int, factory: callable, tags: list[str] = None,
+                 stale_ttl: int = 0, beta: float = 0.0):
         """Get from cache or compute, store, and return.
 
+        Only one caller runs ``factory`` for a missing key; the others wait
+        for its value (or its exception). With ``stale_ttl`` an expired
+        value is returned for that many more seconds while a background
+        thread refreshes it. With ``beta`` > 0 a caller may recompute before
+        expiry — 1.0 is the usual setting, higher refreshes earlier.
+
         Usage:
             result = cache.remember("users:all", 60, lambda: db.fetch("SELECT * FROM users"))
         """
-        value = self.get(key)
-        if value is not None:
+        state, value, flight = self._claim(key, beta)
+        if state == _HIT:
+            return value
+        if state == _WAIT:
+            if flight.loop is not None and flight.loop is _running_loop():
+                # The computing task needs this loop, which we would block — compute instead
+                return factory()
+            return flight.wait()
+        if state == _STALE:
+            threading.Thread(
+                target=self._refresh, args=(key, flight, ttl, factory, tags, stale_ttl),
+                daemon=True, name="tina4-cache-refresh",
+            ).start()
             return value
-        value = factory()
-        self.set(key, value, ttl=ttl)
+        return self._compute(key, flight, ttl, factory, tags, stale_ttl)
+
+    async def remember_async(self, key: str, ttl: int, factory: callable, tags: list[str] = None,
+                             stale_ttl: int = 0, beta: float = 0.0):
+        """remember() for asyncio code. ``factory`` may be a coroutine function.
+
+        Waiting tasks yield to the loop. A computation started here runs to
+        completion even if the task that started it is cancelled, so the
+        callers waiting on it still get a value.
+        """
+        state, value, flight = self._claim(key, beta, loop=asyncio.get_running_loop())
+        if state == _HIT:
+            return value
+        if state == _WAIT:
+            return await flight.wait_async()
+        task = asyncio.get_running_loop().create_task(
+            self._compute_async(key, flight, ttl, factory, tags, stale_ttl),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+        if state == _STALE:
+            return value
+        return await asyncio.shield(task)
+
+    def _claim(self, key: str, beta: float, loop: asyncio.AbstractEventLoop = None) -> tuple:
+        """Decide what a remember() caller does. Returns (state, cached value, flight)."""
+        now = time.time()
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            flight = shard.flights.get(key)
+            if entry is not None:
+                value, expires_at, keep_until, _ = entry
+                if not expires_at or now <= expires_at:
+                    shard.entries.move_to_end(key)
+                    if flight is None and beta > 0 and expires_at and self._expires_early(shard, key, expires_at, now, beta):
+                        shard.refreshes += 1
+                        shard.flights[key] = flight = _Flight(loop)
+                        return _REFRESH, value, flight
+                    shard.hits += 1
+                    return _HIT, value, None
+                if now <= keep_until:
+                    shard.hits += 1
+                    if flight is None:
+                        shard.refreshes += 1
+                        shard.flights[key] = flight = _Flight(loop)
+                        return _STALE, value, flight
+                    return _HIT, value, None
+            if flight is not None:
+                shard.coalesced += 1
+                return _WAIT, None, flight
+            shard.misses += 1
+            shard.flights[key] = flight = _Flight(loop)
+            return _LEAD, None, flight
+
+    @staticmethod
+    def _expires_early(shard: _Shard, key: str, expires_at: float, now: float, beta: float) -> bool:
+        """XFetch: recompute early with a probability that grows towards expiry."""
+        delta = shard.deltas.get(key, 0.0)
+        return now - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+    def _compute(self, key: str, flight: _Flight, ttl: int, factory: callable, tags, stale_ttl: int):
+        started = time.perf_counter()
+        try:
+            value = factory()
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._store_computed(key, value, ttl, tags, stale_ttl, time.perf_counter() - started)
+        self._land(key, flight, value)
+        return value
+
+    async def _compute_async(self, key: str, flight: _Flight, ttl: int, factory: callable, tags, stale_ttl: int):
+        started = time.perf_counter()
+        try:
+            value = factory()
+            if inspect.isawaitable(value):
+                value = await value
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._store_computed(key, value, ttl, tags, stale_ttl, time.perf_counter() - started)
+        self._land(key, flight, value)
         return value
+
+    def _refresh(self, key: str, flight: _Flight, ttl: int, factory: callable, tags, stale_ttl: int):
+        """Background stale-while-revalidate refresh. On failure the stale value stays
+        and the next caller in the stale window tries again."""
+        try:
+            self._compute(key, flight, ttl, factory, tags, stale_ttl)
+        except Exception:
+            pass
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled():
+            task.exception()  # the awaiting caller (if any) sees it; don't warn for refreshes
+
+    def _store_computed(self, key: str, value, ttl: int, tags, stale_ttl: int, took: float):
+        size = self._measure(key, value)
+        shard = self._shard(key)
+        with shard.lock:
+            self._put(shard, key, value, size, ttl, tags, stale_ttl)
+            if key in shard.entries:
+                shard.deltas[key] = took
+
+    def _land(self, key: str, flight: _Flight, value=None, error: BaseException = None):
+        """Retire ``flight`` and hand its outcome to every waiter."""
+        shard = self._shard(key)
+        with shard.lock:
+            if shard.flights.get(key) is flight:
+                del shard.flights[key]
+        flight.finish(value, error)
@@ -0,0 +1,166 @@
+# Tina4 Codec — Pluggable JSON encoding.
+"""
+One place the framework turns values into JSON and back. Responses, the
+cache backends, the query cache and session handlers all go through it.
+
+    from tina4_python.core import codec
+
+    codec.dumps({"id": 1})             # '{"id":1}'
+    codec.dumps_bytes(rows)            # b'[...]' — no str round-trip
+    codec.loads(b'{"id": 1}')          # {'id': 1}
+
+    for chunk in codec.iter_array(cursor):   # JSON array, a chunk at a time
+        out.write(chunk)
+
+The fastest importable codec is picked on first use (orjson, else the
+standard library). Output is compact, and values JSON has no type for
+(datetime, Decimal, UUID, ...) are written as ``str(value)`` whichever
+codec is active. Register your own with:
+
+    codec.register("mine", encode=lambda obj: ..., decode=lambda data: ...)
+    codec.use("mine")
+
+Environment:
+    TINA4_JSON_CODEC   — codec name to use, e.g. "stdlib" (default: fastest available)
+"""
+import os
+import json
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+# Chunk size iter_array() aims for — small rows are batched up to this
+ARRAY_CHUNK_SIZE = 65536
+
+
+class JSONCodec:
+    """A named encode (obj → bytes) / decode (bytes | str → obj) pair."""
+
+    __slots__ = ("name", "encode", "decode")
+
+    def __init__(self, name: str, encode, decode):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+
+def _stdlib_encode(obj) -> bytes:
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+_STDLIB = JSONCodec("stdlib", _stdlib_encode, json.loads)
+_codecs: dict[str, JSONCodec] = {"stdlib": _STDLIB}
+# Preference order for auto-selection
+_preferred: list[str] = []
+
+if _orjson is not None:
+    # Pass datetimes/dataclasses through to default=str so output matches stdlib
+    _ORJSON_OPTIONS = (
+        _orjson.OPT_NON_STR_KEYS | _orjson.OPT_PASSTHROUGH_DATETIME | _orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def _orjson_encode(obj) -> bytes:
+        try:
+            return _orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Integers over 64 bits, cyclic defaults, ... — the stdlib copes
+            return _stdlib_encode(obj)
+
+    _codecs["orjson"] = JSONCodec("orjson", _orjson_encode, _orjson.loads)
+    _preferred.append("orjson")
+
+_active: JSONCodec | None = None
+
+
+def register(name: str, encode, decode, prefer: bool = False) -> JSONCodec:
+    """Add a codec. ``prefer=True`` makes auto-selection try it first."""
+    codec = JSONCodec(name, encode, decode)
+    _codecs[name] = codec
+    if prefer:
+        _preferred.insert(0, name)
+    return codec
+
+
+def use(name: str | None = None) -> JSONCodec:
+    """Switch the active codec by name; None re-runs auto-selection."""
+    global _active
+    if name is None:
+        name = os.environ.get("TINA4_JSON_CODEC", "") or next(iter(_preferred), "stdlib")
+    if name not in _codecs:
+        raise ValueError(f"Unknown JSON codec {name!r} (available: {', '.join(sorted(_codecs))})")
+    _active = _codecs[name]
+    return _active
+
+
+def current() -> JSONCodec:
+    """The active codec, auto-selected on first use."""
+    return _active if _active is not None else use()
+
+
+def available() -> list[str]:
+    return sorted(_codecs)
+
+
+def dumps_bytes(obj) -> bytes:
+    """Compact JSON as UTF-8 bytes."""
+    return (_active or use()).encode(obj)
+
+
+def dumps(obj) -> str:
+    """Compact JSON as a string."""
+    return (_active or use()).encode(obj).decode()
+
+
+def loads(data: bytes | str):
+    """Parse JSON. Raises ``json.JSONDecodeError`` (a ValueError) on bad input."""
+    return (_active or use()).decode(data)
+
+
+def iter_array(items, chunk_size: int = ARRAY_CHUNK_SIZE):
+    """Encode an iterable as one JSON array, yielding chunks of about ``chunk_size`` bytes.
+
+    Only one chunk's worth of encoded rows is held at a time, so a
+    generator or cursor of any length streams in constant memory.
+    """
+    encode = (_active or use()).encode
+    parts = [b"["]
+    size = 1
+    first = True
+    for item in items:
+        data = encode(item)
+        if not first:
+            parts.append(b",")
+            size += 1
+        first = False
+        parts.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(parts)
+            parts.clear()
+            size = 0
+    parts.append(b"]")
+    yield b"".join(parts)
+
+
+async def aiter_array(items, chunk_size: int = ARRAY_CHUNK_SIZE):
+    """:func:`iter_array` for async iterables."""
+    encode = (_active or use()).encode
+    parts = [b"["]
+    size = 1
+    first = True
+    async for item in items:
+        data = encode(item)
+        if not first:
+            parts.append(b",")
+            size += 1
+        first = False
+        parts.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(parts)
+            parts.clear()
+            size = 0
+    parts.append(b"]")
+    yield b"".join(parts)
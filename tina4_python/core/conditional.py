@@ -0,0 +1,81 @@
+# Tina4 Conditional — ETag / Last-Modified validators and 304 decisions.
+"""
+Decides whether a conditional GET can be answered with 304 Not Modified.
+
+    if not_modified(request.headers, etag='"v42"', last_modified=1718000000):
+        ...  # send 304, skip the body
+
+Routes declare a cheap validator so revalidation never runs the handler:
+
+    @get("/api/users/{id}")
+    @etag(lambda request: User.find(request.params["id"]).updated_at)
+    async def user(request, response): ...
+
+    Router.get("/api/stats", stats).etag(lambda request: stats_version())
+
+The validator returns a version (str / int), an ``updated_at`` (datetime or
+epoch seconds as float), or None to skip the check. A datetime or float
+also becomes the Last-Modified header.
+"""
+import hashlib
+import inspect
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+# Headers a 304 repeats from the full response (RFC 9110 §15.4.5)
+NOT_MODIFIED_HEADERS = frozenset((
+    "etag", "last-modified", "cache-control", "content-location", "date",
+    "expires", "vary", "x-request-id", "set-cookie",
+))
+
+
+def not_modified(headers: dict, etag: str | None = None, last_modified: float | None = None) -> bool:
+    """True when the request's validators show the client copy is current.
+
+    If-None-Match wins over If-Modified-Since and is compared weakly, so
+    ``W/"x"`` matches ``"x"`` (a compressed body keeps its ETag).
+    """
+    if_none_match = headers.get("if-none-match", "")
+    if if_none_match:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        wanted = etag.removeprefix("W/")
+        return wanted in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    if_modified_since = headers.get("if-modified-since", "")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def body_etag(content: bytes) -> str:
+    """Strong ETag for a response body — hash the uncompressed bytes."""
+    return f'"{hashlib.md5(content).hexdigest()[:16]}"'
+
+
+async def route_validators(validator, request) -> tuple[str | None, float | None]:
+    """Run a route's validator and turn its result into ``(etag, last_modified)``."""
+    value = validator(request)
+    if inspect.isawaitable(value):
+        value = await value
+    if value is None:
+        return None, None
+    last_modified = None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        last_modified = value.timestamp()
+    elif isinstance(value, float):
+        last_modified = value
+    if isinstance(value, str) and value.startswith(('"', 'W/"')):
+        return value, last_modified
+    return f'"{hashlib.md5(str(value).encode()).hexdigest()[:16]}"', last_modified
+
+
+def http_date(timestamp: float) -> str:
+    """Format epoch seconds as an IMF-fixdate (Last-Modified)."""
+    return formatdate(int(timestamp), usegmt=True)
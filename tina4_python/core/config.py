@@ -0,0 +1,73 @@
+# Tina4 Config — Runtime settings snapshot for the request path.
+"""
+The environment settings request dispatch needs, read once.
+
+    config = runtime_config()
+    if config.debug: ...
+
+The server freezes the snapshot at startup so no request touches
+``os.environ``. Dev reload refreshes it. Until it is frozen (embedding
+``handle()`` directly, tests), every call reads the environment afresh, so
+changes to ``os.environ`` apply immediately.
+
+Environment:
+    TINA4_DEBUG              — dev admin, swagger, toolbar and inspector
+    TINA4_ENV                — "production" for production defaults
+    TINA4_RATE_LIMIT         — enable per-IP rate limiting
+    TINA4_API_KEY / API_KEY  — static bearer token accepted on secured routes
+    TINA4_SESSION_TTL        — session cookie Max-Age in seconds (default: 3600); a
+                               Session's stored lifetime (default: 1800)
+    TINA4_SESSION_TOUCH_INTERVAL — seconds between expiry refreshes of unchanged sessions (default: 300)
+    TINA4_SESSION_SAMESITE   — session cookie SameSite (default: Lax)
+"""
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeConfig:
+    """Immutable settings snapshot consulted by the dispatch path."""
+    debug: bool = False
+    production: bool = False
+    rate_limit: bool = False
+    api_key: str = ""
+    session_ttl: int = 3600
+    # The same variable with the Session class's own default
+    session_lifetime: int = 1800
+    session_touch_interval: int = 300
+    session_samesite: str = "Lax"
+
+    @classmethod
+    def from_env(cls) -> "RuntimeConfig":
+        from tina4_python.dotenv import is_truthy
+        return cls(
+            debug=is_truthy(os.environ.get("TINA4_DEBUG", "")),
+            production=os.environ.get("TINA4_ENV", "development") == "production",
+            rate_limit=bool(os.environ.get("TINA4_RATE_LIMIT", "")),
+            api_key=os.environ.get("TINA4_API_KEY", os.environ.get("API_KEY", "")),
+            session_ttl=int(os.environ.get("TINA4_SESSION_TTL", "3600")),
+            session_lifetime=int(os.environ.get("TINA4_SESSION_TTL", "1800")),
+            session_touch_interval=int(os.environ.get("TINA4_SESSION_TOUCH_INTERVAL", "300")),
+            session_samesite=os.environ.get("TINA4_SESSION_SAMESITE", "Lax"),
+        )
+
+
+_frozen: RuntimeConfig | None = None
+
+
+def runtime_config() -> RuntimeConfig:
+    """The frozen snapshot, or a fresh read of the environment before freezing."""
+    return _frozen if _frozen is not None else RuntimeConfig.from_env()
+
+
+def freeze_runtime_config() -> RuntimeConfig:
+    """Snapshot the environment for the rest of the process (server startup, dev reload)."""
+    global _frozen
+    _frozen = RuntimeConfig.from_env()
+    return _frozen
+
+
+def thaw_runtime_config() -> None:
+    """Go back to reading the environment on every call."""
+    global _frozen
+    _frozen = None
@@ -0,0 +1,492 @@
+# Tina4 HTTP/1.1 — Connection handler for the built-in asyncio server.
+"""
+HTTP/1.1 → ASGI bridge used by ``run()`` when no production ASGI server
+(uvicorn, hypercorn, granian) is installed.
+
+    - Persistent connections (keep-alive) with an idle timeout and a
+      max-requests-per-connection limit
+    - Pipelined requests, answered in order
+    - ``Content-Length`` and ``Transfer-Encoding: chunked`` request bodies,
+      streamed to the app through ``receive()`` as they arrive; any other
+      transfer coding is answered 400
+    - Streamed responses (``more_body``) sent as they are produced, with
+      ``Transfer-Encoding: chunked`` when no Content-Length is given
+    - The ``http.response.pathsend`` extension, served with sendfile()
+    - Bytes-level request parsing; ``httptools`` is used when importable
+    - Graceful drain on shutdown via ConnectionTracker
+
+Environment:
+    TINA4_KEEPALIVE_TIMEOUT       — idle seconds before a connection is closed (default: 5)
+    TINA4_KEEPALIVE_MAX_REQUESTS  — requests served per connection, 0 = unlimited (default: 1000)
+"""
+import os
+import asyncio
+from http import HTTPStatus
+
+from tina4_python.core import request as _request_module
+from tina4_python.debug import Log
+
+try:
+    import httptools as _httptools
+except ImportError:  # pragma: no cover - optional accelerator
+    _httptools = None
+
+# Seconds allowed to receive a complete request head / each body chunk
+HEADER_TIMEOUT = 30
+BODY_TIMEOUT = 30
+
+# Largest body chunk handed to the app per receive() call
+BODY_CHUNK_SIZE = 65536
+
+_REASONS = {s.value: s.phrase.encode() for s in HTTPStatus}
+
+
+class BadRequest(Exception):
+    """Raised for a request that cannot be parsed."""
+
+
+def keepalive_timeout() -> float:
+    """Idle timeout for persistent connections, from TINA4_KEEPALIVE_TIMEOUT."""
+    return float(os.environ.get("TINA4_KEEPALIVE_TIMEOUT", "5"))
+
+
+def keepalive_max_requests() -> int:
+    """Requests per connection before closing, from TINA4_KEEPALIVE_MAX_REQUESTS."""
+    return int(os.environ.get("TINA4_KEEPALIVE_MAX_REQUESTS", "1000"))
+
+
+# ── Request head parsing ───────────────────────────────────────────
+
+
+def _parse_head_pure(head: bytes) -> tuple[str, bytes, str, list[tuple[bytes, bytes]]]:
+    """Parse a request line + headers without decoding header values."""
+    lines = head.rstrip(b"\r\n").split(b"\r\n")
+    parts = lines[0].split(b" ")
+    if len(parts) != 3 or not parts[2].startswith(b"HTTP/"):
+        raise BadRequest("Malformed request line")
+    headers = []
+    for line in lines[1:]:
+        name, sep, value = line.partition(b":")
+        if not sep or not name or name != name.strip():
+            raise BadRequest("Malformed header line")
+        headers.append((name.lower(), value.strip()))
+    return parts[0].decode("latin-1"), parts[1], parts[2][5:].decode("latin-1"), headers
+
+
+class _HeadCollector:
+    """httptools callback target — collects the URL and headers."""
+
+    __slots__ = ("url", "headers")
+
+    def __init__(self):
+        self.url = b""
+        self.headers = []
+
+    def on_url(self, url: bytes):
+        self.url += url
+
+    def on_header(self, name: bytes, value: bytes):
+        self.headers.append((name.lower(), value))
+
+
+def _parse_head_httptools(head: bytes) -> tuple[str, bytes, str, list[tuple[bytes, bytes]]]:
+    """Parse a request head with httptools (C parser)."""
+    collector = _HeadCollector()
+    parser = _httptools.HttpRequestParser(collector)
+    try:
+        parser.feed_data(head)
+    except _httptools.HttpParserUpgrade:
+        pass  # Upgrade requests are handed off after the head
+    except _httptools.HttpParserError as e:
+        raise BadRequest(str(e)) from e
+    return parser.get_method().decode("latin-1"), collector.url, parser.get_http_version(), collector.headers
+
+
+parse_head = _parse_head_httptools if _httptools is not None else _parse_head_pure
+
+
+# ── Body reading ───────────────────────────────────────────────────
+
+
+class _BodyReader:
+    """Reads one request body off the connection, a chunk at a time.
+
+    Backs the ASGI ``receive()`` callable so the app sees the body as it
+    arrives instead of after it has been buffered. ``done`` is False while
+    unread body bytes remain on the socket.
+    """
+
+    __slots__ = ("reader", "remaining", "chunked", "limit", "total", "done", "_chunk_left")
+
+    def __init__(self, reader: asyncio.StreamReader, content_length: int | None, chunked: bool, limit: int):
+        self.reader = reader
+        self.remaining = content_length or 0
+        self.chunked = chunked
+        self.limit = limit
+        self.total = 0
+        self.done = not chunked and not content_length
+        self._chunk_left = 0
+
+    async def read(self) -> tuple[bytes, bool]:
+        """Return ``(chunk, more_body)``."""
+        if self.done:
+            return b"", False
+        if self.chunked:
+            chunk = await asyncio.wait_for(self._read_chunk(), timeout=BODY_TIMEOUT)
+        else:
+            chunk = await asyncio.wait_for(
+                self.reader.read(min(self.remaining, BODY_CHUNK_SIZE)), timeout=BODY_TIMEOUT,
+            )
+            if not chunk:
+                raise ConnectionError("Connection closed mid-body")
+            self.remaining -= len(chunk)
+            self.done = self.remaining == 0
+        return chunk, not self.done
+
+    async def _read_chunk(self) -> bytes:
+        """Read from a Transfer-Encoding: chunked body (trailers are discarded)."""
+        reader = self.reader
+        if self._chunk_left == 0:
+            line = await reader.readuntil(b"\r\n")
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError as e:
+                raise BadRequest("Malformed chunk size") from e
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                self.done = True
+                return b""
+            self.total += size
+            if self.total > self.limit:
+                raise _request_module.PayloadTooLarge(
+                    f"Chunked body exceeds TINA4_MAX_UPLOAD_SIZE ({self.limit} bytes)"
+                )
+            self._chunk_left = size
+        data = await reader.readexactly(min(self._chunk_left, BODY_CHUNK_SIZE))
+        self._chunk_left -= len(data)
+        if self._chunk_left == 0 and await reader.readexactly(2) != b"\r\n":
+            raise BadRequest("Malformed chunk terminator")
+        return data
+
+
+# ── Response writing ───────────────────────────────────────────────
+
+
+def _encode_head(status: int, headers: list, keep_alive: bool, extra: bytes = b"") -> list[bytes]:
+    """Serialise the status line and headers; ``extra`` is raw header lines to append."""
+    out = [b"HTTP/1.1 %d %s\r\n" % (status, _REASONS.get(status, b"Unknown"))]
+    for name, value in headers:
+        if name.lower() != b"connection":
+            out.append(name + b": " + value + b"\r\n")
+    out.append(extra)
+    out.append(b"connection: keep-alive\r\n\r\n" if keep_alive else b"connection: close\r\n\r\n")
+    return out
+
+
+def _has_header(headers: list, lname: bytes) -> bool:
+    return any(name.lower() == lname for name, _ in headers)
+
+
+def _encode_response(status: int, headers: list, body: bytes, keep_alive: bool, head_only: bool) -> bytes:
+    """Serialise a buffered ASGI response into one HTTP/1.1 message."""
+    extra = b""
+    # An empty body on HEAD says nothing about the GET length (a streamed response
+    # sends none), so only a body actually given is measured
+    if (status >= 200 and status not in (204, 304) and not _has_header(headers, b"content-length")
+            and (body or not head_only)):
+        extra = b"content-length: %d\r\n" % len(body)
+    out = _encode_head(status, headers, keep_alive, extra)
+    if not head_only:
+        out.append(body)
+    return b"".join(out)
+
+
+async def _send_path(writer: asyncio.StreamWriter, path: str, status: int, headers: list,
+                     keep_alive: bool, head_only: bool):
+    """Answer with a whole file, using sendfile() where the transport allows."""
+    with open(path, "rb") as f:
+        extra = b""
+        if not _has_header(headers, b"content-length"):
+            extra = b"content-length: %d\r\n" % os.fstat(f.fileno()).st_size
+        writer.write(b"".join(_encode_head(status, headers, keep_alive, extra)))
+        await writer.drain()
+        if not head_only:
+            await asyncio.get_running_loop().sendfile(writer.transport, f)
+
+
+def _error_response(status: int) -> bytes:
+    reason = _REASONS.get(status, b"Error")
+    return b"HTTP/1.1 %d %s\r\ncontent-length: 0\r\nconnection: close\r\n\r\n" % (status, reason)
+
+
+# ── Connection tracking ────────────────────────────────────────────
+
+
+class ConnectionTracker:
+    """Open connections of one server, so it can drain gracefully.
+
+    ``drain()`` closes idle keep-alive connections at once, lets requests
+    in flight finish (answering them with ``connection: close``), and
+    aborts whatever is still open when the timeout runs out.
+    """
+
+    def __init__(self):
+        self.draining = False
+        self._busy: dict[asyncio.StreamWriter, bool] = {}
+        self._empty = asyncio.Event()
+        self._empty.set()
+
+    def opened(self, writer: asyncio.StreamWriter):
+        self._busy[writer] = False
+        self._empty.clear()
+
+    def closed(self, writer: asyncio.StreamWriter):
+        self._busy.pop(writer, None)
+        if not self._busy:
+            self._empty.set()
+
+    def set_busy(self, writer: asyncio.StreamWriter, busy: bool):
+        self._busy[writer] = busy
+
+    def __len__(self) -> int:
+        return len(self._busy)
+
+    async def drain(self, timeout: float):
+        self.draining = True
+        for writer, busy in list(self._busy.items()):
+            if not busy:
+                writer.close()
+        try:
+            await asyncio.wait_for(self._empty.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            for writer in list(self._busy):
+                writer.transport.abort()
+
+
+# ── Connection loop ────────────────────────────────────────────────
+
+
+async def serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                           asgi_app, server: tuple, on_upgrade=None,
+                           tracker: ConnectionTracker | None = None):
+    """Serve HTTP/1.1 requests on one connection until it closes or idles out.
+
+    ``on_upgrade(reader, writer, headers, path)`` takes over the socket for
+    ``Upgrade: websocket`` requests; ``headers`` is a str → str dict.
+    ``tracker`` lets the server drain this connection on shutdown.
+    """
+    idle_timeout = keepalive_timeout()
+    max_requests = keepalive_max_requests()
+    client = writer.get_extra_info("peername") or ("127.0.0.1", 0)
+    served = 0
+    if tracker is not None:
+        if tracker.draining:
+            writer.close()
+            return
+        tracker.opened(writer)
+
+    try:
+        while True:
+            if tracker is not None and served:
+                if tracker.draining:
+                    return
+                tracker.set_busy(writer, False)
+            try:
+                head = await asyncio.wait_for(
+                    reader.readuntil(b"\r\n\r\n"),
+                    timeout=HEADER_TIMEOUT if served == 0 else idle_timeout,
+                )
+            except asyncio.LimitOverrunError:
+                writer.write(_error_response(431))
+                await writer.drain()
+                return
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+
+            if tracker is not None:
+                tracker.set_busy(writer, True)
+
+            try:
+                method, target, version, headers = parse_head(head)
+            except BadRequest:
+                writer.write(_error_response(400))
+                await writer.drain()
+                return
+
+            content_length = None
+            chunked = False
+            connection = b""
+            upgrade = b""
+            expect = b""
+            for name, value in headers:
+                if name == b"content-length":
+                    if not value.isdigit() or (content_length is not None and int(value) != content_length):
+                        writer.write(_error_response(400))
+                        await writer.drain()
+                        return
+                    content_length = int(value)
+                elif name == b"transfer-encoding":
+                    # Only a single chunked coding can be framed; anything else
+                    # would leave the body length unknown
+                    if chunked or value.strip().lower() != b"chunked":
+                        writer.write(_error_response(400))
+                        await writer.drain()
+                        return
+                    chunked = True
+                elif name == b"connection":
+                    connection = value.lower()
+                elif name == b"upgrade":
+                    upgrade = value.lower()
+                elif name == b"expect":
+                    expect = value.lower()
+
+            path_bytes, _, qs = target.partition(b"?")
+            path = path_bytes.decode("utf-8", errors="replace")
+
+            if upgrade == b"websocket" and on_upgrade is not None:
+                header_dict = {k.decode("latin-1"): v.decode("latin-1") for k, v in headers}
+                await on_upgrade(reader, writer, header_dict, path)
+                return
+
+            if version == "1.1":
+                keep_alive = b"close" not in connection
+            else:
+                keep_alive = b"keep-alive" in connection
+            if chunked:
+                # Never reuse a connection whose framing was ambiguous
+                keep_alive = keep_alive and content_length is None
+
+            limit = _request_module.TINA4_MAX_UPLOAD_SIZE
+            if content_length is not None and content_length > limit and not chunked:
+                writer.write(_error_response(413))
+                await writer.drain()
+                return
+
+            body = _BodyReader(reader, content_length, chunked, limit)
+            # 100 Continue is deferred until the app first asks for the body,
+            # so a handler that rejects the request never invites the upload
+            continue_pending = expect == b"100-continue" and not body.done
+
+            served += 1
+            if max_requests and served >= max_requests:
+                keep_alive = False
+
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.3"},
+                "http_version": version,
+                "method": method,
+                "scheme": "http",
+                "path": path,
+                "raw_path": path_bytes,
+                "query_string": qs,
+                "root_path": "",
+                "headers": headers,
+                "server": server,
+                "client": client,
+                "extensions": {"http.response.pathsend": {}},
+            }
+
+            body_sent = False
+            head_only = method == "HEAD"
+            resp_status = 200
+            resp_headers = []
+            # Response progress: None until the head is written, then
+            # "chunked" | "raw" while streaming, "done" once complete
+            resp_mode = None
+
+            async def receive():
+                nonlocal body_sent, continue_pending
+                if body_sent:
+                    return {"type": "http.disconnect"}
+                if continue_pending:
+                    continue_pending = False
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                chunk, more = await body.read()
+                body_sent = not more
+                return {"type": "http.request", "body": chunk, "more_body": more}
+
+            async def send(msg):
+                nonlocal resp_status, resp_headers, resp_mode, keep_alive
+                if msg["type"] == "http.response.start":
+                    resp_status = msg["status"]
+                    resp_headers = msg.get("headers", [])
+                    return
+                if resp_mode == "done":
+                    return
+                if resp_mode is None and not body.done:
+                    # The app answers without reading the whole body; the
+                    # rest is still on the socket, so the connection can't be reused
+                    keep_alive = False
+                if resp_mode is None and tracker is not None and tracker.draining:
+                    keep_alive = False
+                if msg["type"] == "http.response.pathsend" and resp_mode is None:
+                    await _send_path(writer, msg["path"], resp_status, resp_headers, keep_alive, head_only)
+                    resp_mode = "done"
+                    return
+                if msg["type"] != "http.response.body":
+                    return
+                data = msg.get("body", b"")
+                more = msg.get("more_body", False)
+                if resp_mode is None:
+                    if not more:
+                        # Whole body in one message — the common, buffered case
+                        writer.write(_encode_response(resp_status, resp_headers, data, keep_alive, head_only))
+                        resp_mode = "done"
+                        await writer.drain()
+                        return
+                    if _has_header(resp_headers, b"content-length"):
+                        resp_mode = "raw"
+                        extra = b""
+                    elif version == "1.1" and not head_only:
+                        resp_mode = "chunked"
+                        extra = b"transfer-encoding: chunked\r\n"
+                    else:
+                        # HTTP/1.0 peers get a close-delimited body
+                        resp_mode = "raw"
+                        extra = b""
+                        keep_alive = keep_alive and head_only
+                    writer.write(b"".join(_encode_head(resp_status, resp_headers, keep_alive, extra)))
+                if data and not head_only:
+                    writer.write(b"%x\r\n%b\r\n" % (len(data), data) if resp_mode == "chunked" else data)
+                if not more:
+                    if resp_mode == "chunked":
+                        writer.write(b"0\r\n\r\n")
+                    resp_mode = "done"
+                await writer.drain()
+
+            try:
+                await asgi_app(scope, receive, send)
+            except _request_module.PayloadTooLarge:
+                if resp_mode is None:
+                    writer.write(_error_response(413))
+                    await writer.drain()
+                return
+            except BadRequest:
+                if resp_mode is None:
+                    writer.write(_error_response(400))
+                    await writer.drain()
+                return
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            except Exception as e:
+                Log.error(f"Unhandled error serving {method} {path}: {e}")
+                if resp_mode is None:
+                    writer.write(_error_response(500))
+                    await writer.drain()
+                return  # a half-sent stream is cut off by closing the connection
+
+            if resp_mode is None:
+                await send({"type": "http.response.body", "body": b""})
+            elif resp_mode != "done":
+                return  # the app never finished its streamed body
+            if not keep_alive:
+                return
+    except ConnectionError:
+        pass
+    finally:
+        if tracker is not None:
+            tracker.closed(writer)
+        if not writer.is_closing():
+            writer.close()
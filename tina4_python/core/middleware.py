@@ -11,18 +11,113 @@ CORS is configured via environment variables:
     TINA4_CORS_HEADERS=Content-Type,Authorization
     TINA4_CORS_MAX_AGE=86400               # Preflight cache (seconds)
 
-Rate limiter uses a sliding window in memory:
+Rate limiter uses GCRA (constant state per client) in a pluggable store:
     TINA4_RATE_LIMIT=100                   # Requests per window
     TINA4_RATE_WINDOW=60                   # Window in seconds
+    TINA4_RATE_STORE=memory                # memory | shared (pre-fork workers) | redis
+    TINA4_RATE_REDIS_URL=redis://localhost:6379   # redis store (default: TINA4_CACHE_URL)
 
 CSRF protection (off by default):
     TINA4_CSRF=true                        # Enable CSRF token validation
+
+Route middleware is compiled once per route into a MiddlewarePipeline of
+bound before_*/after_* callables. Middleware classes are instantiated once
+and shared across requests; set ``per_request = True`` on a class to get a
+fresh instance for every call instead. A before_* hook answers a request
+itself — skipping the handler — by returning an error status, or a
+Response with ``_answered`` set (as ResponseCache does for a hit).
 """
 import os
+import math
 import time
+import struct
+import hashlib
 import logging
 import threading
 
+from tina4_python.core.resp import RespClient, RespError
+
+
+class _MiddlewareStep:
+    """One before_*/after_* hook in a compiled pipeline, with timing counters."""
+
+    __slots__ = ("name", "attr", "fn", "factory", "calls", "seconds")
+
+    def __init__(self, name: str, attr: str, fn=None, factory=None):
+        self.name = name
+        self.attr = attr
+        self.fn = fn            # Bound method on a shared instance
+        self.factory = factory  # Class to instantiate per call (per_request = True)
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, request, response):
+        fn = self.fn if self.factory is None else getattr(self.factory(), self.attr)
+        start = time.perf_counter()
+        try:
+            return fn(request, response)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+
+class MiddlewarePipeline:
+    """Frozen, ordered before/after hooks resolved from a route's middleware list."""
+
+    __slots__ = ("before", "after")
+
+    def __init__(self, before: tuple = (), after: tuple = ()):
+        self.before: tuple[_MiddlewareStep, ...] = before
+        self.after: tuple[_MiddlewareStep, ...] = after
+
+    @classmethod
+    def compile(cls, middleware: list) -> "MiddlewarePipeline":
+        """Resolve middleware classes/instances into bound hooks.
+
+        Hooks keep the old dispatch order: middleware in list order, and
+        within each one its before_*/after_* methods in ``dir()`` order.
+        """
+        if not middleware:
+            return _EMPTY_PIPELINE
+        before, after = [], []
+        for mw in middleware:
+            is_class = isinstance(mw, type)
+            per_request = is_class and getattr(mw, "per_request", False)
+            target = mw if per_request else (mw() if is_class else mw)
+            label = mw.__name__ if is_class else type(mw).__name__
+            for attr in dir(target):
+                if attr.startswith("before_"):
+                    phase = before
+                elif attr.startswith("after_"):
+                    phase = after
+                else:
+                    continue
+                hook = getattr(target, attr)
+                if not callable(hook):
+                    continue
+                if per_request:
+                    phase.append(_MiddlewareStep(f"{label}.{attr}", attr, factory=mw))
+                else:
+                    phase.append(_MiddlewareStep(f"{label}.{attr}", attr, fn=hook))
+        return cls(tuple(before), tuple(after))
+
+    def stats(self) -> list[dict]:
+        """Call counts and time spent in each hook."""
+        return [
+            {
+                "name": step.name,
+                "phase": "before" if phase is self.before else "after",
+                "calls": step.calls,
+                "total_ms": round(step.seconds * 1000, 3),
+                "avg_ms": round(step.seconds * 1000 / step.calls, 3) if step.calls else 0,
+            }
+            for phase in (self.before, self.after)
+            for step in phase
+        ]
+
+
+_EMPTY_PIPELINE = MiddlewarePipeline()
+
 
 class CorsMiddleware:
     """CORS handler — reads config from env, injects headers."""
@@ -74,66 +169,274 @@ class CorsMiddleware:
         )
 
 
-class RateLimiter:
-    """Sliding window rate limiter — per-IP, in-memory.
+# ── Rate Limiting ──────────────────────────────────────────────
 
-    Thread-safe. Automatically cleans up expired entries.
+
+class RateLimitStore:
+    """Where rate-limit state lives. Every store keeps one number per key.
+
+    ``consume`` runs one GCRA step atomically: the key's theoretical
+    arrival time (TAT) moves ``interval`` seconds on if that stays within
+    ``tolerance`` of ``now``. Returns (allowed, TAT − now after the step).
+    A key whose TAT has passed is the same as a key never seen, so stores
+    may drop it at any time.
     """
 
-    def __init__(self):
-        self.limit = int(os.environ.get("TINA4_RATE_LIMIT", "100"))
-        self.window = int(os.environ.get("TINA4_RATE_WINDOW", "60"))
-        self._requests: dict[str, list[float]] = {}
-        self._lock = threading.Lock()
+    def consume(self, key: str, now: float, interval: float, tolerance: float) -> tuple[bool, float]:
+        raise NotImplementedError
+
+    def cleanup(self, now: float):
+        """Forget keys whose TAT has passed."""
+        pass
+
+
+class MemoryRateStore(RateLimitStore):
+    """Per-process store — a dict per shard, each behind its own lock."""
+
+    def __init__(self, shards: int = 16):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+
+    def _shard(self, key: str) -> tuple[dict, threading.Lock]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def consume(self, key: str, now: float, interval: float, tolerance: float) -> tuple[bool, float]:
+        tats, lock = self._shard(key)
+        with lock:
+            tat = tats.get(key, now)
+            new_tat = (tat if tat > now else now) + interval
+            if new_tat - now > tolerance:
+                return False, new_tat - now
+            tats[key] = new_tat
+            return True, new_tat - now
+
+    def cleanup(self, now: float):
+        for tats, lock in self._shards:
+            with lock:
+                for key in [key for key, tat in tats.items() if tat <= now]:
+                    del tats[key]
+
+    def __contains__(self, key: str) -> bool:
+        tats, _ = self._shard(key)
+        return key in tats
+
+    def __len__(self) -> int:
+        return sum(len(tats) for tats, _ in self._shards)
+
+
+class SharedMemoryRateStore(RateLimitStore):
+    """Fixed-size table in anonymous shared memory, shared by pre-forked workers.
+
+    Create it before the workers fork (the server's limiter is built at
+    import time, so ``TINA4_RATE_STORE=shared`` does this). Each slot
+    holds a 64-bit key hash and a TAT; each shard of slots has its own
+    process-shared lock. When every slot a key may use is busy, the one
+    closest to expiring is taken over — that client briefly gets a fresh
+    allowance, so size the table above the number of active clients.
+    """
+
+    _SLOT = struct.Struct("<Qd")
+    PROBE = 8
+
+    def __init__(self, slots: int = 65536, shards: int = 16):
+        import mmap
+        import multiprocessing
+        self._per_shard = max(self.PROBE, slots // shards)
+        self._shards = shards
+        self._mem = mmap.mmap(-1, self._per_shard * shards * self._SLOT.size)
+        self._locks = [multiprocessing.Lock() for _ in range(shards)]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # Stable across processes, unlike hash(); 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def consume(self, key: str, now: float, interval: float, tolerance: float) -> tuple[bool, float]:
+        h = self._hash(key)
+        shard = h % self._shards
+        base = shard * self._per_shard
+        start = (h // self._shards) % self._per_shard
+        size = self._SLOT.size
+        with self._locks[shard]:
+            offset, tat = None, now
+            oldest, oldest_tat = None, float("inf")
+            for i in range(self.PROBE):
+                slot = (base + (start + i) % self._per_shard) * size
+                slot_hash, slot_tat = self._SLOT.unpack_from(self._mem, slot)
+                if slot_hash == h:
+                    offset, tat = slot, slot_tat
+                    break
+                if slot_tat < oldest_tat:
+                    oldest, oldest_tat = slot, slot_tat
+            if offset is None:
+                offset = oldest  # An empty or spent slot has the lowest TAT
+            new_tat = (tat if tat > now else now) + interval
+            if new_tat - now > tolerance:
+                return False, new_tat - now
+            self._SLOT.pack_into(self._mem, offset, h, new_tat)
+            return True, new_tat - now
+
+
+class RedisRateStore(RateLimitStore):
+    """Redis / Valkey store — the GCRA step runs server-side as a Lua script.
+
+    Uses the ``redis`` package if available, otherwise Tina4's pooled RESP
+    client, calling the script by its SHA1 (EVALSHA) once the server has
+    it. If the server cannot be reached the request is allowed (fail open)
+    and a warning is logged.
+    """
+
+    SCRIPT = (
+        "local now = tonumber(ARGV[1]) "
+        "local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1]) "
+        "if tat < now then tat = now end "
+        "local new_tat = tat + tonumber(ARGV[2]) "
+        "if new_tat - now > tonumber(ARGV[3]) then return {0, tostring(new_tat - now)} end "
+        "redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000)) "
+        "return {1, tostring(new_tat - now)}"
+    )
+    SCRIPT_SHA = hashlib.sha1(SCRIPT.encode()).hexdigest()
+    _logger = logging.getLogger("tina4.ratelimit")
+
+    def __init__(self, url: str = None, prefix: str = "tina4:rate:"):
+        url = url or os.environ.get("TINA4_RATE_REDIS_URL") or os.environ.get("TINA4_CACHE_URL", "redis://localhost:6379")
+        self._resp = RespClient(url, timeout=5)
+        self._prefix = prefix
+        self._client = None
+        try:
+            import redis as redis_pkg
+            self._client = redis_pkg.Redis(host=self._resp.host, port=self._resp.port, db=self._resp.db, socket_timeout=5)
+        except ImportError:
+            pass
+
+    def consume(self, key: str, now: float, interval: float, tolerance: float) -> tuple[bool, float]:
+        args = (f"{now:.6f}", f"{interval:.6f}", f"{tolerance:.6f}")
+        try:
+            if self._client is not None:
+                allowed, offset = self._client.eval(self.SCRIPT, 1, self._prefix + key, *args)
+            else:
+                allowed, offset = self._eval_raw(self._prefix + key, args)
+        except Exception as e:
+            self._logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return True, interval
+        return bool(int(allowed)), float(offset)
+
+    def _eval_raw(self, key: str, args: tuple) -> list:
+        try:
+            return self._resp.execute("EVALSHA", self.SCRIPT_SHA, 1, key, *args)
+        except RespError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+            # First call on this server (or after SCRIPT FLUSH) — EVAL caches it
+            return self._resp.execute("EVAL", self.SCRIPT, 1, key, *args)
+
+
+_shared_stores: dict[str, RateLimitStore] = {}
+
+
+def default_rate_store() -> RateLimitStore:
+    """The store TINA4_RATE_STORE names for a new limiter.
+
+    ``memory`` gives each limiter its own; ``shared`` and ``redis`` are one
+    store per process, which every limiter's keys share.
+    """
+    kind = os.environ.get("TINA4_RATE_STORE", "memory").lower().strip()
+    if kind == "shared":
+        if kind not in _shared_stores:
+            _shared_stores[kind] = SharedMemoryRateStore()
+        return _shared_stores[kind]
+    if kind in ("redis", "valkey"):
+        if "redis" not in _shared_stores:
+            _shared_stores["redis"] = RedisRateStore()
+        return _shared_stores["redis"]
+    return MemoryRateStore()
+
+
+def _api_key_of(request) -> str | None:
+    token = request.headers.get("x-api-key", "")
+    if not token:
+        auth = request.headers.get("authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else ""
+    # Never keep the credential itself in the store
+    return "key:" + hashlib.sha256(token.encode()).hexdigest()[:32] if token else None
+
+
+def _user_of(request) -> str | None:
+    auth = request.headers.get("authorization", "")
+    if not auth.startswith("Bearer "):
+        return None
+    from tina4_python.auth import Auth
+    payload = Auth().valid_token(auth[7:])
+    if not payload:
+        return None
+    user = payload.get("user_id", payload.get("sub", payload.get("id")))
+    return f"user:{user}" if user is not None else None
+
+
+# Built-in ``key=`` names for per-route limits
+RATE_LIMIT_KEYS = {
+    "ip": lambda request: request.ip,
+    "api_key": _api_key_of,
+    "user": _user_of,
+}
+
+
+class RateLimiter:
+    """GCRA rate limiter — one number of state per client, pluggable store.
+
+    ``limit`` requests per ``window`` seconds, spaced out smoothly: a
+    client may burst up to ``limit`` at once, then earns one request back
+    every ``window / limit`` seconds. The default store is per-process
+    memory; set TINA4_RATE_STORE to ``shared`` (pre-forked workers) or
+    ``redis`` (several hosts) to share limits.
+
+    ``key`` picks the client for :meth:`client_key` — "ip" (default),
+    "api_key", "user" (a valid bearer JWT's user_id/sub), or
+    ``fn(request)`` returning a string. Requests the key cannot identify
+    count against their IP.
+    """
+
+    def __init__(self, limit: int = None, window: int = None, store: RateLimitStore = None, key="ip"):
+        self.limit = limit or int(os.environ.get("TINA4_RATE_LIMIT", "100"))
+        self.window = window or int(os.environ.get("TINA4_RATE_WINDOW", "60"))
+        self.store = store if store is not None else default_rate_store()
+        self.key = key
         self._last_cleanup = time.monotonic()
 
-    def check(self, ip: str) -> tuple[bool, dict]:
-        """Check if request is allowed.
+    def client_key(self, request) -> str:
+        """Who ``request`` counts against under this limiter's ``key``."""
+        resolve = self.key if callable(self.key) else RATE_LIMIT_KEYS.get(self.key, RATE_LIMIT_KEYS["ip"])
+        value = resolve(request)
+        return str(value) if value else request.ip
+
+    def check(self, key: str) -> tuple[bool, dict]:
+        """Count one request against ``key`` (an IP or any client key).
 
         Returns (allowed, info) where info has remaining/limit/reset fields.
         """
-        now = time.monotonic()
-
-        with self._lock:
-            # Periodic cleanup every 60 seconds
-            if now - self._last_cleanup > 60:
-                self._cleanup(now)
-                self._last_cleanup = now
-
-            if ip not in self._requests:
-                self._requests[ip] = []
-
-            # Remove expired timestamps
-            cutoff = now - self.window
-            timestamps = self._requests[ip]
-            self._requests[ip] = [t for t in timestamps if t > cutoff]
-            timestamps = self._requests[ip]
-
-            remaining = max(0, self.limit - len(timestamps))
-            reset = int(self.window - (now - timestamps[0])) if timestamps else self.window
-
-            if len(timestamps) >= self.limit:
-                return False, {
-                    "limit": self.limit,
-                    "remaining": 0,
-                    "reset": reset,
-                    "window": self.window,
-                }
-
-            timestamps.append(now)
-            return True, {
-                "limit": self.limit,
-                "remaining": remaining - 1,
-                "reset": self.window,
-                "window": self.window,
+        now = time.time()
+        if time.monotonic() - self._last_cleanup > 60:
+            self._cleanup(now)
+        limit, window = self.limit, self.window
+        interval = window / limit
+        allowed, ahead = self.store.consume(key, now, interval, window)
+        if not allowed:
+            return False, {
+                "limit": limit,
+                "remaining": 0,
+                "reset": max(1, math.ceil(ahead - window)),
+                "window": window,
             }
+        return True, {
+            "limit": limit,
+            "remaining": int((window - ahead) / interval + 1e-9),
+            "reset": math.ceil(ahead),
+            "window": window,
+        }
 
     def _cleanup(self, now: float):
-        """Remove IPs with no recent requests."""
-        cutoff = now - self.window
-        expired = [ip for ip, ts in self._requests.items() if not ts or ts[-1] < cutoff]
-        for ip in expired:
-            del self._requests[ip]
+        """Drop clients whose allowance has fully recovered."""
+        self._last_cleanup = time.monotonic()
+        self.store.cleanup(now)
 
     def apply_headers(self, response, info: dict):
         """Add rate limit headers to response."""
@@ -1,112 +1,666 @@
 # Tina4 Request — Parsed HTTP request.
 """
 Clean request object with parsed body, params, headers, and cookies.
+
+Large bodies are spooled to a temporary file instead of being held in
+memory, and can be consumed incrementally:
+
+    async for chunk in request.stream():
+        out.write(chunk)
+
+Multipart uploads are parsed as they arrive; each file part is an
+UploadedFile that keeps the classic dict shape and is also file-like:
+
+    request.files["video"]["filename"]
+    request.files["video"].save("uploads/video.mp4")
 """
 import json
 import os
+import shutil
+from tempfile import SpooledTemporaryFile
 from urllib.parse import parse_qs, unquote
 
+from tina4_python.core import codec
+
 # Maximum upload size in bytes (default 10 MB). Override via TINA4_MAX_UPLOAD_SIZE env var.
 TINA4_MAX_UPLOAD_SIZE = int(os.environ.get("TINA4_MAX_UPLOAD_SIZE", 10_485_760))
 
+# Bodies and uploaded file parts larger than this (default 1 MB) are spooled to disk.
+# Override via TINA4_SPOOL_THRESHOLD.
+TINA4_SPOOL_THRESHOLD = int(os.environ.get("TINA4_SPOOL_THRESHOLD", 1_048_576))
+
+# Chunk size used by Request.stream()
+STREAM_CHUNK_SIZE = 65536
+
 
 class PayloadTooLarge(Exception):
     """Raised when request body exceeds TINA4_MAX_UPLOAD_SIZE."""
     pass
 
 
+class UploadedFile(dict):
+    """An uploaded file part.
+
+    Behaves as the classic ``{"filename", "type", "content", "size"}`` dict,
+    with ``content`` read on access, and as a read-only file object backed by
+    a :class:`SpooledTemporaryFile` (in memory below TINA4_SPOOL_THRESHOLD).
+    ``content`` is a key like the others to ``in``, iteration, ``keys()`` /
+    ``items()``, ``dict(upload)`` and ``json.dumps``.
+    """
+
+    def __init__(self, filename: str, content_type: str, file, size: int):
+        super().__init__(filename=filename, type=content_type, size=size)
+        self.file = file
+
+    def __missing__(self, key):
+        if key == "content":
+            return self.getvalue()
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key == "content" or super().__contains__(key)
+
+    def __iter__(self):
+        yield from super().__iter__()
+        yield "content"
+
+    def __len__(self) -> int:
+        return super().__len__() + 1
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return dict.fromkeys(self).keys()
+
+    def items(self):
+        return {key: self[key] for key in self}.items()
+
+    def values(self):
+        return {key: self[key] for key in self}.values()
+
+    def copy(self) -> dict:
+        """A plain dict of the classic shape, content included."""
+        return dict(self.items())
+
+    @property
+    def filename(self) -> str:
+        return self["filename"]
+
+    @property
+    def size(self) -> int:
+        return self["size"]
+
+    def getvalue(self) -> bytes:
+        """Return the whole file content."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def save(self, path: str) -> str:
+        """Copy the upload to ``path`` without loading it into memory."""
+        self.file.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(self.file, out)
+        return path
+
+    def close(self):
+        self.file.close()
+
+
+class MultipartParser:
+    """Incremental multipart/form-data parser.
+
+    Feed it body chunks in order; file parts are written straight to
+    :class:`UploadedFile` spools and text fields are decoded to ``str``.
+
+        parser = MultipartParser(content_type)
+        parser.feed(chunk)
+        fields = parser.close()
+    """
+
+    # States
+    _PREAMBLE, _DELIMITER, _HEADERS, _BODY, _DONE = range(5)
+
+    # Cap on one part's header block, to bound buffering of a hostile body
+    MAX_HEADER_SIZE = 16384
+
+    def __init__(self, content_type: str, spool_threshold: int | None = None):
+        self.boundary = _multipart_boundary(content_type)
+        self.spool_threshold = TINA4_SPOOL_THRESHOLD if spool_threshold is None else spool_threshold
+        self.result: dict = {}
+        self._state = self._PREAMBLE if self.boundary else self._DONE
+        self._buffer = bytearray()
+        self._delimiter = f"--{self.boundary}".encode()
+        self._marker = b"\r\n" + self._delimiter
+        self._name = None
+        self._filename = None
+        self._type = "application/octet-stream"
+        self._sink = None
+        self._size = 0
+
+    def feed(self, chunk: bytes):
+        """Consume the next piece of the body."""
+        if self._state == self._DONE:
+            return
+        self._buffer += chunk
+        while self._step():
+            pass
+
+    def close(self) -> dict:
+        """Finish parsing and return ``{name: str | UploadedFile}``.
+
+        A part cut off before its closing delimiter is dropped.
+        """
+        if self._sink is not None and self._filename:
+            self._sink.close()
+        self._sink = None
+        self._state = self._DONE
+        self._buffer.clear()
+        return self.result
+
+    def _step(self) -> bool:
+        """Advance the state machine once; False when more input is needed."""
+        buf = self._buffer
+        if self._state == self._PREAMBLE:
+            pos = buf.find(self._delimiter)
+            if pos == -1:
+                # Keep a tail that could be the start of the delimiter
+                del buf[:max(0, len(buf) - len(self._delimiter) + 1)]
+                return False
+            del buf[:pos + len(self._delimiter)]
+            self._state = self._DELIMITER
+            return True
+
+        if self._state == self._DELIMITER:
+            # After a delimiter: "--" closes the body, otherwise a CRLF
+            # (possibly after transport padding) starts the next part
+            if len(buf) < 2:
+                return False
+            if buf[:2] == b"--":
+                self._state = self._DONE
+                buf.clear()
+                return False
+            eol = buf.find(b"\r\n")
+            if eol == -1:
+                return False
+            del buf[:eol + 2]
+            self._state = self._HEADERS
+            return True
+
+        if self._state == self._HEADERS:
+            if buf[:2] == b"\r\n":
+                header_section, consumed = "", 2
+            else:
+                end = buf.find(b"\r\n\r\n")
+                if end == -1:
+                    if len(buf) > self.MAX_HEADER_SIZE:
+                        self._state = self._DONE
+                        buf.clear()
+                    return False
+                header_section, consumed = bytes(buf[:end]).decode(errors="replace"), end + 4
+            self._start_part(header_section)
+            del buf[:consumed]
+            self._state = self._BODY
+            return True
+
+        if self._state == self._BODY:
+            pos = buf.find(self._marker)
+            if pos == -1:
+                # Everything except a possible partial marker is content
+                safe = len(buf) - len(self._marker) + 1
+                if safe > 0:
+                    self._write(buf[:safe])
+                    del buf[:safe]
+                return False
+            self._write(buf[:pos])
+            del buf[:pos + len(self._marker)]
+            self._end_part()
+            self._state = self._DELIMITER
+            return True
+
+        return False
+
+    def _start_part(self, header_section: str):
+        self._name = None
+        self._filename = None
+        self._type = "application/octet-stream"
+        for line in header_section.split("\r\n"):
+            if "Content-Disposition" in line:
+                for token in line.split(";"):
+                    token = token.strip()
+                    if token.startswith("name="):
+                        self._name = token[5:].strip('"')
+                    elif token.startswith("filename="):
+                        self._filename = token[9:].strip('"')
+            elif "Content-Type" in line:
+                self._type = line.split(":", 1)[1].strip()
+        self._size = 0
+        if not self._name:
+            self._sink = None
+        elif self._filename:
+            self._sink = SpooledTemporaryFile(max_size=self.spool_threshold)
+        else:
+            self._sink = bytearray()
+
+    def _write(self, data):
+        if self._sink is None or not data:
+            return
+        self._size += len(data)
+        if self._filename:
+            self._sink.write(data)
+        else:
+            self._sink += data
+
+    def _end_part(self):
+        if self._sink is None:
+            return
+        if self._filename:
+            self._sink.seek(0)
+            self.result[self._name] = UploadedFile(self._filename, self._type, self._sink, self._size)
+        else:
+            self.result[self._name] = self._sink.decode(errors="replace")
+        self._sink = None
+
+
+class Headers(dict):
+    """Case-insensitive request headers that keep repeated values.
+
+    Reads like the familiar ``dict`` of lowercase names; a header sent more
+    than once reads as its values joined with ``", "`` (``"; "`` for
+    Cookie), and ``get_all()`` returns them separately.
+
+        request.headers["Content-Type"]     # same as ["content-type"]
+        request.headers.get_all("accept")   # ["text/html", "application/json"]
+    """
+
+    __slots__ = ("_multi",)
+
+    def __init__(self, raw: list | None = None):
+        super().__init__()
+        self._multi: dict[str, list[str]] = {}
+        for name, value in raw or ():
+            name = name.decode("latin-1").lower() if isinstance(name, bytes) else name.lower()
+            value = value.decode(errors="replace") if isinstance(value, bytes) else value
+            values = self._multi.get(name)
+            if values is None:
+                self._multi[name] = [value]
+                dict.__setitem__(self, name, value)
+            else:
+                values.append(value)
+                dict.__setitem__(self, name, ("; " if name == "cookie" else ", ").join(values))
+
+    def get_all(self, name: str) -> list[str]:
+        """Every value sent for ``name``, in order."""
+        return list(self._multi.get(name.lower(), ()))
+
+    def __getitem__(self, name: str) -> str:
+        return dict.__getitem__(self, name.lower())
+
+    def __contains__(self, name) -> bool:
+        return dict.__contains__(self, name.lower() if isinstance(name, str) else name)
+
+    def get(self, name: str, default=None):
+        return dict.get(self, name.lower(), default)
+
+    def __setitem__(self, name: str, value: str):
+        name = name.lower()
+        self._multi[name] = [value]
+        dict.__setitem__(self, name, value)
+
+    def __delitem__(self, name: str):
+        name = name.lower()
+        self._multi.pop(name, None)
+        dict.__delitem__(self, name)
+
+    def pop(self, name: str, *default):
+        self._multi.pop(name.lower(), None)
+        return dict.pop(self, name.lower(), *default)
+
+    def setdefault(self, name: str, default: str = None):
+        if name not in self:
+            self[name] = default
+        return self[name]
+
+
 class Request:
-    """Parsed HTTP request — everything a route handler needs."""
+    """Parsed HTTP request — everything a route handler needs.
+
+    Headers, cookies, query/params, body and files are decoded from the
+    raw ASGI scope and body on first access, so requests that never look
+    at them (404s, static files, preflights, cache hits) never pay for it.
+    """
 
     __slots__ = (
-        "method", "path", "query_string", "params", "query", "headers",
-        "body", "raw_body", "cookies", "files", "ip",
-        "content_type", "session", "_route_params",
+        "method", "path", "query_string", "_scope_headers", "_headers", "_query", "_params",
+        "_cookies", "_body", "_files", "_body_parsed", "_form", "_raw_body", "_body_file",
+        "_ip", "_client", "_content_type", "session", "_route_params",
+        "_cache_key", "_cache_ttl",
     )
 
     def __init__(self):
         self.method: str = "GET"
         self.path: str = "/"
         self.query_string: str = ""
-        self.params: dict = {}          # Query string + route params merged
-        self.query: dict = {}           # Query string params only (separate from route params)
-        self.headers: dict = {}         # Lowercase header keys
-        self.body: dict | str | None = None  # Parsed body
-        self.raw_body: bytes = b""
-        self.cookies: dict = {}
-        self.files: dict = {}
-        self.ip: str = ""
-        self.content_type: str = ""
-        self.session = None             # Set by session middleware
-        self._route_params: dict = {}   # Dynamic route params ({id}, etc.)
+        self._scope_headers: list = ()    # Raw ASGI (name, value) byte pairs
+        self._headers: Headers | None = None
+        self._query: dict | None = None
+        self._params: dict | None = None
+        self._cookies: dict | None = None
+        self._body = None
+        self._files: dict | None = None
+        self._body_parsed: bool = True    # Nothing to parse until from_scope() supplies a body
+        self._form: dict | None = None    # Multipart fields parsed while streaming
+        self._raw_body: bytes | None = b""
+        self._body_file = None            # SpooledTemporaryFile for large bodies
+        self._ip: str | None = None
+        self._client = None
+        self._content_type: str | None = None
+        self.session = None               # Set by session middleware
+        self._route_params: dict = {}     # Dynamic route params ({id}, etc.)
+        self._cache_key: str | None = None  # Set by ResponseCache on a miss
+        self._cache_ttl: int | None = None
+
+    # ── Lazily decoded views ──
+
+    @property
+    def headers(self) -> Headers:
+        """Request headers — case-insensitive, repeated values kept."""
+        if self._headers is None:
+            self._headers = Headers(self._scope_headers)
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: dict):
+        self._headers = value
+
+    @property
+    def content_type(self) -> str:
+        if self._content_type is None:
+            self._content_type = self.headers.get("content-type", "")
+        return self._content_type
+
+    @content_type.setter
+    def content_type(self, value: str):
+        self._content_type = value
+
+    @property
+    def ip(self) -> str:
+        """Client IP, respecting X-Forwarded-For."""
+        if self._ip is None:
+            self._ip = _extract_ip({"client": self._client}, self.headers)
+        return self._ip
+
+    @ip.setter
+    def ip(self, value: str):
+        self._ip = value
+
+    @property
+    def query(self) -> dict:
+        """Query string params only (separate from route params)."""
+        if self._query is None:
+            self._query = {}
+            if self.query_string:
+                parsed = parse_qs(self.query_string, keep_blank_values=True)
+                self._query = {k: v[0] if len(v) == 1 else v for k, v in parsed.items()}
+        return self._query
+
+    @query.setter
+    def query(self, value: dict):
+        self._query = value
+
+    @property
+    def params(self) -> dict:
+        """Query string + route params merged (route params take priority)."""
+        if self._params is None:
+            self._params = dict(self.query)
+            self._params.update(self._route_params)
+        return self._params
+
+    @params.setter
+    def params(self, value: dict):
+        self._params = value
+
+    @property
+    def cookies(self) -> dict:
+        if self._cookies is None:
+            self._cookies = {}
+            cookie_header = self.headers.get("cookie", "")
+            if cookie_header:
+                for pair in cookie_header.split(";"):
+                    pair = pair.strip()
+                    if "=" in pair:
+                        k, _, v = pair.partition("=")
+                        self._cookies[k.strip()] = v.strip()
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: dict):
+        self._cookies = value
+
+    @property
+    def body(self) -> dict | str | None:
+        """Parsed body (JSON, form fields, or text)."""
+        if not self._body_parsed:
+            self._parse_body()
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body_parsed = True
+        self._body = value
+
+    @property
+    def files(self) -> dict:
+        """Uploaded files from a multipart body."""
+        if not self._body_parsed:
+            self._parse_body()
+        if self._files is None:
+            self._files = {}
+        return self._files
+
+    @files.setter
+    def files(self, value: dict):
+        self._files = value
+
+    @property
+    def raw_body(self) -> bytes:
+        """The raw request body. Spooled bodies are read from disk on first access."""
+        if self._raw_body is None:
+            self._body_file.seek(0)
+            self._raw_body = self._body_file.read()
+        return self._raw_body
+
+    @raw_body.setter
+    def raw_body(self, value: bytes):
+        self._raw_body = value
+
+    def _parse_body(self):
+        """Decode the body once — a spooled body is decoded like an in-memory one,
+        except binary media types, which stay on disk (use raw_body or stream())."""
+        self._body_parsed = True
+        content_type = self.content_type
+        if self._form is not None:
+            body = self._form or None
+        elif self._body_file is None:
+            body = _parse_body(self._raw_body, content_type)
+        elif "multipart/form-data" in content_type:
+            parser = MultipartParser(content_type)
+            self._body_file.seek(0)
+            while chunk := self._body_file.read(STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+            body = parser.close() or None
+        elif _is_binary_type(content_type):
+            body = None
+        else:
+            body = _parse_body(self.raw_body, content_type)
+
+        # Separate files from body for multipart uploads
+        if isinstance(body, dict) and "multipart/form-data" in content_type:
+            files = {}
+            fields = {}
+            for key, value in body.items():
+                if isinstance(value, dict) and "filename" in value:
+                    # Content stays as raw bytes — no base64 encoding
+                    files[key] = value
+                else:
+                    fields[key] = value
+            self._files = files
+            body = fields
+        self._body = body
+
+    async def stream(self, chunk_size: int = STREAM_CHUNK_SIZE):
+        """Yield the request body in chunks without loading a spooled body into memory.
+
+        Usage:
+            async for chunk in request.stream():
+                out.write(chunk)
+        """
+        if self._raw_body is None:
+            self._body_file.seek(0)
+            while True:
+                chunk = self._body_file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            view = memoryview(self._raw_body)
+            for start in range(0, len(view), chunk_size):
+                yield bytes(view[start:start + chunk_size])
+
+    def close(self):
+        """Release the spooled body file and uploaded file parts."""
+        uploads = self._files.values() if self._files else ()
+        if self._form:
+            uploads = self._form.values()
+        for upload in uploads:
+            if isinstance(upload, UploadedFile):
+                upload.close()
+        if self._body_file is not None:
+            self._body_file.close()
+            self._body_file = None
+            if self._raw_body is None:
+                self._raw_body = b""
 
     @classmethod
-    def from_scope(cls, scope: dict, body: bytes = b"") -> "Request":
-        """Build a Request from an ASGI scope + body."""
+    def from_scope(cls, scope: dict, body: bytes = b"", body_file=None, form: dict | None = None) -> "Request":
+        """Build a Request from an ASGI scope + body.
+
+        Only the method, path and query string are taken eagerly; everything
+        else is decoded on first access. Pass ``body_file`` (as returned by
+        :func:`read_body`) instead of ``body`` for a spooled body, or
+        ``form`` for a multipart body that was already parsed while
+        streaming (``raw_body`` is then empty).
+        """
         req = cls()
         req.method = scope.get("method", "GET")
         req.path = scope.get("path", "/")
         req.query_string = scope.get("query_string", b"").decode()
-        req.raw_body = body
-
-        # Parse headers (ASGI sends as list of [name, value] byte pairs)
-        for name, value in scope.get("headers", []):
-            req.headers[name.decode().lower()] = value.decode()
-
-        req.content_type = req.headers.get("content-type", "")
-        req.ip = _extract_ip(scope, req.headers)
+        req._scope_headers = scope.get("headers", ())
+        req._client = scope.get("client")
+        req._form = form
+        req._body_parsed = False
+        if body_file is not None:
+            req._body_file = body_file
+            req._raw_body = None
+            body_file.seek(0, os.SEEK_END)
+            body_size = body_file.tell()
+        else:
+            req._raw_body = body
+            body_size = len(body)
 
         # Check upload size limit
-        content_length = int(req.headers.get("content-length", 0) or 0)
-        if content_length > TINA4_MAX_UPLOAD_SIZE or len(body) > TINA4_MAX_UPLOAD_SIZE:
+        content_length = 0
+        for name, value in req._scope_headers:
+            if name.lower() == b"content-length":
+                content_length = int(value or 0)
+                break
+        if content_length > TINA4_MAX_UPLOAD_SIZE or body_size > TINA4_MAX_UPLOAD_SIZE:
             raise PayloadTooLarge(
-                f"Request body ({max(content_length, len(body))} bytes) exceeds "
+                f"Request body ({max(content_length, body_size)} bytes) exceeds "
                 f"TINA4_MAX_UPLOAD_SIZE ({TINA4_MAX_UPLOAD_SIZE} bytes)"
             )
 
-        # Parse query params
-        if req.query_string:
-            parsed = parse_qs(req.query_string, keep_blank_values=True)
-            req.query = {k: v[0] if len(v) == 1 else v for k, v in parsed.items()}
-            req.params = dict(req.query)  # params starts as copy of query, route params merge later
-
-        # Parse cookies
-        cookie_header = req.headers.get("cookie", "")
-        if cookie_header:
-            for pair in cookie_header.split(";"):
-                pair = pair.strip()
-                if "=" in pair:
-                    k, _, v = pair.partition("=")
-                    req.cookies[k.strip()] = v.strip()
-
-        # Parse body
-        req.body = _parse_body(body, req.content_type)
-
-        # Separate files from body for multipart uploads
-        if isinstance(req.body, dict) and "multipart/form-data" in req.content_type:
-            files = {}
-            fields = {}
-            for key, value in req.body.items():
-                if isinstance(value, dict) and "filename" in value:
-                    # Content stays as raw bytes — no base64 encoding
-                    files[key] = value
-                else:
-                    fields[key] = value
-            req.files = files
-            req.body = fields
-
         return req
 
     def merge_route_params(self):
         """Merge route params into params dict (route params take priority)."""
-        if self._route_params:
-            self.params.update(self._route_params)
+        if self._route_params and self._params is not None:
+            self._params.update(self._route_params)
 
     def param(self, key: str, default=None):
         """Get a route parameter (from URL path). Alias for params[key]."""
         return self.params.get(key, self._route_params.get(key, default))
 
 
+async def read_body(receive, limit: int | None = None, spool_threshold: int | None = None,
+                    parser: MultipartParser | None = None) -> tuple[bytes, object]:
+    """Drain an ASGI ``receive`` channel into ``(body, body_file)``.
+
+    Chunks are gathered in a list and joined once. When the body grows past
+    ``spool_threshold`` it moves to a :class:`SpooledTemporaryFile` and
+    ``(b"", file)`` is returned instead. With a ``parser``, chunks are fed to
+    it as they arrive and nothing is kept (``(b"", None)``). Raises
+    :class:`PayloadTooLarge` as soon as more than ``limit`` bytes have arrived.
+    """
+    limit = TINA4_MAX_UPLOAD_SIZE if limit is None else limit
+    threshold = TINA4_SPOOL_THRESHOLD if spool_threshold is None else spool_threshold
+    chunks: list[bytes] = []
+    spool = None
+    size = 0
+    while True:
+        msg = await receive()
+        if msg["type"] == "http.disconnect":
+            break
+        chunk = msg.get("body", b"")
+        if chunk:
+            size += len(chunk)
+            if size > limit:
+                if spool is not None:
+                    spool.close()
+                if parser is not None:
+                    parser.close()
+                raise PayloadTooLarge(
+                    f"Request body exceeds TINA4_MAX_UPLOAD_SIZE ({limit} bytes)"
+                )
+            if parser is not None:
+                parser.feed(chunk)
+            elif spool is not None:
+                spool.write(chunk)
+            elif size > threshold:
+                spool = SpooledTemporaryFile(max_size=threshold)
+                spool.writelines(chunks)
+                spool.write(chunk)
+                chunks = []
+            else:
+                chunks.append(chunk)
+        if not msg.get("more_body", False):
+            break
+    if spool is not None:
+        spool.seek(0)
+        return b"", spool
+    return b"".join(chunks), None
+
+
+# Media types that are never text — a spooled body of one is not read back to decode it
+_BINARY_TYPES = (
+    "application/octet-stream", "application/zip", "application/gzip", "application/zstd",
+    "application/pdf", "application/x-tar", "image/", "audio/", "video/", "font/",
+)
+
+
+def _is_binary_type(content_type: str) -> bool:
+    """Content types whose body is opaque bytes, not text to decode into request.body."""
+    return content_type.lower().lstrip().startswith(_BINARY_TYPES)
+
 
 def _extract_ip(scope: dict, headers: dict) -> str:
     """Extract client IP, respecting X-Forwarded-For."""
@@ -124,7 +678,7 @@ def _parse_body(body: bytes, content_type: str) -> dict | str | None:
 
     if "application/json" in content_type:
         try:
-            return json.loads(body)
+            return codec.loads(body)
         except (json.JSONDecodeError, ValueError):
             return body.decode(errors="replace")
 
@@ -142,98 +696,22 @@ def _parse_body(body: bytes, content_type: str) -> dict | str | None:
         return None
 
 
-def _parse_multipart(body: bytes, content_type: str) -> dict:
-    """Parse multipart/form-data body. Returns dict with fields and files.
-
-    Uses sequential scanning instead of split() to handle binary files
-    that may contain the boundary string in their content.
-    """
-    result = {}
-
-    # Extract boundary
-    boundary = None
+def _multipart_boundary(content_type: str) -> str | None:
+    """Extract the boundary parameter from a multipart Content-Type."""
     for part in content_type.split(";"):
         part = part.strip()
         if part.startswith("boundary="):
-            boundary = part[9:].strip('"')
-            break
-
-    if not boundary:
-        return result
-
-    delimiter = f"--{boundary}".encode()
-    close_delimiter = f"--{boundary}--".encode()
-    crlf = b"\r\n"
-    double_crlf = b"\r\n\r\n"
-
-    # Find first delimiter
-    pos = body.find(delimiter)
-    if pos == -1:
-        return result
-    pos += len(delimiter)
-
-    while pos < len(body):
-        # Skip CRLF after delimiter
-        if body[pos:pos + 2] == crlf:
-            pos += 2
-
-        # Find end of headers (double CRLF)
-        header_end = body.find(double_crlf, pos)
-        if header_end == -1:
-            break
-
-        header_section = body[pos:header_end].decode(errors="replace")
-        content_start = header_end + 4
-
-        # Find next delimiter — scan for \r\n--boundary
-        next_delim = body.find(crlf + delimiter, content_start)
-        if next_delim == -1:
-            break
-
-        content = body[content_start:next_delim]
+            return part[9:].strip('"')
+    return None
 
-        # Check if this is the close delimiter
-        after_delim = next_delim + len(crlf) + len(delimiter)
-        if body[after_delim:after_delim + 2] == b"--":
-            # This is the final part
-            is_last = True
-        else:
-            is_last = False
-
-        # Move past delimiter for next iteration
-        pos = after_delim
-
-        # Parse Content-Disposition and Content-Type
-        name = None
-        filename = None
-        file_type = "application/octet-stream"
-        for line in header_section.split("\r\n"):
-            if "Content-Disposition" in line:
-                for token in line.split(";"):
-                    token = token.strip()
-                    if token.startswith("name="):
-                        name = token[5:].strip('"')
-                    elif token.startswith("filename="):
-                        filename = token[9:].strip('"')
-            elif "Content-Type" in line:
-                file_type = line.split(":", 1)[1].strip()
-
-        if not name:
-            if is_last:
-                break
-            continue
-
-        if filename:
-            result[name] = {
-                "filename": filename,
-                "type": file_type,
-                "content": bytes(content),
-                "size": len(content),
-            }
-        else:
-            result[name] = content.decode(errors="replace")
 
-        if is_last:
-            break
+def _parse_multipart(body: bytes, content_type: str) -> dict:
+    """Parse a complete multipart/form-data body. Returns dict with fields and files.
 
-    return result
+    File parts become :class:`UploadedFile` objects; the boundary is matched
+    only at the start of a line, so binary content containing the boundary
+    string is kept intact.
+    """
+    parser = MultipartParser(content_type)
+    parser.feed(body)
+    return parser.close()
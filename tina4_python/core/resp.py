@@ -0,0 +1,888 @@
+# Tina4 RESP — Zero-dependency Redis / Valkey client (RESP2 and RESP3).
+"""
+Pooled, pipelined client for the Redis serialization protocol, shared by
+every Redis/Valkey path in Tina4 — the response cache, the session
+handlers, the rate limit store and the WebSocket backplane.
+
+    from tina4_python.core.resp import RespClient
+
+    client = RespClient("redis://:secret@localhost:6379/2")
+    client.set("greeting", "hello", ex=60)
+    client.get("greeting")                  # b"hello"
+    client.mset({"a": "1", "b": "2"})
+    client.mget(["a", "b"])                 # [b"1", b"2"]
+
+    with client.pipeline() as pipe:         # one round trip
+        pipe.command("INCR", "hits")
+        pipe.command("EXPIRE", "hits", 60)
+    pipe.results                            # [1, 1]
+
+    client.pipeline(transaction=True)       # the same, inside MULTI/EXEC
+
+    for key in client.scan_iter("tina4:cache:*"):
+        ...
+
+    # asyncio
+    client = AsyncRespClient("redis://localhost:6379")
+    await client.set("k", "v")
+    async with client.pipeline() as pipe:
+        pipe.command("GET", "k")
+
+Connections open on demand, authenticate and select their database once,
+and go back to a pool of up to ``pool_size`` after each command. Replies
+are parsed incrementally, so values of any size arrive whole. Bulk strings
+come back as bytes unless ``decode=True``; status replies (``+OK``) are
+always str. Error replies raise RespError — inside a pipeline they are
+returned in place of the reply unless ``raise_on_error`` is set.
+
+A command that fails on a pooled connection the server has since closed
+is retried once on a fresh connection.
+
+URLs: ``redis://[[user]:password@]host[:port][/db]``, ``rediss://`` for TLS;
+``valkey://`` and ``valkeys://`` are accepted as aliases.
+
+Environment:
+    TINA4_REDIS_POOL_SIZE    — connections kept per client (default: 8)
+    TINA4_REDIS_TIMEOUT      — connect/read timeout in seconds (default: 5)
+"""
+import os
+import ssl
+import time
+import socket
+import asyncio
+import logging
+import threading
+from urllib.parse import urlparse, unquote
+
+# Returned by RespParser.gets() until a whole reply has arrived
+NOT_READY = object()
+
+_READ_SIZE = 65536
+# Consumed bytes kept at the front of the parse buffer before compacting it
+_COMPACT_AT = 65536
+
+
+class RespError(Exception):
+    """An error reply from the server (``-ERR ...``)."""
+
+
+class RespProtocolError(ConnectionError):
+    """The server sent something that is not RESP; the connection is unusable."""
+
+
+class _Stale(ConnectionError):
+    """The connection was dead before the server saw the request — the send
+    failed, or it closed before any reply byte. Only this is safe to retry."""
+
+
+class _Incomplete(Exception):
+    """More bytes are needed. ``args[0]`` is the buffer length worth retrying at."""
+
+
+def parse_url(url: str) -> dict:
+    """``redis://[[user]:password@]host[:port][/db]`` → connection options."""
+    parts = urlparse(url if "://" in url else "redis://" + url)
+    if parts.scheme not in ("redis", "rediss", "valkey", "valkeys"):
+        raise ValueError(f"Not a Redis URL: {url}")
+    options = {
+        "host": parts.hostname or "localhost",
+        "port": parts.port or 6379,
+        "db": int(parts.path.strip("/") or 0),
+        "tls": parts.scheme in ("rediss", "valkeys"),
+    }
+    if parts.username:
+        options["username"] = unquote(parts.username)
+    if parts.password:
+        options["password"] = unquote(parts.password)
+    return options
+
+
+# ── Protocol ───────────────────────────────────────────────────────
+
+
+def encode_command(args) -> bytes:
+    """One command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        elif isinstance(arg, (bytearray, memoryview)):
+            data = bytes(arg)
+        else:
+            data = str(arg).encode("ascii")
+        out.append(b"$%d\r\n" % len(data))
+        out.append(data)
+        out.append(b"\r\n")
+    return b"".join(out)
+
+
+class RespParser:
+    """Incremental RESP2/RESP3 reply parser — feed() bytes, gets() whole replies.
+
+    A reply split across reads is only re-parsed once enough bytes have
+    arrived to possibly complete it, so large values cost linear time.
+    Sets and pushes are returned as lists, maps as dicts, and attributes
+    are skipped.
+    """
+
+    def __init__(self, decode: bool = False):
+        self._buf = bytearray()
+        self._start = 0   # where the next reply begins
+        self._need = 0    # buffer length the pending reply needs
+        self._decode = decode
+
+    def feed(self, data: bytes):
+        self._buf += data
+
+    def gets(self):
+        """The next complete reply, or NOT_READY."""
+        if len(self._buf) < self._need or self._start >= len(self._buf):
+            return NOT_READY
+        try:
+            reply, pos = self._parse(self._start)
+        except _Incomplete as e:
+            self._need = e.args[0]
+            return NOT_READY
+        self._need = 0
+        if pos >= len(self._buf):
+            self._buf.clear()
+            self._start = 0
+        elif pos > _COMPACT_AT:
+            del self._buf[:pos]
+            self._start = 0
+        else:
+            self._start = pos
+        return reply
+
+    def _line(self, pos: int) -> tuple[int, bytes, int]:
+        end = self._buf.find(b"\r\n", pos)
+        if end < 0:
+            raise _Incomplete(len(self._buf) + 1)
+        return self._buf[pos], bytes(self._buf[pos + 1:end]), end + 2
+
+    def _blob(self, pos: int, length: int) -> tuple[bytes, int]:
+        end = pos + length
+        if len(self._buf) < end + 2:
+            raise _Incomplete(end + 2)
+        return bytes(self._buf[pos:end]), end + 2
+
+    def _parse(self, pos: int):
+        kind, line, pos = self._line(pos)
+        if kind == 0x2B:  # + simple string
+            return line.decode("utf-8", "replace"), pos
+        if kind == 0x2D:  # - error
+            return RespError(line.decode("utf-8", "replace")), pos
+        if kind == 0x3A or kind == 0x28:  # : integer, ( big number
+            return int(line), pos
+        if kind == 0x24:  # $ bulk string
+            length = int(line)
+            if length < 0:
+                return None, pos
+            data, pos = self._blob(pos, length)
+            return (data.decode("utf-8", "replace") if self._decode else data), pos
+        if kind in (0x2A, 0x7E, 0x3E):  # * array, ~ set, > push
+            count = int(line)
+            if count < 0:
+                return None, pos
+            items = []
+            for _ in range(count):
+                item, pos = self._parse(pos)
+                items.append(item)
+            return items, pos
+        if kind == 0x25:  # % map
+            result = {}
+            for _ in range(int(line)):
+                key, pos = self._parse(pos)
+                value, pos = self._parse(pos)
+                result[key if not isinstance(key, list) else tuple(key)] = value
+            return result, pos
+        if kind == 0x7C:  # | attribute — metadata ahead of the real reply
+            for _ in range(int(line) * 2):
+                _, pos = self._parse(pos)
+            return self._parse(pos)
+        if kind == 0x5F:  # _ null
+            return None, pos
+        if kind == 0x23:  # # boolean
+            return line == b"t", pos
+        if kind == 0x2C:  # , double
+            return float(line), pos
+        if kind == 0x21:  # ! blob error
+            data, pos = self._blob(pos, int(line))
+            return RespError(data.decode("utf-8", "replace")), pos
+        if kind == 0x3D:  # = verbatim string, "txt:" prefixed
+            data, pos = self._blob(pos, int(line))
+            data = data[4:]
+            return (data.decode("utf-8", "replace") if self._decode else data), pos
+        raise RespProtocolError(f"Unexpected RESP type byte {kind!r}")
+
+
+def _handshake_commands(options: dict) -> list[tuple]:
+    """HELLO/AUTH and SELECT sent once when a connection opens."""
+    commands = []
+    username, password = options.get("username"), options.get("password")
+    if options.get("protocol", 2) == 3:
+        hello = ["HELLO", 3]
+        if password:
+            hello += ["AUTH", username or "default", password]
+        commands.append(tuple(hello))
+    elif password:
+        commands.append(("AUTH", username, password) if username else ("AUTH", password))
+    if options.get("db"):
+        commands.append(("SELECT", options["db"]))
+    return commands
+
+
+def _tls_context(options: dict) -> ssl.SSLContext | None:
+    return ssl.create_default_context() if options.get("tls") else None
+
+
+def _text(value) -> str:
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+
+
+def _check_pipeline(replies: list, transaction: bool, raise_on_error: bool) -> list:
+    """The caller-visible results of a pipeline's raw replies."""
+    if transaction:
+        # replies are: +OK (MULTI), +QUEUED or a queueing error per command, then EXEC
+        queued, result = replies[1:-1], replies[-1]
+        if isinstance(result, RespError) or result is None:
+            raise next((r for r in queued if isinstance(r, RespError)), None) or result or RespError("EXECABORT")
+        replies = result
+    if raise_on_error:
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+    return replies
+
+
+def _set_args(key, value, ex=None, px=None, nx=False, xx=False) -> tuple:
+    args = ["SET", key, value]
+    if ex:
+        args += ["EX", int(ex)]
+    if px:
+        args += ["PX", int(px)]
+    if nx:
+        args.append("NX")
+    if xx:
+        args.append("XX")
+    return tuple(args)
+
+
+def _mset_args(mapping: dict) -> tuple:
+    args = ["MSET"]
+    for key, value in mapping.items():
+        args += [key, value]
+    return tuple(args)
+
+
+def _scan_args(cursor: int, match, count, kind) -> tuple:
+    args = ["SCAN", cursor]
+    if match:
+        args += ["MATCH", match]
+    if count:
+        args += ["COUNT", count]
+    if kind:
+        args += ["TYPE", kind]
+    return tuple(args)
+
+
+class _Options:
+    """Connection settings shared by the sync and asyncio clients."""
+
+    def _configure(self, url, host, port, db, username, password, pool_size, timeout, decode, protocol):
+        options = parse_url(url) if url else {}
+        if host is not None:
+            options["host"] = host
+        if port is not None:
+            options["port"] = int(port)
+        if db is not None:
+            options["db"] = int(db)
+        if username is not None:
+            options["username"] = username
+        if password is not None:
+            options["password"] = password
+        options.setdefault("host", "localhost")
+        options.setdefault("port", 6379)
+        options.setdefault("db", 0)
+        options["protocol"] = protocol
+        self._options = options
+        self._decode = decode
+        self._pool_size = pool_size or int(os.environ.get("TINA4_REDIS_POOL_SIZE", "8"))
+        self._timeout = timeout if timeout is not None else float(os.environ.get("TINA4_REDIS_TIMEOUT", "5"))
+
+    @property
+    def host(self) -> str:
+        return self._options["host"]
+
+    @property
+    def port(self) -> int:
+        return self._options["port"]
+
+    @property
+    def db(self) -> int:
+        return self._options["db"]
+
+
+# ── Blocking client ────────────────────────────────────────────────
+
+
+class _Connection:
+    """One socket to the server and the parser reading it."""
+
+    def __init__(self, options: dict, timeout: float, decode: bool):
+        sock = socket.create_connection((options["host"], options["port"]), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        context = _tls_context(options)
+        if context is not None:
+            sock = context.wrap_socket(sock, server_hostname=options["host"])
+        self.sock = sock
+        self.pid = os.getpid()
+        self._parser = RespParser(decode)
+        self._answered = False  # Reply bytes arrived since the last send
+        try:
+            handshake = _handshake_commands(options)
+            if handshake:
+                self.send(handshake)
+                for reply in [self.read() for _ in handshake]:
+                    if isinstance(reply, RespError):
+                        raise reply
+        except BaseException:
+            self.close()
+            raise
+
+    def send(self, commands: list):
+        self._answered = False
+        try:
+            self.sock.sendall(b"".join(encode_command(c) for c in commands))
+        except TimeoutError:
+            raise  # Part of it may have been delivered
+        except OSError as e:
+            raise _Stale(f"Send to Redis server failed: {e}") from e
+
+    def read(self):
+        while True:
+            reply = self._parser.gets()
+            if reply is not NOT_READY:
+                return reply
+            try:
+                data = self.sock.recv(_READ_SIZE)
+            except ConnectionResetError:
+                data = b""
+                if self._answered:
+                    raise
+            if not data:
+                if self._answered:
+                    raise ConnectionError("Connection closed by Redis server")
+                raise _Stale("Connection closed by Redis server before replying")
+            self._answered = True
+            self._parser.feed(data)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RespClient(_Options):
+    """Thread-safe Redis/Valkey client over a pool of kept-alive connections."""
+
+    def __init__(self, url: str = None, *, host: str = None, port: int = None, db: int = None,
+                 username: str = None, password: str = None, pool_size: int = None,
+                 timeout: float = None, decode: bool = False, protocol: int = 2):
+        self._configure(url, host, port, db, username, password, pool_size, timeout, decode, protocol)
+        self._idle: list[_Connection] = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+
+    # ── Pool ─────────────────────────────────────────────────────
+
+    def _acquire(self) -> tuple[_Connection, bool]:
+        """A connection, and whether it came from the pool (and so may be stale)."""
+        with self._cond:
+            if self._pid != os.getpid():
+                # Forked: the parent's sockets are not ours to use
+                self._idle, self._open, self._pid = [], 0, os.getpid()
+            while True:
+                if self._idle:
+                    return self._idle.pop(), True
+                if self._open < self._pool_size:
+                    self._open += 1
+                    break
+                if not self._cond.wait(self._timeout):
+                    raise ConnectionError("Timed out waiting for a free Redis connection")
+        try:
+            return _Connection(self._options, self._timeout, self._decode), False
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn: _Connection, broken: bool = False):
+        with self._cond:
+            if broken or conn.pid != self._pid:
+                conn.close()
+                if conn.pid == self._pid:
+                    self._open -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def _run(self, commands: list) -> list:
+        """Send ``commands`` in one write and return their raw replies, in order.
+
+        A pooled connection found dead before the server saw the request is
+        retried once on a new one; a timeout or a reply cut short is not, as
+        the commands may already have run.
+        """
+        for attempt in (0, 1):
+            conn, reused = self._acquire()
+            try:
+                conn.send(commands)
+                replies = [conn.read() for _ in commands]
+            except _Stale:
+                self._release(conn, broken=True)
+                if reused and attempt == 0:
+                    # The server dropped idle connections — likely all of them
+                    self._drop_idle()
+                    continue
+                raise
+            except BaseException:
+                self._release(conn, broken=True)
+                raise
+            self._release(conn)
+            return replies
+
+    def _drop_idle(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def close(self):
+        """Close the idle connections (busy ones close when released after this)."""
+        self._drop_idle()
+
+    # ── Commands ─────────────────────────────────────────────────
+
+    def execute(self, *args):
+        """Run one command and return its reply. Error replies raise RespError."""
+        reply = self._run([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def pipeline(self, transaction: bool = False, raise_on_error: bool = True) -> "Pipeline":
+        return Pipeline(self, transaction, raise_on_error)
+
+    def ping(self) -> bool:
+        return self.execute("PING") in ("PONG", b"PONG")
+
+    def get(self, key):
+        return self.execute("GET", key)
+
+    def set(self, key, value, ex: int = None, px: int = None, nx: bool = False, xx: bool = False) -> bool:
+        """SET, optionally with a TTL; False when NX/XX prevented the write."""
+        return self.execute(*_set_args(key, value, ex, px, nx, xx)) is not None
+
+    def delete(self, *keys) -> int:
+        return self.execute("DEL", *keys) if keys else 0
+
+    def mget(self, keys) -> list:
+        keys = list(keys)
+        return self.execute("MGET", *keys) if keys else []
+
+    def mset(self, mapping: dict) -> bool:
+        if mapping:
+            self.execute(*_mset_args(mapping))
+        return True
+
+    def publish(self, channel, message) -> int:
+        return self.execute("PUBLISH", channel, message)
+
+    def scan_iter(self, match: str = None, count: int = 1000, kind: str = None):
+        """Every key matching ``match``, a batch per round trip (SCAN, never KEYS)."""
+        cursor = 0
+        while True:
+            cursor, keys = self.execute(*_scan_args(cursor, match, count, kind))
+            yield from keys
+            cursor = int(cursor)
+            if cursor == 0:
+                return
+
+    def unlink_matching(self, match: str, batch: int = 500) -> int:
+        """Delete every key matching ``match`` without blocking the server. Returns how many."""
+        removed = 0
+        keys = []
+        for key in self.scan_iter(match):
+            keys.append(key)
+            if len(keys) >= batch:
+                removed += self.execute("UNLINK", *keys)
+                keys = []
+        if keys:
+            removed += self.execute("UNLINK", *keys)
+        return removed
+
+    def pubsub(self) -> "PubSub":
+        return PubSub(self)
+
+
+class Pipeline:
+    """Commands queued locally and sent in one round trip.
+
+    With ``transaction`` they run inside MULTI/EXEC. ``execute()`` returns
+    the replies in order (also kept in ``results``); used as a context
+    manager it executes on a clean exit.
+    """
+
+    def __init__(self, client, transaction: bool = False, raise_on_error: bool = True):
+        self._client = client
+        self._transaction = transaction
+        self._raise = raise_on_error
+        self._commands: list[tuple] = []
+        self.results: list | None = None
+
+    def command(self, *args) -> "Pipeline":
+        self._commands.append(args)
+        return self
+
+    def set(self, key, value, ex: int = None, px: int = None, nx: bool = False, xx: bool = False) -> "Pipeline":
+        return self.command(*_set_args(key, value, ex, px, nx, xx))
+
+    def get(self, key) -> "Pipeline":
+        return self.command("GET", key)
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def _frame(self) -> list[tuple]:
+        commands, self._commands = self._commands, []
+        if self._transaction:
+            return [("MULTI",), *commands, ("EXEC",)]
+        return commands
+
+    def _finish(self, replies: list) -> list:
+        self.results = _check_pipeline(replies, self._transaction, self._raise) if replies else []
+        return self.results
+
+    def execute(self) -> list:
+        commands = self._frame()
+        return self._finish(self._client._run(commands) if commands else [])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+
+
+class PubSub:
+    """Subscriber on its own connection, delivering messages on a reader thread.
+
+    ``callback(channel, data)`` runs on that thread. If the connection
+    drops the reader reconnects and re-subscribes to every channel.
+    """
+
+    _logger = logging.getLogger("tina4.resp")
+
+    def __init__(self, client: RespClient):
+        self._client = client
+        self._callbacks: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._conn: _Connection | None = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def subscribe(self, channel: str, callback):
+        with self._lock:
+            self._callbacks[channel] = callback
+            self._connection().send([("SUBSCRIBE", channel)])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, daemon=True, name="tina4-resp-pubsub")
+                self._thread.start()
+
+    def unsubscribe(self, channel: str):
+        with self._lock:
+            if self._callbacks.pop(channel, None) is not None and self._conn is not None:
+                self._conn.send([("UNSUBSCRIBE", channel)])
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)  # wakes the reader
+            except OSError:
+                pass
+            conn.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def _connection(self) -> _Connection:
+        """The subscriber connection (caller holds the lock)."""
+        if self._conn is None:
+            client = self._client
+            self._conn = _Connection(client._options, client._timeout, client._decode)
+            self._conn.sock.settimeout(None)  # idle channels are normal
+        return self._conn
+
+    def _listen(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                conn = self._conn
+            try:
+                message = conn.read()
+            except (OSError, ConnectionError) as e:
+                if self._closed:
+                    return
+                self._logger.warning(f"Redis subscriber connection lost, reconnecting: {e}")
+                self._reconnect()
+                continue
+            if isinstance(message, list) and len(message) == 3 and _text(message[0]) == "message":
+                callback = self._callbacks.get(_text(message[1]))
+                if callback is not None:
+                    try:
+                        callback(_text(message[1]), message[2])
+                    except Exception as e:
+                        self._logger.error(f"Redis subscriber callback failed: {e}")
+
+    def _reconnect(self):
+        delay = 0.1
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                try:
+                    conn = self._connection()
+                    if self._callbacks:
+                        conn.send([("SUBSCRIBE", *self._callbacks)])
+                    return
+                except (OSError, ConnectionError, RespError):
+                    self._conn = None
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+
+# ── asyncio client ─────────────────────────────────────────────────
+
+
+class _AsyncConnection:
+    """One stream pair to the server and the parser reading it."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, decode: bool):
+        self.reader = reader
+        self.writer = writer
+        self._parser = RespParser(decode)
+        self._answered = False  # Reply bytes arrived since the last send
+
+    @classmethod
+    async def open(cls, options: dict, timeout: float, decode: bool) -> "_AsyncConnection":
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(
+                options["host"], options["port"], ssl=_tls_context(options),
+            )
+        conn = cls(reader, writer, decode)
+        try:
+            handshake = _handshake_commands(options)
+            if handshake:
+                await conn.send(handshake)
+                for _ in handshake:
+                    reply = await conn.read(timeout)
+                    if isinstance(reply, RespError):
+                        raise reply
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    async def send(self, commands: list):
+        self._answered = False
+        try:
+            self.writer.write(b"".join(encode_command(c) for c in commands))
+            await self.writer.drain()
+        except TimeoutError:
+            raise
+        except OSError as e:
+            raise _Stale(f"Send to Redis server failed: {e}") from e
+
+    async def read(self, timeout: float):
+        while True:
+            reply = self._parser.gets()
+            if reply is not NOT_READY:
+                return reply
+            try:
+                async with asyncio.timeout(timeout):
+                    data = await self.reader.read(_READ_SIZE)
+            except ConnectionResetError:
+                data = b""
+                if self._answered:
+                    raise
+            if not data:
+                if self._answered:
+                    raise ConnectionError("Connection closed by Redis server")
+                raise _Stale("Connection closed by Redis server before replying")
+            self._answered = True
+            self._parser.feed(data)
+
+    def close(self):
+        try:
+            self.writer.close()
+        except (OSError, RuntimeError):
+            pass
+
+
+class AsyncRespClient(_Options):
+    """asyncio Redis/Valkey client over a pool of kept-alive connections.
+
+    The pool belongs to the event loop that first uses it; a client used
+    from another loop starts a fresh pool there.
+    """
+
+    def __init__(self, url: str = None, *, host: str = None, port: int = None, db: int = None,
+                 username: str = None, password: str = None, pool_size: int = None,
+                 timeout: float = None, decode: bool = False, protocol: int = 2):
+        self._configure(url, host, port, db, username, password, pool_size, timeout, decode, protocol)
+        self._idle: list[_AsyncConnection] = []
+        self._open = 0
+        self._cond: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    # ── Pool ─────────────────────────────────────────────────────
+
+    def _bind(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._idle, self._open = [], 0
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def _acquire(self) -> tuple[_AsyncConnection, bool]:
+        cond = self._bind()
+        async with cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop(), True
+                if self._open < self._pool_size:
+                    self._open += 1
+                    break
+                try:
+                    async with asyncio.timeout(self._timeout):
+                        await cond.wait()
+                except TimeoutError:
+                    raise ConnectionError("Timed out waiting for a free Redis connection") from None
+        try:
+            return await _AsyncConnection.open(self._options, self._timeout, self._decode), False
+        except BaseException:
+            async with cond:
+                self._open -= 1
+                cond.notify()
+            raise
+
+    async def _release(self, conn: _AsyncConnection, broken: bool = False):
+        cond = self._bind()
+        async with cond:
+            if broken:
+                conn.close()
+                self._open -= 1
+            else:
+                self._idle.append(conn)
+            cond.notify()
+
+    async def _run(self, commands: list) -> list:
+        for attempt in (0, 1):
+            conn, reused = await self._acquire()
+            try:
+                await conn.send(commands)
+                replies = [await conn.read(self._timeout) for _ in commands]
+            except _Stale:
+                await self._release(conn, broken=True)
+                if reused and attempt == 0:
+                    await self.close()
+                    continue
+                raise
+            except BaseException:
+                # Cancelled mid-reply: the stream position is unknown, drop it
+                await asyncio.shield(self._release(conn, broken=True))
+                raise
+            await self._release(conn)
+            return replies
+
+    async def close(self):
+        """Close the idle connections."""
+        idle, self._idle = self._idle, []
+        self._open -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    # ── Commands ─────────────────────────────────────────────────
+
+    async def execute(self, *args):
+        reply = (await self._run([args]))[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def pipeline(self, transaction: bool = False, raise_on_error: bool = True) -> "AsyncPipeline":
+        return AsyncPipeline(self, transaction, raise_on_error)
+
+    async def ping(self) -> bool:
+        return await self.execute("PING") in ("PONG", b"PONG")
+
+    async def get(self, key):
+        return await self.execute("GET", key)
+
+    async def set(self, key, value, ex: int = None, px: int = None, nx: bool = False, xx: bool = False) -> bool:
+        return await self.execute(*_set_args(key, value, ex, px, nx, xx)) is not None
+
+    async def delete(self, *keys) -> int:
+        return await self.execute("DEL", *keys) if keys else 0
+
+    async def mget(self, keys) -> list:
+        keys = list(keys)
+        return await self.execute("MGET", *keys) if keys else []
+
+    async def mset(self, mapping: dict) -> bool:
+        if mapping:
+            await self.execute(*_mset_args(mapping))
+        return True
+
+    async def publish(self, channel, message) -> int:
+        return await self.execute("PUBLISH", channel, message)
+
+    async def scan_iter(self, match: str = None, count: int = 1000, kind: str = None):
+        cursor = 0
+        while True:
+            cursor, keys = await self.execute(*_scan_args(cursor, match, count, kind))
+            for key in keys:
+                yield key
+            cursor = int(cursor)
+            if cursor == 0:
+                return
+
+
+class AsyncPipeline(Pipeline):
+    """Pipeline for AsyncRespClient — ``await pipe.execute()`` or ``async with``."""
+
+    async def execute(self) -> list:
+        commands = self._frame()
+        return self._finish(await self._client._run(commands) if commands else [])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.execute()
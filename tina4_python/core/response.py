@@ -14,13 +14,59 @@ Explicit methods for special cases:
     return response.redirect("/login")
     return response.render("page.html", {"title": "Home"})
     return response.file("report.pdf")
+    return response.stream(rows_as_csv(), "text/csv")  # Chunked, never buffered
+    return response.json_stream(db.fetch(sql).records)  # JSON array, encoded as it streams
+
+Buffered bodies are compressed with zstd (when the runtime has it) or gzip,
+at a level that drops as the body grows. Bodies over
+TINA4_COMPRESS_OFFLOAD_SIZE are compressed on a small thread pool so the
+event loop keeps serving; ``compression_stats()`` reports time and ratio.
+
+Environment:
+    TINA4_FILE_STREAM_THRESHOLD   — bytes above which files are streamed (default: 1 MB)
+    TINA4_COMPRESS_MIN_SIZE       — smallest body worth compressing (default: 1024)
+    TINA4_COMPRESS_OFFLOAD_SIZE   — bodies larger than this compress off the event loop (default: 256 KB)
+    TINA4_COMPRESS_WORKERS        — compression threads (default: 2)
 """
-import json
+import os
 import gzip
-import hashlib
+import zlib
+import time
+import asyncio
+import threading
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from tina4_python.core import codec
+from tina4_python.core.conditional import body_etag
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:  # pragma: no cover - depends on interpreter version
+    _zstd = None
+
+# Files larger than this (default 1 MB) are streamed instead of read into memory.
+# Override via TINA4_FILE_STREAM_THRESHOLD.
+FILE_STREAM_THRESHOLD = int(os.environ.get("TINA4_FILE_STREAM_THRESHOLD", 1_048_576))
+
+# Read size for streamed files
+FILE_CHUNK_SIZE = 262144
+
+COMPRESS_MIN_SIZE = int(os.environ.get("TINA4_COMPRESS_MIN_SIZE", 1024))
+COMPRESS_OFFLOAD_SIZE = int(os.environ.get("TINA4_COMPRESS_OFFLOAD_SIZE", 262_144))
+COMPRESS_WORKERS = int(os.environ.get("TINA4_COMPRESS_WORKERS", 2))
+
+# (bodies up to this size, gzip level, zstd level) — bigger bodies trade ratio for speed
+COMPRESS_LEVELS = (
+    (65_536, 6, 6),
+    (1_048_576, 4, 3),
+    (None, 1, 1),
+)
+
+# Leading bytes of formats that are already compressed (gzip, zstd, zip, png, jpeg)
+_COMPRESSED_MAGIC = (b"\x1f\x8b", b"\x28\xb5\x2f\xfd", b"PK\x03\x04", b"\x89PNG", b"\xff\xd8\xff")
+
 
 # ---------------------------------------------------------------------------
 # Global Frond template engine registry
@@ -75,7 +121,7 @@ class Response:
 
     __slots__ = (
         "status_code", "content", "content_type",
-        "_headers", "_cookies",
+        "_headers", "_cookies", "_stream", "_stream_gzip", "_file_path", "_answered",
     )
 
     def __init__(self):
@@ -84,6 +130,10 @@ class Response:
         self.content_type: str = "text/html; charset=utf-8"
         self._headers: list[tuple[str, str]] = []
         self._cookies: list[str] = []
+        self._stream = None             # async/sync iterable body for streamed responses
+        self._stream_gzip: bool = False
+        self._file_path: str | None = None   # whole-file body, eligible for sendfile
+        self._answered: bool = False    # set by a before_* hook that answered the request itself
 
     def __call__(self, data=None, status_code: int = 200, content_type: str = None) -> "Response":
         """Smart callable — auto-detects content type from data.
@@ -101,7 +151,7 @@ class Response:
             # Explicit content type provided
             self.content_type = content_type
             if isinstance(data, (dict, list)):
-                self.content = json.dumps(data, default=str, separators=(",", ":")).encode()
+                self.content = codec.dumps_bytes(data)
             elif isinstance(data, str):
                 self.content = data.encode()
             elif isinstance(data, bytes):
@@ -113,7 +163,7 @@ class Response:
         elif isinstance(data, (dict, list)):
             # Auto-detect JSON
             self.content_type = "application/json"
-            self.content = json.dumps(data, default=str, separators=(",", ":")).encode()
+            self.content = codec.dumps_bytes(data)
         elif isinstance(data, str):
             stripped = data.strip()
             if stripped.startswith("<") and stripped.endswith(">"):
@@ -161,7 +211,7 @@ class Response:
         if status_code:
             self.status_code = status_code
         self.content_type = "application/json"
-        self.content = json.dumps(data, default=str, separators=(",", ":")).encode()
+        self.content = codec.dumps_bytes(data)
         return self
 
     def html(self, content: str, status_code: int = None) -> "Response":
@@ -214,7 +264,7 @@ class Response:
 
         mime, _ = mimetypes.guess_type(str(path))
         self.content_type = mime or "application/octet-stream"
-        self.content = path.read_bytes()
+        self.send_file(str(path))
 
         if download_name:
             self._headers.append(
@@ -222,6 +272,91 @@ class Response:
             )
         return self
 
+    def send_file(self, file_path: str, offset: int = 0, length: int = None) -> "Response":
+        """Use ``length`` bytes of a file from ``offset`` as the body.
+
+        Small bodies are read into memory; anything over
+        FILE_STREAM_THRESHOLD is streamed from disk with a fixed
+        Content-Length, and a whole file may go out via sendfile().
+        """
+        size = os.path.getsize(file_path)
+        # Never promise more than the file holds now (it may have shrunk since a cached stat)
+        length = max(0, size - offset) if length is None else max(0, min(length, size - offset))
+        if length <= FILE_STREAM_THRESHOLD:
+            with open(file_path, "rb") as f:
+                f.seek(offset)
+                self.content = f.read(length)
+            return self
+        self.content = b""
+        self._stream = _read_file_chunks(file_path, offset, length)
+        self._file_path = file_path if offset == 0 and length == size else None
+        self._headers.append(("content-length", str(length)))
+        return self
+
+    def stream(self, source, content_type: str = "text/plain; charset=utf-8",
+               status_code: int = None) -> "Response":
+        """Stream the body from an (async) iterable of str/bytes chunks.
+
+        Each chunk is sent as it is produced — no Content-Length, no ETag.
+
+        Usage:
+            async def rows():
+                yield "id,name\\n"
+                async for user in fetch_users():
+                    yield f"{user.id},{user.name}\\n"
+
+            return response.stream(rows(), "text/csv")
+        """
+        if status_code:
+            self.status_code = status_code
+        self.content_type = content_type
+        self.content = b""
+        self._stream = source
+        return self
+
+    def json_stream(self, items, status_code: int = None) -> "Response":
+        """Stream an (async) iterable as a JSON array, encoding rows as they are sent.
+
+        The array is never built in memory, so exports of any size run in
+        constant memory.
+
+        Usage:
+            return response.json_stream(db.fetch("SELECT * FROM orders", limit=200000).records)
+
+            async def events():
+                async for event in feed():
+                    yield event.to_dict()
+
+            return response.json_stream(events())
+        """
+        if hasattr(items, "__aiter__"):
+            source = codec.aiter_array(items)
+        else:
+            source = codec.iter_array(items)
+        return self.stream(source, "application/json", status_code)
+
+    @property
+    def is_streaming(self) -> bool:
+        """True when the body comes from response.stream()."""
+        return self._stream is not None
+
+    async def iter_stream(self):
+        """Yield the encoded chunks of a streamed body (gzip applied if negotiated)."""
+        source = self._stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self._stream_gzip else None
+        if hasattr(source, "__aiter__"):
+            async for chunk in source:
+                data = _encode_chunk(chunk, compressor)
+                if data:
+                    yield data
+        else:
+            for chunk in source:
+                data = _encode_chunk(chunk, compressor)
+                if data:
+                    yield data
+        if compressor is not None:
+            yield compressor.flush()
+
     def render(self, template: str, data: dict = None) -> "Response":
         """Render a Frond/Twig template with data.
 
@@ -257,24 +392,33 @@ class Response:
         """Alias for render() — parity with PHP/Node.js naming."""
         return self.render(template, data)
 
+    def entity_tag(self) -> str | None:
+        """The response's ETag — an explicit header, or a hash of the uncompressed body.
+
+        The hash is only computed for 200 responses with a buffered body,
+        and is added as a header so the work is done once.
+        """
+        for name, value in self._headers:
+            if name.lower() == "etag":
+                return value
+        if self._stream is not None or not self.content or self.status_code != 200:
+            return None
+        etag = body_etag(self.content)
+        self._headers.append(("etag", etag))
+        return etag
+
     def build_headers(self, accept_encoding: str = "") -> list[tuple[bytes, bytes]]:
         """Build final ASGI headers with compression and ETag."""
-        # Compress if applicable
-        should_compress = (
-            len(self.content) > 1024
-            and "gzip" in accept_encoding
-            and _is_compressible(self.content_type)
-        )
+        if self._stream is not None:
+            return self._build_stream_headers(accept_encoding)
 
-        if should_compress:
-            self.content = gzip.compress(self.content, compresslevel=6)
-            self._headers.append(("content-encoding", "gzip"))
-            self._headers.append(("vary", "Accept-Encoding"))
+        # ETag on the uncompressed body (unless the content already has a
+        # validator, e.g. a static file or a route's @etag)
+        self.entity_tag()
 
-        # ETag
-        if self.content and self.status_code == 200:
-            etag = hashlib.md5(self.content).hexdigest()[:16]
-            self._headers.append(("etag", f'"{etag}"'))
+        encoding = self._content_encoding(accept_encoding)
+        if encoding is not None:
+            self._set_encoded(compress(self.content, encoding), encoding)
 
         # Build ASGI header list
         headers = [
@@ -290,6 +434,175 @@ class Response:
 
         return headers
 
+    async def build_headers_async(self, accept_encoding: str = "") -> list[tuple[bytes, bytes]]:
+        """:meth:`build_headers`, compressing large bodies on the compression thread pool."""
+        if self._stream is None and len(self.content) > COMPRESS_OFFLOAD_SIZE:
+            encoding = self._content_encoding(accept_encoding)
+            if encoding is not None:
+                self.entity_tag()
+                loop = asyncio.get_running_loop()
+                data = await loop.run_in_executor(_compress_pool(), compress, self.content, encoding, True)
+                self._set_encoded(data, encoding)
+        return self.build_headers(accept_encoding)
+
+    def _content_encoding(self, accept_encoding: str) -> str | None:
+        """The coding to compress this buffered body with, or None to send it as is."""
+        if (
+            len(self.content) <= COMPRESS_MIN_SIZE
+            or not accept_encoding
+            or self.status_code == 206
+            or any(name == "content-encoding" for name, _ in self._headers)
+            or not _is_compressible(self.content_type)
+            or self.content.startswith(_COMPRESSED_MAGIC)
+        ):
+            return None
+        return negotiate_encoding(accept_encoding)
+
+    def _set_encoded(self, data: bytes, encoding: str):
+        self.content = data
+        self._headers.append(("content-encoding", encoding))
+        self._headers.append(("vary", "Accept-Encoding"))
+        # Same ETag for every coding, so it can only be a weak one
+        self._headers = [
+            (n, "W/" + v if n.lower() == "etag" and not v.startswith("W/") else v)
+            for n, v in self._headers
+        ]
+
+    def _build_stream_headers(self, accept_encoding: str) -> list[tuple[bytes, bytes]]:
+        """Headers for a streamed body — ETag (and usually length) unknown up front."""
+        self._stream_gzip = (
+            self._file_path is None
+            and "gzip" in accept_encoding
+            and _is_compressible(self.content_type)
+            and not any(name == "content-length" for name, _ in self._headers)
+        )
+        if self._stream_gzip:
+            self._headers.append(("content-encoding", "gzip"))
+            self._headers.append(("vary", "Accept-Encoding"))
+
+        headers = [(b"content-type", self.content_type.encode())]
+        for name, value in self._headers:
+            headers.append((name.encode(), value.encode()))
+        for cookie_str in self._cookies:
+            headers.append((b"set-cookie", cookie_str.encode()))
+        return headers
+
+
+# ── Compression ──────────────────────────────────────────────────
+
+class _CompressionStats:
+    """Counters for buffered-body compression, shared by the loop and the pool."""
+
+    __slots__ = ("lock", "responses", "offloaded", "bytes_in", "bytes_out", "seconds")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.responses = 0
+        self.offloaded = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+
+_stats = _CompressionStats()
+_pool: ThreadPoolExecutor | None = None
+
+
+def compression_stats() -> dict:
+    """Compression counters for tuning the size thresholds and levels."""
+    with _stats.lock:
+        return {
+            "responses": _stats.responses,
+            "offloaded": _stats.offloaded,
+            "bytes_in": _stats.bytes_in,
+            "bytes_out": _stats.bytes_out,
+            "ratio": round(_stats.bytes_out / _stats.bytes_in, 4) if _stats.bytes_in else 0,
+            "total_ms": round(_stats.seconds * 1000, 3),
+            "avg_ms": round(_stats.seconds * 1000 / _stats.responses, 3) if _stats.responses else 0,
+        }
+
+
+def reset_compression_stats():
+    with _stats.lock:
+        _stats.reset()
+
+
+def _compress_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=max(1, COMPRESS_WORKERS), thread_name_prefix="tina4-compress")
+    return _pool
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codings listed in Accept-Encoding, minus any refused with q=0."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding)
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """zstd when both sides support it, else gzip, else None."""
+    accepted = _accepted_encodings(accept_encoding)
+    if _zstd is not None and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compression_level(encoding: str, size: int) -> int:
+    """Level for a body of ``size`` bytes — see COMPRESS_LEVELS."""
+    for limit, gzip_level, zstd_level in COMPRESS_LEVELS:
+        if limit is None or size <= limit:
+            return zstd_level if encoding == "zstd" else gzip_level
+    return 1
+
+
+def compress(data: bytes, encoding: str, offloaded: bool = False) -> bytes:
+    """Compress a response body with a size-adaptive level and count it."""
+    start = time.perf_counter()
+    level = compression_level(encoding, len(data))
+    if encoding == "zstd":
+        out = _zstd.compress(data, level=level)
+    else:
+        out = gzip.compress(data, compresslevel=level, mtime=0)
+    elapsed = time.perf_counter() - start
+    with _stats.lock:
+        _stats.responses += 1
+        _stats.offloaded += offloaded
+        _stats.bytes_in += len(data)
+        _stats.bytes_out += len(out)
+        _stats.seconds += elapsed
+    return out
+
+
+def _read_file_chunks(file_path: str, offset: int, length: int):
+    """Yield ``length`` bytes of a file from ``offset``, FILE_CHUNK_SIZE at a time."""
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            data = f.read(min(FILE_CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def _encode_chunk(chunk, compressor) -> bytes:
+    """Encode one streamed chunk, sync-flushing the compressor so it is sent now."""
+    data = chunk.encode() if isinstance(chunk, str) else bytes(chunk)
+    if compressor is None or not data:
+        return data
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
 
 def error_response(code: str, message: str, status: int = 400) -> dict:
     """Build a standard error response envelope.
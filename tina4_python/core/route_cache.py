@@ -0,0 +1,218 @@
+# Tina4 Route Cache — Serve cached responses for routes marked cacheable.
+"""
+Caches the responses of routes declared cacheable, in process memory.
+
+    @get("/api/products")
+    @cached(max_age=120, vary=("Accept-Language",))
+    async def products(request, response): ...
+
+    Router.get("/api/stats", stats).cache(30)
+
+The dispatcher looks a GET up here once auth and the before-middleware
+have passed; a hit never reaches the handler. Entries are keyed on method, path,
+the query string with its parameters sorted, and the values of the
+route's ``Vary`` headers. An entry holds the status, headers and body,
+plus each compressed variant the first time a client asks for it, so a
+popular response is compressed once. Every cached route's responses get
+``Cache-Control: public, max-age=<seconds left>``.
+
+When a key misses, the first request runs the handler and concurrent
+requests for the same key wait for its result instead of running it too.
+
+Only 200 responses with a buffered body are stored, and not when the
+handler set a cookie or ``Cache-Control: no-store`` / ``private``.
+
+The key says nothing about who is asking, so responses that may depend
+on the caller bypass the cache entirely: routes that require auth,
+requests carrying an ``Authorization`` header, and requests whose
+handler used the session.
+
+Environment:
+    TINA4_CACHE_MAX_ENTRIES   — responses kept, least recently used evicted (default: 1000)
+    TINA4_CACHE_VARY          — request headers every cached route varies on, comma-separated
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+
+from tina4_python.core.response import Response, COMPRESS_OFFLOAD_SIZE, compress, _compress_pool
+from tina4_python.core.conditional import body_etag, not_modified
+
+# Response headers that belong to one exchange, not to the cached copy
+_PER_RESPONSE = frozenset(("x-request-id", "set-cookie", "cache-control", "age", "date"))
+
+
+class CachedResponse:
+    """One stored response and the compressed variants made from it."""
+
+    __slots__ = ("status_code", "content_type", "headers", "body", "etag", "stored_at", "expires_at", "variants")
+
+    def __init__(self, response: Response, max_age: int):
+        self.status_code = response.status_code
+        self.content_type = response.content_type
+        self.headers = [(n, v) for n, v in response._headers if n.lower() not in _PER_RESPONSE]
+        self.body = response.content
+        self.etag = response.entity_tag() or body_etag(self.body)
+        self.stored_at = time.time()
+        self.expires_at = self.stored_at + max_age
+        self.variants: dict[str, bytes] = {}
+
+
+class RouteCache:
+    """LRU of cached route responses with single-flight misses."""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or int(os.environ.get("TINA4_CACHE_MAX_ENTRIES", "1000"))
+        self._vary = tuple(h.strip() for h in os.environ.get("TINA4_CACHE_VARY", "").split(",") if h.strip())
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def key(self, request, vary: tuple = ()) -> str:
+        """method, path, sorted query and the Vary header values."""
+        query = request.query_string
+        if query:
+            query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+        parts = [request.method, " ", request.path, "?", query]
+        for name in (*self._vary, *vary):
+            parts.append(f"|{name.lower()}={request.headers.get(name, '')}")
+        return "".join(parts)
+
+    async def serve(self, request, response: Response, route: dict, handler) -> Response:
+        """Answer from the cache, or run ``handler()`` (once per key at a time) and store the result."""
+        if _personal(request, route):
+            # One caller's response must never be served to another
+            return await handler()
+        vary = tuple(route.get("cache_vary", ()))
+        max_age = route.get("cache_max_age", 60)
+        key = self.key(request, vary)
+
+        entry = self._get(key)
+        if entry is None:
+            waiting = self._inflight.get(key)
+            if waiting is not None:
+                # Someone is already computing this key — share their result
+                self._coalesced += 1
+                entry = await asyncio.shield(waiting)
+                if entry is None:
+                    # Their response could not be cached, so neither can ours
+                    return await handler()
+        if entry is not None:
+            return await self._respond(request, response, entry, vary)
+
+        self._misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        stored = None
+        try:
+            response = await handler()
+            if _storable(response) and not _session_used(request):
+                stored = CachedResponse(response, max_age)
+                self._put(key, stored)
+                _cache_headers(response, stored.expires_at, vary)
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(stored)
+        return response
+
+    def _get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def _put(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _respond(self, request, response: Response, entry: CachedResponse, vary: tuple) -> Response:
+        """Fill ``response`` from ``entry``, with a stored compressed variant when the client takes one."""
+        response.status_code = entry.status_code
+        response.content_type = entry.content_type
+        response.content = entry.body
+        response._headers.extend(entry.headers)
+        if not any(n.lower() == "etag" for n, _ in entry.headers):
+            response.header("etag", entry.etag)
+        response.header("age", str(int(time.time() - entry.stored_at)))
+        _cache_headers(response, entry.expires_at, vary)
+
+        # A client that has it gets a 304 — no point compressing
+        if not_modified(request.headers, entry.etag):
+            return response
+        encoding = response._content_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is not None:
+            data = entry.variants.get(encoding)
+            if data is None:
+                if len(entry.body) > COMPRESS_OFFLOAD_SIZE:
+                    loop = asyncio.get_running_loop()
+                    data = await loop.run_in_executor(_compress_pool(), compress, entry.body, encoding, True)
+                else:
+                    data = compress(entry.body, encoding)
+                entry.variants[encoding] = data
+            response._set_encoded(data, encoding)
+        return response
+
+    def clear(self):
+        """Drop every cached response and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._coalesced = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "size": len(self._entries),
+            }
+
+
+def _personal(request, route: dict) -> bool:
+    """The response may differ per caller — secured route or credentials sent."""
+    return bool(route.get("auth_required")) or "authorization" in request.headers
+
+
+def _session_used(request) -> bool:
+    """The handler read or wrote the session, so its output may be the caller's own."""
+    session = getattr(request, "session", None)
+    return session is not None and getattr(session, "loaded", True)
+
+
+def _storable(response: Response) -> bool:
+    if response.status_code != 200 or response.is_streaming or response._cookies:
+        return False
+    for name, value in response._headers:
+        name = name.lower()
+        if name == "set-cookie":
+            return False
+        if name == "cache-control" and ("no-store" in value or "private" in value):
+            return False
+    return True
+
+
+def _cache_headers(response: Response, expires_at: float, vary: tuple):
+    """Cache-Control to match the entry's remaining life, and Vary for the keyed headers."""
+    present = {name.lower() for name, _ in response._headers}
+    if "cache-control" not in present and response.status_code == 200:
+        response.header("cache-control", f"public, max-age={max(0, int(expires_at - time.time()))}")
+    if vary and "vary" not in present:
+        response.header("vary", ", ".join(vary))
+
+
+route_cache = RouteCache()
@@ -16,7 +16,10 @@ Routes are registered via decorators. Pattern matching supports dynamic params.
         return response.status(201).json(request.body)
 """
 import re
+import inspect
 import functools
+from tina4_python.core.request import Request
+from tina4_python.core.middleware import MiddlewarePipeline
 from tina4_python.debug import Log
 
 
@@ -26,6 +29,10 @@ _routes: list[dict] = []
 # Global WebSocket route registry
 _ws_routes: list[dict] = []
 
+# Compiled lookup tables — rebuilt lazily whenever the registries change
+_route_tables: dict | None = None
+_ws_table: "_RouteTable | None" = None
+
 
 class RouteRef:
     """Thin wrapper around a registered route dict, enabling chained modifiers.
@@ -45,15 +52,39 @@ class RouteRef:
         self._route["auth_required"] = True
         return self
 
-    def cache(self, max_age: int | None = None):
-        """Mark this route as cacheable.
+    def cache(self, max_age: int | None = None, vary: tuple = ()):
+        """Serve this route's GET responses from the route cache.
 
         Args:
             max_age: Optional TTL override in seconds.
+            vary: Request headers whose values get their own cache entry.
         """
         self._route["cached"] = True
         if max_age is not None:
             self._route["cache_max_age"] = max_age
+        if vary:
+            self._route["cache_vary"] = tuple(vary)
+        return self
+
+    def etag(self, validator):
+        """Answer conditional GETs from a cheap validator before the handler runs.
+
+        Args:
+            validator: ``fn(request)`` returning a version, an ``updated_at``
+                datetime, or None to skip the check (may be async).
+        """
+        self._route["etag"] = validator
+        return self
+
+    def rate_limit(self, limit: int, window: int = 60, key="ip"):
+        """Limit this route to ``limit`` requests per ``window`` seconds per client.
+
+        Args:
+            key: "ip", "api_key", "user" or ``fn(request)`` — see
+                :class:`~tina4_python.core.middleware.RateLimiter`.
+        """
+        from tina4_python.core.middleware import RateLimiter
+        self._route["rate_limit"] = RateLimiter(limit, window, key=key)
         return self
 
 
@@ -161,19 +192,18 @@ class Router:
             "handler": handler,
         }
         _ws_routes.append(route)
+        _invalidate_tables()
         Log.debug(f"WebSocket route registered: {path}")
 
     @staticmethod
     def match_ws(path: str) -> tuple[dict | None, dict]:
         """Find a WebSocket route matching the given path. Returns (route, params)."""
-        for route in _ws_routes:
-            m = route["pattern"].match(path)
-            if m:
-                params = {}
-                for i, name in enumerate(route["param_names"]):
-                    params[name] = m.group(i + 1)
-                return route, params
-        return None, {}
+        global _ws_table
+        table = _ws_table
+        if table is None or table.count != len(_ws_routes):
+            table = _RouteTable(list(enumerate(_ws_routes)), len(_ws_routes))
+            _ws_table = table
+        return table.lookup(path)
 
     @staticmethod
     def all_ws() -> list[dict]:
@@ -257,27 +287,35 @@ class Router:
             "handler": handler,
             "middleware": options.get("middleware", []),
             "auth_required": auth_required,
-            "cached": options.get("cached", False),
-            "cache_max_age": options.get("cache_max_age", 60),
+            "cached": options.get("cached", getattr(handler, "_cached", False)),
+            "cache_max_age": options.get("cache_max_age", getattr(handler, "_cache_max_age", 60)),
+            "cache_vary": tuple(options.get("cache_vary", getattr(handler, "_cache_vary", ()))),
+            "etag": options.get("etag", getattr(handler, "_etag", None)),
+            "rate_limit": options.get("rate_limit", getattr(handler, "_rate_limit", None)),
+            "invoke_plan": _build_invoke_plan(handler, param_names),
         }
         _routes.append(route)
+        _invalidate_tables()
         Log.debug(f"Route registered: {m} {path} (auth={'required' if auth_required else 'public'})")
         return RouteRef(route)
 
     @staticmethod
     def match(method: str, path: str) -> tuple[dict | None, dict]:
-        """Find a route matching method + path. Returns (route, params)."""
-        for route in _routes:
-            if route["method"] not in (method.upper(), "ANY"):
-                continue
-            m = route["pattern"].match(path)
-            if m:
-                params = {}
-                for i, name in enumerate(route["param_names"]):
-                    params[name] = m.group(i + 1)
-                return route, params
-
-        return None, {}
+        """Find a route matching method + path. Returns (route, params).
+
+        Registration order still decides ties — the first registered route
+        that matches wins — but the lookup goes through a compiled table
+        (hash map for static paths, segment trie for the rest) instead of
+        running every route's regex.
+        """
+        tables = _route_tables
+        if tables is None or tables["count"] != len(_routes):
+            tables = _build_route_tables()
+        method = method.upper()
+        table = tables.get(method)
+        if table is None:
+            table = tables["ANY"]
+        return table.lookup(path)
 
     @staticmethod
     def get_routes() -> list[dict]:
@@ -294,6 +332,7 @@ class Router:
         """Clear all routes (for testing)."""
         _routes.clear()
         _ws_routes.clear()
+        _invalidate_tables()
 
 
 def _compile_pattern(path: str) -> tuple[re.Pattern, list[str]]:
@@ -337,6 +376,247 @@ def _compile_pattern(path: str) -> tuple[re.Pattern, list[str]]:
     return re.compile(pattern_str), param_names
 
 
+# ── Compiled routing table ─────────────────────────────────────
+
+_INT_SEGMENT = re.compile(r"\d+").fullmatch
+_FLOAT_SEGMENT = re.compile(r"[\d.]+").fullmatch
+
+
+class _Node:
+    """One segment of the routing trie."""
+
+    __slots__ = ("static", "params", "greedy", "terminal", "min_index")
+
+    def __init__(self):
+        self.static: dict[str, _Node] = {}
+        self.params: list[tuple] = []       # (kind, matcher, node) — single segment
+        self.greedy: _Node | None = None    # {name:path} / * — one or more segments
+        self.terminal: tuple | None = None  # (index, route) of the first route ending here
+        self.min_index: float = float("inf")
+
+
+class _RouteTable:
+    """Route lookup for one HTTP method (or the WebSocket registry).
+
+    Fully static paths resolve through a dict. Everything else walks a
+    segment trie, pruning any branch whose routes were all registered after
+    the best match found so far, so the cost follows path depth rather than
+    route count. Results are identical to scanning the routes' regexes in
+    registration order.
+    """
+
+    __slots__ = ("count", "_root", "_static")
+
+    def __init__(self, indexed_routes: list[tuple[int, dict]], count: int):
+        self.count = count
+        self._root = _Node()
+        self._static: dict[str, tuple] = {}
+        static_keys = []
+        for index, route in indexed_routes:
+            segments = route["path"].strip("/").split("/")
+            self._insert(segments, index, route)
+            if all(_segment_kind(seg) is None for seg in segments):
+                static_keys.append("/" + "/".join(segments))
+        # Resolve static paths once, so an earlier dynamic route that also
+        # matches still wins exactly as it would in a linear scan
+        for key in static_keys:
+            if key not in self._static:
+                route, params = self._search(key)
+                if route is not None and not params:
+                    self._static[key] = route
+
+    def _insert(self, segments: list[str], index: int, route: dict):
+        node = self._root
+        node.min_index = min(node.min_index, index)
+        for seg in segments:
+            kind = _segment_kind(seg)
+            if kind is None:
+                node = node.static.setdefault(seg, _Node())
+            elif kind in ("path", "*"):
+                if node.greedy is None:
+                    node.greedy = _Node()
+                node = node.greedy
+            else:
+                for existing_kind, _, child in node.params:
+                    if existing_kind == kind:
+                        node = child
+                        break
+                else:
+                    matcher = _INT_SEGMENT if kind == "int" else _FLOAT_SEGMENT if kind == "float" else None
+                    child = _Node()
+                    node.params.append((kind, matcher, child))
+                    node = child
+            node.min_index = min(node.min_index, index)
+            if kind == "*":
+                break  # Nothing can follow a wildcard
+        if node.terminal is None or index < node.terminal[0]:
+            node.terminal = (index, route)
+
+    def lookup(self, path: str) -> tuple[dict | None, dict]:
+        key = path[:-1] if len(path) > 2 and path.endswith("/") else path
+        route = self._static.get(key)
+        if route is not None:
+            return route, {}
+        return self._search(path)
+
+    def _search(self, path: str) -> tuple[dict | None, dict]:
+        if not path.startswith("/"):
+            return None, {}
+        raw = path[1:].split("/")
+        # A single trailing slash is optional, as in the compiled regexes
+        segments = raw[:-1] if len(raw) > 1 and raw[-1] == "" else raw
+        best = _walk(self._root, segments, 0, raw, [], (float("inf"), None, ()))
+        route = best[1]
+        if route is None:
+            return None, {}
+        return route, dict(zip(route["param_names"], best[2]))
+
+
+def _walk(node: _Node, segments: list[str], i: int, raw: list[str], values: list, best: tuple) -> tuple:
+    """Depth-first trie search keeping the lowest-index (first registered) match."""
+    if node.min_index >= best[0]:
+        return best
+    if i == len(segments):
+        if node.terminal is not None and node.terminal[0] < best[0]:
+            best = (node.terminal[0], node.terminal[1], tuple(values))
+        return best
+
+    seg = segments[i]
+    child = node.static.get(seg)
+    if child is not None:
+        best = _walk(child, segments, i + 1, raw, values, best)
+
+    if seg:
+        for _, matcher, child in node.params:
+            if matcher is None or matcher(seg):
+                values.append(seg)
+                best = _walk(child, segments, i + 1, raw, values, best)
+                values.pop()
+
+    greedy = node.greedy
+    if greedy is not None and greedy.min_index < best[0]:
+        # Greedy capture of the remainder — keeps the raw trailing slash
+        if greedy.terminal is not None and greedy.terminal[0] < best[0]:
+            rest = "/".join(raw[i:])
+            if rest:
+                best = (greedy.terminal[0], greedy.terminal[1], tuple(values) + (rest,))
+        # Longest capture first, leaving at least one segment for what follows
+        for j in range(len(segments) - 1, i, -1):
+            captured = "/".join(segments[i:j])
+            if captured:
+                values.append(captured)
+                best = _walk(greedy, segments, j, raw, values, best)
+                values.pop()
+    return best
+
+
+def _segment_kind(segment: str) -> str | None:
+    """Classify a route segment: None (static), "*", or the {param} type hint."""
+    if segment == "*":
+        return "*"
+    if segment.startswith("{") and segment.endswith("}"):
+        inner = segment[1:-1]
+        if ":" in inner:
+            type_hint = inner.split(":", 1)[1]
+            if type_hint in ("path", "int", "float"):
+                return type_hint
+        return "str"
+    return None
+
+
+def _build_route_tables() -> dict:
+    """Compile the HTTP route registry into per-method lookup tables."""
+    global _route_tables
+    indexed = list(enumerate(_routes))
+    any_routes = [(i, r) for i, r in indexed if r["method"] == "ANY"]
+    methods = {r["method"] for _, r in indexed} - {"ANY"}
+    tables = {"count": len(indexed), "ANY": _RouteTable(any_routes, len(indexed))}
+    for m in methods:
+        scoped = [(i, r) for i, r in indexed if r["method"] in (m, "ANY")]
+        tables[m] = _RouteTable(scoped, len(indexed))
+    _route_tables = tables
+    return tables
+
+
+def _invalidate_tables():
+    """Drop the compiled tables — the next match() rebuilds them."""
+    global _route_tables, _ws_table
+    _route_tables = None
+    _ws_table = None
+
+
+# ── Handler invocation plans ──────────────────────────────────
+
+# Plan slots for the non-path-param arguments a handler asks for
+_ARG_REQUEST = "<request>"
+_ARG_RESPONSE = "<response>"
+
+# The common (request, response) plan, shared so dispatch can test it with `is`
+_PLAN_REQUEST_RESPONSE = (_ARG_REQUEST, _ARG_RESPONSE)
+
+
+def _build_invoke_plan(handler, param_names: list[str]) -> tuple:
+    """Work out once how a handler is called.
+
+    Returns a tuple of argument slots in call order: a path param name, or
+    ``_ARG_REQUEST`` / ``_ARG_RESPONSE``. Handler params named after a path
+    param receive its value; of the rest, a single param gets the request
+    when annotated as ``Request`` (the response otherwise), and two or more
+    get ``(request, response)``.
+    """
+    try:
+        params = list(inspect.signature(handler).parameters.values())
+    except (TypeError, ValueError):
+        return _PLAN_REQUEST_RESPONSE
+
+    plan = []
+    remaining = []
+    for p in params:
+        if p.name in param_names:
+            plan.append(p.name)
+        else:
+            remaining.append(p)
+
+    if len(remaining) == 1:
+        ann = remaining[0].annotation
+        if ann is Request or (isinstance(ann, str) and ann in ("Request", "request")):
+            plan.append(_ARG_REQUEST)
+        else:
+            plan.append(_ARG_RESPONSE)
+    elif len(remaining) >= 2:
+        plan.append(_ARG_REQUEST)
+        plan.append(_ARG_RESPONSE)
+
+    plan = tuple(plan)
+    return _PLAN_REQUEST_RESPONSE if plan == _PLAN_REQUEST_RESPONSE else plan
+
+
+def get_invoke_plan(route: dict) -> tuple:
+    """Return the route's invocation plan, rebuilding it if it was invalidated."""
+    plan = route.get("invoke_plan")
+    if plan is None:
+        plan = _build_invoke_plan(route["handler"], route["param_names"])
+        route["invoke_plan"] = plan
+    return plan
+
+
+def get_middleware_pipeline(route: dict) -> MiddlewarePipeline:
+    """Return the route's compiled middleware pipeline, building it on first dispatch."""
+    pipeline = route.get("middleware_pipeline")
+    if pipeline is None:
+        pipeline = MiddlewarePipeline.compile(route.get("middleware", []))
+        route["middleware_pipeline"] = pipeline
+    return pipeline
+
+
+def _rebind_route(fn):
+    """Return the route dict a late decorator modifies, dropping its cached plans."""
+    route = fn._route_ref._route
+    route.pop("invoke_plan", None)
+    route.pop("middleware_pipeline", None)
+    return route
+
+
 # Decorator functions — the public API
 
 def _register_route(method: str, path: str, fn, **options):
@@ -419,7 +699,7 @@ def noauth():
         # If route was already registered (decorator applied after @get/@post),
         # update the route dict directly.
         if hasattr(fn, "_route_ref"):
-            fn._route_ref._route["auth_required"] = False
+            _rebind_route(fn)["auth_required"] = False
         return fn
     return decorator
 
@@ -431,7 +711,7 @@ def secured():
         # If route was already registered (decorator applied after @get/@post),
         # update the route dict directly.
         if hasattr(fn, "_route_ref"):
-            fn._route_ref._route["auth_required"] = True
+            _rebind_route(fn)["auth_required"] = True
         return fn
     return decorator
 
@@ -445,19 +725,85 @@ def middleware(*middleware_classes):
         # If route was already registered (decorator applied after @get/@post),
         # update the route dict directly.
         if hasattr(fn, "_route_ref"):
-            existing = fn._route_ref._route.get("middleware", [])
-            fn._route_ref._route["middleware"] = list(middleware_classes) + existing
+            route = _rebind_route(fn)
+            route["middleware"] = list(middleware_classes) + route.get("middleware", [])
         return fn
     return decorator
 
 
 # ── Caching Decorator ──────────────────────────────────────────
 
-def cached(max_age: int = 60):
-    """Cache the response of this route."""
+def cached(max_age: int = 60, vary: tuple = ()):
+    """Cache the response of this route.
+
+    Usage::
+
+        @get("/api/products")
+        @cached(max_age=120, vary=("Accept-Language",))
+        async def products(request, response):
+            ...
+
+    See :mod:`tina4_python.core.route_cache`.
+    """
     def decorator(fn):
         fn._cached = True
         fn._cache_max_age = max_age
+        fn._cache_vary = tuple(vary)
+        if hasattr(fn, "_route_ref"):
+            fn._route_ref.cache(max_age, vary)
+        return fn
+    return decorator
+
+
+# ── Conditional Request Decorator ──────────────────────────────
+
+def etag(validator):
+    """Answer If-None-Match / If-Modified-Since with 304 without running the handler.
+
+    Usage::
+
+        @get("/api/articles/{id}")
+        @etag(lambda request: Article.version(request.params["id"]))
+        async def article(request, response):
+            ...
+
+    ``validator(request)`` returns a version, an ``updated_at`` datetime,
+    or None to skip the check. See :mod:`tina4_python.core.conditional`.
+    """
+    def decorator(fn):
+        fn._etag = validator
+        if hasattr(fn, "_route_ref"):
+            fn._route_ref._route["etag"] = validator
+        return fn
+    return decorator
+
+
+# ── Rate Limit Decorator ──────────────────────────────────────
+
+def rate_limit(limit: int, window: int = 60, key="ip"):
+    """Limit a route to ``limit`` requests per ``window`` seconds per client.
+
+    Usage::
+
+        @post("/api/login")
+        @rate_limit(5, 60)
+        async def login(request, response):
+            ...
+
+        @get("/api/search")
+        @rate_limit(1000, 3600, key="api_key")
+        async def search(request, response):
+            ...
+
+    Applies whether or not TINA4_RATE_LIMIT is on. ``key`` is "ip",
+    "api_key", "user" or ``fn(request)``; state lives in the
+    TINA4_RATE_STORE store.
+    """
+    def decorator(fn):
+        from tina4_python.core.middleware import RateLimiter
+        fn._rate_limit = RateLimiter(limit, window, key=key)
+        if hasattr(fn, "_route_ref"):
+            fn._route_ref._route["rate_limit"] = fn._rate_limit
         return fn
     return decorator
 
@@ -4,9 +4,17 @@ Zero-dependency ASGI application + built-in dev server.
 
     from tina4_python.core import run
     run()  # Starts on localhost:7146
+    run(workers=4)  # Pre-fork 4 workers sharing the port (production)
+
+Environment:
+    TINA4_WORKERS            — worker processes, 0 = one per CPU (default: 1; forced to 1 in debug)
+    TINA4_GRACEFUL_TIMEOUT   — seconds to drain requests in flight on SIGTERM (default: 30)
+    TINA4_SESSION_GC_INTERVAL — seconds between background expired-session sweeps, 0 = off (default: 300)
+    TINA4_SESSION_FLUSH_INTERVAL — seconds between write-behind flushes of tiered sessions (default: 1)
 """
 import os
 import sys
+import time
 import signal
 import asyncio
 import contextvars
@@ -14,10 +22,18 @@ import importlib
 import uuid
 from pathlib import Path
 
-from tina4_python.core.request import Request
+from tina4_python.core.request import Request, PayloadTooLarge, MultipartParser, read_body
+from tina4_python.core import request as _request_module
 from tina4_python.core.response import Response
-from tina4_python.core.router import Router
+from tina4_python.core import static as _static
+from tina4_python.core.config import runtime_config, freeze_runtime_config, RuntimeConfig
+from tina4_python.core.conditional import NOT_MODIFIED_HEADERS, not_modified, route_validators, http_date
+from tina4_python.core.router import (
+    Router, get_invoke_plan, get_middleware_pipeline, _build_invoke_plan, _ARG_REQUEST, _ARG_RESPONSE, _PLAN_REQUEST_RESPONSE,
+)
 from tina4_python.core.middleware import CorsMiddleware, RateLimiter
+from tina4_python.core.route_cache import route_cache
+from tina4_python.session import LazySession
 from tina4_python.debug import Log, set_request_id
 from tina4_python import __version__
 
@@ -71,7 +87,6 @@ def _ensure_folders():
 
 async def _health_handler(request: Request, response: Response) -> Response:
     """Built-in /health endpoint."""
-    import time
     broken_dir = Path("data/.broken")
     broken_files = list(broken_dir.glob("*.broken")) if broken_dir.exists() else []
 
@@ -502,7 +517,6 @@ class _AsgiWebSocketConnection:
 
         client = scope.get("client", ("unknown", 0))
         self.ip = client[0] if client else "unknown"
-        import time
         self.connected_at = time.time()
 
     @property
@@ -629,48 +643,47 @@ async def _handle_dev_websocket(reader, writer, headers, path):
 
 
 def _init_session(request: Request) -> None:
-    """Auto-start session from cookie. Modifies request.session in place."""
+    """Attach a lazy session bound to the request's cookie — nothing is read until it is used."""
     if request.session is not None:
         return
-    try:
-        from tina4_python.session import Session
-        cookie_header = request.headers.get("cookie", "")
-        sid_match = None
-        for part in cookie_header.split(";"):
-            part = part.strip()
-            if part.startswith("tina4_session="):
-                sid_match = part.split("=", 1)[1]
-                break
-        sess = Session()
-        sess.start(sid_match)
-        request.session = sess
-        # Probabilistic garbage collection (1% of requests)
-        import random
-        if random.randint(1, 100) == 1:
-            sess.gc()
-    except Exception:
-        pass  # Session module not available — session stays None
+    request.session = LazySession(request.cookies.get("tina4_session") or None)
 
 
 def _handle_rate_limit(request: Request, response: Response) -> Response | None:
-    """Check rate limit. Returns an error Response if blocked, else None."""
-    rate_enabled = os.environ.get("TINA4_RATE_LIMIT", "")
-    if not rate_enabled:
-        return None
+    """Check rate limit (only called when TINA4_RATE_LIMIT is on). Returns an error Response if blocked, else None."""
     allowed, info = _rate_limiter.check(request.ip)
     _rate_limiter.apply_headers(response, info)
     if not allowed:
         _cors.apply(request, response)
-        response.status(429).json({
-            "error": "Too Many Requests",
-            "retry_after": info["reset"],
-            "status": 429,
-        })
-        response.header("retry-after", str(info["reset"]))
+        _too_many_requests(response, info)
         return response
     return None
 
 
+def _check_route_rate_limit(request: Request, response: Response, route: dict) -> bool:
+    """Apply the route's own limit (@rate_limit). Returns True if the handler should be skipped."""
+    limiter = route["rate_limit"]
+    allowed, info = limiter.check(f"{route['method']} {route['path']} {limiter.client_key(request)}")
+    limiter.apply_headers(response, info)
+    if not allowed:
+        _too_many_requests(response, info)
+        return True
+    return False
+
+
+def _too_many_requests(response: Response, info: dict) -> None:
+    response.status(429).json({
+        "error": "Too Many Requests",
+        "retry_after": info["reset"],
+        "status": 429,
+    })
+    response.header("retry-after", str(info["reset"]))
+
+
+# Dev admin API handler -> invocation plan (built on first call)
+_dev_admin_plans: dict = {}
+
+
 async def _handle_dev_admin(request: Request, response: Response) -> Response:
     """Serve the /__dev dashboard and API routes."""
     from tina4_python.dev_admin import get_api_handlers, render_dashboard
@@ -688,20 +701,11 @@ async def _handle_dev_admin(request: Request, response: Response) -> Response:
                         response.status(code).json(data)
                     return data
                 _resp.render = response.render
-                import inspect
-                _tsig = inspect.signature(handler_info[1])
-                _tpcount = len(_tsig.parameters)
-                _tparams = list(_tsig.parameters.values())
-                if _tpcount == 0:
-                    await handler_info[1]()
-                elif _tpcount == 1:
-                    _tann = _tparams[0].annotation
-                    if _tann is Request or (isinstance(_tann, str) and _tann in ("Request", "request")):
-                        await handler_info[1](request)
-                    else:
-                        await handler_info[1](_resp)
-                else:
-                    await handler_info[1](request, _resp)
+                _fn = handler_info[1]
+                _plan = _dev_admin_plans.get(_fn)
+                if _plan is None:
+                    _plan = _dev_admin_plans[_fn] = _build_invoke_plan(_fn, [])
+                await _fn(*[request if slot == _ARG_REQUEST else _resp for slot in _plan])
             except Exception as e:
                 response.status(500).json({"error": str(e)})
         else:
@@ -735,12 +739,11 @@ def _handle_swagger(request: Request, response: Response) -> Response | None:
     return None
 
 
-def _check_auth(request: Request, response: Response, route: dict) -> bool:
+def _check_auth(request: Request, response: Response, route: dict, _api_key: str) -> bool:
     """Validate auth on a route. Returns True if handler should be skipped."""
     if not route.get("auth_required"):
         return False
     _auth_header = request.headers.get("authorization", "")
-    _api_key = os.environ.get("TINA4_API_KEY", os.environ.get("API_KEY", ""))
     _auth_ok = False
     if _auth_header and _auth_header.startswith("Bearer "):
         _token = _auth_header[7:]
@@ -764,73 +767,55 @@ def _check_auth(request: Request, response: Response, route: dict) -> bool:
 
 
 def _run_before_middleware(request: Request, response: Response, route: dict) -> tuple[Request, Response, bool]:
-    """Run before_* middleware methods. Returns (request, response, skip_handler)."""
-    skip = False
-    for _mw_cls in route.get("middleware", []):
-        _mw_inst = _mw_cls() if isinstance(_mw_cls, type) else _mw_cls
-        for _attr_name in dir(_mw_inst):
-            if _attr_name.startswith("before_"):
-                _mw_method = getattr(_mw_inst, _attr_name)
-                if callable(_mw_method):
-                    _mw_result = _mw_method(request, response)
-                    if _mw_result is not None:
-                        request, response = _mw_result
-                        if response.status_code >= 400:
-                            skip = True
-                            break
-        if skip:
-            break
-    return request, response, skip
+    """Run the route's before_* hooks. Returns (request, response, skip_handler).
+
+    A hook answers the request — and the handler is skipped — by returning
+    an error status, or a Response with ``_answered`` set.
+    """
+    for step in get_middleware_pipeline(route).before:
+        result = step(request, response)
+        if result is not None:
+            request, response = result
+            if response.status_code >= 400 or getattr(response, "_answered", False):
+                return request, response, True
+    return request, response, False
 
 
 def _run_after_middleware(request: Request, response: Response, route: dict) -> tuple[Request, Response]:
-    """Run after_* middleware methods."""
-    for _mw_cls in route.get("middleware", []):
-        _mw_inst = _mw_cls() if isinstance(_mw_cls, type) else _mw_cls
-        for _attr_name in dir(_mw_inst):
-            if _attr_name.startswith("after_"):
-                _mw_method = getattr(_mw_inst, _attr_name)
-                if callable(_mw_method):
-                    _mw_result = _mw_method(request, response)
-                    if _mw_result is not None:
-                        request, response = _mw_result
+    """Run the route's after_* hooks."""
+    for step in get_middleware_pipeline(route).after:
+        result = step(request, response)
+        if result is not None:
+            request, response = result
     return request, response
 
 
 async def _invoke_handler(request: Request, response: Response, route: dict, params: dict) -> Response:
-    """Call the route handler with the correct arguments."""
-    import inspect
-    _sig = inspect.signature(route["handler"])
-    _params = list(_sig.parameters.values())
-    _pcount = len(_params)
-
-    _args = []
-    _remaining = []
-    for p in _params:
-        if p.name in params:
-            _args.append(params[p.name])
-        else:
-            _remaining.append(p)
-
-    if len(_remaining) == 1:
-        _ann = _remaining[0].annotation
-        if _ann is Request or (isinstance(_ann, str) and _ann in ("Request", "request")):
-            _args.append(request)
-        else:
-            _args.append(response)
-    elif len(_remaining) >= 2:
-        _args.append(request)
-        _args.append(response)
-
-    if _pcount == 0:
-        result = await route["handler"]()
+    """Call the route handler using the invocation plan built at registration."""
+    plan = get_invoke_plan(route)
+    if plan is _PLAN_REQUEST_RESPONSE:
+        result = await route["handler"](request, response)
     else:
-        result = await route["handler"](*_args)
+        result = await route["handler"](*[
+            request if slot == _ARG_REQUEST else response if slot == _ARG_RESPONSE else params[slot]
+            for slot in plan
+        ])
     if isinstance(result, Response):
         response = result
     return response
 
 
+def _apply_validators(response: Response, etag: str | None, last_modified: float | None) -> None:
+    """Stamp a route's validators on its response (a handler's own headers win)."""
+    if response.status_code not in (200, 304):
+        return
+    present = {name.lower() for name, _ in response._headers}
+    if etag and "etag" not in present:
+        response.header("etag", etag)
+    if last_modified is not None and "last-modified" not in present:
+        response.header("last-modified", http_date(last_modified))
+
+
 def _handle_route_error(
     error: Exception, request: Request, response: Response,
     request_id: str, is_dev: bool,
@@ -866,9 +851,9 @@ def _handle_route_error(
     return response
 
 
-def _handle_no_route(request: Request, response: Response, request_id: str) -> Response:
+async def _handle_no_route(request: Request, response: Response, request_id: str) -> Response:
     """Serve static files, templates, landing page, or 404."""
-    static = _try_static(request.path)
+    static = await _try_static_async(request.path, request)
     if static:
         return static
     tpl_file = _resolve_template(request.path)
@@ -892,14 +877,38 @@ def _handle_no_route(request: Request, response: Response, request_id: str) -> R
 
 
 def _finalize_response(
-    request: Request, response: Response, route: dict | None,
-    request_id: str, is_dev: bool, req_start: float,
+    request: Request, response: Response, route: dict | None, config: RuntimeConfig,
 ) -> Response:
-    """Apply CORS, dev toolbar, request inspector, and session cookie."""
+    """Apply CORS and the session cookie."""
     _cors.apply(request, response)
 
-    # Dev toolbar injection
-    if is_dev and response.content_type and "text/html" in response.content_type:
+    # Session save + cookie — only for sessions the request actually used
+    session = request.session
+    if session is not None and getattr(session, "loaded", True):
+        try:
+            session.save()
+            sid = getattr(session, "cookie_value", None) or getattr(session, "session_id", None) \
+                or getattr(session, "id", None)
+            if sid and getattr(session, "needs_cookie", True):
+                response.header(
+                    "set-cookie",
+                    f"tina4_session={sid}; Path=/; HttpOnly; SameSite={config.session_samesite}; Max-Age={config.session_ttl}",
+                )
+            elif not sid and getattr(session, "needs_cookie", False):
+                # Destroyed this request — drop the client's copy too
+                response.header("set-cookie", "tina4_session=; Path=/; HttpOnly; Max-Age=0")
+        except Exception:
+            pass
+
+    return response
+
+
+def _dev_decorate(
+    request: Request, response: Response, route: dict | None,
+    request_id: str, req_start: float,
+) -> None:
+    """Dev lane only — inject the dev toolbar and record the request in the inspector."""
+    if response.content_type and "text/html" in response.content_type and not response.is_streaming:
         if not request.path.startswith("/__dev"):
             try:
                 from tina4_python.dev_admin import render_dev_toolbar
@@ -917,35 +926,73 @@ def _finalize_response(
             except Exception:
                 pass
 
-    # Request inspector
-    if is_dev:
-        try:
-            import time as _time
-            from tina4_python.dev_admin import RequestInspector
-            duration = (_time.perf_counter() - req_start) * 1000
-            RequestInspector.capture(
-                request.method, request.path, response.status_code, duration,
-                body_size=len(response.content) if response.content else 0,
-                ip=request.ip,
-            )
-        except Exception:
-            pass
+    try:
+        from tina4_python.dev_admin import RequestInspector
+        duration = (time.perf_counter() - req_start) * 1000
+        RequestInspector.capture(
+            request.method, request.path, response.status_code, duration,
+            body_size=len(response.content) if response.content else 0,
+            ip=request.ip,
+        )
+    except Exception:
+        pass
 
-    # Session save + cookie
-    if request.session is not None:
+
+async def _dispatch(
+    request: Request, response: Response, request_id: str, config: RuntimeConfig,
+) -> tuple[dict | None, Response]:
+    """Match the route and run its rate limit, auth, middleware, validators and the handler."""
+    route, params = Router.match(request.method, request.path)
+
+    if route:
+        request._route_params = params
+        request.merge_route_params()
         try:
-            request.session.save()
-            sid = request.session.session_id if hasattr(request.session, 'session_id') else getattr(request.session, 'id', None)
-            if sid:
-                ttl = int(os.environ.get("TINA4_SESSION_TTL", "3600"))
-                samesite = os.environ.get("TINA4_SESSION_SAMESITE", "Lax")
-                response.header("set-cookie", f"tina4_session={sid}; Path=/; HttpOnly; SameSite={samesite}; Max-Age={ttl}")
-            import random
-            if random.randint(1, 100) == 1:
-                request.session.gc()
-        except Exception:
-            pass
+            skip = route.get("rate_limit") is not None and _check_route_rate_limit(request, response, route)
+            if not skip:
+                skip = _check_auth(request, response, route, config.api_key)
+            if not skip:
+                request, response, skip = _run_before_middleware(request, response, route)
+            validators = None
+            if not skip and route.get("etag") is not None and request.method in ("GET", "HEAD"):
+                validators = await route_validators(route["etag"], request)
+                skip = not_modified(request.headers, *validators)
+                if skip:
+                    response.status(304)
+            if not skip:
+                if route.get("cached") and request.method == "GET":
+                    response = await route_cache.serve(
+                        request, response, route, lambda: _invoke_handler(request, response, route, params),
+                    )
+                else:
+                    response = await _invoke_handler(request, response, route, params)
+            if validators is not None:
+                _apply_validators(response, *validators)
+            request, response = _run_after_middleware(request, response, route)
+        except Exception as e:
+            response = _handle_route_error(e, request, response, request_id, config.debug)
+    else:
+        response = await _handle_no_route(request, response, request_id)
+    return route, response
+
+
+async def _handle_dev(request: Request, response: Response, request_id: str, config: RuntimeConfig) -> Response:
+    """Dev lane — dev admin and swagger ahead of dispatch, toolbar and inspector after."""
+    req_start = time.perf_counter()
 
+    # Dev admin
+    if request.path.startswith("/__dev"):
+        return await _handle_dev_admin(request, response)
+
+    # Swagger
+    if request.method == "GET":
+        swagger_resp = _handle_swagger(request, response)
+        if swagger_resp is not None:
+            return swagger_resp
+
+    route, response = await _dispatch(request, response, request_id, config)
+    response = _finalize_response(request, response, route, config)
+    _dev_decorate(request, response, route, request_id, req_start)
     return response
 
 
@@ -955,10 +1002,13 @@ async def handle(request: Request) -> Response:
     Handles session setup, CORS, rate limiting, routing, auth, middleware,
     dev toolbar injection, and session saving. The caller is responsible
     for sending the response over the wire. Useful for testing and embedding.
-    """
-    import time as _time
 
-    request_id = request.headers.get("x-request-id", str(uuid.uuid4())[:8])
+    Settings come from :func:`runtime_config` — frozen when the server
+    starts. Outside debug mode the dev admin, swagger, toolbar and
+    inspector stages are never entered.
+    """
+    config = runtime_config()
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:8]
     set_request_id(request_id)
     _init_session(request)
 
@@ -972,57 +1022,37 @@ async def handle(request: Request) -> Response:
         return response
 
     # Rate limiting
-    rate_response = _handle_rate_limit(request, response)
-    if rate_response is not None:
-        return rate_response
-
-    _req_start = _time.perf_counter()
-    from tina4_python.dotenv import is_truthy
-    _is_dev = is_truthy(os.environ.get("TINA4_DEBUG", ""))
-
-    # Dev admin
-    if _is_dev and request.path.startswith("/__dev"):
-        return await _handle_dev_admin(request, response)
-
-    # Swagger
-    if _is_dev and request.method == "GET":
-        swagger_resp = _handle_swagger(request, response)
-        if swagger_resp is not None:
-            return swagger_resp
+    if config.rate_limit:
+        rate_response = _handle_rate_limit(request, response)
+        if rate_response is not None:
+            return rate_response
 
-    # Route matching and dispatch
-    route, params = Router.match(request.method, request.path)
-
-    if route:
-        request._route_params = params
-        request.merge_route_params()
-        try:
-            skip = _check_auth(request, response, route)
-            if not skip:
-                request, response, skip = _run_before_middleware(request, response, route)
-            if not skip:
-                response = await _invoke_handler(request, response, route, params)
-            request, response = _run_after_middleware(request, response, route)
-        except Exception as e:
-            response = _handle_route_error(e, request, response, request_id, _is_dev)
-    else:
-        response = _handle_no_route(request, response, request_id)
+    if config.debug:
+        return await _handle_dev(request, response, request_id, config)
 
-    return _finalize_response(request, response, route, request_id, _is_dev, _req_start)
+    route, response = await _dispatch(request, response, request_id, config)
+    return _finalize_response(request, response, route, config)
 
 
 async def app(scope: dict, receive, send):
     """ASGI entry point — compatible with uvicorn, hypercorn, granian."""
     if scope["type"] == "lifespan":
-        msg = await receive()
-        if msg["type"] == "lifespan.startup":
-            import time
-            global _start_time
-            _start_time = time.time()
-            await send({"type": "lifespan.startup.complete"})
-        elif msg["type"] == "lifespan.shutdown":
-            await send({"type": "lifespan.shutdown.complete"})
-        return
+        gc_task = flush_task = None
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                global _start_time
+                _start_time = time.time()
+                freeze_runtime_config()
+                gc_task = _start_session_gc()
+                flush_task = _start_session_flush()
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                if gc_task is not None:
+                    gc_task.cancel()
+                await _stop_session_flush(flush_task)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
 
     if scope["type"] == "websocket":
         await _handle_asgi_websocket(scope, receive, send)
@@ -1031,63 +1061,112 @@ async def app(scope: dict, receive, send):
     if scope["type"] != "http":
         return
 
-    # Read full body
-    body = b""
-    while True:
-        msg = await receive()
-        body += msg.get("body", b"")
-        if not msg.get("more_body", False):
-            break
+    # Reject an oversized declared body before reading any of it, then
+    # gather (or spool) the body and build the request
+    if _declared_length(scope) > _request_module.TINA4_MAX_UPLOAD_SIZE:
+        await _send_payload_too_large(send)
+        return
+    try:
+        content_type = _header(scope, b"content-type")
+        if b"multipart/form-data" in content_type:
+            # Parse uploads as they stream in; file parts go straight to spools
+            parser = MultipartParser(content_type.decode("latin-1"))
+            await read_body(receive, parser=parser)
+            request = Request.from_scope(scope, form=parser.close())
+        else:
+            body, body_file = await read_body(receive)
+            request = Request.from_scope(scope, body, body_file=body_file)
+    except PayloadTooLarge:
+        await _send_payload_too_large(send)
+        return
+
+    try:
+        response = await handle(request)
+        await _send_response(request, response, send, scope.get("extensions") or {})
+    finally:
+        request.close()
 
-    # Build request and dispatch
-    request = Request.from_scope(scope, body)
-    response = await handle(request)
 
-    # ETag check — 304 Not Modified
-    if_none_match = request.headers.get("if-none-match", "")
+async def _send_response(request: Request, response: Response, send, extensions: dict) -> None:
+    """Send a handled response — buffered with ETag/304, or streamed chunk by chunk."""
     accept_encoding = request.headers.get("accept-encoding", "")
-    headers = response.build_headers(accept_encoding)
 
-    # Check ETag after building (since build_headers computes it)
-    etag = ""
-    for name, value in headers:
-        if name == b"etag":
-            etag = value.decode()
-            break
-    if if_none_match and if_none_match == etag:
-        await send({"type": "http.response.start", "status": 304, "headers": []})
-        await send({"type": "http.response.body", "body": b""})
+    if response.is_streaming:
+        headers = response.build_headers(accept_encoding)
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        if response._file_path and "http.response.pathsend" in extensions and request.method != "HEAD":
+            # The server sends the file itself (sendfile), no chunks pass through Python
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(response._file_path)})
+            return
+        if request.method != "HEAD":
+            async for chunk in response.iter_stream():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        return
+
+    # Conditional GET — decided on the uncompressed body, so a 304 never compresses
+    if response.status_code == 304 or (
+        request.method in ("GET", "HEAD") and response.status_code == 200
+        and not_modified(request.headers, response.entity_tag())
+    ):
+        await _send_not_modified(response, send)
         return
 
+    headers = await response.build_headers_async(accept_encoding)
     await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
     await send({"type": "http.response.body", "body": response.content})
 
 
-def _try_static(path: str) -> Response | None:
-    """Serve static files. Searches multiple directories.
+async def _send_not_modified(response: Response, send) -> None:
+    """Send 304 with the validator and caching headers only — no body, no length."""
+    headers = [
+        (name.encode(), value.encode()) for name, value in response._headers
+        if name.lower() in NOT_MODIFIED_HEADERS
+    ]
+    headers.extend((b"set-cookie", cookie.encode()) for cookie in response._cookies)
+    await send({"type": "http.response.start", "status": 304, "headers": headers})
+    await send({"type": "http.response.body", "body": b""})
 
-    Search order (first match wins):
-    1. TINA4_PUBLIC_DIR env var (if set)
-    2. public/           (simple, IDE-friendly)
-    3. src/public/       (nested convention)
-    4. tina4_python/public/  (framework built-in assets)
-    """
-    clean = path.lstrip("/")
-    custom = os.environ.get("TINA4_PUBLIC_DIR")
-    candidates = []
-    if custom:
-        candidates.append(Path(custom) / clean)
-    candidates.append(Path("public") / clean)
-    candidates.append(Path("src/public") / clean)
-    # Framework built-in assets (tina4.min.js, frond.min.js, tina4.min.css, tina4-dev-admin.min.js, etc.)
-    candidates.append(Path(__file__).resolve().parent.parent / "public" / clean)
-
-    for file_path in candidates:
-        if file_path.is_file():
-            resp = Response()
-            resp.file(str(file_path))
-            return resp
-    return None
+
+def _header(scope: dict, name: bytes) -> bytes:
+    """First value of a raw ASGI header, or b"" when absent."""
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value
+    return b""
+
+
+def _declared_length(scope: dict) -> int:
+    """The request's Content-Length header, or 0 when absent or malformed."""
+    value = _header(scope, b"content-length")
+    return int(value) if value.isdigit() else 0
+
+
+async def _send_payload_too_large(send) -> None:
+    """Answer 413 without reading the request body."""
+    response = Response().status(413).json({
+        "error": "Payload Too Large",
+        "max_size": _request_module.TINA4_MAX_UPLOAD_SIZE,
+        "status": 413,
+    })
+    await send({"type": "http.response.start", "status": 413, "headers": response.build_headers()})
+    await send({"type": "http.response.body", "body": response.content})
+
+
+def _try_static(path: str, request: Request = None) -> Response | None:
+    """Serve a static file from the public directories (see core.static)."""
+    entry = _static.resolve(path)
+    if entry is None:
+        return None
+    return _static.serve(entry, request, Response())
+
+
+async def _try_static_async(path: str, request: Request = None) -> Response | None:
+    """_try_static() for the dispatcher — compresses variants off the event loop."""
+    entry = _static.resolve(path)
+    if entry is None:
+        return None
+    return await _static.serve_async(entry, request, Response())
 
 
 def _write_broken(request: Request, error: Exception):
@@ -1142,32 +1221,43 @@ def _write_broken(request: Request, error: Exception):
 def _find_production_server():
     """Check for production ASGI servers, return (name, start_func) or None.
 
-    Priority order: uvicorn > hypercorn > granian.
+    Priority order: uvicorn > hypercorn > granian. ``start_func(host, port,
+    asgi_app, workers)`` hands multi-worker runs the ``worker_app`` import
+    string, since each worker process must discover routes itself.
     Returns None if no production server is installed.
     """
     try:
         import uvicorn
-        def _start_uvicorn(host, port, asgi_app):
-            uvicorn.run(asgi_app, host=host, port=port, log_level="info")
+        def _start_uvicorn(host, port, asgi_app, workers=1):
+            if workers > 1:
+                uvicorn.run(WORKER_APP, host=host, port=port, workers=workers, log_level="info")
+            else:
+                uvicorn.run(asgi_app, host=host, port=port, log_level="info")
         return "uvicorn", _start_uvicorn
     except ImportError:
         pass
     try:
         import hypercorn.asyncio
         import hypercorn.config
-        def _start_hypercorn(host, port, asgi_app):
+        def _start_hypercorn(host, port, asgi_app, workers=1):
             import asyncio
             cfg = hypercorn.config.Config()
             cfg.bind = [f"{host}:{port}"]
-            asyncio.run(hypercorn.asyncio.serve(asgi_app, cfg))
+            if workers > 1:
+                from hypercorn.run import run as hypercorn_run
+                cfg.workers = workers
+                cfg.application_path = WORKER_APP
+                hypercorn_run(cfg)
+            else:
+                asyncio.run(hypercorn.asyncio.serve(asgi_app, cfg))
         return "hypercorn", _start_hypercorn
     except ImportError:
         pass
     try:
         import granian
-        def _start_granian(host, port, asgi_app):
+        def _start_granian(host, port, asgi_app, workers=1):
             from granian import Granian
-            g = Granian("tina4_python.core.server:app", address=host, port=port, interface="asgi")
+            g = Granian(WORKER_APP, address=host, port=port, interface="asgi", workers=workers)
             g.serve()
         return "granian", _start_granian
     except ImportError:
@@ -1175,6 +1265,329 @@ def _find_production_server():
     return None
 
 
+# ── Workers ───────────────────────────────────────────────────────────
+
+# Import string for production servers that start their own worker processes
+WORKER_APP = "tina4_python.core.server:worker_app"
+
+_worker_ready = False
+
+
+def resolve_workers(cli_workers: int | None = None) -> int:
+    """Worker processes: CLI flag > TINA4_WORKERS env > 1.
+
+    ``0`` or ``auto`` means one worker per CPU.
+    """
+    value = cli_workers if cli_workers is not None else os.environ.get("TINA4_WORKERS", "1")
+    if str(value).strip().lower() in ("0", "auto"):
+        return os.cpu_count() or 1
+    try:
+        return max(1, int(value))
+    except ValueError:
+        Log.warning(f"Invalid TINA4_WORKERS value {value!r} — using 1 worker")
+        return 1
+
+
+def _prepare_worker():
+    """Load .env and discover routes in a freshly started worker process."""
+    cwd = os.getcwd()
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+    from tina4_python.dotenv import load_env
+    load_env()
+    _auto_discover("src")
+    freeze_runtime_config()
+
+
+async def worker_app(scope: dict, receive, send):
+    """ASGI entry point for worker processes spawned by uvicorn/hypercorn/granian.
+
+    Discovers routes on first use, then behaves exactly like ``app``.
+    """
+    global _worker_ready
+    if not _worker_ready:
+        _worker_ready = True
+        _prepare_worker()
+    await app(scope, receive, send)
+
+
+def _graceful_timeout() -> float:
+    """Seconds a stopping server waits for requests in flight (TINA4_GRACEFUL_TIMEOUT)."""
+    return float(os.environ.get("TINA4_GRACEFUL_TIMEOUT", "30"))
+
+
+async def _serve_asyncio(host: str, port: int, ai_port: int | None = None,
+                         sock=None, reuse_port: bool = False):
+    """Run the built-in HTTP/1.1 server until SIGINT/SIGTERM, then drain.
+
+    ``sock`` is an already-listening socket (inherited from a pre-fork
+    parent); ``reuse_port`` binds with SO_REUSEPORT so sibling workers
+    share the port.
+    """
+    from asyncio import start_server
+
+    from tina4_python.core.http_server import serve_connection, ConnectionTracker
+
+    freeze_runtime_config()
+    shutdown = asyncio.Event()
+    tracker = ConnectionTracker()
+
+    def _signal_handler(*_):
+        Log.info("Shutting down gracefully...")
+        shutdown.set()
+
+    async def _on_upgrade(reader, writer, headers, path):
+        if hasattr(writer, "_tina4_ai_port") and path == "/__dev_reload":
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        await _handle_dev_websocket(reader, writer, headers, path)
+
+    async def _handle_connection(reader, writer):
+        """HTTP/1.1 keep-alive connection → ASGI app."""
+        await serve_connection(reader, writer, app, (host, port), on_upgrade=_on_upgrade, tracker=tracker)
+
+    if sock is not None:
+        server = await start_server(_handle_connection, sock=sock)
+    else:
+        server = await start_server(_handle_connection, host, port, reuse_port=reuse_port or None)
+
+    # Test port (port + 1000) — stable, no live-reload WebSocket
+    ai_server = None
+    if ai_port:
+        try:
+            async def _handle_ai_connection(reader, writer):
+                _ai_port_ctx.set(True)
+                writer._tina4_ai_port = True
+                await _handle_connection(reader, writer)
+
+            ai_server = await start_server(_handle_ai_connection, host, ai_port)
+        except OSError:
+            Log.warning(f"AI port {ai_port} in use — skipping")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _signal_handler)
+        except NotImplementedError:
+            pass  # Windows
+
+    gc_task = _start_session_gc()
+    flush_task = _start_session_flush()
+    await shutdown.wait()
+    if gc_task is not None:
+        gc_task.cancel()
+    # Stop accepting, then let requests in flight finish
+    if ai_server:
+        ai_server.close()
+    server.close()
+    await tracker.drain(_graceful_timeout())
+    await _stop_session_flush(flush_task)
+    if ai_server:
+        await ai_server.wait_closed()
+    await server.wait_closed()
+    Log.info("Server stopped.")
+
+
+# ── Session GC ────────────────────────────────────────────────
+
+# Shared by every worker started from the same directory; holds the last sweep time
+_GC_TURN_FILE = Path("data") / ".session-gc"
+
+
+def _start_session_gc() -> asyncio.Task | None:
+    """Start the periodic expired-session sweep for this server (one per worker group).
+
+    Controlled by TINA4_SESSION_GC_INTERVAL (seconds, 0 disables). In a
+    pre-fork group only worker 0 runs the loop. Workers started by another
+    server (uvicorn, hypercorn, granian) have no worker ID, so each runs the
+    loop and takes turns through a lock file — one sweep per interval.
+    """
+    interval = float(os.environ.get("TINA4_SESSION_GC_INTERVAL", "300"))
+    if interval <= 0 or os.environ.get("TINA4_WORKER_ID", "0") != "0":
+        return None
+    return asyncio.get_running_loop().create_task(_session_gc_loop(interval))
+
+
+async def _session_gc_loop(interval: float):
+    """Sweep expired sessions every ``interval`` seconds, on a thread so requests keep flowing."""
+    from tina4_python.session import run_gc
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(_claim_gc_turn, interval):
+                await asyncio.to_thread(run_gc)
+        except Exception as e:
+            Log.warning(f"Session GC failed: {e}")
+
+
+def _claim_gc_turn(interval: float, path: Path = None) -> bool:
+    """True when no worker sharing ``path`` has swept in the last interval; records this sweep."""
+    path = path or _GC_TURN_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+") as f:
+        try:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            pass  # No flock (Windows) — the timestamp alone keeps sweeps apart
+        except OSError:
+            return False  # Another worker is claiming right now
+        f.seek(0)
+        try:
+            last = float(f.read() or 0)
+        except ValueError:
+            last = 0.0
+        now = time.time()
+        # A little slack so loops started a moment apart don't skip a whole interval
+        if now - last < interval * 0.9:
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(repr(now))
+        f.flush()
+    return True
+
+
+def _start_session_flush() -> asyncio.Task | None:
+    """Start writing tiered sessions behind to storage — every worker flushes its own tier.
+
+    Only runs when TINA4_SESSION_TIER_SIZE is set; TINA4_SESSION_FLUSH_INTERVAL
+    is the period in seconds.
+    """
+    if int(os.environ.get("TINA4_SESSION_TIER_SIZE", "0")) <= 0:
+        return None
+    interval = float(os.environ.get("TINA4_SESSION_FLUSH_INTERVAL", "1")) or 1.0
+    return asyncio.get_running_loop().create_task(_session_flush_loop(interval))
+
+
+async def _session_flush_loop(interval: float):
+    """Flush queued session writes every ``interval`` seconds, on a thread."""
+    from tina4_python.session import flush_sessions
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush_sessions)
+        except Exception as e:
+            Log.warning(f"Session flush failed: {e}")
+
+
+async def _stop_session_flush(task: asyncio.Task | None):
+    """Stop the flush loop and write out whatever is still queued."""
+    if task is None:
+        return
+    task.cancel()
+    from tina4_python.session import flush_sessions
+    try:
+        await asyncio.to_thread(flush_sessions)
+    except Exception as e:
+        Log.warning(f"Session flush failed: {e}")
+
+
+# Worker exit status meaning "could not bind the port" — restarting won't help
+_EXIT_BIND_FAILED = 3
+
+
+def _run_prefork(host: str, port: int, workers: int):
+    """Fork ``workers`` server processes and supervise them.
+
+    Routes are already discovered, so workers share those pages
+    copy-on-write. Each worker binds with SO_REUSEPORT where the platform
+    has it (the kernel balances connections); otherwise they all accept on
+    one socket bound here. Crashed workers are restarted; SIGTERM/SIGINT
+    drain every worker and wait up to TINA4_GRACEFUL_TIMEOUT before SIGKILL.
+    A worker that cannot bind the port stops the whole group with exit
+    status 1 instead of being restarted.
+    """
+    import errno
+    import socket
+    import threading
+
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    sock = None
+    if not reuse_port:
+        sock = socket.create_server((host, port), backlog=2048)
+
+    children: dict[int, tuple[int, float]] = {}  # pid → (worker index, started at)
+    stopping = False
+
+    def _spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            os.environ["TINA4_WORKER_ID"] = str(index)
+            code = 0
+            try:
+                asyncio.run(_serve_asyncio(host, port, sock=sock, reuse_port=reuse_port))
+            except KeyboardInterrupt:
+                pass
+            except OSError as e:
+                Log.error(f"Worker {index} failed: {e}")
+                bind_errors = (errno.EADDRINUSE, errno.EACCES, errno.EADDRNOTAVAIL)
+                code = _EXIT_BIND_FAILED if e.errno in bind_errors else 1
+            except BaseException as e:
+                Log.error(f"Worker {index} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+
+    def _kill_remaining():
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _stop(*_):
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        Log.info(f"Stopping {len(children)} worker(s)...")
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        timer = threading.Timer(_graceful_timeout() + 1, _kill_remaining)
+        timer.daemon = True
+        timer.start()
+
+    for index in range(workers):
+        _spawn(index)
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    Log.info(f"Started {workers} workers (SO_REUSEPORT: {'on' if reuse_port else 'off'})")
+
+    failed = False
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index, started = children.pop(pid, (None, 0.0))
+        if index is None or stopping:
+            continue
+        if os.waitstatus_to_exitcode(status) == _EXIT_BIND_FAILED:
+            Log.error(f"Worker {index} could not bind {host}:{port} — stopping")
+            failed = True
+            _stop()
+            continue
+        Log.warning(f"Worker {index} (pid {pid}) exited with status {status} — restarting")
+        if time.monotonic() - started < 1:
+            time.sleep(1)  # Back off a worker that crashes on start
+        _spawn(index)
+
+    if sock is not None:
+        sock.close()
+    Log.info("Server stopped.")
+    if failed:
+        sys.exit(1)
+
+
 def _kill_port(port: int) -> None:
     """Kill whatever process is listening on *port*.
 
@@ -1182,7 +1595,6 @@ def _kill_port(port: int) -> None:
     Raises RuntimeError if the port cannot be freed.
     """
     import subprocess
-    import time
 
     print(f"  Port {port} in use — killing existing process...")
 
@@ -1322,7 +1734,8 @@ def _print_banner(host: str, port: int, server_name: str = "asyncio", ai_port: i
     print(banner)
 
 
-def run(host: str | None = None, port: int | None = None, no_browser: bool = False, no_reload: bool = False):
+def run(host: str | None = None, port: int | None = None, no_browser: bool = False, no_reload: bool = False,
+        workers: int | None = None):
     """Start the Tina4 dev server.
 
     Discovers routes from src/, starts ASGI server, handles shutdown.
@@ -1332,8 +1745,9 @@ def run(host: str | None = None, port: int | None = None, no_browser: bool = Fal
         port: Bind port. Falls back to PORT env var, then 7146.
         no_browser: If True, do not open browser on startup.
         no_reload: If True, disable the file watcher / live-reload.
+        workers: Worker processes. Falls back to TINA4_WORKERS env var, then 1.
+            Ignored (forced to 1) when TINA4_DEBUG is on.
     """
-    import time
     global _start_time
     _start_time = time.time()
 
@@ -1382,11 +1796,22 @@ def run(host: str | None = None, port: int | None = None, no_browser: bool = Fal
             except Exception as e:
                 Log.error(f"DevReload: failed to start: {e}")
 
+    workers = resolve_workers(workers)
+    if workers > 1 and is_debug:
+        Log.warning("TINA4_DEBUG is on — running a single worker (live reload needs one process)")
+        workers = 1
+
     prod = None
     if not is_debug:
         prod = _find_production_server()
 
+    if workers > 1 and not prod and not hasattr(os, "fork"):
+        Log.warning("Pre-fork workers need os.fork() — running a single worker")
+        workers = 1
+
     server_name = prod[0] if prod else "asyncio"
+    if workers > 1:
+        server_name += f", {workers} workers"
 
     # Determine AI dev port (port+1) when debug is on and not suppressed
     _no_ai_port = os.environ.get("TINA4_NO_AI_PORT", "").lower() in ("true", "1", "yes")
@@ -1410,151 +1835,19 @@ def run(host: str | None = None, port: int | None = None, no_browser: bool = Fal
         name, starter = prod
         Log.info(f"Production server: {name}")
         try:
-            starter(host, port, app)
+            starter(host, port, app, workers)
         except KeyboardInterrupt:
             pass
         return
 
+    if workers > 1:
+        _run_prefork(host, port, workers)
+        return
+
     # Fall back to built-in asyncio dev server
     Log.info("Development server: asyncio")
 
-    # Graceful shutdown
-    shutdown = asyncio.Event()
-
-    def _signal_handler(*_):
-        Log.info("Shutting down gracefully...")
-        shutdown.set()
-
-    # Run ASGI server
-    async def _serve():
-        from asyncio import start_server
-
-        async def _handle_connection(reader, writer):
-            """Minimal HTTP/1.1 → ASGI bridge for dev server."""
-            try:
-                raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=30)
-            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
-                writer.close()
-                return
-
-            lines = raw.decode(errors="replace").split("\r\n")
-            if not lines:
-                writer.close()
-                return
-
-            # Parse request line
-            parts = lines[0].split(" ", 2)
-            if len(parts) < 2:
-                writer.close()
-                return
-
-            method = parts[0]
-            raw_path = parts[1]
-            path, _, qs = raw_path.partition("?")
-
-            # Parse headers
-            headers = []
-            content_length = 0
-            for line in lines[1:]:
-                if ":" in line:
-                    name, _, value = line.partition(":")
-                    name = name.strip().lower()
-                    value = value.strip()
-                    headers.append([name.encode(), value.encode()])
-                    if name == "content-length":
-                        content_length = int(value)
-
-            # Check for WebSocket upgrade before reading body
-            _header_dict = {k.decode(): v.decode() for k, v in headers}
-            if _header_dict.get("upgrade", "").lower() == "websocket":
-                if hasattr(writer, "_tina4_ai_port") and path == "/__dev_reload":
-                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
-                    await writer.drain()
-                    writer.close()
-                    return
-                await _handle_dev_websocket(reader, writer, _header_dict, path)
-                return
-
-            # Read body
-            body = b""
-            if content_length > 0:
-                body = await asyncio.wait_for(
-                    reader.readexactly(content_length), timeout=30
-                )
-
-            # Build ASGI scope
-            addr = writer.get_extra_info("peername") or ("127.0.0.1", 0)
-            scope = {
-                "type": "http",
-                "method": method,
-                "path": path,
-                "query_string": qs.encode(),
-                "headers": headers,
-                "server": (host, port),
-                "client": addr,
-            }
-
-            # Capture response
-            resp_started = False
-            resp_status = 200
-            resp_headers = []
-            resp_body = b""
-
-            async def receive():
-                return {"type": "http.request", "body": body, "more_body": False}
-
-            async def send(msg):
-                nonlocal resp_started, resp_status, resp_headers, resp_body
-                if msg["type"] == "http.response.start":
-                    resp_started = True
-                    resp_status = msg["status"]
-                    resp_headers = msg.get("headers", [])
-                elif msg["type"] == "http.response.body":
-                    resp_body = msg.get("body", b"")
-
-            await app(scope, receive, send)
-
-            # Write HTTP/1.1 response
-            status_line = f"HTTP/1.1 {resp_status} OK\r\n"
-            writer.write(status_line.encode())
-            for name, value in resp_headers:
-                writer.write(name + b": " + value + b"\r\n")
-            writer.write(b"\r\n")
-            writer.write(resp_body)
-            await writer.drain()
-            writer.close()
-
-        server = await start_server(_handle_connection, host, port)
-
-        # Test port (port + 1000) — stable, no live-reload WebSocket
-        ai_server = None
-        if _ai_port:
-            try:
-                async def _handle_ai_connection(reader, writer):
-                    _ai_port_ctx.set(True)
-                    writer._tina4_ai_port = True
-                    await _handle_connection(reader, writer)
-
-                ai_server = await start_server(_handle_ai_connection, host, _ai_port)
-            except OSError:
-                Log.warning(f"AI port {_ai_port} in use — skipping")
-
-        loop = asyncio.get_running_loop()
-        for sig in (signal.SIGINT, signal.SIGTERM):
-            try:
-                loop.add_signal_handler(sig, _signal_handler)
-            except NotImplementedError:
-                pass  # Windows
-
-        await shutdown.wait()
-        if ai_server:
-            ai_server.close()
-            await ai_server.wait_closed()
-        server.close()
-        await server.wait_closed()
-        Log.info("Server stopped.")
-
     try:
-        asyncio.run(_serve())
+        asyncio.run(_serve_asyncio(host, port, ai_port=_ai_port))
     except KeyboardInterrupt:
         pass
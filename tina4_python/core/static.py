@@ -0,0 +1,380 @@
+# Tina4 Static — Static file resolution and serving.
+"""
+Serves files from the public directories with HTTP caching semantics.
+
+    entry = resolve("/css/app.css")       # StaticFile or None (cached)
+    response = serve(entry, request, Response())
+
+    - Resolved paths and stat results are cached. A hit is re-validated
+      with a single stat() once TINA4_STATIC_REVALIDATE seconds old (every
+      time in dev mode); a miss is remembered for TINA4_STATIC_MISS_TTL
+      seconds (never in dev mode), so added files appear without a restart
+    - ETag / Last-Modified come from mtime and size — the file is never hashed;
+      each content-coding gets its own strong tag (``"…-gz"``, ``"…-zst"``)
+    - If-None-Match / If-Modified-Since answer 304
+    - Range / If-Range give 206 partial content (one range per request)
+    - Files over TINA4_FILE_STREAM_THRESHOLD are streamed, and sent with
+      sendfile() where the server supports ``http.response.pathsend``
+    - Compressible files are sent as precompressed ``.zst`` / ``.gz``
+      siblings when present (see precompress()), otherwise compressed once
+      — on the compression pool when served through serve_async() — and
+      kept in a bounded in-memory cache keyed by path and mtime
+
+Precompress the public directories at build time:
+
+    tina4python compress
+
+Search order (first match wins):
+    1. TINA4_PUBLIC_DIR env var (if set)
+    2. public/
+    3. src/public/
+    4. tina4_python/public/  (framework built-in assets)
+
+Environment:
+    TINA4_PUBLIC_DIR              — extra public directory searched first
+    TINA4_FILE_STREAM_THRESHOLD   — bytes above which files are streamed (default: 1 MB)
+    TINA4_STATIC_VARIANT_CACHE    — bytes of compressed variants kept in memory (default: 32 MB)
+    TINA4_STATIC_REVALIDATE       — seconds before a cached file is stat()ed again (default: 2)
+    TINA4_STATIC_MISS_TTL         — seconds a missing path is remembered (default: 2)
+"""
+import os
+import time
+import gzip
+import stat
+import asyncio
+import threading
+import mimetypes
+from email.utils import formatdate
+from pathlib import Path
+
+from tina4_python.core import response as _response_module
+from tina4_python.core.conditional import not_modified
+from tina4_python.core.config import runtime_config
+from tina4_python.core.response import Response, _is_compressible, _accepted_encodings, _compress_pool, _zstd
+
+# Cap on cached lookups (hits and misses) so random 404 paths can't grow it unbounded
+CACHE_MAX_ENTRIES = 4096
+
+# Files smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# Content-Encoding → sibling suffix, in order of preference
+ENCODINGS = (("zstd", ".zst"), ("gzip", ".gz")) if _zstd is not None else (("gzip", ".gz"),)
+
+_SUFFIX_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+# Content-Encoding → ETag suffix, so each coding has its own strong validator
+_CODING_TAGS = {"gzip": "gz", "zstd": "zst"}
+
+VARIANT_CACHE_BYTES = int(os.environ.get("TINA4_STATIC_VARIANT_CACHE", 33_554_432))
+
+REVALIDATE_SECONDS = float(os.environ.get("TINA4_STATIC_REVALIDATE", "2"))
+MISS_TTL_SECONDS = float(os.environ.get("TINA4_STATIC_MISS_TTL", "2"))
+
+_FRAMEWORK_PUBLIC = str(Path(__file__).resolve().parent.parent / "public")
+
+
+class StaticFile:
+    """A resolved static file and its cached validators."""
+
+    __slots__ = ("path", "size", "mtime_ns", "mtime", "content_type", "etag", "last_modified",
+                 "compressible", "siblings")
+
+    def __init__(self, path: str, st: os.stat_result):
+        self.path = path
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self.mtime = int(st.st_mtime)
+        mime, encoding = mimetypes.guess_type(path)
+        if encoding:
+            # app.js.gz is served as an opaque archive, never as JavaScript
+            mime = _SUFFIX_TYPES.get(encoding, "application/octet-stream")
+        self.content_type = mime or "application/octet-stream"
+        self.etag = f'"{self.mtime_ns:x}-{self.size:x}"'
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        self.compressible = self.size >= COMPRESS_MIN_SIZE and _is_compressible(self.content_type)
+        # Content-Encoding → (path, size) of up-to-date precompressed siblings
+        self.siblings: dict[str, tuple[str, int]] = {}
+        if self.compressible:
+            for name, suffix in ENCODINGS:
+                try:
+                    sib = os.stat(path + suffix)
+                except OSError:
+                    continue
+                if sib.st_mtime_ns >= self.mtime_ns:
+                    self.siblings[name] = (path + suffix, sib.st_size)
+
+    def coded_etag(self, encoding: str | None) -> str:
+        """The strong ETag of the representation sent with ``encoding`` (None = identity)."""
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{_CODING_TAGS[encoding]}"'
+
+
+# url path → (StaticFile, or None for a miss; monotonic time it was last checked)
+_cache: dict[str, tuple[StaticFile | None, float]] = {}
+
+# (path, mtime_ns, encoding) → compressed bytes, oldest first
+_variants: dict[tuple[str, int, str], bytes] = {}
+_variant_bytes = 0
+_variant_lock = threading.Lock()
+
+
+def clear_cache():
+    """Forget every resolved path and compressed variant (call after deploying new assets)."""
+    global _variant_bytes
+    _cache.clear()
+    with _variant_lock:
+        _variants.clear()
+        _variant_bytes = 0
+
+
+def static_roots() -> list[str]:
+    """Public directories in search order."""
+    roots = []
+    custom = os.environ.get("TINA4_PUBLIC_DIR")
+    if custom:
+        roots.append(custom)
+    roots.extend(("public", os.path.join("src", "public"), _FRAMEWORK_PUBLIC))
+    return roots
+
+
+def resolve(url_path: str) -> StaticFile | None:
+    """Map a URL path to a static file, or None.
+
+    A cached hit is trusted for REVALIDATE_SECONDS, then re-stat()ed and kept
+    if unchanged; a miss is cached for MISS_TTL_SECONDS. Dev mode re-stats
+    every hit and never caches misses, so edits show up immediately.
+    """
+    dev = runtime_config().debug
+    now = time.monotonic()
+
+    cached = _cache.get(url_path)
+    if cached is not None:
+        entry, checked = cached
+        age = now - checked
+        if entry is None:
+            if age < MISS_TTL_SECONDS:
+                return None
+        elif not dev and age < REVALIDATE_SECONDS:
+            return entry
+        else:
+            try:
+                st = os.stat(entry.path)
+            except OSError:
+                st = None
+            if st is not None and st.st_mtime_ns == entry.mtime_ns and st.st_size == entry.size:
+                _cache[url_path] = (entry, now)
+                return entry
+
+    entry = _lookup(url_path)
+    if entry is not None or (not dev and MISS_TTL_SECONDS > 0):
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            _cache.clear()
+        _cache[url_path] = (entry, now)
+    else:
+        _cache.pop(url_path, None)
+    return entry
+
+
+def _lookup(url_path: str) -> StaticFile | None:
+    clean = url_path.lstrip("/")
+    if not clean or "\x00" in clean or "\\" in clean:
+        return None
+    if ".." in clean.split("/"):
+        return None  # Never walk out of a public directory
+    for root in static_roots():
+        candidate = os.path.join(root, clean)
+        try:
+            st = os.stat(candidate)
+        except (OSError, ValueError):
+            continue
+        if stat.S_ISREG(st.st_mode):
+            return StaticFile(candidate, st)
+    return None
+
+
+def serve(entry: StaticFile, request, response: Response) -> Response:
+    """Fill ``response`` for ``entry``, honouring conditional and Range headers."""
+    headers = request.headers if request is not None else {}
+    byte_range, encoding = _plan(entry, headers)
+    return _fill(entry, headers, response, byte_range, encoding)
+
+
+async def serve_async(entry: StaticFile, request, response: Response) -> Response:
+    """serve() for the event loop — a variant not yet in memory is compressed on the compression pool."""
+    headers = request.headers if request is not None else {}
+    byte_range, encoding = _plan(entry, headers)
+    if (encoding is not None and encoding not in entry.siblings
+            and (entry.path, entry.mtime_ns, encoding) not in _variants
+            and not _not_modified(entry, headers, encoding)):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_compress_pool(), _compressed_variant, entry, encoding)
+    return _fill(entry, headers, response, byte_range, encoding)
+
+
+def _plan(entry: StaticFile, headers) -> tuple:
+    """The byte range to send (or ``"unsatisfiable"``) and the content-coding — ranges are always of the identity file."""
+    byte_range = None
+    range_header = headers.get("range", "")
+    if range_header and _if_range_matches(entry, headers.get("if-range", "")):
+        byte_range = _parse_range(range_header, entry.size)
+    if byte_range is not None:
+        return byte_range, None
+    return None, _negotiate(entry, headers.get("accept-encoding", ""))
+
+
+def _fill(entry: StaticFile, headers, response: Response, byte_range, encoding: str | None) -> Response:
+    response.content_type = entry.content_type
+    response.header("etag", entry.coded_etag(encoding))
+    response.header("last-modified", entry.last_modified)
+    response.header("accept-ranges", "bytes")
+    if entry.compressible:
+        response.header("vary", "Accept-Encoding")
+
+    if _not_modified(entry, headers, encoding):
+        response.status_code = 304
+        response.content = b""
+        return response
+
+    if byte_range == "unsatisfiable":
+        response.status_code = 416
+        response.content = b""
+        response.header("content-range", f"bytes */{entry.size}")
+        return response
+
+    if byte_range is not None:
+        start, end = byte_range
+        response.status_code = 206
+        response.header("content-range", f"bytes {start}-{end}/{entry.size}")
+        response.send_file(entry.path, start, end - start + 1)
+        return response
+
+    if encoding is not None:
+        response.header("content-encoding", encoding)
+        sibling = entry.siblings.get(encoding)
+        if sibling is not None:
+            response.send_file(sibling[0])
+        else:
+            response.content = _compressed_variant(entry, encoding)
+        return response
+
+    # The length comes from the file as it is now, not the cached stat
+    response.send_file(entry.path)
+    return response
+
+
+def _negotiate(entry: StaticFile, accept_encoding: str) -> str | None:
+    """Pick the preferred encoding we can serve for ``entry``, or None for identity.
+
+    Files too big to compress in memory are only sent encoded when a
+    precompressed sibling exists.
+    """
+    if not entry.compressible or not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    in_memory = entry.size <= _response_module.FILE_STREAM_THRESHOLD
+    for name, _ in ENCODINGS:
+        if name in accepted and (name in entry.siblings or in_memory):
+            return name
+    return None
+
+
+def _compressed_variant(entry: StaticFile, encoding: str) -> bytes:
+    """Compress ``entry`` once per mtime; later hits come from memory. Safe to run on a pool thread."""
+    global _variant_bytes
+    key = (entry.path, entry.mtime_ns, encoding)
+    data = _variants.get(key)
+    if data is not None:
+        return data
+    with open(entry.path, "rb") as f:
+        data = _compress(f.read(), encoding)
+    with _variant_lock:
+        if key not in _variants:
+            _variants[key] = data
+            _variant_bytes += len(data)
+        while _variant_bytes > VARIANT_CACHE_BYTES and _variants:
+            oldest = next(iter(_variants))
+            _variant_bytes -= len(_variants.pop(oldest))
+    return data
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    """Maximum-effort compression — it runs once per file version, not per request."""
+    if encoding == "zstd":
+        return _zstd.compress(data, level=19)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress(roots: list[str] | None = None) -> int:
+    """Write ``.gz`` (and ``.zst`` where supported) siblings for compressible files.
+
+    Walks ``public/`` and ``src/public/`` by default. Siblings that are
+    already newer than their source are left alone. Returns the number of
+    files written.
+    """
+    written = 0
+    for root in roots or ["public", os.path.join("src", "public")]:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                entry = StaticFile(path, os.stat(path))
+                if not entry.compressible:
+                    continue
+                data = None
+                for name, suffix in ENCODINGS:
+                    if name in entry.siblings:
+                        continue
+                    if data is None:
+                        with open(path, "rb") as f:
+                            data = f.read()
+                    with open(path + suffix, "wb") as out:
+                        out.write(_compress(data, name))
+                    written += 1
+    clear_cache()
+    return written
+
+
+def _not_modified(entry: StaticFile, headers: dict, encoding: str | None = None) -> bool:
+    return not_modified(headers, entry.coded_etag(encoding), entry.mtime)
+
+
+def _if_range_matches(entry: StaticFile, if_range: str) -> bool:
+    """If-Range: apply the Range only while the validator still matches — the identity
+    tag, as ranges are of the identity file."""
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == entry.etag
+    return if_range == entry.last_modified
+
+
+def _parse_range(header: str, size: int):
+    """Parse a single ``bytes=`` range.
+
+    Returns ``(start, end)`` inclusive, ``"unsatisfiable"``, or None to
+    ignore the header (malformed or multi-range — the full file is sent).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                return "unsatisfiable"
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or end < start:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
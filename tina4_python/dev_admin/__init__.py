@@ -245,6 +245,7 @@ def get_api_handlers() -> dict:
     return {
         "/__dev/api/status": ("GET", _api_status),
         "/__dev/api/routes": ("GET", _api_routes),
+        "/__dev/api/middleware": ("GET", _api_middleware),
         "/__dev/api/queue": ("GET", _api_queue),
         "/__dev/api/queue/retry": ("POST", _api_queue_retry),
         "/__dev/api/queue/purge": ("POST", _api_queue_purge),
@@ -336,6 +337,23 @@ async def _api_routes(request, response):
         return response({"routes": [], "count": 0, "error": str(e)})
 
 
+async def _api_middleware(request, response):
+    """Time spent in each middleware hook, per route."""
+    try:
+        from tina4_python.core.router import Router
+        result = []
+        for r in Router.get_routes():
+            pipeline = r.get("middleware_pipeline")
+            if pipeline is None:
+                continue
+            hooks = pipeline.stats()
+            if hooks:
+                result.append({"method": r.get("method", "GET"), "path": r.get("path", ""), "middleware": hooks})
+        return response({"routes": result, "count": len(result)})
+    except Exception as e:
+        return response({"routes": [], "count": 0, "error": str(e)})
+
+
 async def _api_queue(request, response):
     """Queue status and jobs."""
     try:
@@ -128,6 +128,10 @@ def _rediscover_routes():
     from tina4_python.core.server import _health_handler
     Router.add("GET", "/health", _health_handler)
 
+    # Settings may have changed with the code
+    from tina4_python.core.config import freeze_runtime_config
+    freeze_runtime_config()
+
     after = len(_routes)
     Log.debug(f"DevReload: reloaded {reloaded} modules, {before} -> {after} routes")
 
@@ -568,22 +568,29 @@ class ORM(metaclass=ORMMeta):
 
     @classmethod
     def cached(cls, sql: str, params: list = None, ttl: int = 60,
-               limit: int = 20, offset: int = 0):
-        """SQL query with result caching. Returns array of ORM objects."""
-        cache_key = f"{cls.__name__}:{Cache.query_key(sql, params)}:{limit}:{offset}"
-        cached = _query_cache.get(cache_key)
-        if cached is not None:
-            return cached
+               limit: int = 20, offset: int = 0, stale_ttl: int = 0, beta: float = 0.0):
+        """SQL query with result caching. Returns array of ORM objects.
 
-        result = cls.select(sql, params, limit=limit, offset=offset)
-        _query_cache.set(cache_key, result, ttl=ttl, tags=[cls.__name__])
-        return result
+        Concurrent callers for the same query share one database round trip.
+        ``stale_ttl`` and ``beta`` are passed to ``Cache.remember()``: serve
+        the old result while one refresh runs, and refresh early.
+        """
+        cache_key = f"{cls.__name__}:{Cache.query_key(sql, params)}:{limit}:{offset}"
+        return _query_cache.remember(
+            cache_key, ttl, lambda: cls.select(sql, params, limit=limit, offset=offset),
+            tags=[cls.__name__], stale_ttl=stale_ttl, beta=beta,
+        )
 
     @classmethod
     def clear_cache(cls):
         """Clear all cached query results for this model."""
         _query_cache.clear_tag(cls.__name__)
 
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit, miss, coalesced and refresh counters of the shared query cache."""
+        return _query_cache.stats()
+
     # ── Relationships ───────────────────────────────────────────
 
     def has_one(self, related_class, foreign_key: str = None):
@@ -9,14 +9,42 @@ File-based sessions by default. Pluggable backends for Redis, MongoDB, Database.
     session.set("user_id", 42)
     session.get("user_id")  # 42
     session.save()
+
+Requests get a LazySession: nothing is read from storage until the handler
+first uses ``request.session``, ``save()`` only writes when data changed,
+and the cookie is only sent when the session is created, regenerated or
+its expiry is refreshed.
+
+Environment:
+    TINA4_SESSION_BACKEND          — file (default), redis, valkey, mongodb, database,
+                                     cookie (data in a signed cookie, no server storage)
+    TINA4_SESSION_TTL              — session lifetime in seconds (default: 1800)
+    TINA4_SESSION_TOUCH_INTERVAL   — refresh the expiry of an unchanged session at
+                                     most this often, in seconds (default: 300)
+    TINA4_SESSION_GC_INTERVAL      — seconds between background expiry sweeps run
+                                     by the server, 0 to disable (default: 300)
+    TINA4_SESSION_TIER_SIZE        — keep this many hot sessions in memory and write
+                                     changes behind to the backend, 0 = off (default: 0)
+    TINA4_SESSION_FLUSH_INTERVAL   — seconds between write-behind flushes (default: 1)
 """
 import os
 import json
 import time
+import atexit
 import hashlib
 import secrets
+import weakref
+import threading
 from pathlib import Path
 
+from tina4_python.core import codec
+from tina4_python.core.config import runtime_config
+
+# Stored alongside the session data: when its expiry was last pushed forward
+_TOUCHED_KEY = "_tina4_touched"
+# Stored by handlers whose cookie value is not the session ID (cookie sessions)
+_SID_KEY = "_tina4_sid"
+
 
 class SessionHandler:
     """Base class for session storage backends."""
@@ -25,24 +53,48 @@ class SessionHandler:
         raise NotImplementedError
 
     def write(self, session_id: str, data: dict, ttl: int):
+        """Store the session. May return a new session ID for the cookie (None keeps it)."""
         raise NotImplementedError
 
     def destroy(self, session_id: str):
         raise NotImplementedError
 
+    def touch(self, session_id: str, data: dict, ttl: int):
+        """Push an unchanged session's expiry forward. Rewrites it by default."""
+        return self.write(session_id, data, ttl)
+
     def gc(self, max_lifetime: int):
         """Garbage-collect expired sessions."""
         pass
 
 
 class FileSessionHandler(SessionHandler):
-    """File-based session storage (default, zero-dep)."""
+    """File-based session storage (default, zero-dep).
+
+    Each write also drops an empty marker in ``_expiry/<bucket>/``, where
+    the bucket is the minute the session expires in. gc() only opens the
+    buckets that have passed, so live sessions are never read.
+
+    Sessions written before the index existed are found by one full sweep,
+    after which ``_expiry/.swept`` records that the directory is indexed —
+    on disk, so every handler and process sees it.
+    """
+
+    # Width of an expiry bucket in seconds
+    BUCKET_SECONDS = 60
 
     def __init__(self, path: str = None):
         self._path = Path(
             path or os.environ.get("TINA4_SESSION_PATH", "data/sessions")
         )
         self._path.mkdir(parents=True, exist_ok=True)
+        self._index = self._path / "_expiry"
+        self._swept = self._index / ".swept"
+        if not self._index.is_dir():
+            legacy = any(self._path.glob("*.json"))
+            self._index.mkdir(exist_ok=True)
+            if not legacy:
+                self._swept.touch()  # Nothing predates the index
 
     def _file(self, session_id: str) -> Path:
         safe = hashlib.sha256(session_id.encode()).hexdigest()
@@ -53,7 +105,7 @@ class FileSessionHandler(SessionHandler):
         if not f.exists():
             return {}
         try:
-            data = json.loads(f.read_text(encoding="utf-8"))
+            data = codec.loads(f.read_text(encoding="utf-8"))
             if data.get("_expires", 0) and time.time() > data["_expires"]:
                 f.unlink(missing_ok=True)
                 return {}
@@ -65,22 +117,74 @@ class FileSessionHandler(SessionHandler):
         f = self._file(session_id)
         expires = time.time() + ttl if ttl > 0 else 0
         f.write_text(
-            json.dumps({"_data": data, "_expires": expires}, default=str),
+            codec.dumps({"_data": data, "_expires": expires}),
             encoding="utf-8",
         )
+        if expires:
+            self._mark(f.name, expires)
+
+    def _mark(self, name: str, expires: float):
+        bucket = self._index / str(int(expires // self.BUCKET_SECONDS))
+        try:
+            (bucket / name).touch()
+        except FileNotFoundError:
+            bucket.mkdir(exist_ok=True)
+            (bucket / name).touch()
 
     def destroy(self, session_id: str):
         self._file(session_id).unlink(missing_ok=True)
 
     def gc(self, max_lifetime: int):
         now = time.time()
-        for f in self._path.glob("*.json"):
+        if not self._swept.exists():
+            # Sessions written before the index existed need one full sweep
+            self._sweep(now)
+            self._swept.touch()
+        current = int(now // self.BUCKET_SECONDS)
+        try:
+            buckets = [b for b in self._index.iterdir() if b.name.isdigit() and int(b.name) <= current]
+        except OSError:
+            return
+        for bucket in buckets:
+            number = int(bucket.name)
+            for marker in bucket.iterdir():
+                expires = self._expire(self._path / marker.name, now)
+                # Keep markers of sessions that are live and still expire in this
+                # bucket; a rewritten session has a newer marker elsewhere
+                if expires is None or int(expires // self.BUCKET_SECONDS) != number:
+                    marker.unlink(missing_ok=True)
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
-                if data.get("_expires", 0) and now > data["_expires"]:
-                    f.unlink(missing_ok=True)
-            except (json.JSONDecodeError, OSError):
-                f.unlink(missing_ok=True)
+                bucket.rmdir()
+            except OSError:
+                pass  # Still holds live markers, or a writer just added one
+
+    def _expire(self, f: Path, now: float) -> float | None:
+        """Delete ``f`` if expired or unreadable. Returns its expiry while it lives, else None."""
+        try:
+            expires = codec.loads(f.read_text(encoding="utf-8")).get("_expires", 0)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError, AttributeError):
+            f.unlink(missing_ok=True)
+            return None
+        if expires and now > expires:
+            f.unlink(missing_ok=True)
+            return None
+        return expires
+
+    def _sweep(self, now: float):
+        """Full scan for sessions that predate the expiry index; indexes the live ones."""
+        for f in self._path.glob("*.json"):
+            expires = self._expire(f, now)
+            if expires:
+                self._mark(f.name, expires)
+
+
+# Databases whose session table is known to be current in this process — by
+# URL, or by object for in-memory databases (two of those never share tables)
+_tables_ready: set[str] = set()
+_tables_ready_dbs: weakref.WeakSet = weakref.WeakSet()
+_tables_lock = threading.Lock()
 
 
 class DatabaseSessionHandler(SessionHandler):
@@ -91,15 +195,37 @@ class DatabaseSessionHandler(SessionHandler):
         self._ensure_table()
 
     def _ensure_table(self):
-        if not self._db.table_exists("tina4_session"):
-            self._db.execute("""
-                CREATE TABLE tina4_session (
-                    session_id TEXT PRIMARY KEY,
-                    data TEXT NOT NULL,
-                    expires_at REAL NOT NULL
+        """Create or migrate the session table — once per process and database."""
+        url = getattr(self._db, "url", None)
+        shared = isinstance(url, str) and ":memory:" not in url
+        with _tables_lock:
+            if (url in _tables_ready) if shared else (self._db in _tables_ready_dbs):
+                return
+            if not self._db.table_exists("tina4_session"):
+                self._db.execute("""
+                    CREATE TABLE tina4_session (
+                        session_id TEXT PRIMARY KEY,
+                        data TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+            # gc() deletes by expiry — keep it an index range scan, also on tables
+            # created before the index existed
+            try:
+                created = self._db.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_tina4_session_expires ON tina4_session (expires_at)"
                 )
-            """)
+                error = None if created is not False else getattr(self._db, "last_error", None)
+            except Exception as e:
+                error = e
+            if error:
+                from tina4_python.debug import Log
+                Log.warning(f"Session table index not created, gc() will scan the table: {error}")
             self._db.commit()
+            if shared:
+                _tables_ready.add(url)
+            else:
+                _tables_ready_dbs.add(self._db)
 
     def read(self, session_id: str) -> dict:
         row = self._db.fetch_one(
@@ -112,13 +238,13 @@ class DatabaseSessionHandler(SessionHandler):
             self.destroy(session_id)
             return {}
         try:
-            return json.loads(row["data"])
+            return codec.loads(row["data"])
         except json.JSONDecodeError:
             return {}
 
     def write(self, session_id: str, data: dict, ttl: int):
         expires = time.time() + ttl if ttl > 0 else 0
-        payload = json.dumps(data, default=str)
+        payload = codec.dumps(data)
         existing = self._db.fetch_one(
             "SELECT session_id FROM tina4_session WHERE session_id = ?",
             [session_id],
@@ -143,6 +269,7 @@ class DatabaseSessionHandler(SessionHandler):
         self._db.commit()
 
     def gc(self, max_lifetime: int):
+        """Delete every expired row in one statement (uses idx_tina4_session_expires)."""
         self._db.execute(
             "DELETE FROM tina4_session WHERE expires_at > 0 AND expires_at < ?",
             [time.time()],
@@ -163,15 +290,28 @@ class Session:
 
     def __init__(self, handler: SessionHandler = None, ttl: int = None):
         self._handler = handler or self._resolve_handler()
-        self._ttl = ttl or int(os.environ.get("TINA4_SESSION_TTL", "1800"))  # 30 min
+        config = runtime_config()
+        self._ttl = ttl or config.session_lifetime  # 30 min
+        self._touch_interval = config.session_touch_interval
         self._session_id: str | None = None
+        self._cookie_value: str | None = None  # Differs from the ID only for cookie sessions
         self._data: dict = {}
         self._dirty: bool = False
+        self._touched: float = 0.0        # When storage last had its expiry extended
+        self._cookie_pending: bool = False
 
     @staticmethod
-    def _resolve_handler() -> SessionHandler:
-        """Auto-select session handler from TINA4_SESSION_BACKEND env var."""
-        backend = os.environ.get("TINA4_SESSION_BACKEND", "file").lower().strip()
+    def _resolve_handler(backend: str = None) -> SessionHandler:
+        """Auto-select session handler from TINA4_SESSION_BACKEND env var.
+
+        With TINA4_SESSION_TIER_SIZE set, every Session in the process shares
+        one in-memory tier in front of that backend.
+        """
+        if backend is None:
+            backend = os.environ.get("TINA4_SESSION_BACKEND", "file").lower().strip()
+            tier_size = int(os.environ.get("TINA4_SESSION_TIER_SIZE", "0"))
+            if tier_size > 0 and backend != "cookie":
+                return _shared_tier(backend, tier_size)
         if backend in ("file", "filesystem"):
             return FileSessionHandler()
         elif backend in ("redis",):
@@ -185,18 +325,44 @@ class Session:
             return MongoDBSessionHandler()
         elif backend in ("database", "db"):
             return DatabaseSessionHandler()
+        elif backend in ("cookie",):
+            from tina4_python.session_handlers import CookieSessionHandler
+            return CookieSessionHandler()
         else:
             return FileSessionHandler()
 
     @property
     def session_id(self) -> str | None:
+        """The stable session ID — unchanged by writes for as long as the session lives."""
         return self._session_id
 
+    @property
+    def cookie_value(self) -> str | None:
+        """What the session cookie carries: the ID, or the whole session for cookie sessions."""
+        return self._cookie_value
+
+    @property
+    def needs_cookie(self) -> bool:
+        """True when the response must (re)send the session cookie."""
+        return self._cookie_pending
+
     def start(self, session_id: str = None) -> str:
-        """Start or resume a session. Returns the session ID."""
-        self._session_id = session_id or secrets.token_urlsafe(32)
-        self._data = self._handler.read(self._session_id)
+        """Start or resume a session from its cookie value. Returns the session ID.
+
+        A new session is not looked up in storage — its ID was just made.
+        """
         self._dirty = False
+        if session_id:
+            self._data = self._handler.read(session_id)
+            self._touched = self._data.pop(_TOUCHED_KEY, 0.0)
+            self._session_id = self._data.pop(_SID_KEY, None) or session_id
+            self._cookie_value = session_id
+            self._cookie_pending = False
+        else:
+            self._session_id = self._cookie_value = secrets.token_urlsafe(32)
+            self._data = {}
+            self._touched = 0.0
+            self._cookie_pending = True
         return self._session_id
 
     def get(self, key: str, default=None):
@@ -210,8 +376,9 @@ class Session:
 
     def delete(self, key: str):
         """Remove a session key."""
-        self._data.pop(key, None)
-        self._dirty = True
+        if key in self._data:
+            del self._data[key]
+            self._dirty = True
 
     # Alias for backward compatibility
     unset = delete
@@ -225,30 +392,57 @@ class Session:
 
     def clear(self):
         """Clear all session data."""
-        self._data.clear()
-        self._dirty = True
+        if self._data:
+            self._data.clear()
+            self._dirty = True
 
     def save(self):
-        """Persist session data to the backend."""
-        if self._session_id and self._dirty:
-            self._handler.write(self._session_id, self._data, self._ttl)
+        """Persist session data to the backend.
+
+        Writes only when data changed. An unchanged session that is not
+        empty has its expiry refreshed at most once per touch interval,
+        and the cookie is re-sent with it so both expire together.
+        Values mutated in place (``session.get("cart").append(...)``) are
+        not seen — call ``set()`` again to save them. A handler that
+        returns a new cookie value from ``write()`` (cookie sessions) gets
+        it sent; the session ID stays the same.
+        """
+        if not self._session_id:
+            return
+        now = time.time()
+        data = {**self._data, _TOUCHED_KEY: now}
+        if self._cookie_value != self._session_id:
+            data[_SID_KEY] = self._session_id
+        if self._dirty:
+            new_value = self._handler.write(self._cookie_value, data, self._ttl)
             self._dirty = False
+            self._touched = now
+        elif self._data and now - self._touched >= self._touch_interval:
+            new_value = self._handler.touch(self._cookie_value, data, self._ttl)
+            self._touched = now
+            self._cookie_pending = True
+        else:
+            return
+        if new_value and new_value != self._cookie_value:
+            self._cookie_value = new_value
+            self._cookie_pending = True
 
     def destroy(self):
-        """Destroy the session entirely."""
+        """Destroy the session entirely. The response expires the cookie."""
         if self._session_id:
-            self._handler.destroy(self._session_id)
+            self._handler.destroy(self._cookie_value)
             self._data.clear()
-            self._session_id = None
+            self._session_id = self._cookie_value = None
             self._dirty = False
+            self._cookie_pending = True
 
     def regenerate(self) -> str:
         """Regenerate session ID (prevents fixation attacks)."""
-        old_id = self._session_id
-        if old_id:
-            self._handler.destroy(old_id)
-        self._session_id = secrets.token_urlsafe(32)
+        if self._cookie_value:
+            self._handler.destroy(self._cookie_value)
+        self._session_id = self._cookie_value = secrets.token_urlsafe(32)
         self._dirty = True
+        self._cookie_pending = True
         self.save()
         return self._session_id
 
@@ -272,15 +466,73 @@ class Session:
 
     def cookie_header(self, cookie_name: str = "tina4_session") -> str:
         """Return a Set-Cookie header value for this session."""
-        samesite = os.environ.get("TINA4_SESSION_SAMESITE", "Lax")
-        return f"{cookie_name}={self._session_id}; Path=/; HttpOnly; SameSite={samesite}; Max-Age={self._ttl}"
+        samesite = runtime_config().session_samesite
+        return f"{cookie_name}={self._cookie_value}; Path=/; HttpOnly; SameSite={samesite}; Max-Age={self._ttl}"
 
     def gc(self):
         """Run garbage collection on the backend."""
         self._handler.gc(self._ttl)
 
 
+def run_gc() -> None:
+    """Sweep expired sessions from the configured backend (the server calls this periodically)."""
+    Session().gc()
+
+
+# ── Shared Tier ──────────────────────────────────────────────────
+
+_tier: SessionHandler | None = None
+_tier_lock = threading.Lock()
+
+
+def _shared_tier(backend: str, size: int) -> SessionHandler:
+    """The process-wide TieredSessionHandler, created on first use."""
+    global _tier
+    with _tier_lock:
+        if _tier is None:
+            from tina4_python.session_handlers import TieredSessionHandler
+            _tier = TieredSessionHandler(Session._resolve_handler(backend), max_sessions=size)
+            atexit.register(flush_sessions)
+        return _tier
+
+
+def flush_sessions() -> int:
+    """Write queued tiered-session changes to the backend (the server calls this on an
+    interval and at shutdown). Returns how many sessions were written."""
+    tier = _tier
+    return tier.flush() if tier is not None else 0
+
+
+class LazySession:
+    """``request.session`` until first use — no handler, no storage read, no cookie.
+
+    The first attribute access starts a real :class:`Session` from the
+    request's cookie; after that it behaves exactly like one.
+    """
+
+    __slots__ = ("_cookie_id", "_session")
+
+    def __init__(self, session_id: str | None = None):
+        self._cookie_id = session_id
+        self._session: Session | None = None
+
+    @property
+    def loaded(self) -> bool:
+        """True once the request has used its session."""
+        return self._session is not None
+
+    def _load(self) -> Session:
+        if self._session is None:
+            session = Session()
+            session.start(self._cookie_id)
+            self._session = session
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+
 __all__ = [
-    "Session", "SessionHandler",
+    "Session", "LazySession", "SessionHandler", "run_gc", "flush_sessions",
     "FileSessionHandler", "DatabaseSessionHandler",
 ]
@@ -1,6 +1,7 @@
 # Tina4 Session Handlers — pluggable session storage backends, zero core dependencies.
 """
-Optional session handlers for Redis, MongoDB, and Valkey.
+Optional session handlers for Redis, MongoDB, and Valkey, plus stateless
+signed-cookie sessions and an in-memory write-behind tier for any handler.
 Each handler extends SessionHandler and implements: read, write, destroy, gc.
 
 All external packages are optional imports with clear error messages.
@@ -14,5 +15,10 @@ All external packages are optional imports with clear error messages.
 from tina4_python.session_handlers.redis_handler import RedisSessionHandler
 from tina4_python.session_handlers.mongodb_handler import MongoDBSessionHandler
 from tina4_python.session_handlers.valkey_handler import ValkeySessionHandler
+from tina4_python.session_handlers.cookie_handler import CookieSessionHandler
+from tina4_python.session_handlers.tiered_handler import TieredSessionHandler
 
-__all__ = ["RedisSessionHandler", "MongoDBSessionHandler", "ValkeySessionHandler"]
+__all__ = [
+    "RedisSessionHandler", "MongoDBSessionHandler", "ValkeySessionHandler",
+    "CookieSessionHandler", "TieredSessionHandler",
+]
@@ -0,0 +1,214 @@
+# Tina4 Cookie Session Handler — session data in a signed cookie, no server storage.
+"""
+Stateless sessions: the data travels in the session cookie itself, signed
+with HMAC-SHA256 under the same ``SECRET`` that ``Auth`` signs tokens with.
+Nothing is read or written server-side, so any worker on any host can
+serve any request.
+
+    from tina4_python.session import Session
+    from tina4_python.session_handlers import CookieSessionHandler
+
+    session = Session(handler=CookieSessionHandler(encrypt=True))
+
+or ``TINA4_SESSION_BACKEND=cookie``.
+
+The handler hands the session a new cookie value on every write — the
+cookie value is the data. The session ID is separate: a random ID made
+when the session starts and carried, signed, inside the payload, so
+``session.session_id`` (and anything bound to it, such as CSRF tokens)
+stays the same across writes. A session that outgrows the cookie size
+limit is moved to the fallback handler (file sessions unless configured)
+under a plain random key, and comes back into the cookie once it shrinks
+again.
+
+Cookie sessions cannot be revoked. ``destroy()`` and logout only clear the
+client's cookie; a copy of it taken earlier (stolen, or simply replayed)
+stays valid until its signed expiry, because the server keeps nothing to
+check it against. Keep TINA4_SESSION_TTL short, and use a server-side
+backend when a logout must end the session everywhere.
+
+Cookie values are ``c.<payload>.<signature>``, base64url. The payload is
+the expiry plus the JSON data, zlib-compressed when that makes it smaller.
+With ``encrypt`` the payload is XORed with an HMAC-SHA256 keystream under a
+random nonce before signing (encrypt-then-MAC), so clients cannot read it;
+without it the data is only tamper-proof, not secret.
+
+Environment variables:
+    SECRET                           — signing key, shared with Auth
+    TINA4_SESSION_COOKIE_MAX         — largest cookie value in bytes before falling
+                                       back to server storage (default: 3800)
+    TINA4_SESSION_COOKIE_ENCRYPT     — encrypt the payload (default: false)
+    TINA4_SESSION_COOKIE_FALLBACK    — backend for oversized sessions: file (default),
+                                       redis, valkey, mongodb, database
+    TINA4_SESSION_TTL                — session TTL in seconds (default: 1800)
+"""
+import os
+import hmac
+import json
+import time
+import zlib
+import struct
+import hashlib
+import secrets
+
+from tina4_python.auth import _b64url_encode, _b64url_decode
+from tina4_python.core import codec
+from tina4_python.session import SessionHandler, _SID_KEY
+
+# Prefixes telling the two kinds of session ID apart without any lookup
+COOKIE_PREFIX = "c."
+SERVER_PREFIX = "s."
+
+_FLAG_COMPRESSED = 0x01
+_FLAG_ENCRYPTED = 0x02
+_NONCE_SIZE = 16
+_SIG_SIZE = 32
+# Payloads shorter than this rarely shrink under zlib
+_COMPRESS_MIN = 64
+
+
+class CookieSessionHandler(SessionHandler):
+    """Session data in an HMAC-signed (optionally encrypted) cookie.
+
+    ``write()`` and ``touch()`` return the new cookie value to send; the
+    session ID inside it does not change. Oversized sessions are stored with
+    ``fallback`` instead. Issued cookies cannot be revoked before they expire.
+    """
+
+    def __init__(self, secret: str = None, fallback: SessionHandler = None,
+                 max_size: int = None, encrypt: bool = None, compress: bool = True,
+                 ttl: int = None):
+        from tina4_python.dotenv import is_truthy
+
+        secret = (secret or os.environ.get("SECRET", "tina4-default-secret")).encode()
+        # Separate keys for signing and encryption, both derived from SECRET
+        self._mac_key = hmac.new(secret, b"tina4-session-mac", hashlib.sha256).digest()
+        self._enc_key = hmac.new(secret, b"tina4-session-enc", hashlib.sha256).digest()
+        self._max_size = max_size or int(os.environ.get("TINA4_SESSION_COOKIE_MAX", "3800"))
+        if encrypt is None:
+            encrypt = is_truthy(os.environ.get("TINA4_SESSION_COOKIE_ENCRYPT", ""))
+        self._encrypt = encrypt
+        self._compress = compress
+        self._ttl = int(ttl or os.environ.get("TINA4_SESSION_TTL", "1800"))
+        self._fallback = fallback
+
+    @property
+    def fallback(self) -> SessionHandler:
+        """Server-side handler for sessions too large for the cookie (created on first use)."""
+        if self._fallback is None:
+            self._fallback = _resolve_fallback()
+        return self._fallback
+
+    # ── SessionHandler Interface ─────────────────────────────────
+
+    def read(self, session_id: str) -> dict:
+        """Decode a cookie session, or load an oversized one from the fallback."""
+        if session_id.startswith(COOKIE_PREFIX):
+            return self.decode(session_id)
+        if session_id.startswith(SERVER_PREFIX):
+            return self.fallback.read(session_id)
+        # An ID this handler never issued — nothing is stored under it
+        return {}
+
+    def write(self, session_id: str, data: dict, ttl: int = 0) -> str:
+        """Encode the session into a cookie value and return it.
+
+        ``session_id`` is the current cookie value. The stable session ID is
+        ``data[_SID_KEY]``, or for a session never written before the plain
+        ID it was started with. When the data does not fit, it goes to the
+        fallback handler and the returned value is a plain ``s.`` reference
+        to it.
+        """
+        ttl = ttl if ttl > 0 else self._ttl
+        sid = data.get(_SID_KEY)
+        if not sid:
+            issued = session_id.startswith((COOKIE_PREFIX, SERVER_PREFIX))
+            sid = secrets.token_urlsafe(32) if issued else session_id
+        data = {**data, _SID_KEY: sid}
+        token = self.encode(data, ttl)
+        if len(token) <= self._max_size:
+            if session_id.startswith(SERVER_PREFIX):
+                self.fallback.destroy(session_id)
+            return token
+        if not session_id.startswith(SERVER_PREFIX):
+            session_id = SERVER_PREFIX + secrets.token_urlsafe(32)
+        self.fallback.write(session_id, data, ttl)
+        return session_id
+
+    def touch(self, session_id: str, data: dict, ttl: int) -> str:
+        """Re-issue the cookie with a later expiry (or refresh the fallback record)."""
+        if session_id.startswith(SERVER_PREFIX):
+            self.fallback.touch(session_id, data, ttl)
+            return session_id
+        return self.write(session_id, data, ttl)
+
+    def destroy(self, session_id: str):
+        """Cookie sessions die with the cookie; only fallback records need deleting."""
+        if session_id.startswith(SERVER_PREFIX):
+            self.fallback.destroy(session_id)
+
+    def gc(self, max_lifetime: int):
+        self.fallback.gc(max_lifetime)
+
+    # ── Cookie Encoding ──────────────────────────────────────────
+
+    def encode(self, data: dict, ttl: int) -> str:
+        """Sign (and optionally compress and encrypt) session data into a cookie value."""
+        body = struct.pack(">Q", int(time.time()) + ttl) + codec.dumps_bytes(data)
+        flags = 0
+        if self._compress and len(body) >= _COMPRESS_MIN:
+            packed = zlib.compress(body)
+            if len(packed) < len(body):
+                body = packed
+                flags |= _FLAG_COMPRESSED
+        if self._encrypt:
+            nonce = secrets.token_bytes(_NONCE_SIZE)
+            body = nonce + self._xor(nonce, body)
+            flags |= _FLAG_ENCRYPTED
+        payload = bytes((flags,)) + body
+        signature = hmac.new(self._mac_key, payload, hashlib.sha256).digest()
+        return f"{COOKIE_PREFIX}{_b64url_encode(payload)}.{_b64url_encode(signature)}"
+
+    def decode(self, token: str) -> dict:
+        """Verify and unpack a cookie value. Returns {} if forged, corrupt or expired."""
+        try:
+            _, payload, signature = token.split(".")
+            payload = _b64url_decode(payload)
+            signature = _b64url_decode(signature)
+        except ValueError:
+            return {}
+        expected = hmac.new(self._mac_key, payload, hashlib.sha256).digest()
+        if len(signature) != _SIG_SIZE or not hmac.compare_digest(signature, expected) or not payload:
+            return {}
+        flags, body = payload[0], payload[1:]
+        if flags & _FLAG_ENCRYPTED:
+            nonce, body = body[:_NONCE_SIZE], body[_NONCE_SIZE:]
+            body = self._xor(nonce, body)
+        try:
+            if flags & _FLAG_COMPRESSED:
+                body = zlib.decompress(body)
+            (expires,) = struct.unpack(">Q", body[:8])
+            if expires < time.time():
+                return {}
+            data = codec.loads(body[8:])
+        except (zlib.error, struct.error, json.JSONDecodeError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _xor(self, nonce: bytes, data: bytes) -> bytes:
+        """XOR ``data`` with an HMAC-SHA256 counter-mode keystream (its own inverse)."""
+        blocks = (len(data) + 31) // 32
+        stream = b"".join(
+            hmac.new(self._enc_key, nonce + struct.pack(">I", i), hashlib.sha256).digest()
+            for i in range(blocks)
+        )
+        return (int.from_bytes(data, "big") ^ int.from_bytes(stream[:len(data)], "big")).to_bytes(len(data), "big")
+
+
+def _resolve_fallback() -> SessionHandler:
+    """The server-side handler named by TINA4_SESSION_COOKIE_FALLBACK."""
+    from tina4_python.session import Session
+    backend = os.environ.get("TINA4_SESSION_COOKIE_FALLBACK", "file").lower().strip()
+    if backend == "cookie":
+        backend = "file"
+    return Session._resolve_handler(backend)
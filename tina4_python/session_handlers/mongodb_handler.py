@@ -33,6 +33,7 @@ class MongoDBSessionHandler(SessionHandler):
         self._pymongo_client = None
         self._collection = None
         self._use_pymongo = False
+        self._indexed = False
 
         # Raw socket state
         self._socket: socket.socket | None = None
@@ -124,8 +125,9 @@ class MongoDBSessionHandler(SessionHandler):
             self._delete_one(ns, {"_id": session_id})
 
     def gc(self, max_lifetime: int):
-        """Garbage-collect expired sessions."""
+        """Garbage-collect expired sessions — one indexed delete_many on last_accessed."""
         cutoff = time.time() - max_lifetime
+        self._ensure_index()
         if self._use_pymongo:
             self._collection.delete_many({"last_accessed": {"$lt": cutoff}})
         else:
@@ -133,6 +135,21 @@ class MongoDBSessionHandler(SessionHandler):
             ns = f"{self._database}.{self._collection_name}"
             self._delete_many(ns, {"last_accessed": {"$lt": cutoff}})
 
+    def _ensure_index(self):
+        """Index last_accessed once so the expiry delete is a range scan, not a collection scan."""
+        if self._indexed:
+            return
+        if self._use_pymongo:
+            self._collection.create_index("last_accessed")
+        else:
+            self._ensure_connected()
+            self._command({
+                "createIndexes": self._collection_name,
+                "indexes": [{"key": {"last_accessed": 1}, "name": "last_accessed_1"}],
+                "$db": self._database,
+            })
+        self._indexed = True
+
     def close(self):
         """Close the connection."""
         if self._use_pymongo:
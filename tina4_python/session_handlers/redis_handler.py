@@ -1,7 +1,7 @@
 # Tina4 Redis Session Handler — Redis via `redis` package or raw RESP protocol.
 """
 Redis session handler. Uses the `redis` package if available, falls back to
-raw RESP protocol over TCP sockets (zero dependencies).
+Tina4's pooled RESP client, ``tina4_python.core.resp`` (zero dependencies).
 
 Environment variables:
     TINA4_SESSION_REDIS_HOST     — hostname (default: localhost)
@@ -12,20 +12,50 @@ Environment variables:
 """
 import json
 import os
-import socket
+import threading
 
+from tina4_python.core import codec
+from tina4_python.core.resp import RespClient
 from tina4_python.session import SessionHandler
 
+# A handler is built per request, so connections are shared per server and
+# credentials — one pool each, not a new connection, AUTH and SELECT per request
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+
+def _shared_client(kind: str, host: str, port: int, db: int, username: str | None, password: str | None):
+    """The process-wide ``"resp"`` or ``"redis"`` (package) client for this server and database."""
+    key = (kind, host, port, db, username, password)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if kind == "redis":
+                import redis as redis_pkg
+                client = redis_pkg.Redis(
+                    host=host, port=port, db=db, username=username,
+                    password=password, decode_responses=True,
+                )
+            else:
+                # Zero-dependency fallback — pooled, connects on first use
+                client = RespClient(
+                    host=host, port=port, db=db, username=username,
+                    password=password, decode=True, timeout=30,
+                )
+            _clients[key] = client
+        return client
+
 
 class RedisSessionHandler(SessionHandler):
     """Redis-backed session handler with TTL support.
 
-    Uses `redis` package when available, raw RESP protocol as fallback.
+    Uses `redis` package when available, Tina4's RESP client as fallback.
     """
 
     def __init__(self, **config):
         self._host = config.get("host", os.environ.get("TINA4_SESSION_REDIS_HOST", "localhost"))
         self._port = int(config.get("port", os.environ.get("TINA4_SESSION_REDIS_PORT", "6379")))
+        self._username = config.get("username") or None
         self._password = config.get("password") or os.environ.get("TINA4_SESSION_REDIS_PASSWORD") or None
         self._db = int(config.get("db", os.environ.get("TINA4_SESSION_REDIS_DB", "0")))
         self._ttl = int(config.get("ttl", os.environ.get("TINA4_SESSION_TTL", "1800")))
@@ -34,19 +64,12 @@ class RedisSessionHandler(SessionHandler):
         self._redis_client = None
         self._use_redis_pkg = False
 
-        # Raw socket state
-        self._socket: socket.socket | None = None
+        args = (self._host, self._port, self._db, self._username, self._password)
+        self._resp = _shared_client("resp", *args)
 
         # Try redis package first
         try:
-            import redis as redis_pkg
-            self._redis_client = redis_pkg.Redis(
-                host=self._host,
-                port=self._port,
-                db=self._db,
-                password=self._password,
-                decode_responses=True,
-            )
+            self._redis_client = _shared_client("redis", *args)
             self._use_redis_pkg = True
         except ImportError:
             pass
@@ -63,23 +86,22 @@ class RedisSessionHandler(SessionHandler):
             if data is None:
                 return {}
             try:
-                return json.loads(data)
+                return codec.loads(data)
             except json.JSONDecodeError:
                 return {}
         else:
-            self._ensure_connected()
-            data = self._send_command("GET", self._key(session_id))
+            data = self._resp.execute("GET", self._key(session_id))
             if data is None:
                 return {}
             try:
-                return json.loads(data)
+                return codec.loads(data)
             except json.JSONDecodeError:
                 return {}
 
     def write(self, session_id: str, data: dict, ttl: int = 0):
         """Write session data with TTL."""
         effective_ttl = ttl if ttl > 0 else self._ttl
-        payload = json.dumps(data, default=str)
+        payload = codec.dumps(data)
         key = self._key(session_id)
 
         if self._use_redis_pkg:
@@ -88,119 +110,26 @@ class RedisSessionHandler(SessionHandler):
             else:
                 self._redis_client.set(key, payload)
         else:
-            self._ensure_connected()
             if effective_ttl > 0:
-                self._send_command("SETEX", key, str(effective_ttl), payload)
+                self._resp.execute("SET", key, payload, "EX", effective_ttl)
             else:
-                self._send_command("SET", key, payload)
+                self._resp.execute("SET", key, payload)
 
     def destroy(self, session_id: str):
         """Delete a session."""
         if self._use_redis_pkg:
             self._redis_client.delete(self._key(session_id))
         else:
-            self._ensure_connected()
-            self._send_command("DEL", self._key(session_id))
+            self._resp.execute("DEL", self._key(session_id))
 
     def gc(self, max_lifetime: int):
         """Garbage collection. Redis handles TTL automatically."""
         pass
 
     def close(self):
-        """Close the connection."""
+        """Close idle connections. The client is shared and reconnects on next use."""
         if self._use_redis_pkg:
             if self._redis_client:
                 self._redis_client.close()
         else:
-            self._close_raw()
-
-    # ── Raw RESP Protocol Implementation ─────────────────────────
-
-    def _ensure_connected(self):
-        if self._socket is None:
-            self._connect_raw()
-
-    def _connect_raw(self):
-        self._socket = socket.create_connection((self._host, self._port), timeout=10)
-        self._socket.settimeout(30)
-
-        if self._password:
-            result = self._send_command("AUTH", self._password)
-            if result != "OK":
-                raise RuntimeError("Redis authentication failed")
-
-        if self._db > 0:
-            result = self._send_command("SELECT", str(self._db))
-            if result != "OK":
-                raise RuntimeError(f"Redis SELECT database {self._db} failed")
-
-    def _close_raw(self):
-        if self._socket:
-            try:
-                self._send_command("QUIT")
-            except (OSError, ConnectionError):
-                pass
-            try:
-                self._socket.close()
-            except OSError:
-                pass
-            self._socket = None
-
-    def _send_command(self, *args: str):
-        """Send a RESP command and read the reply."""
-        cmd = f"*{len(args)}\r\n"
-        for arg in args:
-            cmd += f"${len(arg)}\r\n{arg}\r\n"
-        self._socket.sendall(cmd.encode("utf-8"))
-        return self._read_reply()
-
-    def _read_reply(self):
-        """Read a RESP reply from the socket."""
-        line = self._read_line()
-        reply_type = line[0]
-        data = line[1:]
-
-        if reply_type == "+":
-            return data
-        elif reply_type == "-":
-            raise RuntimeError(f"Redis error: {data}")
-        elif reply_type == ":":
-            return int(data)
-        elif reply_type == "$":
-            length = int(data)
-            if length == -1:
-                return None
-            value = self._recv_exact(length + 2)  # +2 for \r\n
-            return value[:length].decode("utf-8")
-        elif reply_type == "*":
-            count = int(data)
-            if count == -1:
-                return None
-            result = []
-            for _ in range(count):
-                result.append(self._read_reply())
-            return result
-        else:
-            raise RuntimeError(f"Unknown RESP reply type: {reply_type}")
-
-    def _read_line(self) -> str:
-        """Read a line terminated by \\r\\n."""
-        line = b""
-        while True:
-            char = self._socket.recv(1)
-            if not char:
-                raise RuntimeError("Connection closed while reading from Redis")
-            if char == b"\r":
-                self._socket.recv(1)  # consume \n
-                break
-            line += char
-        return line.decode("utf-8")
-
-    def _recv_exact(self, n: int) -> bytes:
-        data = b""
-        while len(data) < n:
-            chunk = self._socket.recv(n - len(data))
-            if not chunk:
-                raise RuntimeError("Connection closed while reading Redis data")
-            data += chunk
-        return data
+            self._resp.close()
@@ -0,0 +1,270 @@
+# Tina4 Tiered Session Handler — in-process LRU in front of any session backend.
+"""
+Keeps hot sessions in memory and writes changes behind to the wrapped
+handler, so a logged-in page view does no synchronous disk or database I/O.
+
+    from tina4_python.session import Session, FileSessionHandler
+    from tina4_python.session_handlers import TieredSessionHandler
+
+    tier = TieredSessionHandler(FileSessionHandler(), max_sessions=10000)
+    session = Session(handler=tier)
+    ...
+    tier.flush()   # write pending changes through (the server does this on an interval)
+
+or ``TINA4_SESSION_TIER_SIZE=10000`` to tier the configured backend for the
+whole process.
+
+Reads come from memory when the session is hot. Writes update memory and
+queue the session. Repeated writes to one session between flushes are
+coalesced, and each flush writes the whole queue through in one batch.
+Destroy is never deferred, so a logout is durable at once. Session IDs
+never change; the version used to spot other workers' writes is kept in
+the stored payload.
+
+Consistency, with several workers or hosts sharing one backend:
+
+- A worker always sees its own writes.
+- A clean hot copy is served for at most TINA4_SESSION_TIER_REVALIDATE
+  seconds, then read from storage again (never waited on — a read is one
+  storage round trip at most). Another worker's write is therefore seen
+  within its flush interval plus this revalidate interval.
+- Flushes run off the event loop. Each one re-reads the stored copy; if
+  another worker wrote since this worker read it, the keys this worker
+  changed are merged onto the stored copy instead of replacing it. When
+  both changed the same key, this flush's value wins and the clash is
+  counted in ``stats()["conflicts"]`` and logged. A session destroyed
+  elsewhere is not brought back by a pending write.
+- Between a flush's re-read and its write another flush can still land;
+  that narrow window is the only place an update can be lost.
+
+Pending writes live in memory until flushed — up to one flush interval of
+changes is lost if the process is killed outright.
+
+Environment variables:
+    TINA4_SESSION_TIER_SIZE        — hot sessions kept per process, 0 = no tier (default: 0)
+    TINA4_SESSION_FLUSH_INTERVAL   — seconds between write-behind flushes (default: 1)
+    TINA4_SESSION_TIER_REVALIDATE  — seconds a clean hot copy is trusted before re-reading
+                                     storage (default: 1)
+    TINA4_SESSION_TTL              — session TTL in seconds (default: 1800)
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from tina4_python.debug import Log
+from tina4_python.session import SessionHandler, _TOUCHED_KEY
+
+# Stored with the session data in the wrapped handler
+_VERSION_KEY = "_tina4_version"
+
+# Keys that change on every save and never count as a conflict
+_BOOKKEEPING = frozenset((_TOUCHED_KEY, _VERSION_KEY))
+
+_REMOVED = object()
+
+
+class _Entry:
+    """A hot session: its data, and the stored copy it was based on."""
+
+    __slots__ = ("data", "expires", "ttl", "base", "base_version", "checked")
+
+    def __init__(self, data: dict, expires: float, ttl: int, base: dict | None, base_version: int):
+        self.data = data
+        self.expires = expires
+        self.ttl = ttl
+        self.base = base                  # Stored data when last read or flushed, None if never stored
+        self.base_version = base_version  # Its _tina4_version
+        self.checked = time.monotonic()   # When it was last read from or written to storage
+
+
+class TieredSessionHandler(SessionHandler):
+    """Bounded LRU of hot sessions with write-behind to ``handler``."""
+
+    def __init__(self, handler: SessionHandler, max_sessions: int = None, ttl: int = None,
+                 revalidate: float = None):
+        self._handler = handler
+        self._max = max_sessions or int(os.environ.get("TINA4_SESSION_TIER_SIZE", "0")) or 10000
+        self._ttl = int(ttl or os.environ.get("TINA4_SESSION_TTL", "1800"))
+        self._revalidate = float(os.environ.get("TINA4_SESSION_TIER_REVALIDATE", "1")
+                                 if revalidate is None else revalidate)
+        # Queued entries are in both maps until flushed, so an evicted-but-unflushed
+        # session is still found
+        self._hot: OrderedDict[str, _Entry] = OrderedDict()
+        self._pending: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._flushed = 0
+        self._conflicts = 0
+
+    @property
+    def handler(self) -> SessionHandler:
+        """The persistent handler behind the tier."""
+        return self._handler
+
+    # ── SessionHandler Interface ─────────────────────────────────
+
+    def read(self, session_id: str) -> dict:
+        """Serve from memory while the hot copy is fresh or has unflushed changes."""
+        now = time.time()
+        with self._lock:
+            entry = self._pending.get(session_id) or self._hot.get(session_id)
+            if entry is not None and entry.expires > now and (
+                    session_id in self._pending or time.monotonic() - entry.checked < self._revalidate):
+                if session_id in self._hot:
+                    self._hot.move_to_end(session_id)
+                self._hits += 1
+                return dict(entry.data)
+            self._misses += 1
+
+        data, version = self._read_stored(session_id)
+        if not data:
+            with self._lock:
+                if session_id not in self._pending:
+                    self._hot.pop(session_id, None)
+            return {}
+        entry = _Entry(data, data.get(_TOUCHED_KEY, now) + self._ttl, self._ttl, dict(data), version)
+        with self._lock:
+            held = self._pending.get(session_id)
+            if held is not None:
+                # A write queued while we read wins; the flush reconciles it with storage
+                return dict(held.data)
+            self._hot[session_id] = entry
+            self._hot.move_to_end(session_id)
+            self._evict()
+        return dict(data)
+
+    def write(self, session_id: str, data: dict, ttl: int = 0):
+        """Update memory and queue the write."""
+        self._queue(session_id, data, ttl)
+
+    def touch(self, session_id: str, data: dict, ttl: int):
+        """Extend the expiry behind the scenes."""
+        self._queue(session_id, data, ttl)
+
+    def destroy(self, session_id: str):
+        with self._lock:
+            self._hot.pop(session_id, None)
+            self._pending.pop(session_id, None)
+        self._handler.destroy(session_id)
+
+    def gc(self, max_lifetime: int):
+        now = time.time()
+        with self._lock:
+            for session_id in [sid for sid, entry in self._hot.items() if entry.expires <= now]:
+                del self._hot[session_id]
+        self._handler.gc(max_lifetime)
+
+    # ── Tier ─────────────────────────────────────────────────────
+
+    def _read_stored(self, session_id: str) -> tuple[dict, int]:
+        data = self._handler.read(session_id)
+        return data, data.pop(_VERSION_KEY, 0)
+
+    def _queue(self, session_id: str, data: dict, ttl: int):
+        ttl = ttl if ttl > 0 else self._ttl
+        with self._lock:
+            held = self._pending.get(session_id) or self._hot.get(session_id)
+            base, base_version = (held.base, held.base_version) if held is not None else (None, 0)
+            entry = _Entry(dict(data), time.time() + ttl, ttl, base, base_version)
+            if held is not None:
+                entry.checked = held.checked
+            self._hot[session_id] = entry
+            self._hot.move_to_end(session_id)
+            self._pending[session_id] = entry
+            self._evict()
+
+    def _evict(self):
+        while len(self._hot) > self._max:
+            self._hot.popitem(last=False)
+
+    def flush(self) -> int:
+        """Write every queued session through to the handler. Returns how many were written.
+
+        Each session is reconciled with the stored copy first (see the module
+        docstring). Failed writes are re-queued (unless a newer write arrived
+        meanwhile) and the last error is raised once the rest of the batch is done.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            now = time.time()
+            written = 0
+            error = None
+            for session_id, entry in batch.items():
+                remaining = int(entry.expires - now)
+                if remaining <= 0:
+                    continue
+                try:
+                    if self._write_through(session_id, entry, remaining):
+                        written += 1
+                except Exception as e:
+                    error = e
+                    with self._lock:
+                        self._pending.setdefault(session_id, entry)
+            with self._lock:
+                self._flushed += written
+            if error is not None:
+                raise error
+            return written
+
+    def _write_through(self, session_id: str, entry: _Entry, remaining: int) -> bool:
+        stored, stored_version = self._read_stored(session_id)
+        data = entry.data
+        if stored_version != entry.base_version:
+            if entry.base is not None and not stored:
+                # Destroyed by another worker — don't resurrect it
+                with self._lock:
+                    if self._hot.get(session_id) is entry:
+                        del self._hot[session_id]
+                return False
+            data = self._merge(session_id, entry, stored)
+        version = max(time.time_ns() // 1000, stored_version + 1)
+        self._handler.write(session_id, {**data, _VERSION_KEY: version}, remaining)
+        with self._lock:
+            entry.data = data
+            based_on = entry.base_version
+            # A write queued during the flush builds on what was just stored
+            for held in {id(e): e for e in (entry, self._pending.get(session_id),
+                                             self._hot.get(session_id)) if e is not None}.values():
+                if held.base_version == based_on:
+                    held.base = dict(data)
+                    held.base_version = version
+                    held.checked = time.monotonic()
+        return True
+
+    def _merge(self, session_id: str, entry: _Entry, stored: dict) -> dict:
+        """Apply the keys this worker changed since ``entry.base`` onto ``stored``."""
+        base = entry.base or {}
+        merged = dict(stored)
+        clashes = 0
+        for key in base.keys() | entry.data.keys():
+            ours = entry.data.get(key, _REMOVED)
+            if ours == base.get(key, _REMOVED):
+                continue
+            if key not in _BOOKKEEPING and stored.get(key, _REMOVED) != base.get(key, _REMOVED) \
+                    and stored.get(key, _REMOVED) != ours:
+                clashes += 1
+            if ours is _REMOVED:
+                merged.pop(key, None)
+            else:
+                merged[key] = ours
+        if clashes:
+            with self._lock:
+                self._conflicts += clashes
+            Log.warning(f"Session {session_id[:8]}…: {clashes} key(s) changed by two workers; kept this worker's")
+        return merged
+
+    def stats(self) -> dict:
+        """Hit/miss counters, queue depth, and keys two workers changed at once."""
+        with self._lock:
+            return {
+                "hot": len(self._hot),
+                "pending": len(self._pending),
+                "hits": self._hits,
+                "misses": self._misses,
+                "flushed": self._flushed,
+                "conflicts": self._conflicts,
+            }
@@ -25,6 +25,28 @@ from tina4_python.core.response import Response
 from tina4_python.core.router import Router
 
 
+def _run_sync(coro):
+    """Run a coroutine to completion, even from inside a running event loop."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop and loop.is_running():
+        # Already in an async context — run on a separate thread's loop
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            return pool.submit(asyncio.run, coro).result()
+    return asyncio.run(coro)
+
+
+def _drain_stream(response: Response) -> bytes:
+    """Collect a streamed response body (uncompressed)."""
+    async def collect():
+        return b"".join([chunk async for chunk in response.iter_stream()])
+    return _run_sync(collect())
+
+
 class TestResponse:
     """Wraps a Response object with a clean test-friendly API."""
 
@@ -32,7 +54,7 @@ class TestResponse:
 
     def __init__(self, response: Response):
         self.status: int = response.status_code
-        self.body: bytes = response.content
+        self.body: bytes = _drain_stream(response) if response.is_streaming else response.content
         self.content_type: str = response.content_type
         self.headers: dict = {}
         for name, value in response._headers:
@@ -156,18 +178,7 @@ class TestClient:
 
         # If handler is async, run it in an event loop
         if asyncio.iscoroutine(result):
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = None
-
-            if loop and loop.is_running():
-                # Already in an async context — create a task
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as pool:
-                    result = pool.submit(asyncio.run, result).result()
-            else:
-                result = asyncio.run(result)
+            result = _run_sync(result)
 
         # The handler should have returned the response via response(...)
         # If the handler returned a Response, use that
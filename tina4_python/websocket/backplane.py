@@ -49,38 +49,47 @@ class WebSocketBackplane:
 
 
 class RedisBackplane(WebSocketBackplane):
-    """Redis pub/sub backplane.
+    """Redis / Valkey pub/sub backplane.
 
-    Requires the ``redis`` package (``pip install redis``). The import is
-    deferred so the rest of Tina4 works fine without it installed — an error
-    is raised only when this class is actually instantiated.
+    Uses the ``redis`` package when it is installed, otherwise Tina4's own
+    RESP client (``tina4_python.core.resp``) — no extra dependency needed.
     """
 
     def __init__(self, url: str | None = None):
-        try:
-            import redis
-        except ImportError:
-            raise ImportError(
-                "The 'redis' package is required for RedisBackplane. "
-                "Install it with: pip install redis"
-            )
-
         self._url = url or os.environ.get(
             "TINA4_WS_BACKPLANE_URL", "redis://localhost:6379"
         )
-        self._redis = redis.Redis.from_url(self._url)
-        self._pubsub = self._redis.pubsub()
         self._threads: dict[str, threading.Thread] = {}
         self._running = True
+        try:
+            import redis
+        except ImportError:
+            redis = None
+
+        if redis is not None:
+            self._resp = None
+            self._redis = redis.Redis.from_url(self._url)
+            self._pubsub = self._redis.pubsub()
+        else:
+            from tina4_python.core.resp import RespClient
+            self._redis = None
+            self._resp = RespClient(self._url, decode=True)
+            self._pubsub = self._resp.pubsub()
         logger.info("RedisBackplane connected to %s", self._url)
 
     def publish(self, channel: str, message: str) -> None:
-        self._redis.publish(channel, message)
+        if self._resp is not None:
+            self._resp.publish(channel, message)
+        else:
+            self._redis.publish(channel, message)
 
     def subscribe(self, channel: str, callback) -> None:
-        self._pubsub.subscribe(**{channel: lambda raw: callback(raw["data"].decode() if isinstance(raw["data"], bytes) else raw["data"])})
-        thread = self._pubsub.run_in_thread(sleep_time=0.01, daemon=True)
-        self._threads[channel] = thread
+        if self._resp is not None:
+            self._pubsub.subscribe(channel, lambda _channel, data: callback(data))
+        else:
+            self._pubsub.subscribe(**{channel: lambda raw: callback(raw["data"].decode() if isinstance(raw["data"], bytes) else raw["data"])})
+            thread = self._pubsub.run_in_thread(sleep_time=0.01, daemon=True)
+            self._threads[channel] = thread
         logger.info("RedisBackplane subscribed to channel '%s'", channel)
 
     def unsubscribe(self, channel: str) -> None:
@@ -96,7 +105,10 @@ class RedisBackplane(WebSocketBackplane):
             thread.stop()
         self._threads.clear()
         self._pubsub.close()
-        self._redis.close()
+        if self._resp is not None:
+            self._resp.close()
+        else:
+            self._redis.close()
         logger.info("RedisBackplane closed")
 
 